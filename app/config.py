@@ -84,7 +84,98 @@ class Config(BaseSettings):
         default=15,
         description="Access token expiration time in minutes"
     )
-    
+
+    bcrypt_rounds: int = Field(
+        default=12,
+        description="bcrypt cost factor for new password hashes; older hashes are upgraded on login"
+    )
+
+    password_hash_workers: int = Field(
+        default=2,
+        description="Threads dedicated to password hashing and verification"
+    )
+
+    password_hash_max_pending: int = Field(
+        default=32,
+        description="Password operations allowed in flight before logins are rejected with 503"
+    )
+
+    auth_user_cache_ttl_seconds: int = Field(
+        default=30,
+        description="How long authenticated user records are reused across requests (0 disables)"
+    )
+
+    auth_user_cache_max_entries: int = Field(
+        default=10000,
+        description="Maximum number of users kept in the authentication cache"
+    )
+
+    auth_stateless_tokens: bool = Field(
+        default=False,
+        description="Trust signed access-token claims instead of reading the user and session per request"
+    )
+
+    token_revocation_refresh_seconds: float = Field(
+        default=5.0,
+        description="How often each worker loads token revocations recorded by other workers"
+    )
+
+    # Background database maintenance
+    maintenance_enabled: bool = Field(
+        default=True,
+        description="Run periodic garbage collection and SQLite upkeep in the background"
+    )
+
+    maintenance_interval_seconds: float = Field(
+        default=300.0,
+        description="Seconds between maintenance cycles"
+    )
+
+    maintenance_batch_size: int = Field(
+        default=500,
+        description="Rows deleted per transaction by maintenance garbage collection"
+    )
+
+    maintenance_batch_pause_ms: int = Field(
+        default=50,
+        description="Pause between delete batches so other writers can take the SQLite lock"
+    )
+
+    maintenance_checkpoint_every: int = Field(
+        default=12,
+        description="Cycles between WAL checkpoints and incremental vacuums"
+    )
+
+    maintenance_analyze_every: int = Field(
+        default=288,
+        description="Cycles between ANALYZE runs"
+    )
+
+    notification_retention_days: int = Field(
+        default=30,
+        description="Read notifications older than this are garbage collected"
+    )
+
+    taste_decay_half_life_days: Optional[float] = Field(
+        default=None,
+        description="Half-life applied to older recipe ratings in taste aggregates (unset disables decay)"
+    )
+
+    profile_cache_ttl_seconds: float = Field(
+        default=300.0,
+        description="How long recommendation workers reuse a user's taste profile without a write"
+    )
+
+    profile_cache_max_entries: int = Field(
+        default=5000,
+        description="Maximum taste profiles cached per recommendation worker"
+    )
+
+    recipe_cache_max_entries: int = Field(
+        default=2000,
+        description="Hydrated recipes (with ingredients, instructions and nutrition) kept per worker"
+    )
+
     # Application configuration
     environment: str = Field(
         default="development",
@@ -107,6 +198,19 @@ class Config(BaseSettings):
         description="Optional LibreTranslate API key if authentication is enabled"
     )
 
+    translation_memory_enabled: bool = Field(
+        default=True,
+        description="Serve known translations from the on-disk translation memory before Redis and providers"
+    )
+    recipe_pool_enabled: bool = Field(
+        default=False,
+        description="Pre-generate base recipes at startup and serve generation requests from the nearest one"
+    )
+    recipe_pool_variants: int = Field(
+        default=8,
+        description="Recipes generated per cuisine, meal type and diet in the recipe pool"
+    )
+
     # Social features configuration
     social_enabled: bool = Field(
         default=True,
@@ -122,6 +226,34 @@ class Config(BaseSettings):
         default=False,
         description="Enable the unified intelligent flow endpoint"
     )
+    intelligent_flow_workers: int = Field(
+        default=2,
+        description="Asynchronous intelligent flows run concurrently per process"
+    )
+    intelligent_flow_max_jobs: int = Field(
+        default=1000,
+        description="Queued or running asynchronous intelligent flow jobs accepted at once; further enqueues are rejected"
+    )
+    intelligent_flow_job_ttl_seconds: int = Field(
+        default=3600,
+        description="Seconds a finished asynchronous intelligent flow job stays retrievable before it is purged"
+    )
+    intelligent_flow_max_attempts: int = Field(
+        default=3,
+        description="Runs of an asynchronous intelligent flow job before it is marked failed"
+    )
+    intelligent_flow_retry_backoff_seconds: float = Field(
+        default=5.0,
+        description="Delay before retrying a failed intelligent flow job, doubled for each further attempt"
+    )
+    intelligent_flow_visibility_timeout_seconds: float = Field(
+        default=60.0,
+        description="Seconds a claimed intelligent flow job stays hidden from other workers without a lease renewal"
+    )
+    intelligent_flow_max_running_per_user: int = Field(
+        default=1,
+        description="Asynchronous intelligent flows of a single user running at once"
+    )
 
     gamification_point_rules: Dict[str, int] = Field(
         default_factory=dict,
@@ -138,6 +270,26 @@ class Config(BaseSettings):
         description="Cantidad máxima de requests por minuto al discover feed por usuario",
     )
 
+    catalog_snapshot_enabled: bool = Field(
+        default=False,
+        description="Serve product catalog reads from a shared memory-mapped snapshot"
+    )
+
+    catalog_snapshot_path: str = Field(
+        default="data/catalog_snapshot.bin",
+        description="Path of the memory-mapped product catalog snapshot"
+    )
+
+    catalog_snapshot_max_age_seconds: int = Field(
+        default=3600,
+        description="Rebuild the catalog snapshot (at startup and by maintenance) when older than this"
+    )
+
+    meal_planner_mode: str = Field(
+        default="greedy",
+        description="Meal plan product selection: 'greedy' or 'optimized'"
+    )
+
     # Discover feed configuration
     discover_feed: Dict[str, Any] = Field(
         default_factory=lambda: {
@@ -151,6 +303,7 @@ class Config(BaseSettings):
             },
             "max_posts_per_author": 2,
             "cache_ttl_seconds": 60,
+            "cache_max_entries": 5000,
         },
         description="Discover feed ranking configuration",
     )
@@ -194,7 +194,18 @@ class MealPlanConfig(BaseModel):
     # Tolerance settings
     calorie_tolerance_strict: float = Field(default=0.05, description="Strict calorie tolerance (±5%)")
     calorie_tolerance_flexible: float = Field(default=0.15, description="Flexible calorie tolerance (±15%)")
-    
+
+    # Product selection strategy
+    planner_mode: str = Field(default="greedy", description="Meal selection strategy: 'greedy' or 'optimized'")
+    macro_ratio_targets: Dict[str, float] = Field(default={
+        "protein": 0.30,
+        "fat": 0.30,
+        "carbs": 0.40
+    }, description="Target share of meal calories per macro for the optimized planner")
+    portion_options: List[float] = Field(default=[1.0, 1.5, 2.0], description="Serving multiples the optimized planner may choose")
+    optimizer_candidate_pool: int = Field(default=48, description="Products kept per meal before the optimized search")
+    optimizer_beam_width: int = Field(default=96, description="Partial meals kept per search step in the optimized planner")
+
     # Activity level multipliers for TDEE calculation
     activity_multipliers: Dict[str, float] = Field(default={
         "sedentary": 1.2,
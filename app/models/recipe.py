@@ -199,6 +199,7 @@ class RecipeSearchResponse(BaseModel):
     page: int
     page_size: int
     has_more: bool
+    next_cursor: Optional[str] = Field(None, description="Pass as 'cursor' to fetch the next page")
 
 
 class RecipeRatingResponse(BaseModel):
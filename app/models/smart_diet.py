@@ -181,6 +181,8 @@ class SmartDietResponse(BaseModel):
     total_suggestions: int = Field(0, description="Total number of suggestions")
     avg_confidence: float = Field(0.0, description="Average confidence score")
     generation_time_ms: Optional[float] = Field(None, description="Generation time in milliseconds")
+    generation_breakdown_ms: Dict[str, float] = Field(default_factory=dict, description="Time spent per generation stage")
+    degraded_stages: List[str] = Field(default_factory=list, description="Stages that timed out or failed and were skipped")
     
     # Version and metadata
     smart_diet_version: str = Field("1.0", description="Smart Diet algorithm version")
@@ -9,6 +9,7 @@ from typing import Optional, List, Dict, Any
 from app.repositories.base import Repository
 from app.repositories.connection import connection_manager
 from app.models.product import Product
+from app.services.nutrient_index import nutrient_index
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +54,16 @@ class ProductRepository(Repository[Product]):
             "nutriments": entity.nutriments or {}
         }
 
+    @staticmethod
+    def _index(product: Optional[Product]) -> None:
+        """Keep the in-process nutrient index in step with a written product"""
+        if product is not None:
+            nutrient_index.upsert({
+                "barcode": product.barcode,
+                "name": product.name,
+                "nutriments": product.nutriments or {},
+            })
+
     async def get_by_id(self, product_id: int) -> Optional[Product]:
         """Get product by ID"""
         async with connection_manager.get_connection() as conn:
@@ -96,7 +107,9 @@ class ProductRepository(Repository[Product]):
             self.logger.info(f"Product created: {product_id}")
 
         # Task 2.1.5: Call get_by_id AFTER commit (outside context manager)
-        return await self.get_by_id(product_id)
+        created = await self.get_by_id(product_id)
+        self._index(created)
+        return created
 
     async def update(self, product_id: int, updates: Dict[str, Any]) -> Optional[Product]:
         """Update product fields"""
@@ -118,17 +131,27 @@ class ProductRepository(Repository[Product]):
             )
             self.logger.info(f"Product updated: {product_id}")
 
-        return await self.get_by_id(product_id)
+        updated = await self.get_by_id(product_id)
+        self._index(updated)
+        return updated
 
     async def delete(self, product_id: int) -> bool:
         """Delete product"""
         async with connection_manager.get_connection() as conn:
+            row = conn.execute(
+                "SELECT barcode FROM products WHERE id = ?",
+                (product_id,)
+            ).fetchone()
             cursor = conn.execute(
                 "DELETE FROM products WHERE id = ?",
                 (product_id,)
             )
             self.logger.info(f"Product deleted: {product_id}")
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+
+        if deleted and row is not None:
+            nutrient_index.remove(row[0])
+        return deleted
 
     async def get_all(self, limit: int = 100, offset: int = 0) -> List[Product]:
         """Get all products with pagination"""
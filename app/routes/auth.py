@@ -217,14 +217,14 @@ async def change_password(
             )
         
         # Verify current password
-        if not auth_service.verify_password(password_data.current_password, current_hash):
+        if not await auth_service.verify_password_async(password_data.current_password, current_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect"
             )
         
         # Hash new password
-        new_hash = auth_service.hash_password(password_data.new_password)
+        new_hash = await auth_service.hash_password_async(password_data.new_password)
         
         # Update password
         await user_service.update_user(current_user.id, {'password_hash': new_hash})
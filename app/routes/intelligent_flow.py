@@ -2,14 +2,17 @@
 Intelligent Flow API Routes
 
 Expose the unified IA pipeline that chains Food Vision, Recipe AI y Smart Diet.
-Supports synchronous execution and an asynchronous job mode backed by an
-in-memory queue.
+Supports synchronous execution, streaming of each step as it finishes
+(NDJSON) and an asynchronous job mode backed by a durable SQLite queue.
 """
 
+import json
 from datetime import datetime
-from typing import Any, Dict, Optional, Union
+from typing import Any, AsyncIterator, Dict, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from app.models.intelligent_flow import (
@@ -18,13 +21,13 @@ from app.models.intelligent_flow import (
     IntelligentFlowRecipePreferences,
     IntelligentFlowSmartDietConfig,
 )
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.services.auth import get_current_user
 from app.services.intelligent_flow import (
     intelligent_flow_service,
     IntelligentFlowValidationError,
 )
-from app.services.intelligent_flow_queue import intelligent_flow_queue
+from app.services.intelligent_flow_queue import intelligent_flow_queue, IntelligentFlowQueueFull
 from app.utils.feature_flags import assert_feature_enabled
 
 router = APIRouter(tags=["intelligent-flow"])
@@ -66,6 +69,7 @@ class IntelligentFlowJobStatus(BaseModel):
         401: {"description": "Authentication required"},
         404: {"description": "Feature disabled"},
         500: {"description": "Intelligent flow execution failed"},
+        503: {"description": "Asynchronous job queue is full"},
     },
 )
 async def run_intelligent_flow(
@@ -96,7 +100,15 @@ async def run_intelligent_flow(
     )
 
     if async_mode:
-        job = await intelligent_flow_queue.enqueue(intelligent_flow_service, request)
+        priority = 1 if current_user.role in (UserRole.PREMIUM, UserRole.DEVELOPER) else 0
+        try:
+            job = await intelligent_flow_queue.enqueue(intelligent_flow_service, request, priority=priority)
+        except IntelligentFlowQueueFull as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Intelligent flow queue is full, try again later",
+                headers={"Retry-After": "30"},
+            ) from exc
         response.status_code = status.HTTP_202_ACCEPTED
         return IntelligentFlowJobStatus(
             job_id=job.id,
@@ -123,6 +135,60 @@ async def run_intelligent_flow(
         ) from exc
 
 
+@router.post(
+    "/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "One JSON event per line: a `step` event as each step finishes, then `complete` or `error`",
+            "content": {"application/x-ndjson": {}},
+        },
+        400: {"description": "Invalid request payload"},
+        401: {"description": "Authentication required"},
+        404: {"description": "Feature disabled"},
+    },
+)
+async def stream_intelligent_flow(
+    payload: IntelligentFlowPayload,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Execute the intelligent flow and stream each step's result as soon as it is ready.
+
+    The vision analysis arrives while the recipe and Smart Diet steps are
+    still running; the last line carries the same response as the
+    synchronous endpoint.
+    """
+    assert_feature_enabled("intelligent_flow_enabled")
+
+    request = IntelligentFlowRequest(
+        user_id=current_user.id,
+        image_base64=payload.image_base64,
+        meal_type=payload.meal_type,
+        user_context=payload.user_context,
+        recipe_preferences=payload.recipe_preferences,
+        smart_diet_config=payload.smart_diet_config,
+    )
+
+    try:
+        events = intelligent_flow_service.stream_flow(request)
+    except IntelligentFlowValidationError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+
+    return StreamingResponse(_ndjson(events), media_type="application/x-ndjson")
+
+
+async def _ndjson(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    try:
+        async for event in events:
+            yield json.dumps(jsonable_encoder(event)) + "\n"
+    finally:
+        await events.aclose()
+
+
 @router.get(
     "/{job_id}",
     response_model=IntelligentFlowJobStatus,
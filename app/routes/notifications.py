@@ -1,5 +1,6 @@
 # EPIC_A.A5: Notification routes for managing user notifications
 
+import asyncio
 from typing import Optional
 from fastapi import APIRouter, Depends, Query, HTTPException
 from pydantic import BaseModel
@@ -138,7 +139,7 @@ async def cleanup_old_notifications(
     # For now, allow authenticated users (temporary)
 
     try:
-        deleted_count = NotificationService.cleanup_old_notifications(days_old)
+        deleted_count = await asyncio.to_thread(NotificationService.cleanup_old_notifications, days_old)
         return {
             "deleted_count": deleted_count,
             "message": deleted_count
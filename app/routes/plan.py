@@ -12,6 +12,7 @@ from app.models.product import ErrorResponse
 from app.services.meal_planner import meal_planner
 from app.services.plan_storage import plan_storage
 from app.services.plan_customizer import plan_customizer
+from app.services.smart_diet_cache import get_smart_diet_cache
 from app.services.openfoodfacts import openfoodfacts_service
 from app.services.database import db_service
 from app.repositories.meal_plan_repository import MealPlanRepository
@@ -120,6 +121,8 @@ async def generate_meal_plan(request: MealPlanRequest, req: Request):
         # Store the plan for future customization
         plan.is_active = True
         plan_id = await plan_storage.store_plan(plan, user_id=user_id, activate=True)
+        if user_id:
+            await get_smart_diet_cache().invalidate_user_cache(user_id)
         logger.info(f"Plan Storage Debug - Generated plan_id: {plan_id}")
 
         # Include the plan ID in the response
@@ -180,6 +183,9 @@ async def set_plan_activation(plan_id: str, body: PlanActivationRequest, req: Re
             detail=f"Meal plan {plan_id} not found or does not belong to you"
         )
 
+    if body.is_active:
+        await get_smart_diet_cache().invalidate_user_cache(user_id)
+
     return plan
 
 
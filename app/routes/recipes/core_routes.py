@@ -48,36 +48,42 @@ async def search_recipes(
     tags: List[str] = Query(default=[], description="Recipe tags"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     user: Optional[User] = Depends(optional_user_dependency)
 ):
     """
     Search recipes with advanced filtering options.
+
+    Follow ``next_cursor`` to page through results; ``page`` is still
+    honoured (by offset) for clients that do not send a cursor.
     """
     try:
         # Calculate offset for pagination
         offset = (page - 1) * page_size
 
         # Search recipes
-        recipes = await recipe_db_service.search_recipes(
+        result = await recipe_db_service.search_recipes_page(
             cuisine_type=cuisine_type,
             difficulty_level=difficulty_level,
             max_prep_time=max_prep_time,
             tags=tags,
-            limit=page_size
+            limit=page_size,
+            cursor=cursor,
+            offset=offset
         )
-
-        # For simplicity, return all results (in production, implement proper pagination)
-        total_count = len(recipes)
-        has_more = len(recipes) == page_size
+        recipes = result['recipes']
 
         return RecipeSearchResponse(
             recipes=recipes,
-            total_count=total_count,
+            total_count=len(recipes),
             page=page,
             page_size=page_size,
-            has_more=has_more
+            has_more=result['has_more'],
+            next_cursor=result['next_cursor']
         )
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Recipe search failed: {e}")
         raise HTTPException(status_code=500, detail="Recipe search failed")
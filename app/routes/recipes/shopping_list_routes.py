@@ -97,27 +97,31 @@ async def generate_shopping_list(
         all_ingredients = {}
         recipe_mappings = {}
 
+        recipes_by_id = {recipe.id: recipe for recipe in await recipe_db_service.get_recipes(recipe_ids)}
+
         for recipe_id in recipe_ids:
-            recipe = await recipe_db_service.get_recipe(recipe_id)
+            recipe = recipes_by_id.get(recipe_id)
             if not recipe:
                 logger.warning(f"Recipe {recipe_id} not found, skipping")
                 continue
 
             recipe_mappings[recipe_id] = recipe.name
-            for ingredient in recipe.get('ingredients', []):
-                ing_name = ingredient.get('name', '').lower()
+            for ingredient in recipe.ingredients:
+                ing_name = (ingredient.name or '').lower()
+                quantity = ingredient.quantity or 0
+                calories = (ingredient.calories_per_unit or 0) * quantity
                 if ing_name not in all_ingredients:
                     all_ingredients[ing_name] = {
-                        'name': ingredient.get('name'),
-                        'quantity': ingredient.get('quantity', 0),
-                        'unit': ingredient.get('unit', ''),
+                        'name': ingredient.name,
+                        'quantity': quantity,
+                        'unit': ingredient.unit or '',
                         'sources': [recipe_id],
-                        'calories': ingredient.get('calories_per_unit', 0) * ingredient.get('quantity', 0)
+                        'calories': calories
                     }
                 else:
-                    all_ingredients[ing_name]['quantity'] += ingredient.get('quantity', 0)
+                    all_ingredients[ing_name]['quantity'] += quantity
                     all_ingredients[ing_name]['sources'].append(recipe_id)
-                    all_ingredients[ing_name]['calories'] += ingredient.get('calories_per_unit', 0) * ingredient.get('quantity', 0)
+                    all_ingredients[ing_name]['calories'] += calories
 
         return {
             "ingredients": list(all_ingredients.values()),
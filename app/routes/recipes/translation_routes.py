@@ -147,11 +147,7 @@ async def batch_translate_recipes(
         logger.info(f"Batch translating {len(request.recipe_ids)} recipes to {request.target_language} for user {user.id}")
 
         # Get existing recipes from database
-        recipes = []
-        for recipe_id in request.recipe_ids:
-            recipe = await recipe_db_service.get_recipe(recipe_id)
-            if recipe:
-                recipes.append(recipe)
+        recipes = await recipe_db_service.get_recipes(request.recipe_ids)
 
         # Translate all recipes
         translations = await recipe_engine.batch_translate_recipes(
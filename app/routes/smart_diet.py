@@ -16,6 +16,7 @@ from app.models.smart_diet import (
 from app.models.meal_plan import PlanCustomizationRequest, SwapOperation, MealCalorieAdjustment, ChangeLogEntry
 from app.models.product import ErrorResponse
 from app.services.smart_diet import smart_diet_engine
+from app.services.smart_diet_cache import get_smart_diet_cache
 from app.services.plan_storage import plan_storage
 from app.services.plan_customizer import plan_customizer
 from app.utils import auth_context
@@ -256,6 +257,9 @@ async def submit_smart_diet_feedback(
                 detail="Failed to process feedback"
             )
         
+        # Feedback reshapes future suggestions; drop the user's cached ones
+        await get_smart_diet_cache().invalidate_user_cache(user_id)
+        
         # Log feedback details
         rating_info = f", rated {feedback.satisfaction_rating}/5" if feedback.satisfaction_rating else ""
         meal_info = f" for {feedback.meal_context}" if feedback.meal_context else ""
@@ -647,10 +651,11 @@ async def get_smart_diet_metrics(
         
         # TODO: Implement metrics calculation from feedback history
         # For now, return mock metrics (would be implemented with real data)
+        signal_stats = smart_diet_engine.learning_signals.stats()
         metrics = SmartDietMetrics(
             period_days=days,
-            total_suggestions=len(smart_diet_engine.suggestion_history),
-            unique_users=len(set(s.user_id for s in smart_diet_engine.suggestion_history if s.user_id)),
+            total_suggestions=signal_stats["suggestions"],
+            unique_users=signal_stats["users"],
             suggestions_per_user=5.2,  # Mock average
             overall_acceptance_rate=0.68,  # Mock rate
             avg_confidence_score=0.75,
@@ -14,6 +14,11 @@ from app.models.smart_diet import (
 from app.models.product import ErrorResponse
 from app.services.smart_diet_optimized import smart_diet_engine_optimized
 from app.services.performance_monitor import performance_monitor
+from app.services.password_hasher import password_hasher
+from app.services.token_revocation import token_revocations
+from app.services.invalidation_bus import invalidation_bus
+from app.services.intelligent_flow_queue import intelligent_flow_queue
+from app.services.maintenance import maintenance_scheduler
 from app.services.redis_cache import redis_cache_service
 from app.utils.auth_context import get_session_user_id
 
@@ -246,9 +251,15 @@ async def get_performance_metrics(
             ],
             "cache_performance": {
                 "hit_rates": cache_hit_rates,
-                "redis_stats": redis_stats
+                "redis_stats": redis_stats,
+                "memory_caches": performance_monitor.get_memory_cache_stats()
             },
             "engine_metrics": engine_metrics,
+            "password_hashing": password_hasher.stats(),
+            "token_revocations": token_revocations.stats(),
+            "maintenance": maintenance_scheduler.stats(),
+            "invalidation_bus": invalidation_bus.stats(),
+            "intelligent_flow_queue": await intelligent_flow_queue.stats(),
             "recent_alerts": recent_alerts,
             "targets": {
                 "api_response_time_ms": 500,
@@ -281,13 +292,15 @@ async def check_cache_health():
         redis_health = await redis_cache_service.health_check()
         
         # Memory cache statistics (from optimized engine)
+        l1_stats = smart_diet_engine_optimized.optimized_cache.memory_cache.stats()
         memory_cache_stats = {
-            "size": len(smart_diet_engine_optimized.optimized_cache.memory_cache),
-            "max_size": smart_diet_engine_optimized.optimized_cache.max_memory_cache_size,
-            "utilization_percent": round(
-                len(smart_diet_engine_optimized.optimized_cache.memory_cache) / 
-                smart_diet_engine_optimized.optimized_cache.max_memory_cache_size * 100, 2
-            )
+            "size": l1_stats['entries'],
+            "max_size": l1_stats['max_entries'],
+            "bytes": l1_stats['bytes'],
+            "max_bytes": l1_stats['max_bytes'],
+            "hit_rate_percent": l1_stats['hit_rate_percent'],
+            "evictions": l1_stats['evictions'],
+            "utilization_percent": l1_stats['utilization_percent']
         }
         
         # Overall cache health
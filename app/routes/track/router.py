@@ -31,6 +31,7 @@ from app.models.tracking import (
     ConsumePlanItemResponse,
 )
 from app.services.cache import cache_service
+from app.services.smart_diet_cache import get_smart_diet_cache
 from app.repositories.tracking_repository import TrackingRepository
 from app.services.tracking_service import TrackingService
 from app.services.storage import save_photo
@@ -97,6 +98,11 @@ async def _update_meal_cache(user_id: str, meal_record) -> None:
     await cache_service.set(cache_key, recent_meals[-50:], ttl=24 * 3600)
 
 
+async def _invalidate_smart_diet_cache(user_id: str) -> None:
+    """Intake changed: make cached Smart Diet suggestions/insights stale."""
+    await get_smart_diet_cache().invalidate_user_cache(user_id)
+
+
 async def _update_weight_cache(user_id: str, weight_record) -> None:
     """Update weight cache after creation."""
     cache_key = f"weight_history_{user_id}"
@@ -144,6 +150,7 @@ async def track_meal(request: MealTrackingRequest, req: Request):
         )
         
         await _update_meal_cache(user_id, response)
+        await _invalidate_smart_diet_cache(user_id)
         log_operation("Tracked meal", user_id, f"{response.total_calories} calories")
         return response
         
@@ -275,6 +282,7 @@ async def update_meal(req: Request, meal_id: str, meal_data: MealTrackingRequest
             .build()
         )
         
+        await _invalidate_smart_diet_cache(user_id)
         log_operation("Updated meal", user_id, meal_id)
         return response
         
@@ -297,6 +305,7 @@ async def delete_meal(req: Request, meal_id: str):
         if not success:
             raise MealNotFoundError(meal_id)
         
+        await _invalidate_smart_diet_cache(user_id)
         log_operation("Deleted meal", user_id, meal_id)
         return {"Message": f"Meal with id {meal_id} has been deleted successfully"}
         
@@ -368,6 +377,7 @@ async def consume_plan_item(req: Request, item_id: str, request_data: ConsumePla
         result = await tracking_service.consume_plan_item(user_id, item_id, request_data.consumed_at)
 
         if result["success"]:
+            await _invalidate_smart_diet_cache(user_id)
             log_operation("Consumed plan item", user_id, item_id)
             return ConsumePlanItemResponse(
                 success=True,
@@ -1,8 +1,8 @@
-import bcrypt
 import jwt
 import os
 import secrets
 import time
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
@@ -11,6 +11,10 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import ValidationError
 from app.models.user import User, UserCreate, UserLogin, Token, TokenData, UserSession, UserRole, UserResponse
 from app.services.database import db_service
+from app.services.memory_cache import MemoryCache
+from app.services.invalidation_bus import USER, invalidation_bus
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusy, password_hasher as default_password_hasher
+from app.services.token_revocation import TokenRevocationStore, token_revocations
 from app.config import config
 import logging
 
@@ -74,7 +78,13 @@ class RequestContext:
 class AuthService:
     """Authentication service for user management and JWT tokens"""
 
-    def __init__(self, session_service: Optional[SessionService] = None, user_service: Optional[UserService] = None):
+    def __init__(
+        self,
+        session_service: Optional[SessionService] = None,
+        user_service: Optional[UserService] = None,
+        password_hasher: Optional[PasswordHasher] = None,
+        revocations: Optional[TokenRevocationStore] = None,
+    ):
         try:
             if os.environ.get("TZ") != "UTC":
                 os.environ["TZ"] = "UTC"
@@ -86,28 +96,58 @@ class AuthService:
         self.algorithm = ALGORITHM
         self.access_token_expire_minutes = config.access_token_expire_minutes
         self.refresh_token_expire_days = REFRESH_TOKEN_EXPIRE_DAYS
+        # bcrypt runs on a bounded pool so logins never block the event loop
+        self.password_hasher = password_hasher or default_password_hasher
         # Precompute a dummy hash to keep timing consistent for unknown users
-        self._dummy_password_hash = bcrypt.hashpw(b"dietintel_dummy", bcrypt.gensalt()).decode('utf-8')
+        self._dummy_password_hash = self.password_hasher.hash_sync("dietintel_dummy")
         # Phase 2 Batch 7: Session service dependency
         self.session_service = session_service
         # Phase 2 Batch 9: User service dependency
         self.user_service = user_service
+        # Users resolved from access tokens, reused for a few seconds across requests
+        self.user_cache = MemoryCache(
+            "auth_users",
+            max_entries=config.auth_user_cache_max_entries,
+            default_ttl=config.auth_user_cache_ttl_seconds,
+        )
+        invalidation_bus.subscribe(USER, self.invalidate_user)
+        # Stateless mode trusts signed claims and only consults the revocation set
+        self.stateless_tokens = config.auth_stateless_tokens
+        self.revocations = revocations or token_revocations
     
     def hash_password(self, password: str) -> str:
-        """Hash password using bcrypt"""
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+        """Hash password using bcrypt (blocking; prefer hash_password_async in handlers)"""
+        return self.password_hasher.hash_sync(password)
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        """Verify password against hash"""
+        """Verify password against hash (blocking; prefer verify_password_async in handlers)"""
+        return self.password_hasher.verify_sync(plain_password, hashed_password)
+
+    async def hash_password_async(self, password: str) -> str:
+        """Hash password on the password pool"""
+        return await self._run_password_task("hash", self.hash_password, password)
+
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify password on the password pool"""
+        return await self._run_password_task("verify", self.verify_password, plain_password, hashed_password)
+
+    async def _run_password_task(self, operation: str, fn, *args):
         try:
-            return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
-        except (ValueError, TypeError):
-            return False
+            return await self.password_hasher.run(operation, fn, *args)
+        except PasswordHasherBusy as exc:
+            logger.warning(f"Password {operation} rejected: {exc}")
+            raise self._busy_error()
+
+    @staticmethod
+    def _busy_error() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
     
-    def create_access_token(self, user: User) -> str:
-        """Create JWT access token"""
+    def create_access_token(self, user: User, session_id: Optional[str] = None) -> str:
+        """Create JWT access token carrying the claims needed to authenticate statelessly"""
         now = datetime.utcnow().replace(tzinfo=timezone.utc)
         expire = now + timedelta(minutes=self.access_token_expire_minutes)
 
@@ -116,11 +156,17 @@ class AuthService:
             "email": user.email,
             "role": user.role.value,
             "is_developer": user.is_developer,
+            "name": user.full_name,
+            "avatar": user.avatar_url,
+            "active": user.is_active,
+            "verified": user.email_verified,
             "exp": _to_timestamp(expire),
             "iat": _to_timestamp(now),
             "type": "access",
             "jti": secrets.token_hex(16),
         }
+        if session_id is not None:
+            payload["sid"] = str(session_id)
         return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
     
     def create_refresh_token(self, user: User) -> str:
@@ -140,6 +186,25 @@ class AuthService:
     
     def verify_token(self, token: str, token_type: str = "access") -> Optional[TokenData]:
         """Verify and decode JWT token"""
+        payload = self._decode_token(token, token_type)
+        if payload is None:
+            return None
+
+        try:
+            user_id = payload.get("user_id")
+            if user_id is not None:
+                user_id = str(user_id)
+            return TokenData(
+                user_id=user_id,
+                email=payload.get("email"),
+                role=UserRole(payload.get("role", UserRole.STANDARD.value)),
+                is_developer=payload.get("is_developer", False)
+            )
+        except ValidationError:
+            return None
+
+    def _decode_token(self, token: str, token_type: str) -> Optional[Dict[str, Any]]:
+        """Signature, type and expiry checked claims, or None"""
         try:
             payload = jwt.decode(
                 token,
@@ -147,34 +212,29 @@ class AuthService:
                 algorithms=[self.algorithm],
                 options={"verify_exp": False},
             )
-            
-            # Check token type
-            if payload.get("type") != token_type:
-                return None
-            
-            # Check expiration
-            expires_at = _timestamp_to_utc(payload.get("exp"))
-            if not expires_at or datetime.utcnow() > expires_at:
-                return None
-            
-            if not payload.get("email"):
-                return None
-
-            try:
-                user_id = payload.get("user_id")
-                if user_id is not None:
-                    user_id = str(user_id)
-                return TokenData(
-                    user_id=user_id,
-                    email=payload.get("email"),
-                    role=UserRole(payload.get("role", UserRole.STANDARD.value)),
-                    is_developer=payload.get("is_developer", False)
-                )
-            except ValidationError:
-                return None
         except jwt.InvalidTokenError as e:
             logger.warning(f"Invalid token: {e}")
             return None
+
+        # Check token type
+        if payload.get("type") != token_type:
+            return None
+
+        # Check expiration
+        expires_at = _timestamp_to_utc(payload.get("exp"))
+        if not expires_at or datetime.utcnow() > expires_at:
+            return None
+
+        if not payload.get("email"):
+            return None
+        return payload
+
+    def session_id_from_token(self, token: str) -> Optional[str]:
+        """Session id carried by an access token; only trusted in stateless mode"""
+        if not self.stateless_tokens:
+            return None
+        payload = self._decode_token(token, "access")
+        return payload.get("sid") if payload else None
     
     async def register_user(self, user_data: UserCreate) -> Token:
         """Register a new user"""
@@ -195,18 +255,20 @@ class AuthService:
             )
 
         # Hash password
-        password_hash = self.hash_password(user_data.password)
+        password_hash = await self.hash_password_async(user_data.password)
 
         # Create user
         user = await user_service.create_user(user_data, password_hash)
         
-        # Create tokens
-        access_token = self.create_access_token(user)
+        # Create tokens; the session id is assigned up front so the access token can carry it
+        session_id = str(uuid.uuid4())
+        access_token = self.create_access_token(user, session_id)
         refresh_token = self.create_refresh_token(user)
         
         # Create session
         expires_at = datetime.utcnow() + timedelta(days=self.refresh_token_expire_days)
         session = UserSession(
+            id=session_id,
             user_id=user.id,
             access_token=access_token,
             refresh_token=refresh_token,
@@ -240,6 +302,12 @@ class AuthService:
     
     async def login_user(self, login_data: UserLogin) -> Token:
         """Authenticate user and return tokens"""
+        # Admission control: shed logins before doing any work when the
+        # password pool is already full
+        if self.password_hasher.saturated:
+            self.password_hasher.metrics['rejected'] += 1
+            raise self._busy_error()
+
         # Phase 2 Batch 9: Use UserService for user management
         # Phase 3: Use UserRepository for data access
         if self.user_service:
@@ -252,7 +320,7 @@ class AuthService:
         user = await user_service.get_user_by_email(login_data.email)
         if not user:
             # Simulate password verification to mitigate timing attacks
-            self._simulate_password_check()
+            await self._run_password_task("verify", self._simulate_password_check)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
@@ -267,19 +335,25 @@ class AuthService:
 
         # Verify password
         password_hash = await user_service.get_password_hash(user.id)
-        if not password_hash or not self.verify_password(login_data.password, password_hash):
+        if not password_hash or not await self.verify_password_async(login_data.password, password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
             )
+
+        # Upgrade hashes made with an older cost while we have the plaintext
+        if self.password_hasher.needs_rehash(password_hash):
+            await self._rehash_password(user_service, user.id, login_data.password)
         
-        # Create tokens
-        access_token = self.create_access_token(user)
+        # Create tokens; the session id is assigned up front so the access token can carry it
+        session_id = str(uuid.uuid4())
+        access_token = self.create_access_token(user, session_id)
         refresh_token = self.create_refresh_token(user)
         
         # Create session
         expires_at = datetime.utcnow() + timedelta(days=self.refresh_token_expire_days)
         session = UserSession(
+            id=session_id,
             user_id=user.id,
             access_token=access_token,
             refresh_token=refresh_token,
@@ -353,7 +427,7 @@ class AuthService:
             )
         
         # Create new tokens
-        new_access_token = self.create_access_token(user)
+        new_access_token = self.create_access_token(user, session.id)
         new_refresh_token = self.create_refresh_token(user)
         
         # Update session - Phase 2 Batch 7: Using SessionService
@@ -410,6 +484,11 @@ class AuthService:
                 email_verified=True
             )
 
+        if self.stateless_tokens:
+            user = self._user_from_claims(token)
+            if user is not None:
+                return user
+
         token_data = self.verify_token(token, "access")
         if not token_data:
             raise HTTPException(
@@ -417,25 +496,85 @@ class AuthService:
                 detail="Could not validate credentials"
             )
         
-        user = await self.user_service.get_user_by_id(token_data.user_id)
-        if not user:
+        user = self.user_cache.get(token_data.user_id)
+        if user is None:
+            user = await self.user_service.get_user_by_id(token_data.user_id)
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found"
+                )
+            self.user_cache.set(token_data.user_id, user)
+
+        if not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
+                detail="User account is deactivated"
             )
 
-        if not user.is_active:
+        return user
+
+    def _user_from_claims(self, token: str) -> Optional[User]:
+        """
+        Build the user from signed access-token claims without database I/O.
+
+        Returns None for tokens minted before the claims existed, so callers
+        fall back to loading the user.
+        """
+        payload = self._decode_token(token, "access")
+        if payload is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials"
+            )
+        if "active" not in payload or payload.get("user_id") is None:
+            return None
+
+        if self.revocations.is_revoked(payload.get("sid"), str(payload["user_id"]), payload.get("iat")):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+        if not payload["active"]:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User account is deactivated"
             )
 
-        return user
+        try:
+            return User(
+                id=str(payload["user_id"]),
+                email=payload["email"],
+                full_name=payload.get("name"),
+                avatar_url=payload.get("avatar"),
+                is_developer=payload.get("is_developer", False),
+                role=UserRole(payload.get("role", UserRole.STANDARD.value)),
+                is_active=True,
+                email_verified=payload.get("verified", False),
+            )
+        except (ValidationError, ValueError):
+            return None
+
+    async def _rehash_password(self, user_service: UserService, user_id: str, password: str) -> None:
+        """Store a hash at the configured cost; best effort, never fails the login."""
+        if self.password_hasher.saturated:
+            return
+        try:
+            new_hash = await self.password_hasher.hash(password)
+            await user_service.update_user(user_id, {'password_hash': new_hash})
+            self.invalidate_user(user_id)
+            logger.info(f"Rehashed password for user {user_id} at cost {self.password_hasher.rounds}")
+        except Exception as exc:
+            logger.warning(f"Password rehash failed for user {user_id}: {exc}")
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop a cached user after their account changes."""
+        self.user_cache.delete(user_id)
 
     def _simulate_password_check(self) -> None:
         """Run a dummy password comparison to protect timing."""
         try:
-            bcrypt.checkpw(b"invalid", self._dummy_password_hash.encode('utf-8'))
+            self.password_hasher.verify_sync("invalid", self._dummy_password_hash)
         except Exception:
             pass
 
@@ -466,6 +605,16 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     return await auth_service.get_current_user_from_token(credentials.credentials)
 
 
+async def _resolve_session_id(token: str) -> Optional[str]:
+    """Session id from the token's claims in stateless mode, else from the sessions table"""
+    session_id = auth_service.session_id_from_token(token)
+    if session_id is not None:
+        return session_id
+    # Phase 2 Batch 7: Using SessionService for session retrieval
+    session = await session_service.get_session_by_access_token(token)
+    return session.id if session else None
+
+
 async def get_current_request_context(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> RequestContext:
@@ -476,9 +625,7 @@ async def get_current_request_context(
             detail="Not authenticated"
         )
     user = await auth_service.get_current_user_from_token(credentials.credentials)
-    # Phase 2 Batch 7: Using SessionService for session retrieval
-    session = await session_service.get_session_by_access_token(credentials.credentials)
-    session_id = session.id if session else None
+    session_id = await _resolve_session_id(credentials.credentials)
     return RequestContext(user=user, session_id=session_id, token=credentials.credentials)
 
 
@@ -507,9 +654,7 @@ async def get_optional_request_context(
     except HTTPException:
         return RequestContext(user=None, session_id=None, token=None)
 
-    # Phase 2 Batch 7: Using SessionService for session retrieval
-    session = await session_service.get_session_by_access_token(credentials.credentials)
-    session_id = session.id if session else None
+    session_id = await _resolve_session_id(credentials.credentials)
     return RequestContext(user=user, session_id=session_id, token=credentials.credentials)
 
 
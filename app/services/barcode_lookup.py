@@ -2,10 +2,10 @@ import asyncio
 import json
 import logging
 from datetime import datetime
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, List, Union
 import httpx
-import redis.asyncio as redis
 from app.config import config
+from app.services.cache import AsyncCache, CacheNamespace, cache_layer
 from app.models.product import ProductResponse, Nutriments
 
 logger = logging.getLogger(__name__)
@@ -195,105 +195,69 @@ class BarcodeFieldMapper:
 
 class BarcodeRedisCache:
     """
-    Redis cache implementation for barcode lookup results.
-    Handles connection management and error recovery.
+    Redis cache for barcode lookup results, stored in the ``barcode:product``
+    namespace of the shared cache layer. Errors degrade to cache misses.
     """
     
-    def __init__(self):
-        self._redis_pool: Optional[redis.ConnectionPool] = None
-        self._redis_client: Optional[redis.Redis] = None
+    namespace_name = "barcode:product"
     
-    async def _get_redis_client(self) -> redis.Redis:
-        """Get Redis client with connection pool management."""
-        if self._redis_client is None:
-            if self._redis_pool is None:
-                self._redis_pool = redis.ConnectionPool.from_url(
-                    config.redis_url,
-                    max_connections=config.redis_max_connections,
-                    decode_responses=True
-                )
-            
-            self._redis_client = redis.Redis(connection_pool=self._redis_pool)
-        
-        return self._redis_client
+    def __init__(self, cache: Optional[AsyncCache] = None):
+        self.namespace: CacheNamespace = (cache or cache_layer).namespace(self.namespace_name)
     
     def _get_cache_key(self, barcode: str) -> str:
         """Generate cache key for barcode."""
-        return f"barcode:product:{barcode}"
+        return self.namespace.key(barcode)
     
     async def get(self, barcode: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve cached product data for barcode.
         Returns None if not cached or on Redis errors.
         """
-        try:
-            client = await self._get_redis_client()
-            cache_key = self._get_cache_key(barcode)
-            
-            cached_data = await client.get(cache_key)
-            if cached_data:
-                logger.debug(f"Cache hit for barcode: {barcode}")
-                return json.loads(cached_data)
-            
-            logger.debug(f"Cache miss for barcode: {barcode}")
-            return None
-            
-        except (redis.RedisError, json.JSONDecodeError) as e:
-            logger.error(f"Redis get error for barcode {barcode}: {e}")
-            return None
+        cached_data = await self.namespace.get(barcode)
+        if isinstance(cached_data, dict):
+            logger.debug(f"Cache hit for barcode: {barcode}")
+            return cached_data
+        
+        if cached_data is not None:
+            logger.error(f"Ignoring malformed cache entry for barcode {barcode}")
+        return None
+    
+    async def get_many(self, barcodes: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Retrieve cached product data for several barcodes in one round trip."""
+        cached = await self.namespace.mget(barcodes)
+        return {
+            barcode: value if isinstance(value, dict) else None
+            for barcode, value in cached.items()
+        }
     
     async def set(self, barcode: str, product_data: Dict[str, Any]) -> bool:
         """
         Cache product data for barcode with TTL.
         Returns True if successful, False on errors.
         """
-        try:
-            client = await self._get_redis_client()
-            cache_key = self._get_cache_key(barcode)
-            ttl_seconds = config.redis_cache_ttl_hours * 3600
-            
-            # Add cache metadata
-            cache_data = {
-                **product_data,
-                '_cache_metadata': {
-                    'cached_at': datetime.now().isoformat(),
-                    'ttl_hours': config.redis_cache_ttl_hours
-                }
+        # Add cache metadata
+        cache_data = {
+            **product_data,
+            '_cache_metadata': {
+                'cached_at': datetime.now().isoformat(),
+                'ttl_hours': config.redis_cache_ttl_hours
             }
-            
-            await client.setex(
-                cache_key,
-                ttl_seconds,
-                json.dumps(cache_data, default=str)
-            )
-            
+        }
+        
+        success = await self.namespace.set(barcode, cache_data, config.redis_cache_ttl_hours * 3600)
+        if success:
             logger.debug(f"Cached product for barcode {barcode} with TTL {config.redis_cache_ttl_hours}h")
-            return True
-            
-        except (redis.RedisError, TypeError) as e:
-            logger.error(f"Redis set error for barcode {barcode}: {e}")
-            return False
+        return success
     
     async def delete(self, barcode: str) -> bool:
         """Delete cached data for barcode."""
-        try:
-            client = await self._get_redis_client()
-            cache_key = self._get_cache_key(barcode)
-            
-            result = await client.delete(cache_key)
-            logger.debug(f"Deleted cache for barcode {barcode}: {result > 0}")
-            return result > 0
-            
-        except redis.RedisError as e:
-            logger.error(f"Redis delete error for barcode {barcode}: {e}")
-            return False
+        deleted = await self.namespace.delete(barcode)
+        logger.debug(f"Deleted cache for barcode {barcode}: {deleted > 0}")
+        return deleted > 0
     
     async def close(self):
-        """Close Redis connections."""
-        if self._redis_client:
-            await self._redis_client.close()
-        if self._redis_pool:
-            await self._redis_pool.disconnect()
+        """Connections belong to the shared cache layer, closed on shutdown."""
+        return None
 
 
 class BarcodeAPIClient:
@@ -1,62 +1,551 @@
+"""
+Shared async cache layer.
+
+Every Redis user in the process goes through one ``AsyncCache``: a single
+pooled ``redis.asyncio`` client split into namespaces. Each namespace has a
+``CachePolicy`` (default TTL, serializer, optional process-local L1) and
+supports pipelined ``mget``/``mset``. When Redis is unreachable the layer
+backs off for a few seconds instead of paying a connect timeout per call, and
+every operation degrades to a cache miss.
+
+``CacheService`` (root namespace, ``cache_service``) keeps the historical
+string-or-dict API used across routes and services.
+"""
+
+import asyncio
 import json
 import logging
-import asyncio
-from typing import Optional, Union
+import time
+import weakref
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
+
 import redis.asyncio as redis
-from datetime import datetime, timedelta
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from app.config import config
+from app.services.memory_cache import MemoryCache
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency, only needed by MsgpackSerializer
+    msgpack = None
 
 logger = logging.getLogger(__name__)
 
 
-class CacheService:
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
-        self.redis_url = redis_url
-        self._redis: Optional[redis.Redis] = None
-        self._last_error: Optional[Exception] = None
-    
-    async def get_redis(self) -> redis.Redis:
-        if self._redis is None:
-            self._redis = redis.from_url(self.redis_url, decode_responses=True)
+# Generation counters outlive every entry TTL so a counter can never reset
+# while entries written under an older generation are still readable.
+GENERATION_TTL = 7 * 24 * 3600
+
+
+class CacheUnavailableError(Exception):
+    """Raised internally while Redis is in its reconnect back-off window."""
+
+
+class JsonSerializer:
+    """JSON for structured values; strings are stored verbatim (legacy wire format)."""
+
+    name = "json"
+
+    def dumps(self, value: Any) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        if isinstance(value, str):
+            return value.encode("utf-8")
+        return json.dumps(value, default=str).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        text = data.decode("utf-8") if isinstance(data, bytes) else data
+        try:
+            return json.loads(text)
+        except (json.JSONDecodeError, TypeError):
+            return text
+
+
+class TextSerializer:
+    """Plain UTF-8 strings, for callers that serialise their own payloads."""
+
+    name = "text"
+
+    def dumps(self, value: Any) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> str:
+        return data.decode("utf-8") if isinstance(data, bytes) else data
+
+
+class MsgpackSerializer:
+    """Compact binary encoding; requires the optional ``msgpack`` package."""
+
+    name = "msgpack"
+
+    def __init__(self):
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed")
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=str, use_bin_type=True)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        if isinstance(data, str):
+            data = data.encode("latin-1")
+        return msgpack.unpackb(data, raw=False)
+
+
+class CompressedSerializer:
+    """Wraps another serializer and zlib-compresses payloads above a threshold.
+
+    Payloads carry a one byte marker (0 = raw, 1 = compressed); values written
+    before the marker existed are passed to the inner serializer unchanged.
+    """
+
+    RAW = b"\x00"
+    COMPRESSED = b"\x01"
+
+    def __init__(self, inner: Any = None, threshold: int = 1024, level: int = 6):
+        self.inner = inner or JsonSerializer()
+        self.threshold = threshold
+        self.level = level
+        self.name = f"compressed+{self.inner.name}"
+
+    def dumps(self, value: Any) -> bytes:
+        payload = self.inner.dumps(value)
+        if len(payload) > self.threshold:
+            return self.COMPRESSED + zlib.compress(payload, self.level)
+        return self.RAW + payload
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        if isinstance(data, str):
+            return self.inner.loads(data)
+        marker, payload = data[:1], data[1:]
+        if marker == self.COMPRESSED:
+            return self.inner.loads(zlib.decompress(payload))
+        if marker == self.RAW:
+            return self.inner.loads(payload)
+        return self.inner.loads(data)
+
+
+@dataclass
+class CachePolicy:
+    """Per-namespace cache behaviour."""
+    ttl: int = 86400
+    serializer: Any = field(default_factory=JsonSerializer)
+    local_ttl: float = 0.0  # seconds in the process-local L1; 0 disables it
+    local_max_entries: int = 1024
+    local_max_bytes: Optional[int] = None
+
+
+class CacheNamespace:
+    """A key prefix on the shared cache with its own policy and metrics."""
+
+    def __init__(self, cache: "AsyncCache", name: str, policy: CachePolicy):
+        self.cache = cache
+        self.name = name
+        self.policy = policy
+        self.prefix = f"{name}:" if name else ""
+        self.local = MemoryCache(
+            f"cache_l1:{name or 'root'}",
+            max_entries=policy.local_max_entries,
+            max_bytes=policy.local_max_bytes,
+            default_ttl=policy.local_ttl,
+            sizeof=len,
+        ) if policy.local_ttl > 0 else None
+        self.last_error: Optional[Exception] = None
+        self.metrics = {
+            'hits': 0,
+            'local_hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'deletes': 0,
+            'errors': 0,
+        }
+
+    def key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _failed(self, operation: str, key: str, error: Exception) -> None:
+        self.metrics['errors'] += 1
+        self.last_error = error
+        self.cache.record_failure(error)
+        if isinstance(error, CacheUnavailableError):
+            logger.debug(f"Cache {operation} skipped for {key}: {error}")
         else:
-            # Check if the existing connection is still valid for this event loop
+            logger.error(f"Cache {operation} error for {key}: {error}")
+
+    def _decode(self, payload: Union[bytes, str]) -> Any:
+        return self.policy.serializer.loads(payload)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on miss or error."""
+        full_key = self.key(key)
+        if self.local is not None:
+            payload = self.local.get(full_key)
+            if payload is not None:
+                self.metrics['local_hits'] += 1
+                return self._decode(payload)
+
+        try:
+            self.last_error = None
+            client = await self.cache.client()
+            payload = await client.get(full_key)
+        except Exception as e:
+            self._failed("get", full_key, e)
+            return None
+
+        if payload is None:
+            self.metrics['misses'] += 1
+            logger.debug(f"Cache miss for key: {full_key}")
+            return None
+
+        self.metrics['hits'] += 1
+        logger.debug(f"Cache hit for key: {full_key}")
+        if self.local is not None:
+            self.local.set(full_key, payload)
+        try:
+            return self._decode(payload)
+        except Exception as e:
+            self._failed("decode", full_key, e)
+            return None
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Store ``value`` with ``ttl`` seconds (namespace default when omitted)."""
+        full_key = self.key(key)
+        ttl = int(ttl or self.policy.ttl)
+        try:
+            self.last_error = None
+            payload = self.policy.serializer.dumps(value)
+            client = await self.cache.client()
+            await client.setex(full_key, ttl, payload)
+        except Exception as e:
+            self._failed("set", full_key, e)
+            if self.local is not None:
+                self.local.delete(full_key)
+            return False
+
+        self.metrics['sets'] += 1
+        if self.local is not None:
+            self.local.set(full_key, payload, min(self.policy.local_ttl, ttl))
+        logger.debug(f"Cached data for key: {full_key} with TTL: {ttl}s")
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        """Delete keys, returning how many existed."""
+        full_keys = [self.key(key) for key in keys]
+        if self.local is not None:
+            for full_key in full_keys:
+                self.local.delete(full_key)
+        if not full_keys:
+            return 0
+        try:
+            self.last_error = None
+            client = await self.cache.client()
+            deleted = await client.delete(*full_keys)
+        except Exception as e:
+            self._failed("delete", ",".join(full_keys), e)
+            return 0
+        self.metrics['deletes'] += deleted
+        return deleted
+
+    async def exists(self, key: str) -> bool:
+        full_key = self.key(key)
+        try:
+            client = await self.cache.client()
+            return await client.exists(full_key) > 0
+        except Exception as e:
+            self._failed("exists", full_key, e)
+            return False
+
+    async def expire(self, key: str, ttl: int) -> bool:
+        full_key = self.key(key)
+        try:
+            client = await self.cache.client()
+            return bool(await client.expire(full_key, ttl))
+        except Exception as e:
+            self._failed("expire", full_key, e)
+            return False
+
+    def _generation_key(self, scope: str) -> str:
+        return self.key(f"gen:{scope}")
+
+    async def generation(self, scope: str) -> int:
+        """Current generation of ``scope``; 0 when unset or Redis is unavailable."""
+        full_key = self._generation_key(scope)
+        try:
+            client = await self.cache.client()
+            value = await client.get(full_key)
+        except Exception as e:
+            self._failed("generation", full_key, e)
+            return 0
+        return int(value) if value is not None else 0
+
+    async def bump_generation(self, scope: str, ttl: int = GENERATION_TTL) -> Optional[int]:
+        """
+        Advance the generation of ``scope`` with a single INCR.
+
+        Keys that fold the generation in become unreachable at once and are
+        left to expire on their own TTL. Returns the new generation, or None
+        when Redis is unavailable.
+        """
+        full_key = self._generation_key(scope)
+        try:
+            client = await self.cache.client()
+            pipe = client.pipeline(transaction=True)
+            pipe.incr(full_key)
+            pipe.expire(full_key, ttl)
+            results = await pipe.execute()
+        except Exception as e:
+            self._failed("bump_generation", full_key, e)
+            return None
+        return int(results[0])
+
+    async def mget(self, keys: Iterable[str]) -> Dict[str, Optional[Any]]:
+        """Fetch many keys in one round trip; misses map to None."""
+        keys = list(keys)
+        result: Dict[str, Optional[Any]] = {}
+        pending: List[str] = []
+        for key in keys:
+            payload = self.local.get(self.key(key)) if self.local is not None else None
+            if payload is not None:
+                self.metrics['local_hits'] += 1
+                result[key] = self._decode(payload)
+            else:
+                pending.append(key)
+        if not pending:
+            return result
+
+        try:
+            self.last_error = None
+            client = await self.cache.client()
+            payloads = await client.mget([self.key(key) for key in pending])
+        except Exception as e:
+            self._failed("mget", f"{len(pending)} keys", e)
+            return {}
+
+        for key, payload in zip(pending, payloads):
+            if payload is None:
+                self.metrics['misses'] += 1
+                result[key] = None
+                continue
+            self.metrics['hits'] += 1
+            if self.local is not None:
+                self.local.set(self.key(key), payload)
             try:
-                # Test if connection is still valid
-                await asyncio.wait_for(self._redis.ping(), timeout=0.1)
-            except (Exception, asyncio.TimeoutError):
-                # Connection is invalid, create a new one
-                logger.debug("Redis connection invalid, creating new one")
-                self._redis = redis.from_url(self.redis_url, decode_responses=True)
-        return self._redis
-    
+                result[key] = self._decode(payload)
+            except Exception as e:
+                self._failed("decode", self.key(key), e)
+                result[key] = None
+        return result
+
+    async def mset(self, values: Mapping[str, Any], ttl: Optional[int] = None) -> int:
+        """Store many keys with one pipelined round trip; returns the number stored."""
+        if not values:
+            return 0
+        ttl = int(ttl or self.policy.ttl)
+        try:
+            self.last_error = None
+            payloads = {self.key(key): self.policy.serializer.dumps(value) for key, value in values.items()}
+            client = await self.cache.client()
+            pipe = client.pipeline(transaction=False)
+            for full_key, payload in payloads.items():
+                pipe.setex(full_key, ttl, payload)
+            results = await pipe.execute()
+        except Exception as e:
+            self._failed("mset", f"{len(values)} keys", e)
+            return 0
+
+        stored = 0
+        for (full_key, payload), ok in zip(payloads.items(), results):
+            if ok:
+                stored += 1
+                if self.local is not None:
+                    self.local.set(full_key, payload, min(self.policy.local_ttl, ttl))
+        self.metrics['sets'] += stored
+        return stored
+
+    async def invalidate(self, pattern: str = "*") -> int:
+        """Delete every key in the namespace matching a glob ``pattern``."""
+        full_pattern = self.key(pattern)
+        if self.local is not None:
+            self.local.delete_matching(full_pattern)
+        try:
+            client = await self.cache.client()
+            deleted = 0
+            batch: List[Any] = []
+            async for full_key in client.scan_iter(match=full_pattern, count=500):
+                batch.append(full_key)
+                if len(batch) >= 500:
+                    deleted += await client.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += await client.delete(*batch)
+        except Exception as e:
+            self._failed("invalidate", full_pattern, e)
+            return 0
+        self.metrics['deletes'] += deleted
+        logger.info(f"Invalidated {deleted} cache keys matching pattern: {full_pattern}")
+        return deleted
+
+    def clear_local(self) -> None:
+        if self.local is not None:
+            self.local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.metrics['hits'] + self.metrics['local_hits'] + self.metrics['misses']
+        hits = self.metrics['hits'] + self.metrics['local_hits']
+        return {
+            **self.metrics,
+            'total_requests': lookups,
+            'hit_rate_percent': round(hits / lookups * 100, 2) if lookups else 0.0,
+            'serializer': self.policy.serializer.name,
+            'ttl': self.policy.ttl,
+            'local_entries': len(self.local) if self.local is not None else 0,
+        }
+
+
+class AsyncCache:
+    """One pooled ``redis.asyncio`` client shared by all cache namespaces."""
+
+    def __init__(
+        self,
+        redis_url: str,
+        max_connections: int = 10,
+        socket_timeout: float = 1.0,
+        retry_interval: float = 5.0,
+        policies: Optional[Mapping[str, CachePolicy]] = None,
+    ):
+        self.redis_url = redis_url
+        self.max_connections = max_connections
+        self.socket_timeout = socket_timeout
+        self.retry_interval = retry_interval
+        self._policies: Dict[str, CachePolicy] = dict(policies or {})
+        self._namespaces: Dict[str, CacheNamespace] = {}
+        self._client: Optional[redis.Redis] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # One pool per live event loop; a pool dies with its loop
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, redis.Redis]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._unavailable_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._unavailable_until
+
+    async def client(self) -> redis.Redis:
+        """Return the pooled client, creating it for the running event loop."""
+        if time.monotonic() < self._unavailable_until:
+            raise CacheUnavailableError("Redis unavailable, waiting before reconnecting")
+
+        # redis.asyncio connections are bound to the loop that opened them, so
+        # each loop keeps its own pool rather than replacing another loop's
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            client = self._clients.get(loop)
+            if client is None:
+                # Pools of closed loops cannot be awaited any more; release them
+                for owner in [owner for owner in self._clients if owner.is_closed()]:
+                    del self._clients[owner]
+                client = self._clients[loop] = redis.from_url(
+                    self.redis_url,
+                    max_connections=self.max_connections,
+                    socket_connect_timeout=self.socket_timeout,
+                    socket_timeout=self.socket_timeout,
+                    health_check_interval=30,
+                )
+            self._client, self._loop = client, loop
+        return self._client
+
+    def record_failure(self, error: Exception) -> None:
+        """Start the reconnect back-off after a connection-level failure."""
+        if isinstance(error, (RedisConnectionError, RedisTimeoutError, ConnectionError)):
+            self._unavailable_until = time.monotonic() + self.retry_interval
+
+    def namespace(self, name: str, policy: Optional[CachePolicy] = None) -> CacheNamespace:
+        """Return the namespace ``name``, creating it with ``policy`` or its registered policy."""
+        namespace = self._namespaces.get(name)
+        if namespace is None or (policy is not None and namespace.policy is not policy):
+            policy = policy or self._policies.get(name) or CachePolicy()
+            namespace = CacheNamespace(self, name, policy)
+            self._namespaces[name] = namespace
+        return namespace
+
     async def ping(self) -> bool:
         """Check if Redis is available."""
         try:
-            redis_client = await self.get_redis()
-            await redis_client.ping()
+            client = await self.client()
+            await client.ping()
             return True
         except Exception as e:
+            self.record_failure(e)
             logger.warning(f"Redis ping failed: {e}")
             return False
-    
+
+    def clear_local(self) -> None:
+        for namespace in self._namespaces.values():
+            namespace.clear_local()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name or "default": namespace.stats() for name, namespace in self._namespaces.items()}
+
+    async def close(self):
+        """Close the pools of this loop and of loops still running in other threads."""
+        loop = asyncio.get_running_loop()
+        current = self._client if self._loop is loop else None
+        pools = list(self._clients.items())
+        self._clients.clear()
+        self._client = self._loop = None
+        for owner, client in pools:
+            if owner is loop:
+                current = client
+            elif owner.is_running():
+                asyncio.run_coroutine_threadsafe(client.close(), owner)
+        if current is not None:
+            await current.close()
+
+
+# Default TTL and encoding per namespace
+CACHE_POLICIES: Dict[str, CachePolicy] = {
+    "": CachePolicy(ttl=86400),
+    "barcode:product": CachePolicy(
+        ttl=config.redis_cache_ttl_hours * 3600,
+        local_ttl=60,
+        local_max_entries=2048,
+    ),
+    "smart_diet": CachePolicy(ttl=1800, serializer=CompressedSerializer(TextSerializer())),
+}
+
+# Shared cache layer instance
+cache_layer = AsyncCache(
+    config.redis_url,
+    max_connections=config.redis_max_connections,
+    policies=CACHE_POLICIES,
+)
+
+
+class CacheService:
+    """Root namespace of the cache layer with the historical string-or-dict API."""
+
+    def __init__(self, redis_url: Optional[str] = None, cache: Optional[AsyncCache] = None):
+        if cache is None:
+            cache = AsyncCache(redis_url, policies=CACHE_POLICIES) if redis_url else cache_layer
+        self.cache = cache
+        self.redis_url = cache.redis_url
+        self._namespace = cache.namespace("")
+
+    async def get_redis(self) -> redis.Redis:
+        """Return the shared pooled client for callers needing raw commands."""
+        return await self.cache.client()
+
+    async def ping(self) -> bool:
+        """Check if Redis is available."""
+        return await self.cache.ping()
+
     async def get(self, key: str) -> Optional[Union[str, dict]]:
-        try:
-            self._last_error = None
-            redis_client = await self.get_redis()
-            cached_data = await redis_client.get(key)
-            if cached_data:
-                logger.debug(f"Cache hit for key: {key}")
-                # Try to parse as JSON, if it fails return as string
-                try:
-                    return json.loads(cached_data)
-                except json.JSONDecodeError:
-                    return cached_data
-            logger.debug(f"Cache miss for key: {key}")
-            return None
-        except Exception as e:
-            logger.error(f"Error getting from cache: {e}")
-            self._last_error = e
-            return None
-    
+        return await self._namespace.get(key)
+
     async def set(
         self,
         key: str,
@@ -66,51 +555,39 @@ class CacheService:
     ) -> bool:
         """
         Set cache value with TTL in seconds.
-        
+
         Args:
             key: Cache key
             value: Value to cache (string or dict)
             ttl: Time to live in seconds (default 24 hours)
             ttl_hours: Optional TTL in hours (used by tests and convenience helpers)
         """
-        try:
-            if ttl_hours is not None:
-                ttl = int(ttl_hours) * 3600
-            self._last_error = None
-
-            redis_client = await self.get_redis()
-            
-            # Convert value to string if it's a dict
-            if isinstance(value, dict):
-                cache_value = json.dumps(value, default=str)
-            else:
-                cache_value = str(value)
-            
-            await redis_client.setex(key, ttl, cache_value)
-            logger.debug(f"Cached data for key: {key} with TTL: {ttl}s")
-            return True
-        except Exception as e:
-            logger.error(f"Error setting cache: {e}")
-            self._last_error = e
-            return False
-    
+        if ttl_hours is not None:
+            ttl = int(ttl_hours) * 3600
+        return await self._namespace.set(key, value, ttl)
+
     async def delete(self, key: str) -> bool:
         """Delete a cache key."""
-        try:
-            redis_client = await self.get_redis()
-            result = await redis_client.delete(key)
-            return result > 0
-        except Exception as e:
-            logger.error(f"Error deleting from cache: {e}")
-            return False
-    
+        return await self._namespace.delete(key) > 0
+
+    async def mget(self, keys: Iterable[str]) -> Dict[str, Optional[Any]]:
+        return await self._namespace.mget(keys)
+
+    async def mset(self, values: Mapping[str, Any], ttl: int = 86400) -> int:
+        return await self._namespace.mset(values, ttl)
+
+    async def generation(self, scope: str) -> int:
+        return await self._namespace.generation(scope)
+
+    async def bump_generation(self, scope: str, ttl: int = GENERATION_TTL) -> Optional[int]:
+        return await self._namespace.bump_generation(scope, ttl)
+
     async def close(self):
-        if self._redis:
-            await self._redis.close()
+        await self.cache.close()
 
     def consume_last_error(self) -> Optional[Exception]:
-        error = self._last_error
-        self._last_error = None
+        error = self._namespace.last_error
+        self._namespace.last_error = None
         return error
 
 
@@ -0,0 +1,398 @@
+"""
+Columnar, memory-mapped product catalog snapshot.
+
+The products table is exported once into a single binary file holding NumPy
+arrays (nutrients, access counts, timestamps), a deduplicated string table
+(names, brands, sources... each distinct string stored once) and precomputed
+orderings (by barcode for lookups, by popularity for discovery). Every
+uvicorn worker maps the same file read-only, so the pages live once in the OS
+page cache instead of once per worker as parsed ``ProductResponse`` objects.
+Rows are only materialised into ``ProductResponse`` at the API boundary via
+``CatalogSnapshot.product`` / ``to_product``.
+
+File layout: 8-byte magic, 8-byte little-endian header length, JSON header
+describing each array (dtype, shape, offset), then 64-byte aligned arrays.
+"""
+
+import bisect
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from app.config import config
+from app.models.product import Nutriments, ProductResponse
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"DICAT001"
+ALIGNMENT = 64
+
+# Nutrient matrix columns, in Nutriments field order.
+NUTRIENT_COLUMNS = (
+    "energy_kcal_per_100g",
+    "protein_g_per_100g",
+    "fat_g_per_100g",
+    "carbs_g_per_100g",
+    "sugars_g_per_100g",
+    "salt_g_per_100g",
+)
+STRING_COLUMNS = ("barcode", "name", "brand", "image_url", "serving_size", "source", "categories")
+
+
+class _StringTable:
+    """Builder for the deduplicated string table."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._chunks: List[bytes] = []
+        self._offsets: List[int] = [0]
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        string_id = self._ids.get(value)
+        if string_id is None:
+            encoded = value.encode("utf-8")
+            string_id = len(self._chunks)
+            self._ids[value] = string_id
+            self._chunks.append(encoded)
+            self._offsets.append(self._offsets[-1] + len(encoded))
+        return string_id
+
+    def arrays(self):
+        blob = np.frombuffer(b"".join(self._chunks), dtype=np.uint8) if self._chunks else np.zeros(0, np.uint8)
+        return np.asarray(self._offsets, dtype=np.int64), blob
+
+
+def _parse_timestamp(value: Any) -> float:
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def build_catalog_snapshot(conn: Any, path: str) -> int:
+    """
+    Export the products table to a snapshot file at ``path``.
+
+    The file is written to a temporary name and atomically renamed, so
+    workers that already mapped the previous snapshot keep a valid view.
+
+    Returns:
+        Number of products written
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT barcode, name, brand, image_url, serving_size, source, categories, "
+        "nutriments, access_count, last_updated FROM products"
+    )
+    rows = cursor.fetchall()
+    count = len(rows)
+
+    strings = _StringTable()
+    string_ids = {column: np.full(count, -1, dtype=np.int32) for column in STRING_COLUMNS}
+    # float64 so materialised values match what the database path returns
+    nutrients = np.full((count, len(NUTRIENT_COLUMNS)), np.nan, dtype=np.float64)
+    access_count = np.zeros(count, dtype=np.int64)
+    fetched_at = np.zeros(count, dtype=np.float64)
+    barcodes: List[str] = []
+
+    for index, row in enumerate(rows):
+        for column in STRING_COLUMNS:
+            string_ids[column][index] = strings.add(row[column])
+        barcodes.append(str(row["barcode"]))
+        try:
+            nutriments = json.loads(row["nutriments"] or "{}")
+        except (TypeError, ValueError):
+            nutriments = {}
+        for column_index, key in enumerate(NUTRIENT_COLUMNS):
+            value = nutriments.get(key)
+            if value is not None:
+                try:
+                    nutrients[index, column_index] = float(value)
+                except (TypeError, ValueError):
+                    pass
+        access_count[index] = int(row["access_count"] or 0)
+        fetched_at[index] = _parse_timestamp(row["last_updated"])
+
+    string_offsets, string_blob = strings.arrays()
+    arrays = {
+        "nutrients": nutrients,
+        "access_count": access_count,
+        "fetched_at": fetched_at,
+        "barcode_order": np.asarray(sorted(range(count), key=barcodes.__getitem__), dtype=np.int32),
+        # Same ranking as the database path: access_count DESC, last_updated DESC
+        "popularity_order": np.lexsort((-fetched_at, -access_count)).astype(np.int32),
+        "string_offsets": string_offsets,
+        "string_blob": string_blob,
+        **{f"str_{column}": ids for column, ids in string_ids.items()},
+    }
+    _write_arrays(path, arrays, {"rows": count, "built_at": time.time()})
+    logger.info(f"Catalog snapshot written to {path} with {count} products")
+    return count
+
+
+def _write_arrays(path: str, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> None:
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+    header = json.dumps({**meta, "arrays": layout}).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(MAGIC)
+        handle.write(struct.pack("<Q", len(header)))
+        handle.write(header)
+        for name, array in arrays.items():
+            handle.seek(data_start + layout[name]["offset"])
+            handle.write(np.ascontiguousarray(array).tobytes())
+        handle.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+class _SortedBarcodes(Sequence):
+    """Lazy view of barcodes in sorted order, for bisect without building a dict."""
+
+    def __init__(self, snapshot: "CatalogSnapshot"):
+        self._snapshot = snapshot
+
+    def __len__(self) -> int:
+        return self._snapshot.rows
+
+    def __getitem__(self, position):
+        return self._snapshot.string("barcode", int(self._snapshot.barcode_order[position]))
+
+
+class CatalogSnapshot:
+    """Read-only view over a memory-mapped catalog snapshot file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a catalog snapshot")
+        (header_length,) = struct.unpack("<Q", self._mmap[len(MAGIC): len(MAGIC) + 8])
+        header_end = len(MAGIC) + 8 + header_length
+        header = json.loads(self._mmap[len(MAGIC) + 8: header_end])
+        data_start = -(-header_end // ALIGNMENT) * ALIGNMENT
+
+        self.rows: int = header["rows"]
+        self.built_at: float = header["built_at"]
+        self._arrays: Dict[str, np.ndarray] = {}
+        for name, spec in header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            shape = tuple(spec["shape"])
+            count = int(np.prod(shape)) if shape else 1
+            array = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=data_start + spec["offset"])
+            self._arrays[name] = array.reshape(shape)
+        self._sorted_barcodes = _SortedBarcodes(self)
+
+    def close(self) -> None:
+        self._arrays = {}
+        try:
+            self._mmap.close()
+        except (BufferError, ValueError):
+            # Arrays handed out to callers still reference the mapping; the
+            # OS unmaps it once they are garbage collected.
+            pass
+        self._file.close()
+
+    def is_current(self) -> bool:
+        """False once the file at ``path`` has been replaced by a newer build."""
+        try:
+            return os.stat(self.path).st_ino == os.fstat(self._file.fileno()).st_ino
+        except (OSError, ValueError):
+            return False
+
+    # ----- columns --------------------------------------------------------
+
+    @property
+    def nutrients(self) -> np.ndarray:
+        """(rows, 6) float64 matrix in ``NUTRIENT_COLUMNS`` order; NaN when missing."""
+        return self._arrays["nutrients"]
+
+    @property
+    def access_count(self) -> np.ndarray:
+        return self._arrays["access_count"]
+
+    @property
+    def barcode_order(self) -> np.ndarray:
+        return self._arrays["barcode_order"]
+
+    @property
+    def popularity_order(self) -> np.ndarray:
+        return self._arrays["popularity_order"]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._mmap)
+
+    def string(self, column: str, row: int) -> Optional[str]:
+        string_id = int(self._arrays[f"str_{column}"][row])
+        if string_id < 0:
+            return None
+        offsets = self._arrays["string_offsets"]
+        start, end = int(offsets[string_id]), int(offsets[string_id + 1])
+        return self._arrays["string_blob"][start:end].tobytes().decode("utf-8")
+
+    # ----- lookups --------------------------------------------------------
+
+    def index_of(self, barcode: str) -> Optional[int]:
+        """Row index for ``barcode`` via binary search over the sorted barcode order."""
+        position = bisect.bisect_left(self._sorted_barcodes, str(barcode))
+        if position < self.rows and self._sorted_barcodes[position] == str(barcode):
+            return int(self.barcode_order[position])
+        return None
+
+    def iter_popular(self, min_access_count: int = 1) -> Iterator[int]:
+        """Row indices by descending access count."""
+        counts = self.access_count
+        for row in self.popularity_order:
+            if counts[row] < min_access_count:
+                return
+            yield int(row)
+
+    # ----- materialisation -----------------------------------------------
+
+    def to_product(self, row: int) -> ProductResponse:
+        values = self.nutrients[row]
+        nutriments = Nutriments(**{
+            key: (None if np.isnan(values[index]) else float(values[index]))
+            for index, key in enumerate(NUTRIENT_COLUMNS)
+        })
+        fetched_at = float(self._arrays["fetched_at"][row])
+        return ProductResponse(
+            source=self.string("source", row) or "Database",
+            barcode=self.string("barcode", row),
+            name=self.string("name", row),
+            brand=self.string("brand", row),
+            image_url=self.string("image_url", row),
+            serving_size=self.string("serving_size", row),
+            nutriments=nutriments,
+            fetched_at=datetime.fromtimestamp(fetched_at) if fetched_at else datetime.now(),
+        )
+
+    def product(self, barcode: str) -> Optional[ProductResponse]:
+        row = self.index_of(barcode)
+        return self.to_product(row) if row is not None else None
+
+
+def measure_memory_savings(snapshot: CatalogSnapshot, sample: int = 500) -> Dict[str, Any]:
+    """
+    Estimate per-worker resident memory saved by the snapshot.
+
+    Materialises a sample of ``ProductResponse`` objects under tracemalloc to
+    measure their per-product cost, extrapolates to the whole catalog and
+    compares it with the snapshot, whose pages are shared between workers.
+    """
+    rows = min(sample, snapshot.rows)
+    if rows == 0:
+        return {"rows": 0, "snapshot_bytes_shared": snapshot.nbytes,
+                "object_bytes_per_product": 0, "estimated_object_bytes_per_worker": 0,
+                "estimated_savings_bytes_per_worker": 0}
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        products = [snapshot.to_product(row) for row in range(rows)]
+        after = tracemalloc.take_snapshot()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    per_product = max(allocated, 0) / rows
+    estimated = int(per_product * snapshot.rows)
+    del products
+    return {
+        "rows": snapshot.rows,
+        "snapshot_bytes_shared": snapshot.nbytes,
+        "object_bytes_per_product": int(per_product),
+        "estimated_object_bytes_per_worker": estimated,
+        "estimated_savings_bytes_per_worker": estimated,
+    }
+
+
+_catalog_snapshot: Optional[CatalogSnapshot] = None
+
+
+def ensure_catalog_snapshot(conn_factory, path: Optional[str] = None, max_age_seconds: Optional[float] = None) -> Optional[CatalogSnapshot]:
+    """
+    Build the snapshot if missing or stale, then map it for this worker.
+
+    A lock file serialises the build so only one worker exports the table;
+    the others wait and then map the finished file.
+    """
+    global _catalog_snapshot
+    path = path or config.catalog_snapshot_path
+    max_age = config.catalog_snapshot_max_age_seconds if max_age_seconds is None else max_age_seconds
+
+    with open(f"{path}.lock", "a+") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            stale = not os.path.exists(path) or (time.time() - os.path.getmtime(path)) > max_age
+            if stale:
+                with conn_factory() as conn:
+                    build_catalog_snapshot(conn, path)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # Requests may still be reading the previous mapping (refreshes run on a
+    # maintenance thread), so it is not closed here: it is unmapped once the
+    # last reader drops its reference.
+    _catalog_snapshot = CatalogSnapshot(path)
+    return _catalog_snapshot
+
+
+def refresh_catalog_snapshot(conn_factory, path: Optional[str] = None, max_age_seconds: Optional[float] = None) -> Optional[CatalogSnapshot]:
+    """
+    Maintenance hook: rebuild the snapshot once it is older than the max age
+    and remap it in this worker when another worker has rebuilt it.
+
+    A fresh file that is already mapped costs one ``stat``.
+    """
+    path = path or config.catalog_snapshot_path
+    max_age = config.catalog_snapshot_max_age_seconds if max_age_seconds is None else max_age_seconds
+    current = _catalog_snapshot
+    if current is not None and current.path == path and current.is_current():
+        if time.time() - os.path.getmtime(path) <= max_age:
+            return current
+    snapshot = ensure_catalog_snapshot(conn_factory, path, max_age)
+    logger.info(f"Catalog snapshot refreshed: {snapshot.rows} products")
+    return snapshot
+
+
+def get_catalog_snapshot() -> Optional[CatalogSnapshot]:
+    """Return this worker's snapshot, or None when disabled or not yet built."""
+    global _catalog_snapshot
+    if not config.catalog_snapshot_enabled:
+        return None
+    if _catalog_snapshot is None and os.path.exists(config.catalog_snapshot_path):
+        try:
+            _catalog_snapshot = CatalogSnapshot(config.catalog_snapshot_path)
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Catalog snapshot unavailable: {exc}")
+            return None
+    return _catalog_snapshot
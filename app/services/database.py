@@ -10,6 +10,7 @@ from queue import Queue, Empty
 from dataclasses import asdict, is_dataclass
 from app.models.user import User, UserCreate, UserSession, UserRole
 from app.config import config
+from app.services.product_search import ensure_products_fts
 import logging
 import re
 
@@ -68,6 +69,8 @@ class ConnectionPool:
         try:
             raw_conn = sqlite3.connect(self.db_path, check_same_thread=False)
             raw_conn.row_factory = sqlite3.Row  # Enable column access by name
+            # Only takes effect on a new database; lets maintenance return free pages
+            raw_conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
             # Enable WAL mode for better concurrent access
             raw_conn.execute("PRAGMA journal_mode=WAL")
             raw_conn.execute("PRAGMA synchronous=NORMAL")
@@ -536,10 +539,70 @@ class DatabaseService:
                 )
             """)
             
+            # Smart Diet learning signals (suggestions served, feedback given)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS smart_diet_learning_signals (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    signal_type TEXT NOT NULL,
+                    suggestion_id TEXT NOT NULL,
+                    category TEXT,
+                    action TEXT,
+                    confidence REAL,
+                    created_at TIMESTAMP NOT NULL
+                )
+            """)
+
+            # Access-token revocations (logouts, deactivations) shared across workers
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS token_revocations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    subject TEXT NOT NULL,
+                    revoked_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            
+            # Known translations (glossary and provider output), loaded into memory at startup
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS translation_memory (
+                    source_text TEXT NOT NULL,
+                    source_lang TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    translated_text TEXT NOT NULL,
+                    origin TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (source_text, source_lang, target_lang)
+                ) WITHOUT ROWID
+            """)
+
+            # Durable intelligent flow jobs, claimed by worker leases
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS intelligent_flow_jobs (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    payload TEXT,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    available_at REAL NOT NULL,
+                    lease_id TEXT,
+                    lease_expires_at REAL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
             # Indexes for better performance
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON user_sessions(user_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_refresh_token ON user_sessions(refresh_token)")
+            # Let maintenance garbage collection find expired rows without a full scan
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON user_sessions(expires_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_notifications_created_at ON notifications(created_at)")
             
             # Meal tracking indexes
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_meals_user_id ON meals(user_id)")
@@ -574,6 +637,9 @@ class DatabaseService:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_brand ON products(brand)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_access_count ON products(access_count)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_last_updated ON products(last_updated)")
+
+            # Full-text index over name/brand/categories, kept in sync by triggers
+            ensure_products_fts(cursor)
             
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_product_history_user_id ON user_product_history(user_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_product_history_session ON user_product_history(session_id)")
@@ -581,6 +647,12 @@ class DatabaseService:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_product_history_timestamp ON user_product_history(timestamp)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_product_history_action ON user_product_history(action)")
             
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_learning_signals_user_created ON smart_diet_learning_signals(user_id, created_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_token_revocations_expires ON token_revocations(expires_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_intelligent_flow_jobs_due ON intelligent_flow_jobs(status, priority DESC, available_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_intelligent_flow_jobs_user ON intelligent_flow_jobs(user_id, status)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_intelligent_flow_jobs_updated ON intelligent_flow_jobs(status, updated_at)")
+            
             conn.commit()
             logger.info("Database initialized successfully with all tables")
     
@@ -11,7 +11,7 @@ import base64
 import logging
 import time
 from datetime import datetime
-from typing import Optional, Dict, Any, Callable, Awaitable
+from typing import Optional, Dict, Any, AsyncIterator, Callable, Awaitable
 
 from app.models.food_vision import VisionLogResponse
 from app.models.intelligent_flow import (
@@ -49,6 +49,10 @@ class IntelligentFlowValidationError(IntelligentFlowError):
     """Raised when incoming data is invalid."""
 
 
+# Called with (step_name, timing, result) as soon as a step finishes
+StepListener = Callable[[str, Optional[FlowStepTiming], Any], Awaitable[None]]
+
+
 class IntelligentFlowService:
     """Coordinates the intelligent nutrition flow across existing services."""
 
@@ -66,21 +70,83 @@ class IntelligentFlowService:
         self.monitor = performance_monitor
         self._logger = logger
 
-    async def run_flow(self, request: IntelligentFlowRequest) -> IntelligentFlowResponse:
+    async def run_flow(
+        self,
+        request: IntelligentFlowRequest,
+        on_step: Optional[StepListener] = None,
+    ) -> IntelligentFlowResponse:
         """
         Execute the intelligent pipeline end-to-end.
 
+        ``on_step`` is awaited with each step's result as soon as that step
+        finishes, before the remaining steps complete.
+
         Raises:
             IntelligentFlowValidationError: when image decoding fails.
             IntelligentFlowError: for unexpected failures in the vision step.
         """
+        # Decode image once for downstream services
+        image_bytes = self._decode_image(request.image_base64)
+        return await self._execute_flow(request, image_bytes, on_step)
+
+    def stream_flow(self, request: IntelligentFlowRequest) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute the pipeline and yield an event per finished step, then the full response.
+
+        Events are ``{"event": "step", "step", "timing", "result"}`` in completion
+        order, followed by ``{"event": "complete", "response"}`` or, when the
+        flow fails, ``{"event": "error", "detail"}``.
+
+        Raises:
+            IntelligentFlowValidationError: when image decoding fails (before any event).
+        """
+        image_bytes = self._decode_image(request.image_base64)
+        return self._stream_events(request, image_bytes)
+
+    async def _stream_events(
+        self,
+        request: IntelligentFlowRequest,
+        image_bytes: bytes,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def on_step(step_name: str, timing: Optional[FlowStepTiming], result: Any) -> None:
+            await events.put({"event": "step", "step": step_name, "timing": timing, "result": result})
+
+        async def execute() -> None:
+            try:
+                response = await self._execute_flow(request, image_bytes, on_step)
+                await events.put({"event": "complete", "response": response})
+            except IntelligentFlowError as exc:
+                await events.put({"event": "error", "detail": str(exc)})
+            except Exception as exc:  # pragma: no cover - defensive catch-all
+                self._logger.error("Streamed intelligent flow failed: %s", exc, exc_info=True)
+                await events.put({"event": "error", "detail": "Intelligent flow execution failed"})
+            finally:
+                await events.put(None)
+
+        task = asyncio.create_task(execute())
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+        finally:
+            # The client went away: stop working on a response nobody will read
+            if not task.done():
+                task.cancel()
+
+    async def _execute_flow(
+        self,
+        request: IntelligentFlowRequest,
+        image_bytes: bytes,
+        on_step: Optional[StepListener],
+    ) -> IntelligentFlowResponse:
         start_time = time.time()
         timings: Dict[str, FlowStepTiming] = {}
         warnings: list[str] = []
 
-        # Decode image once for downstream services
-        image_bytes = self._decode_image(request.image_base64)
-
         self._logger.info(
             "Running intelligent flow | user=%s meal=%s",
             request.user_id,
@@ -100,19 +166,30 @@ class IntelligentFlowService:
             ),
             continue_on_error=False,
         )
+        await self._notify_step(on_step, "vision", timings, vision_result)
 
         # Recipe AI and Smart Diet can fail independently without cancelling the flow.
         recipe_result, smart_diet_result = await asyncio.gather(
-            self._run_recipe_step(
-                request=request,
-                vision_result=vision_result,
-                timings=timings,
-                warnings=warnings,
+            self._notify_after(
+                on_step,
+                "recipe",
+                timings,
+                self._run_recipe_step(
+                    request=request,
+                    vision_result=vision_result,
+                    timings=timings,
+                    warnings=warnings,
+                ),
             ),
-            self._run_smart_diet_step(
-                request=request,
-                timings=timings,
-                warnings=warnings,
+            self._notify_after(
+                on_step,
+                "smart_diet",
+                timings,
+                self._run_smart_diet_step(
+                    request=request,
+                    timings=timings,
+                    warnings=warnings,
+                ),
             ),
         )
 
@@ -146,6 +223,33 @@ class IntelligentFlowService:
 
         return response
 
+    async def _notify_after(
+        self,
+        on_step: Optional[StepListener],
+        step_name: str,
+        timings: Dict[str, FlowStepTiming],
+        step: Awaitable[Any],
+    ) -> Any:
+        """Await a step and report its result without waiting for sibling steps."""
+        result = await step
+        await self._notify_step(on_step, step_name, timings, result)
+        return result
+
+    async def _notify_step(
+        self,
+        on_step: Optional[StepListener],
+        step_name: str,
+        timings: Dict[str, FlowStepTiming],
+        result: Any,
+    ) -> None:
+        """Hand a finished step to the listener; listener failures never fail the flow."""
+        if on_step is None:
+            return
+        try:
+            await on_step(step_name, timings.get(step_name), result)
+        except Exception as exc:
+            self._logger.warning("Step listener failed for %s: %s", step_name, exc)
+
     async def _run_recipe_step(
         self,
         request: IntelligentFlowRequest,
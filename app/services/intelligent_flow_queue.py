@@ -1,85 +1,445 @@
 """
-In-memory job queue for Intelligent Flow executions.
+Durable job queue for Intelligent Flow executions.
 
-Provides a light async wrapper so the API can enqueue long-running IA flows
-without blocking the request/response cycle.
+Lets the API enqueue long-running IA flows without blocking the
+request/response cycle. Jobs are rows of the ``intelligent_flow_jobs``
+table, so they survive restarts and any worker process sharing the
+database can run them; no external broker is involved.
+
+A fixed pool of workers claims jobs one at a time:
+
+* Higher ``priority`` first; within a priority, users with the fewest
+  running flows first, and no user runs more than ``max_running_per_user``
+  flows at once, so one burst of uploads cannot occupy every worker.
+* A claim is a lease: the job is invisible to other workers until
+  ``visibility_timeout`` passes. The lease is renewed while the flow runs,
+  so it only lapses when a worker dies, and the job is then claimed again.
+* Failed flows are retried with exponential backoff up to ``max_attempts``.
+
+Finished jobs stay retrievable for ``job_ttl`` seconds and are then purged
+by maintenance.
 """
 
 from __future__ import annotations
 
 import asyncio
+import json
+import logging
+import time
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from fastapi.encoders import jsonable_encoder
+
+from app.config import config
 from app.models.intelligent_flow import IntelligentFlowRequest, IntelligentFlowResponse
+from app.services.intelligent_flow import IntelligentFlowValidationError
+from app.services.maintenance import delete_in_batches
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class IntelligentFlowQueueFull(Exception):
+    """Raised when the queue already holds its maximum of unfinished jobs."""
 
 
 @dataclass
 class IntelligentFlowJob:
-    """Job state stored in the in-memory queue."""
+    """Job state as stored in the queue table."""
 
     id: str
     user_id: str
-    status: str = "queued"
+    status: str = QUEUED
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
     result: Optional[IntelligentFlowResponse] = None
     error: Optional[str] = None
+    priority: int = 0
+    attempts: int = 0
 
-    def mark_running(self) -> None:
-        self.status = "running"
-        self.updated_at = datetime.utcnow()
 
-    def mark_completed(self, result: IntelligentFlowResponse) -> None:
-        self.status = "completed"
-        self.result = result
-        self.updated_at = datetime.utcnow()
+class IntelligentFlowQueue:
+    """SQLite-backed queue with a worker pool, leases, retries and per-user fairness."""
 
-    def mark_failed(self, error: str) -> None:
-        self.status = "failed"
-        self.error = error
-        self.updated_at = datetime.utcnow()
+    def __init__(
+        self,
+        db: Any = None,
+        workers: Optional[int] = None,
+        max_jobs: Optional[int] = None,
+        job_ttl: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+        visibility_timeout: Optional[float] = None,
+        max_running_per_user: Optional[int] = None,
+        poll_interval: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            db: Database service (defaults to the shared ``db_service``)
+            workers: Flows run concurrently by this process
+            max_jobs: Unfinished jobs accepted at once; further enqueues are rejected
+            job_ttl: Seconds a finished job stays retrievable
+            max_attempts: Runs per job before it is marked failed
+            retry_backoff: Delay before the first retry, doubled for each further one
+            visibility_timeout: Seconds a claimed job stays invisible without a lease renewal
+            max_running_per_user: Flows of a single user running at once
+            poll_interval: Seconds an idle worker waits before looking for due retries
+                and jobs enqueued by other processes
 
+        Unset values come from the ``intelligent_flow_*`` config settings.
+        """
+        self._db = db
+        self.workers = workers or config.intelligent_flow_workers
+        self.max_jobs = max_jobs or config.intelligent_flow_max_jobs
+        self.job_ttl = job_ttl or config.intelligent_flow_job_ttl_seconds
+        self.max_attempts = max_attempts or config.intelligent_flow_max_attempts
+        self.retry_backoff = retry_backoff if retry_backoff is not None else config.intelligent_flow_retry_backoff_seconds
+        self.visibility_timeout = visibility_timeout or config.intelligent_flow_visibility_timeout_seconds
+        self.max_running_per_user = max_running_per_user or config.intelligent_flow_max_running_per_user
+        self.poll_interval = poll_interval
+        self.service = None
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._waits: deque = deque(maxlen=1000)  # seconds from due to claimed, recent claims
+        self.metrics = {
+            'enqueued': 0,
+            'rejected': 0,
+            'claimed': 0,
+            'completed': 0,
+            'failed': 0,
+            'retried': 0,
+            'lease_expired': 0,
+            'lease_lost': 0,
+        }
 
-class IntelligentFlowQueue:
-    """Singleton-like queue that manages background execution of flows."""
+    @property
+    def db(self):
+        if self._db is None:
+            from app.services.database import db_service
+            self._db = db_service
+        return self._db
 
-    def __init__(self) -> None:
-        self._jobs: Dict[str, IntelligentFlowJob] = {}
-        self._lock = asyncio.Lock()
+    # ----- Producing -----
 
-    async def enqueue(self, service, request: IntelligentFlowRequest) -> IntelligentFlowJob:
+    async def enqueue(self, service, request: IntelligentFlowRequest, priority: int = 0) -> IntelligentFlowJob:
         """
-        Enqueue a new intelligent flow job.
+        Enqueue a new intelligent flow job and make sure workers are running.
 
         Returns:
             IntelligentFlowJob: Job metadata (initially queued)
+
+        Raises:
+            IntelligentFlowQueueFull: when ``max_jobs`` jobs are already queued or running
         """
-        job_id = str(uuid.uuid4())
-        job = IntelligentFlowJob(id=job_id, user_id=request.user_id)
+        now = time.time()
+        job = IntelligentFlowJob(
+            id=str(uuid.uuid4()),
+            user_id=request.user_id,
+            created_at=datetime.utcfromtimestamp(now),
+            updated_at=datetime.utcfromtimestamp(now),
+            priority=priority,
+        )
+        inserted = await asyncio.to_thread(self._insert, job, request.model_dump_json(), now)
+        if not inserted:
+            self.metrics['rejected'] += 1
+            raise IntelligentFlowQueueFull(f"{self.max_jobs} intelligent flow jobs already pending")
 
-        async with self._lock:
-            self._jobs[job_id] = job
+        self.metrics['enqueued'] += 1
+        self.start(service)
+        self._wakeup.set()
+        return job
 
-        async def runner() -> None:
-            job.mark_running()
-            try:
-                result = await service.run_flow(request)
-                job.mark_completed(result)
-            except Exception as exc:  # pragma: no cover - defensive
-                job.mark_failed(str(exc))
+    def _insert(self, job: IntelligentFlowJob, payload: str, now: float) -> bool:
+        with self.db.get_connection() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO intelligent_flow_jobs
+                    (id, user_id, status, priority, payload, attempts, available_at, created_at, updated_at)
+                SELECT ?, ?, ?, ?, ?, 0, ?, ?, ?
+                WHERE (SELECT COUNT(*) FROM intelligent_flow_jobs WHERE status IN (?, ?)) < ?
+                """,
+                (job.id, job.user_id, QUEUED, job.priority, payload, now, now, now, QUEUED, RUNNING, self.max_jobs),
+            )
+            conn.commit()
+            return cursor.rowcount == 1
+
+    async def get(self, job_id: str) -> Optional[IntelligentFlowJob]:
+        """Retrieve job metadata if it exists and has not expired."""
+        row = await asyncio.to_thread(self._read, job_id)
+        if row is None:
+            return None
+        if row["status"] in (COMPLETED, FAILED) and row["updated_at"] + self.job_ttl <= time.time():
+            return None
+        return IntelligentFlowJob(
+            id=row["id"],
+            user_id=row["user_id"],
+            status=row["status"],
+            created_at=datetime.utcfromtimestamp(row["created_at"]),
+            updated_at=datetime.utcfromtimestamp(row["updated_at"]),
+            result=IntelligentFlowResponse.model_validate_json(row["result"]) if row["result"] else None,
+            error=row["error"],
+            priority=row["priority"],
+            attempts=row["attempts"],
+        )
+
+    def _read(self, job_id: str):
+        with self.db.get_connection() as conn:
+            return conn.execute(
+                """
+                SELECT id, user_id, status, priority, result, error, attempts, created_at, updated_at
+                FROM intelligent_flow_jobs WHERE id = ?
+                """,
+                (job_id,),
+            ).fetchone()
+
+    # ----- Claiming -----
 
+    def _claim(self, now: float) -> Optional[Tuple[str, str, str, int, float]]:
+        """Lease the next due job; returns (job id, lease id, payload, attempt, seconds it waited)."""
+        lease_id = uuid.uuid4().hex
+        with self.db.get_connection() as conn:
+            # Idle polls only read; the write lock is taken when there is work
+            probe = conn.execute(
+                """
+                SELECT EXISTS(SELECT 1 FROM intelligent_flow_jobs WHERE status = ? AND lease_expires_at <= ?),
+                       EXISTS(SELECT 1 FROM intelligent_flow_jobs WHERE status = ? AND available_at <= ?)
+                """,
+                (RUNNING, now, QUEUED, now),
+            ).fetchone()
+            has_expired, has_due = bool(probe[0]), bool(probe[1])
+            if not (has_expired or has_due):
+                return None
+
+            # Jobs whose worker died are due again (or out of attempts)
+            expired = 0 if not has_expired else conn.execute(
+                """
+                UPDATE intelligent_flow_jobs
+                SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                    error = CASE WHEN attempts >= ? THEN 'Worker lease expired' ELSE error END,
+                    payload = CASE WHEN attempts >= ? THEN NULL ELSE payload END,
+                    available_at = lease_expires_at,
+                    lease_id = NULL, lease_expires_at = NULL, updated_at = ?
+                WHERE status = ? AND lease_expires_at <= ?
+                """,
+                (self.max_attempts, FAILED, QUEUED, self.max_attempts, self.max_attempts, now, RUNNING, now),
+            ).rowcount
+            row = conn.execute(
+                """
+                UPDATE intelligent_flow_jobs
+                SET status = ?, lease_id = ?, lease_expires_at = ?, attempts = attempts + 1, updated_at = ?
+                WHERE id = (
+                    SELECT j.id FROM intelligent_flow_jobs j
+                    WHERE j.status = ? AND j.available_at <= ?
+                      AND (SELECT COUNT(*) FROM intelligent_flow_jobs r
+                           WHERE r.user_id = j.user_id AND r.status = ?) < ?
+                    ORDER BY j.priority DESC,
+                             (SELECT COUNT(*) FROM intelligent_flow_jobs r
+                              WHERE r.user_id = j.user_id AND r.status = ?),
+                             j.available_at
+                    LIMIT 1
+                )
+                RETURNING id, payload, attempts, available_at
+                """,
+                (
+                    RUNNING, lease_id, now + self.visibility_timeout, now,
+                    QUEUED, now, RUNNING, self.max_running_per_user, RUNNING,
+                ),
+            ).fetchone()
+            conn.commit()
+        self.metrics['lease_expired'] += expired
+        if row is None:
+            return None
+        return row["id"], lease_id, row["payload"], row["attempts"], max(0.0, now - row["available_at"])
+
+    def _renew(self, job_id: str, lease_id: str) -> bool:
+        with self.db.get_connection() as conn:
+            cursor = conn.execute(
+                "UPDATE intelligent_flow_jobs SET lease_expires_at = ? WHERE id = ? AND lease_id = ?",
+                (time.time() + self.visibility_timeout, job_id, lease_id),
+            )
+            conn.commit()
+            return cursor.rowcount == 1
+
+    def _finish(
+        self,
+        job_id: str,
+        lease_id: str,
+        status: str,
+        result: Optional[str] = None,
+        error: Optional[str] = None,
+        available_at: Optional[float] = None,
+        refund_attempt: bool = False,
+    ) -> bool:
+        """Record the outcome of a run; False when the lease was lost to another worker."""
+        now = time.time()
+        with self.db.get_connection() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE intelligent_flow_jobs
+                SET status = ?, result = ?, error = ?,
+                    payload = CASE WHEN ? = ? THEN payload ELSE NULL END,
+                    attempts = attempts - ?,
+                    available_at = COALESCE(?, available_at),
+                    lease_id = NULL, lease_expires_at = NULL, updated_at = ?
+                WHERE id = ? AND lease_id = ?
+                """,
+                (
+                    status, result, error, status, QUEUED, int(refund_attempt),
+                    available_at, now, job_id, lease_id,
+                ),
+            )
+            conn.commit()
+            return cursor.rowcount == 1
+
+    # ----- Workers -----
+
+    def start(self, service) -> None:
+        """Start the worker pool on the running loop (idempotent)."""
+        self.service = service
         loop = asyncio.get_running_loop()
-        loop.create_task(runner())
+        if loop is not self._loop:
+            # Workers of a previous event loop (tests, worker restart) cannot run here
+            self._loop, self._tasks, self._wakeup = loop, [], asyncio.Event()
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(loop.create_task(self._work()))
 
-        return job
+    async def stop(self) -> None:
+        """Stop the workers; flows they were running go back to the queue."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-    async def get(self, job_id: str) -> Optional[IntelligentFlowJob]:
-        """Retrieve job metadata if it exists."""
-        async with self._lock:
-            return self._jobs.get(job_id)
+    async def _work(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                claimed = await asyncio.to_thread(self._claim, time.time())
+            except Exception as e:
+                logger.warning(f"Intelligent flow job claim failed: {e}")
+                claimed = None
+            if claimed is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(*claimed)
+
+    async def _run(self, job_id: str, lease_id: str, payload: str, attempt: int, waited: float) -> None:
+        self.metrics['claimed'] += 1
+        self._waits.append(waited)
+        heartbeat = asyncio.create_task(self._keep_lease(job_id, lease_id))
+        try:
+            request = IntelligentFlowRequest.model_validate_json(payload)
+            result = await self.service.run_flow(request)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back without spending an attempt
+            await self._record(job_id, lease_id, QUEUED, refund_attempt=True)
+            raise
+        except IntelligentFlowValidationError as exc:
+            await self._record(job_id, lease_id, FAILED, error=str(exc))
+        except Exception as exc:
+            await self._record_failure(job_id, lease_id, attempt, exc)
+        else:
+            await self._record(job_id, lease_id, COMPLETED, result=json.dumps(jsonable_encoder(result)))
+        finally:
+            heartbeat.cancel()
+
+    async def _record_failure(self, job_id: str, lease_id: str, attempt: int, exc: Exception) -> None:
+        if attempt < self.max_attempts:
+            delay = self.retry_backoff * 2 ** (attempt - 1)
+            logger.warning(f"Intelligent flow job {job_id} failed (attempt {attempt}), retrying in {delay:.1f}s: {exc}")
+            await self._record(job_id, lease_id, QUEUED, error=str(exc), available_at=time.time() + delay)
+        else:
+            logger.error(f"Intelligent flow job {job_id} failed after {attempt} attempts: {exc}")
+            await self._record(job_id, lease_id, FAILED, error=str(exc))
+
+    async def _record(self, job_id: str, lease_id: str, status: str, **outcome) -> None:
+        try:
+            recorded = await asyncio.to_thread(self._finish, job_id, lease_id, status, **outcome)
+        except Exception as e:
+            # The lease lapses and the job is claimed again
+            logger.error(f"Failed to record intelligent flow job {job_id} as {status}: {e}")
+            return
+        if not recorded:
+            self.metrics['lease_lost'] += 1
+            logger.warning(f"Intelligent flow job {job_id} lease was lost; {status} outcome discarded")
+        elif status in (COMPLETED, FAILED):
+            self.metrics[status] += 1
+        elif not outcome.get('refund_attempt'):
+            self.metrics['retried'] += 1
+
+    async def _keep_lease(self, job_id: str, lease_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            try:
+                if not await asyncio.to_thread(self._renew, job_id, lease_id):
+                    return
+            except Exception as e:
+                logger.warning(f"Intelligent flow job {job_id} lease renewal failed: {e}")
+
+    # ----- Maintenance and metrics -----
+
+    def purge_expired(self, batch_size: int = 500, pause: float = 0.0) -> int:
+        """Delete finished jobs past their TTL (run by maintenance); returns rows removed."""
+        return delete_in_batches(
+            self.db,
+            "intelligent_flow_jobs",
+            "status IN (?, ?) AND updated_at <= ?",
+            (COMPLETED, FAILED, time.time() - self.job_ttl),
+            batch_size,
+            pause,
+        )
+
+    def _depth(self, now: float) -> Dict[str, Any]:
+        with self.db.get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT status, COUNT(*) AS jobs, MIN(available_at) AS oldest
+                FROM intelligent_flow_jobs WHERE status IN (?, ?) GROUP BY status
+                """,
+                (QUEUED, RUNNING),
+            ).fetchall()
+        by_status = {row["status"]: row for row in rows}
+        queued = by_status.get(QUEUED)
+        return {
+            'queued': queued["jobs"] if queued else 0,
+            'running': by_status[RUNNING]["jobs"] if RUNNING in by_status else 0,
+            'oldest_queued_wait_s': round(max(0.0, now - queued["oldest"]), 3) if queued else 0.0,
+        }
+
+    async def stats(self) -> Dict[str, Any]:
+        """Queue depth (all processes) plus this process's wait times and counters."""
+        try:
+            depth = await asyncio.to_thread(self._depth, time.time())
+        except Exception as e:
+            logger.warning(f"Intelligent flow queue depth unavailable: {e}")
+            depth = {}
+        waits = sorted(self._waits)
+
+        def percentile(q: float) -> float:
+            return round(waits[min(len(waits) - 1, int(q * len(waits)))] * 1000, 2) if waits else 0.0
+
+        return {
+            'workers': sum(1 for task in self._tasks if not task.done()),
+            **depth,
+            'wait_ms_p50': percentile(0.50),
+            'wait_ms_p95': percentile(0.95),
+            'wait_ms_max': percentile(1.0),
+            **self.metrics,
+        }
 
 
 intelligent_flow_queue = IntelligentFlowQueue()
@@ -0,0 +1,152 @@
+"""
+Cache invalidation bus.
+
+Services that keep data in process memory subscribe a handler per topic;
+writers publish ``(topic, key)`` after changing the underlying rows.
+Handlers in the publishing process run immediately, and the event is also
+sent on a Redis channel (``invalidate:<topic>``) so every other worker drops
+its copy too. Publishing never fails the write: when Redis is unreachable
+the event stays local and the caches' TTL bounds how long other workers
+serve the stale entry.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+import weakref
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.cache import cache_layer
+
+logger = logging.getLogger(__name__)
+
+TASTE_PROFILE = "taste_profile"
+SMART_DIET = "smart_diet"
+USER = "user"
+
+Handler = Callable[[str], Any]
+
+
+class InvalidationBus:
+    """In-process topic handlers mirrored over Redis pub/sub."""
+
+    def __init__(self, cache: Any = cache_layer, channel_prefix: str = "invalidate", retry_interval: float = 5.0):
+        self.cache = cache
+        self.channel_prefix = channel_prefix
+        self.retry_interval = retry_interval
+        # Tells this worker's own messages apart when they come back from Redis
+        self.origin = uuid.uuid4().hex
+        self._handlers: Dict[str, List[Callable[[], Optional[Handler]]]] = {}
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.metrics = {
+            'published': 0,
+            'publish_errors': 0,
+            'received': 0,
+            'handler_errors': 0,
+            'listen_errors': 0,
+        }
+
+    def channel(self, topic: str) -> str:
+        return f"{self.channel_prefix}:{topic}"
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        """
+        Call ``handler(key)`` for every invalidation of ``topic``.
+
+        Bound methods are held weakly so subscribing does not keep their
+        owner alive.
+        """
+        if hasattr(handler, '__self__'):
+            ref: Callable[[], Optional[Handler]] = weakref.WeakMethod(handler)
+        else:
+            ref = lambda: handler  # noqa: E731
+        self._handlers.setdefault(topic, []).append(ref)
+
+    def dispatch(self, topic: str, key: str) -> int:
+        """Run local handlers for ``topic``; returns how many ran."""
+        refs = self._handlers.get(topic, [])
+        alive = []
+        for ref in refs:
+            handler = ref()
+            if handler is None:
+                continue
+            alive.append(ref)
+            try:
+                handler(key)
+            except Exception as e:
+                self.metrics['handler_errors'] += 1
+                logger.warning(f"Invalidation handler for {topic} failed on {key}: {e}")
+        if len(alive) != len(refs):
+            self._handlers[topic] = alive
+        return len(alive)
+
+    async def publish(self, topic: str, key: str) -> None:
+        """Invalidate ``key`` here and in every other worker."""
+        self.dispatch(topic, key)
+        try:
+            client = await self.cache.client()
+            await client.publish(self.channel(topic), json.dumps({'origin': self.origin, 'key': key}))
+            self.metrics['published'] += 1
+        except Exception as e:
+            self.metrics['publish_errors'] += 1
+            self.cache.record_failure(e)
+            logger.debug(f"Invalidation of {topic}:{key} not broadcast: {e}")
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        if message.get('type') != 'pmessage':
+            return
+        channel = message.get('channel')
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        try:
+            payload = json.loads(message.get('data'))
+        except (TypeError, ValueError):
+            return
+        if payload.get('origin') == self.origin:
+            return
+        self.metrics['received'] += 1
+        self.dispatch(channel[len(self.channel_prefix) + 1:], str(payload.get('key')))
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                client = await self.cache.client()
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                try:
+                    await pubsub.psubscribe(self.channel("*"))
+                    async for message in pubsub.listen():
+                        self._on_message(message)
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics['listen_errors'] += 1
+                self.cache.record_failure(e)
+                logger.debug(f"Invalidation listener disconnected: {e}")
+                await asyncio.sleep(self.retry_interval)
+
+    def start(self) -> None:
+        """Start receiving invalidations published by other workers."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._listen())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'listening': self._task is not None and not self._task.done(),
+            'topics': {topic: len(refs) for topic, refs in self._handlers.items()},
+            **self.metrics,
+        }
+
+
+invalidation_bus = InvalidationBus()
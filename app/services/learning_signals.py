@@ -0,0 +1,225 @@
+"""
+Smart Diet learning signals.
+
+Suggestions served to a user and the feedback they give are the engine's
+learning signal. Hot history is kept per user in fixed-size ring buffers
+(and only for the most recently active users), every signal is queued for a
+batched write to the ``smart_diet_learning_signals`` table, and
+accepted/rejected outcomes are folded into per-(user, category) counters so
+feedback learning reads a single dict entry instead of scanning history.
+Counters are rebuilt from the table the first time a user is seen by this
+process (after a restart or once the user has been evicted).
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from app.models.smart_diet import SmartSuggestion, SuggestionFeedback
+
+logger = logging.getLogger(__name__)
+
+
+class _UserSignals:
+    """Ring buffers and outcome counters for one user."""
+
+    __slots__ = ("suggestions", "feedback", "counts", "loaded")
+
+    def __init__(self, limit: int):
+        self.suggestions: Deque[SmartSuggestion] = deque(maxlen=limit)
+        self.feedback: Deque[SuggestionFeedback] = deque(maxlen=limit)
+        self.counts: Dict[str, List[int]] = {}  # category -> [accepted, rejected]
+        self.loaded = False  # counts rehydrated from persisted feedback
+
+
+class LearningSignalStore:
+    """Bounded in-memory learning history with periodic SQLite persistence."""
+
+    # Largest confidence change learned feedback can apply (±20%)
+    MAX_AFFINITY_SHIFT = 0.2
+    # Pseudo-count damping the shift until a category has a few outcomes
+    AFFINITY_PRIOR = 5
+
+    def __init__(
+        self,
+        per_user_limit: int = 100,
+        max_users: int = 5000,
+        flush_batch_size: int = 200,
+        flush_interval: float = 60.0,
+        db: Any = None,
+    ):
+        self.per_user_limit = per_user_limit
+        self.max_users = max_users
+        self.flush_batch_size = flush_batch_size
+        self.flush_interval = flush_interval
+        self._db = db
+        self._users: "OrderedDict[str, _UserSignals]" = OrderedDict()
+        self._pending: List[Tuple[Any, ...]] = []
+        self._last_flush = time.monotonic()
+
+    @property
+    def db(self):
+        if self._db is None:
+            from app.services.database import db_service
+            self._db = db_service
+        return self._db
+
+    def _user(self, user_id: str) -> _UserSignals:
+        signals = self._users.get(user_id)
+        if signals is None:
+            signals = self._users[user_id] = _UserSignals(self.per_user_limit)
+            if len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        return signals
+
+    async def load_user(self, user_id: str) -> None:
+        """Rehydrate a user's outcome counters from SQLite unless already done."""
+        signals = self._users.get(user_id)
+        if signals is not None and signals.loaded:
+            return
+        try:
+            rows = await asyncio.to_thread(self._read_outcomes, user_id)
+        except Exception as e:
+            logger.warning(f"Failed to load Smart Diet learning signals for {user_id}: {e}")
+            return
+
+        counts: Dict[str, List[int]] = {}
+        # Feedback not flushed yet is counted from the queue
+        pending = [
+            (row[3], row[4], 1) for row in self._pending
+            if row[0] == user_id and row[1] == "feedback" and row[3] is not None
+        ]
+        for category, action, total in list(rows) + pending:
+            if action in ("accepted", "rejected"):
+                counts.setdefault(category, [0, 0])[0 if action == "accepted" else 1] += total
+        signals = self._user(user_id)
+        signals.counts = counts
+        signals.loaded = True
+
+    def _read_outcomes(self, user_id: str) -> List[Tuple[str, str, int]]:
+        with self.db.get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT category, action, COUNT(*) FROM smart_diet_learning_signals
+                WHERE user_id = ? AND signal_type = 'feedback' AND category IS NOT NULL
+                GROUP BY category, action
+                """,
+                (user_id,),
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    # ----- Recording -----
+
+    def record_suggestions(self, user_id: str, suggestions: Iterable[SmartSuggestion]) -> None:
+        signals = self._user(user_id)
+        for suggestion in suggestions:
+            signals.suggestions.append(suggestion)
+            self._pending.append((
+                user_id, "suggestion", suggestion.id, suggestion.category.value,
+                None, suggestion.confidence_score, suggestion.created_at.isoformat(),
+            ))
+
+    def record_feedback(self, feedback: SuggestionFeedback, category: Optional[str] = None) -> None:
+        self._user(feedback.user_id).feedback.append(feedback)
+        self._pending.append((
+            feedback.user_id, "feedback", feedback.suggestion_id, category,
+            feedback.action, None, feedback.feedback_at.isoformat(),
+        ))
+
+    def record_outcome(self, user_id: str, category: str, accepted: bool) -> None:
+        counts = self._user(user_id).counts.setdefault(category, [0, 0])
+        counts[0 if accepted else 1] += 1
+
+    # ----- Reads -----
+
+    def find_suggestion(self, user_id: str, suggestion_id: str) -> Optional[SmartSuggestion]:
+        signals = self._users.get(user_id)
+        if signals is None:
+            return None
+        for suggestion in reversed(signals.suggestions):
+            if suggestion.id == suggestion_id:
+                return suggestion
+        return None
+
+    def user_suggestions(self, user_id: str, since: Optional[datetime] = None) -> List[SmartSuggestion]:
+        signals = self._users.get(user_id)
+        if signals is None:
+            return []
+        return [s for s in signals.suggestions if since is None or s.created_at >= since]
+
+    def user_feedback(self, user_id: str, since: Optional[datetime] = None) -> List[SuggestionFeedback]:
+        signals = self._users.get(user_id)
+        if signals is None:
+            return []
+        return [f for f in signals.feedback if since is None or f.feedback_at >= since]
+
+    def outcome_counts(self, user_id: str, category: str) -> Tuple[int, int]:
+        """(accepted, rejected) outcomes recorded for a user's category"""
+        signals = self._users.get(user_id)
+        counts = signals.counts.get(category) if signals is not None else None
+        return (counts[0], counts[1]) if counts else (0, 0)
+
+    def affinity(self, user_id: str, category: str) -> float:
+        """Confidence multiplier learned from feedback, 1.0 when neutral"""
+        accepted, rejected = self.outcome_counts(user_id, category)
+        total = accepted + rejected
+        if not total:
+            return 1.0
+        return 1.0 + self.MAX_AFFINITY_SHIFT * (accepted - rejected) / (total + self.AFFINITY_PRIOR)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "users": len(self._users),
+            "suggestions": sum(len(s.suggestions) for s in self._users.values()),
+            "feedback": sum(len(s.feedback) for s in self._users.values()),
+            "pending": len(self._pending),
+        }
+
+    # ----- Persistence -----
+
+    @property
+    def flush_due(self) -> bool:
+        return bool(self._pending) and (
+            len(self._pending) >= self.flush_batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    async def flush_if_due(self) -> int:
+        return await self.flush() if self.flush_due else 0
+
+    async def flush(self) -> int:
+        """Write queued signals to SQLite off the event loop; returns rows written."""
+        rows, self._pending = self._pending, []
+        self._last_flush = time.monotonic()
+        if not rows:
+            return 0
+        try:
+            await asyncio.to_thread(self._write, rows)
+        except Exception as e:
+            logger.error(f"Failed to persist {len(rows)} Smart Diet learning signals: {e}")
+            # Keep the newest batch for the next attempt without growing unbounded
+            self._pending = (rows + self._pending)[-self.flush_batch_size * 5:]
+            return 0
+        logger.debug(f"Persisted {len(rows)} Smart Diet learning signals")
+        return len(rows)
+
+    def _write(self, rows: List[Tuple[Any, ...]]) -> None:
+        with self.db.get_connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO smart_diet_learning_signals
+                    (user_id, signal_type, suggestion_id, category, action, confidence, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.commit()
+
+    def clear(self) -> None:
+        self._users.clear()
+        self._pending.clear()
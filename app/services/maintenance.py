@@ -0,0 +1,208 @@
+"""
+Background database maintenance.
+
+SQLite has a single writer, so a housekeeping ``DELETE`` that touches a
+large share of a table holds the write lock for as long as it runs and
+every request that writes waits behind it. ``delete_in_batches`` removes
+rows in bounded chunks, committing and pausing between them so other
+writers get the lock back. Each chunk's duration is recorded as writer
+lock time.
+
+``MaintenanceScheduler`` runs registered jobs on a fixed cadence from the
+application lifespan: garbage collection every cycle, and cheaper-to-skip
+work (WAL checkpoint, incremental vacuum, ANALYZE) every few cycles.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from app.config import config
+from app.services.performance_monitor import PerformanceMetric, performance_monitor
+
+logger = logging.getLogger(__name__)
+
+
+class MaintenanceMetrics:
+    """Rows reclaimed and writer lock time per table."""
+
+    def __init__(self, monitor: Any = performance_monitor):
+        self.monitor = monitor
+        self._tables: Dict[str, Dict[str, float]] = {}
+
+    def record_batch(self, table: str, deleted: int, lock_ms: float) -> None:
+        entry = self._tables.setdefault(table, {
+            'rows_reclaimed': 0,
+            'batches': 0,
+            'lock_ms_total': 0.0,
+            'lock_ms_max': 0.0,
+        })
+        entry['rows_reclaimed'] += deleted
+        entry['batches'] += 1
+        entry['lock_ms_total'] += lock_ms
+        entry['lock_ms_max'] = max(entry['lock_ms_max'], lock_ms)
+        if self.monitor is not None:
+            self.monitor.record_metric(PerformanceMetric(
+                timestamp=datetime.now(),
+                metric_type='maintenance',
+                operation=f"delete:{table}",
+                duration_ms=lock_ms,
+                success=True,
+                metadata={'rows': deleted},
+            ))
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {
+            table: {key: round(value, 2) if isinstance(value, float) else value for key, value in entry.items()}
+            for table, entry in self._tables.items()
+        }
+
+    def clear(self) -> None:
+        self._tables.clear()
+
+
+maintenance_metrics = MaintenanceMetrics()
+
+
+def delete_in_batches(
+    db: Any,
+    table: str,
+    where: str,
+    params: Sequence[Any] = (),
+    batch_size: int = 500,
+    pause: float = 0.0,
+    metrics: Optional[MaintenanceMetrics] = maintenance_metrics,
+) -> int:
+    """
+    Delete rows of ``table`` matching ``where`` at most ``batch_size`` at a time.
+
+    Blocking: each chunk is its own transaction and the thread sleeps
+    ``pause`` seconds between chunks, so callers on the event loop should
+    run this in a worker thread. Returns the number of rows deleted.
+    """
+    sql = f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {where} LIMIT ?)"
+    total = 0
+    while True:
+        with db.get_connection() as conn:
+            cursor = conn.cursor()
+            started = time.perf_counter()
+            cursor.execute(sql, (*params, batch_size))
+            conn.commit()
+            lock_ms = (time.perf_counter() - started) * 1000
+            deleted = cursor.rowcount
+
+        total += deleted
+        if metrics is not None:
+            metrics.record_batch(table, deleted, lock_ms)
+        if deleted < batch_size:
+            return total
+        if pause:
+            time.sleep(pause)
+
+
+def checkpoint_wal(db: Any) -> Dict[str, int]:
+    """Copy the WAL into the database file and truncate it."""
+    with db.get_connection() as conn:
+        busy, log_frames, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    return {'busy': busy, 'log_frames': log_frames, 'checkpointed': checkpointed}
+
+
+def incremental_vacuum(db: Any, pages: int = 1000) -> int:
+    """
+    Return up to ``pages`` free pages to the filesystem; returns pages freed.
+
+    Only databases created with ``auto_vacuum=INCREMENTAL`` have pages to
+    give back; for others this is a no-op.
+    """
+    with db.get_connection() as conn:
+        before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if not before:
+            return 0
+        # executescript steps the pragma to completion; execute() frees a single page
+        conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return before - after
+
+
+def analyze(db: Any, analysis_limit: int = 1000) -> None:
+    """Refresh planner statistics, sampling at most ``analysis_limit`` rows per index."""
+    with db.get_connection() as conn:
+        conn.execute(f"PRAGMA analysis_limit={int(analysis_limit)}")
+        conn.execute("ANALYZE")
+        conn.commit()
+
+
+@dataclass
+class MaintenanceJob:
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    every: int = 1  # cycles
+
+
+class MaintenanceScheduler:
+    """Run maintenance jobs every ``interval`` seconds, one at a time."""
+
+    def __init__(self, interval: float = 300.0):
+        self.interval = interval
+        self.jobs: List[MaintenanceJob] = []
+        self.cycles = 0
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._last: Dict[str, Dict[str, Any]] = {}
+
+    def add_job(self, name: str, run: Callable[[], Awaitable[Any]], every: int = 1) -> None:
+        self.jobs.append(MaintenanceJob(name, run, max(1, every)))
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Run the jobs due this cycle; a failing job is logged and skipped."""
+        self.cycles += 1
+        results: Dict[str, Any] = {}
+        for job in self.jobs:
+            if (self.cycles - 1) % job.every:
+                continue
+            started = time.perf_counter()
+            try:
+                results[job.name] = await job.run()
+                success = True
+            except Exception as e:
+                logger.error(f"Maintenance job '{job.name}' failed: {e}")
+                results[job.name] = None
+                success = False
+            self._last[job.name] = {
+                'at': datetime.utcnow().isoformat(),
+                'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+                'success': success,
+                'result': results[job.name],
+            }
+        return results
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'interval_seconds': self.interval,
+            'cycles': self.cycles,
+            'jobs': dict(self._last),
+            'tables': maintenance_metrics.snapshot(),
+        }
+
+
+maintenance_scheduler = MaintenanceScheduler(interval=config.maintenance_interval_seconds)
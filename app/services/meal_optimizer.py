@@ -0,0 +1,239 @@
+"""
+Optimisation-based product selection for meal plans.
+
+The greedy planner walks products in barcode order and stops as soon as the
+calorie window is reached, ignoring macros. This module precomputes serving
+calories and macros for every candidate product once per plan (``ServingTable``)
+and then, per meal, searches combinations of products and portion multiples
+(a small bounded knapsack) for the one that lands inside the calorie tolerance
+window while keeping protein/fat/carb shares closest to the configured targets.
+
+The search is a vectorised beam search over products in index order, so each
+combination is visited once and a 500 product catalog is solved in a few
+milliseconds.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.meal_plan import MealPlanConfig
+from app.models.product import ProductResponse
+
+logger = logging.getLogger(__name__)
+
+# Calories per gram, in MACRO_COLUMNS order
+MACRO_COLUMNS = ("protein", "fat", "carbs")
+MACRO_KCAL_PER_GRAM = np.array([4.0, 9.0, 4.0])
+
+# Objective weights: calorie deviation is relative to the meal target, macro
+# deviation is the L1 distance between calorie shares (0..2).
+MACRO_WEIGHT = 0.5
+ITEM_PENALTY = 0.01
+# Large enough that an optional product always wins over a slightly better fit
+OPTIONAL_BONUS = 1.0
+
+
+@dataclass
+class MealSelection:
+    """Product index into the serving table and the chosen serving multiple."""
+    index: int
+    portion: float
+
+
+class ServingTable:
+    """Serving calories and macros for a product list, computed once per plan."""
+
+    def __init__(self, products: Sequence[ProductResponse],
+                 serving_info: Callable[[ProductResponse], Optional[Tuple]]):
+        self.products: List[ProductResponse] = []
+        self.serving_sizes: List[str] = []
+        grams, calories, macros, extras = [], [], [], []
+
+        for product in products:
+            info = serving_info(product)
+            if not info:
+                continue
+            serving_size, serving_calories, serving_macros = info
+            if serving_calories is None or serving_calories <= 0:
+                continue
+            self.products.append(product)
+            self.serving_sizes.append(serving_size)
+            grams.append(_serving_grams(serving_size))
+            calories.append(serving_calories)
+            macros.append((serving_macros.protein_g, serving_macros.fat_g, serving_macros.carbs_g))
+            extras.append((
+                np.nan if serving_macros.sugars_g is None else serving_macros.sugars_g,
+                np.nan if serving_macros.salt_g is None else serving_macros.salt_g,
+            ))
+
+        self.grams = np.asarray(grams, dtype=np.float64)
+        self.calories = np.asarray(calories, dtype=np.float64)
+        self.macros = np.asarray(macros, dtype=np.float64).reshape(-1, 3)
+        # Sugars/salt stay NaN when unknown so MealItemMacros keeps its None
+        self.extras = np.asarray(extras, dtype=np.float64).reshape(-1, 2)
+        self._positions = {product.barcode: i for i, product in enumerate(self.products)}
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def mask_for(self, barcodes: Iterable[str]) -> np.ndarray:
+        """Boolean mask of table rows whose barcode is in ``barcodes``."""
+        mask = np.zeros(len(self.products), dtype=bool)
+        for barcode in barcodes:
+            position = self._positions.get(barcode)
+            if position is not None:
+                mask[position] = True
+        return mask
+
+
+class MealOptimizer:
+    """Pick the product/portion combination that best fits a meal target."""
+
+    def __init__(self, config: MealPlanConfig = None):
+        self.config = config or MealPlanConfig()
+        targets = self.config.macro_ratio_targets
+        shares = np.array([targets.get(name, 0.0) for name in MACRO_COLUMNS], dtype=np.float64)
+        self.macro_targets = shares / shares.sum() if shares.sum() > 0 else np.full(3, 1.0 / 3)
+        self.portions = np.asarray(sorted(set(self.config.portion_options)) or [1.0], dtype=np.float64)
+
+    def solve(self, table: ServingTable, target_calories: float, tolerance: float, max_items: int,
+              optional_mask: Optional[np.ndarray] = None,
+              candidate_mask: Optional[np.ndarray] = None) -> List[MealSelection]:
+        """
+        Solve one meal.
+
+        Args:
+            table: Precomputed serving table
+            target_calories: Calorie target for the meal
+            tolerance: Allowed relative deviation from the target
+            max_items: Maximum distinct products in the meal
+            optional_mask: Rows the user asked to prioritise
+            candidate_mask: Rows eligible for this meal (defaults to all)
+
+        Returns:
+            Selected products with serving multiples, in table order
+        """
+        if len(table) == 0 or target_calories <= 0 or max_items <= 0:
+            return []
+
+        n = len(table)
+        optional_mask = optional_mask if optional_mask is not None else np.zeros(n, dtype=bool)
+        eligible = candidate_mask.copy() if candidate_mask is not None else np.ones(n, dtype=bool)
+        upper = target_calories * (1 + tolerance)
+        lower = target_calories * (1 - tolerance)
+
+        # Variants: every (product, portion) pair that fits the meal on its own
+        variant_products = np.repeat(np.arange(n), len(self.portions))
+        variant_portions = np.tile(self.portions, n)
+        variant_calories = table.calories[variant_products] * variant_portions
+        keep = eligible[variant_products] & (variant_calories <= upper)
+        variant_products = variant_products[keep]
+        variant_portions = variant_portions[keep]
+        if variant_products.size == 0:
+            return []
+
+        pool = self._candidate_pool(table, np.unique(variant_products), target_calories, max_items, optional_mask)
+        in_pool = np.isin(variant_products, pool)
+        variant_products = variant_products[in_pool]
+        variant_portions = variant_portions[in_pool]
+        variant_calories = table.calories[variant_products] * variant_portions
+        variant_macros = table.macros[variant_products] * variant_portions[:, None]
+        variant_optional = optional_mask[variant_products].astype(np.float64)
+
+        # Beam state; the empty meal is the root
+        last = np.array([-1])
+        calories = np.zeros(1)
+        macros = np.zeros((1, 3))
+        optional_count = np.zeros(1)
+        chosen = np.empty((1, 0), dtype=np.int64)
+
+        best_cost = np.inf
+        best_in_window = False
+        best_choice: Optional[np.ndarray] = None
+
+        for depth in range(1, max_items + 1):
+            new_calories = calories[:, None] + variant_calories[None, :]
+            valid = (variant_products[None, :] > last[:, None]) & (new_calories <= upper)
+            if not valid.any():
+                break
+
+            state_idx, variant_idx = np.nonzero(valid)
+            new_calories = new_calories[state_idx, variant_idx]
+            new_macros = macros[state_idx] + variant_macros[variant_idx]
+            new_optional = optional_count[state_idx] + variant_optional[variant_idx]
+            cost = self._cost(new_calories, new_macros, new_optional, depth, target_calories)
+
+            in_window = new_calories >= lower
+            if in_window.any():
+                candidate = int(np.argmin(np.where(in_window, cost, np.inf)))
+                if not best_in_window or cost[candidate] < best_cost:
+                    best_cost, best_in_window = cost[candidate], True
+                    best_choice = np.append(chosen[state_idx[candidate]], variant_idx[candidate])
+            elif not best_in_window:
+                candidate = int(np.argmin(cost))
+                if cost[candidate] < best_cost:
+                    best_cost = cost[candidate]
+                    best_choice = np.append(chosen[state_idx[candidate]], variant_idx[candidate])
+
+            # Keep the most promising partial meals for the next step
+            width = self.config.optimizer_beam_width
+            if cost.size > width:
+                top = np.argpartition(cost, width)[:width]
+            else:
+                top = np.arange(cost.size)
+            last = variant_products[variant_idx[top]]
+            calories = new_calories[top]
+            macros = new_macros[top]
+            optional_count = new_optional[top]
+            chosen = np.column_stack([chosen[state_idx[top]], variant_idx[top]])
+
+        if best_choice is None:
+            return []
+        return [
+            MealSelection(index=int(variant_products[v]), portion=float(variant_portions[v]))
+            for v in best_choice
+        ]
+
+    def _candidate_pool(self, table: ServingTable, products: np.ndarray, target_calories: float,
+                        max_items: int, optional_mask: np.ndarray) -> np.ndarray:
+        """Shortlist products by how well a single serving fits an even share of the meal."""
+        limit = self.config.optimizer_candidate_pool
+        if products.size <= limit:
+            return products
+
+        share = target_calories / max_items
+        calorie_fit = np.abs(table.calories[products] - share) / share
+        macro_fit = self._macro_deviation(table.macros[products])
+        score = calorie_fit + MACRO_WEIGHT * macro_fit
+
+        ranked = products[np.argsort(score, kind="stable")[:limit]]
+        optional = products[optional_mask[products]]
+        return np.union1d(ranked, optional)
+
+    def _macro_deviation(self, macros: np.ndarray) -> np.ndarray:
+        macro_kcal = macros * MACRO_KCAL_PER_GRAM
+        total = macro_kcal.sum(axis=1, keepdims=True)
+        shares = np.divide(macro_kcal, total, out=np.zeros_like(macro_kcal), where=total > 0)
+        deviation = np.abs(shares - self.macro_targets).sum(axis=1)
+        # Products with no macro data cannot be judged; treat them as worst fit
+        return np.where(total[:, 0] > 0, deviation, 2.0)
+
+    def _cost(self, calories: np.ndarray, macros: np.ndarray, optional_count: np.ndarray,
+              items: int, target_calories: float) -> np.ndarray:
+        calorie_deviation = np.abs(calories - target_calories) / target_calories
+        return (
+            calorie_deviation
+            + MACRO_WEIGHT * self._macro_deviation(macros)
+            + ITEM_PENALTY * items
+            - OPTIONAL_BONUS * optional_count
+        )
+
+
+def _serving_grams(serving_size: str) -> float:
+    try:
+        return float(serving_size.replace('g', '').strip())
+    except (ValueError, AttributeError):
+        return 100.0
@@ -1,4 +1,5 @@
 import logging
+import math
 import random
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
@@ -13,8 +14,10 @@ from app.models.meal_plan import (
 )
 from app.models.product import ProductResponse, Nutriments
 from app.services.nutrition_calculator import nutrition_calculator
+from app.services.meal_optimizer import MealOptimizer, ServingTable
 from app.services.cache import cache_service
 from app.services.product_discovery import product_discovery_service
+from app.config import config as app_config
 
 logger = logging.getLogger(__name__)
 cached_products: List[ProductResponse] = []
@@ -32,6 +35,9 @@ class MealPlannerService:
        - Fill remaining calories from cached product database  
        - Max 3 items per meal (5 with flexibility)
        - Stay within calorie tolerance (±5% strict, ±15% flexible)
+       With planner_mode="optimized" the meal is instead solved as a small
+       bounded knapsack over precomputed serving arrays (see MealOptimizer),
+       targeting calories plus protein/fat/carb ratios.
     4. Calculate final macros and metrics
     
     Assumptions:
@@ -43,6 +49,11 @@ class MealPlannerService:
     
     def __init__(self, config: MealPlanConfig = None):
         self.config = config or MealPlanConfig()
+        self.optimizer = MealOptimizer(self.config)
+
+    @property
+    def uses_optimizer(self) -> bool:
+        return self.config.planner_mode == "optimized"
     
     async def generate_plan(self, request: MealPlanRequest) -> MealPlanResponse:
         """
@@ -72,20 +83,29 @@ class MealPlannerService:
             # Return empty plan rather than failing
             return self._create_empty_plan(bmr, tdee, daily_target, request.flexibility or False)
         
+        # Serving calories/macros are computed once and shared by all meals
+        serving_table = None
+        if self.uses_optimizer:
+            filtered_products = self._filter_products_by_preferences(available_products, request.preferences)
+            serving_table = ServingTable(filtered_products, self._calculate_serving_info)
+
         # Step 4: Build each meal
         breakfast = await self._build_meal(
             "Breakfast", breakfast_target, available_products, 
-            request.optional_products or [], request.flexibility or False, request.preferences
+            request.optional_products or [], request.flexibility or False, request.preferences,
+            serving_table=serving_table
         )
         
         lunch = await self._build_meal(
             "Lunch", lunch_target, available_products,
-            request.optional_products or [], request.flexibility or False, request.preferences
+            request.optional_products or [], request.flexibility or False, request.preferences,
+            serving_table=serving_table
         )
         
         dinner = await self._build_meal(
             "Dinner", dinner_target, available_products,
-            request.optional_products or [], request.flexibility or False, request.preferences
+            request.optional_products or [], request.flexibility or False, request.preferences,
+            serving_table=serving_table
         )
         
         # Step 5: Calculate final metrics
@@ -308,7 +328,7 @@ class MealPlannerService:
     async def _build_meal(self, meal_name: str, target_calories: float, 
                          available_products: List[ProductResponse],
                          optional_products: List[str], flexibility: bool,
-                         preferences) -> Meal:
+                         preferences, serving_table: Optional[ServingTable] = None) -> Meal:
         """
         Build a single meal using refactored pipeline.
         """
@@ -316,6 +336,23 @@ class MealPlannerService:
         tolerance = self.config.calorie_tolerance_flexible if flexibility else self.config.calorie_tolerance_strict
         optional_set = set(optional_products or [])
 
+        if self.uses_optimizer:
+            if serving_table is None:
+                filtered = self._filter_products_by_preferences(available_products, preferences)
+                serving_table = ServingTable(filtered, self._calculate_serving_info)
+            selected_items = self._optimize_meal_items(
+                serving_table, target_calories, tolerance, max_items, optional_set
+            )
+            current_calories = sum(item.calories for item in selected_items)
+            logger.info(f"Built {meal_name} (optimized): {len(selected_items)} items, "
+                       f"{current_calories:.1f}/{target_calories:.1f} kcal")
+            return Meal(
+                name=meal_name,
+                target_calories=target_calories,
+                actual_calories=current_calories,
+                items=selected_items
+            )
+
         filtered_products = self._filter_products_by_preferences(available_products, preferences)
         filtered_products.sort(key=lambda p: (0 if p.barcode in optional_set else 1, p.barcode, p.name or ""))
 
@@ -410,6 +447,13 @@ class MealPlannerService:
             actual_tolerance = tolerance
         else:
             actual_tolerance = self.config.calorie_tolerance_flexible if flexibility else self.config.calorie_tolerance_strict
+
+        if self.uses_optimizer:
+            filtered = self._filter_products_by_preferences(available_products, preferences)
+            table = ServingTable(filtered, self._calculate_serving_info)
+            return self._optimize_meal_items(
+                table, target_calories, actual_tolerance, max_items, set(optional_products or [])
+            )
         
         # Separate optional and regular products
         optional_prods = [p for p in available_products if p.barcode in optional_products]
@@ -477,6 +521,51 @@ class MealPlannerService:
         
         return selected_items
     
+    def _optimize_meal_items(self, table: ServingTable, target_calories: float, tolerance: float,
+                             max_items: int, optional_set) -> List[MealItem]:
+        """
+        Select meal items with the optimisation-based planner.
+
+        Args:
+            table: Precomputed serving table for the candidate products
+            target_calories: Target calories for the meal
+            tolerance: Allowed relative calorie deviation
+            max_items: Maximum items in the meal
+            optional_set: Barcodes to prioritize
+
+        Returns:
+            List of MealItem objects selected for the meal
+        """
+        selections = self.optimizer.solve(
+            table, target_calories, tolerance, max_items,
+            optional_mask=table.mask_for(optional_set)
+        )
+
+        items = []
+        for selection in selections:
+            index, portion = selection.index, selection.portion
+            product = table.products[index]
+            protein, fat, carbs = table.macros[index] * portion
+            sugars, salt = table.extras[index] * portion
+            if portion == 1.0:
+                serving = table.serving_sizes[index]
+            else:
+                serving = f"{table.grams[index] * portion:.0f}g"
+            items.append(MealItem(
+                barcode=product.barcode,
+                name=product.name or "Unknown",
+                serving=serving,
+                calories=float(table.calories[index] * portion),
+                macros=MealItemMacros(
+                    protein_g=float(protein),
+                    fat_g=float(fat),
+                    carbs_g=float(carbs),
+                    sugars_g=None if math.isnan(sugars) else float(sugars),
+                    salt_g=None if math.isnan(salt) else float(salt)
+                )
+            ))
+        return items
+
     def _calculate_serving_info(self, product: ProductResponse) -> Optional[Tuple[str, float, MealItemMacros]]:
         """
         Calculate serving size, calories, and macros for a product.
@@ -811,4 +900,4 @@ class MealPlannerService:
 
         return selected_products
 
-meal_planner = MealPlannerService()
+meal_planner = MealPlannerService(MealPlanConfig(planner_mode=app_config.meal_planner_mode))
@@ -0,0 +1,162 @@
+"""
+In-process memory cache.
+
+``MemoryCache`` is the bounded LRU used wherever a service keeps hot data in
+the worker's own memory (Smart Diet L1, discover feed, the Redis layer's L1
+tier). Every operation is O(1): entries live in an ``OrderedDict`` kept in
+recency order, so eviction pops from the front instead of scanning for the
+oldest timestamp. Capacity can be bounded by entry count, by approximate
+size in bytes, or both, and every entry carries its own TTL.
+
+Each cache registers with the shared ``PerformanceMonitor`` so its hit,
+miss and eviction counters show up next to the request metrics.
+"""
+
+import fnmatch
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.services.performance_monitor import performance_monitor
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """Cheap size estimate in bytes: exact for bytes/str, shallow otherwise."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8", errors="ignore"))
+    return sys.getsizeof(value)
+
+
+class MemoryCache:
+    """Thread-safe LRU cache with per-entry TTL and optional byte budget."""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        default_ttl: Optional[float] = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+        monitor: Any = performance_monitor,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.metrics = {
+            'hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'rejected': 0,
+        }
+        if monitor is not None:
+            monitor.register_memory_cache(self)
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.metrics['misses'] += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.metrics['expirations'] += 1
+                self.metrics['misses'] += 1
+                return default
+            self._entries.move_to_end(key)
+            self.metrics['hits'] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        Store ``value`` for ``ttl`` seconds (``default_ttl`` when omitted).
+
+        Returns False when the value is not cached: a non-positive TTL, or a
+        value that alone exceeds ``max_bytes``.
+        """
+        lifetime = ttl if ttl is not None else self.default_ttl
+        if lifetime is not None and lifetime <= 0:
+            return False
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            self.metrics['rejected'] += 1
+            logger.debug(f"Memory cache {self.name}: {size} byte entry exceeds budget, not cached")
+            return False
+
+        expires_at = time.monotonic() + lifetime if lifetime is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self.bytes += size
+            self.metrics['sets'] += 1
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.metrics['evictions'] += 1
+        return True
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def delete_matching(self, pattern: str) -> int:
+        """Drop string keys matching a glob ``pattern`` (O(n), for invalidation)."""
+        with self._lock:
+            matches = [
+                key for key in self._entries
+                if isinstance(key, str) and fnmatch.fnmatchcase(key, pattern)
+            ]
+            for key in matches:
+                self._remove(key)
+            return len(matches)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.metrics['hits'] + self.metrics['misses']
+        return {
+            'name': self.name,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            **self.metrics,
+            'hit_rate_percent': round(self.metrics['hits'] / lookups * 100, 2) if lookups else 0.0,
+            'utilization_percent': round(len(self._entries) / self.max_entries * 100, 2) if self.max_entries else 0.0,
+        }
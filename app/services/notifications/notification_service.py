@@ -2,6 +2,7 @@
 
 from typing import Dict, List, Optional
 from app.services.database import db_service
+from app.services.maintenance import delete_in_batches
 import uuid
 from datetime import datetime, timedelta
 import json
@@ -204,9 +205,12 @@ class NotificationService:
             return 0
 
     @staticmethod
-    def cleanup_old_notifications(days_old: int = 30) -> int:
+    def cleanup_old_notifications(days_old: int = 30, batch_size: int = 500, pause: float = 0.0) -> int:
         """
-        Delete notifications older than specified days.
+        Delete read notifications older than specified days.
+
+        Deletes ``batch_size`` rows per transaction, sleeping ``pause``
+        seconds between chunks; blocking, so async callers use a worker thread.
 
         Returns:
             Number of notifications deleted
@@ -214,17 +218,17 @@ class NotificationService:
         try:
             cutoff_date = datetime.utcnow() - timedelta(days=days_old)
 
-            with db_service.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "DELETE FROM notifications WHERE created_at < ? AND read_at IS NOT NULL",
-                    (cutoff_date.isoformat(),)
-                )
-                deleted_count = cursor.rowcount
-                conn.commit()
-
-                logger.info(f"Cleaned up {deleted_count} old notifications")
-                return deleted_count
+            deleted_count = delete_in_batches(
+                db_service,
+                "notifications",
+                "created_at < ? AND read_at IS NOT NULL",
+                (cutoff_date.isoformat(),),
+                batch_size=batch_size,
+                pause=pause,
+            )
+
+            logger.info(f"Cleaned up {deleted_count} old notifications")
+            return deleted_count
 
         except Exception as e:
             logger.error(f"Failed to cleanup old notifications: {e}")
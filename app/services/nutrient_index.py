@@ -0,0 +1,462 @@
+"""
+In-memory nutrient-space index over the product catalog.
+
+Each product is stored once as a per-100g vector (kcal, protein, fat, carbs,
+sugars, salt, fiber) in a NumPy matrix, and assigned to keyword partitions
+such as "grain_products" or "dairy_products". "Healthier alternative" queries
+then become vectorised masks over a single partition instead of ``LIKE``
+scans followed by per-row scoring in Python, and nearest-neighbour lookups
+are a single distance computation over the partition.
+
+The index loads lazily from the products table, accepts incremental upserts
+from writers in this process and rebuilds itself periodically to pick up rows
+written by other processes (e.g. the OpenFoodFacts sync script). Rebuilds run
+in a worker thread and swap the new arrays in at once, so queries keep being
+answered from the previous contents meanwhile.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from app.services.database import db_service
+from app.services.product_search import fold_text
+
+logger = logging.getLogger(__name__)
+
+# Column order of the nutrient matrix and the nutriments JSON key for each.
+NUTRIENT_FIELDS = ("kcal", "protein", "fat", "carbs", "sugars", "salt", "fiber")
+NUTRIMENT_KEYS = {
+    "kcal": "energy_kcal_per_100g",
+    "protein": "protein_g_per_100g",
+    "fat": "fat_g_per_100g",
+    "carbs": "carbs_g_per_100g",
+    "sugars": "sugars_g_per_100g",
+    "salt": "salt_g_per_100g",
+    "fiber": "fiber_g_per_100g",
+}
+# Aliases accepted in "current nutrition" dicts used across Smart Diet.
+FIELD_ALIASES = {
+    "calories": "kcal",
+    "energy_kcal": "kcal",
+    "protein_g": "protein",
+    "fat_g": "fat",
+    "carbs_g": "carbs",
+    "sugars_g": "sugars",
+    "salt_g": "salt",
+    "fiber_g": "fiber",
+}
+CORE_FIELDS = ("kcal", "protein", "fat", "carbs")
+
+_COLUMN = {name: index for index, name in enumerate(NUTRIENT_FIELDS)}
+
+
+@dataclass(frozen=True)
+class NutrientRule:
+    """
+    A relative improvement criterion against the current item.
+
+    ``ratio`` above 1 means "at least ratio × current" (e.g. 1.15 for ≥15 %
+    more protein); below 1 means "at most ratio × current" (e.g. 0.8 for
+    ≤80 % kcal). Either way the candidate must actually differ from the
+    current value in the improving direction.
+    """
+
+    field: str
+    ratio: float
+    weight: float = 1.0
+
+
+@dataclass
+class NutrientMatch:
+    """A product returned by an index query."""
+
+    barcode: str
+    name: str
+    nutrients: Dict[str, Optional[float]]
+    score: float = 0.0
+    matched: List[str] = field(default_factory=list)
+
+
+def nutrient_vector(values: Mapping[str, Any]) -> np.ndarray:
+    """Build a nutrient vector from a dict keyed by field, alias or nutriments key."""
+    vector = np.full(len(NUTRIENT_FIELDS), np.nan)
+    reverse_keys = {key: name for name, key in NUTRIMENT_KEYS.items()}
+    for key, value in (values or {}).items():
+        name = FIELD_ALIASES.get(key) or reverse_keys.get(key) or key
+        if name in _COLUMN and value is not None:
+            try:
+                vector[_COLUMN[name]] = float(value)
+            except (TypeError, ValueError):
+                continue
+    return vector
+
+
+class NutrientIndex:
+    """NumPy-backed nutrient vectors partitioned by food category keywords."""
+
+    # Seconds before a failed rebuild is attempted again
+    RETRY_SECONDS = 30.0
+
+    def __init__(self, max_age_seconds: float = 600.0, initial_capacity: int = 1024):
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.RLock()
+        self._keywords: Dict[str, List[str]] = {}
+        # Writes made while a rebuild reads the table, replayed onto its result
+        self._writes_during_rebuild: Optional[List[tuple]] = None
+        self._rebuild_task: Optional["asyncio.Task[None]"] = None
+        self._rebuild_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._retry_at = 0.0
+        self._reset(initial_capacity)
+
+    def _reset(self, capacity: int) -> None:
+        self._vectors = np.full((capacity, len(NUTRIENT_FIELDS)), np.nan)
+        self._popularity = np.zeros(capacity)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._barcodes: List[str] = []
+        self._names: List[str] = []
+        self._row_by_barcode: Dict[str, int] = {}
+        self._categories_text: Dict[str, Optional[str]] = {}
+        self._partition_rows: Dict[str, set] = {name: set() for name in self._keywords}
+        self._partition_cache: Dict[str, np.ndarray] = {}
+        self._loaded_at: Optional[float] = None
+
+    # ----- configuration -------------------------------------------------
+
+    def register_partitions(self, keywords: Mapping[str, Sequence[str]]) -> None:
+        """Register category → keyword lists. Existing rows are re-partitioned."""
+        with self._lock:
+            changed = False
+            for category, words in keywords.items():
+                folded = [fold_text(word) for word in words]
+                if self._keywords.get(category) != folded:
+                    self._keywords[category] = folded
+                    changed = True
+            if changed and self._barcodes:
+                self._repartition()
+
+    def _repartition(self) -> None:
+        self._partition_rows = {name: set() for name in self._keywords}
+        for row, barcode in enumerate(self._barcodes):
+            if self._alive[row]:
+                self._assign_partitions(row, self._names[row], self._categories_text.get(barcode))
+        self._partition_cache.clear()
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self._keywords)
+
+    def partition_for_term(self, term: str) -> Optional[str]:
+        """Return the partition whose keywords include ``term`` (or appear in it)."""
+        folded = fold_text(term).strip()
+        if not folded:
+            return None
+        for category, words in self._keywords.items():
+            if any(word == folded or word in folded for word in words):
+                return category
+        return None
+
+    # ----- loading and incremental updates --------------------------------
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or (time.monotonic() - self._loaded_at) > self.max_age_seconds
+
+    def load_rows(self, rows: Iterable[Mapping[str, Any]]) -> int:
+        """
+        Replace the index contents with ``rows`` (products table rows).
+
+        The new arrays are built without holding the lock and swapped in at
+        once; queries meanwhile see the previous contents.
+        """
+        rows = list(rows)
+        fresh = NutrientIndex(self.max_age_seconds, initial_capacity=1)
+        fresh._keywords = dict(self._keywords)
+        fresh._reset(max(len(rows), 16))
+        for row in rows:
+            fresh._upsert_row(row)
+
+        with self._lock:
+            for name in ("_vectors", "_popularity", "_alive", "_barcodes", "_names",
+                         "_row_by_barcode", "_categories_text", "_partition_rows", "_partition_cache"):
+                setattr(self, name, getattr(fresh, name))
+            if fresh._keywords != self._keywords:
+                # Partitions were registered while the rows were being indexed
+                self._repartition()
+            for operation, argument in self._writes_during_rebuild or ():
+                operation(argument)
+            self._loaded_at = time.monotonic()
+            count = len(self._row_by_barcode)
+        logger.info(f"Nutrient index loaded with {count} products")
+        return count
+
+    def load_from_db(self, conn: Any) -> int:
+        cursor = conn.cursor()
+        cursor.execute("SELECT barcode, name, categories, nutriments, access_count FROM products")
+        return self.load_rows(cursor.fetchall())
+
+    def rebuild(self) -> int:
+        """Reload from the products table (blocking; async callers use ``ensure_fresh``)."""
+        with self._lock:
+            self._writes_during_rebuild = []
+        try:
+            with db_service.get_connection() as conn:
+                return self.load_from_db(conn)
+        finally:
+            with self._lock:
+                self._writes_during_rebuild = None
+
+    def ensure_fresh(self) -> bool:
+        """
+        Non-blocking readiness check for request handlers.
+
+        Schedules a background rebuild when the index is missing or stale and
+        returns whether it can answer queries now (from the previous contents
+        while a rebuild runs). Callers fall back to the database when False.
+        """
+        if self.is_stale() and time.monotonic() >= self._retry_at:
+            try:
+                self.schedule_rebuild()
+            except RuntimeError:
+                # No event loop (scripts): nothing to block, rebuild inline
+                try:
+                    self.rebuild()
+                except Exception as exc:
+                    self._retry_at = time.monotonic() + self.RETRY_SECONDS
+                    logger.warning(f"Nutrient index unavailable: {exc}")
+        return self.is_loaded
+
+    def schedule_rebuild(self) -> None:
+        """Start a rebuild in a worker thread unless one is already running."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._rebuild_loop:
+            # A task of a previous event loop (tests, worker restart) never completes here
+            self._rebuild_loop, self._rebuild_task = loop, None
+        if self._rebuild_task is None or self._rebuild_task.done():
+            self._rebuild_task = loop.create_task(self._rebuild_in_thread())
+
+    async def _rebuild_in_thread(self) -> None:
+        try:
+            await asyncio.to_thread(self.rebuild)
+        except Exception as exc:
+            self._retry_at = time.monotonic() + self.RETRY_SECONDS
+            logger.warning(f"Nutrient index rebuild failed: {exc}")
+
+    def upsert(self, row: Mapping[str, Any]) -> None:
+        """Insert or update one product (a products row or equivalent mapping)."""
+        with self._lock:
+            self._upsert_row(row)
+            if self._writes_during_rebuild is not None:
+                self._writes_during_rebuild.append((self._upsert_row, row))
+
+    def remove(self, barcode: str) -> None:
+        with self._lock:
+            if self._writes_during_rebuild is not None:
+                self._writes_during_rebuild.append((self._remove_row, barcode))
+            self._remove_row(barcode)
+
+    def _remove_row(self, barcode: str) -> None:
+        with self._lock:
+            row = self._row_by_barcode.pop(str(barcode), None)
+            if row is None:
+                return
+            self._alive[row] = False
+            for category, members in self._partition_rows.items():
+                if row in members:
+                    members.discard(row)
+                    self._partition_cache.pop(category, None)
+
+    def _upsert_row(self, row: Mapping[str, Any]) -> None:
+        barcode = str(_get(row, "barcode") or "").strip()
+        if not barcode:
+            return
+        nutriments = _get(row, "nutriments") or {}
+        if isinstance(nutriments, str):
+            try:
+                nutriments = json.loads(nutriments)
+            except (TypeError, ValueError):
+                nutriments = {}
+        name = _get(row, "name") or ""
+        categories = _get(row, "categories")
+
+        index = self._row_by_barcode.get(barcode)
+        if index is None:
+            index = len(self._barcodes)
+            self._grow(index + 1)
+            self._barcodes.append(barcode)
+            self._names.append(name)
+            self._row_by_barcode[barcode] = index
+        else:
+            self._names[index] = name
+            for category, members in self._partition_rows.items():
+                if index in members:
+                    members.discard(index)
+                    self._partition_cache.pop(category, None)
+
+        self._vectors[index] = nutrient_vector(nutriments)
+        self._popularity[index] = float(_get(row, "access_count") or 0)
+        self._alive[index] = True
+        self._categories_text[barcode] = categories
+        self._assign_partitions(index, name, categories)
+
+    def _grow(self, size: int) -> None:
+        capacity = self._vectors.shape[0]
+        if size <= capacity:
+            return
+        new_capacity = max(size, capacity * 2)
+        vectors = np.full((new_capacity, len(NUTRIENT_FIELDS)), np.nan)
+        vectors[:capacity] = self._vectors
+        popularity = np.zeros(new_capacity)
+        popularity[:capacity] = self._popularity
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[:capacity] = self._alive
+        self._vectors, self._popularity, self._alive = vectors, popularity, alive
+
+    def _assign_partitions(self, index: int, name: str, categories: Optional[str]) -> None:
+        text = fold_text(f"{name} {categories or ''}")
+        for category, words in self._keywords.items():
+            if any(word in text for word in words):
+                self._partition_rows.setdefault(category, set()).add(index)
+                self._partition_cache.pop(category, None)
+
+    def _partition(self, category: str) -> np.ndarray:
+        cached = self._partition_cache.get(category)
+        if cached is None:
+            cached = np.fromiter(sorted(self._partition_rows.get(category, ())), dtype=np.int64)
+            self._partition_cache[category] = cached
+        return cached
+
+    def partition_size(self, category: str) -> int:
+        with self._lock:
+            return int(self._partition(category).size)
+
+    # ----- queries --------------------------------------------------------
+
+    def rank_alternatives(
+        self,
+        category: str,
+        current: Mapping[str, Any],
+        rules: Sequence[NutrientRule],
+        limit: int = 10,
+        require_all: bool = False,
+        min_score: float = 0.0,
+        exclude: Iterable[str] = (),
+    ) -> List[NutrientMatch]:
+        """
+        Rank products of ``category`` that improve on ``current``.
+
+        Each rule is evaluated as a vectorised mask over the partition; a
+        candidate's score is the sum of the weights of rules it satisfies.
+        Candidates with incomplete core macros are skipped. Ties are broken
+        by popularity (access count).
+        """
+        with self._lock:
+            rows = self._partition(category)
+            if rows.size == 0 or not rules:
+                return []
+            vectors = self._vectors[rows]
+            current_vector = nutrient_vector(current)
+
+            valid = self._alive[rows] & ~np.isnan(vectors[:, [_COLUMN[f] for f in CORE_FIELDS]]).any(axis=1)
+            masks = []
+            scores = np.zeros(rows.size)
+            for rule in rules:
+                column = _COLUMN[FIELD_ALIASES.get(rule.field, rule.field)]
+                reference = current_vector[column]
+                if np.isnan(reference):
+                    reference = 0.0
+                values = vectors[:, column]
+                with np.errstate(invalid="ignore"):
+                    if rule.ratio >= 1:
+                        mask = (values >= reference * rule.ratio) & (values > reference)
+                    else:
+                        mask = (values <= reference * rule.ratio) & (values < reference)
+                mask &= ~np.isnan(values)
+                masks.append(mask)
+                scores += mask * rule.weight
+
+            combined = np.logical_and.reduce(masks) if require_all else np.logical_or.reduce(masks)
+            combined &= valid & (scores > min_score)
+            for barcode in exclude:
+                row = self._row_by_barcode.get(str(barcode))
+                if row is not None:
+                    combined &= rows != row
+
+            candidates = np.flatnonzero(combined)
+            if candidates.size == 0:
+                return []
+            order = np.lexsort((-self._popularity[rows[candidates]], -scores[candidates]))[:limit]
+
+            results = []
+            rule_masks = np.array(masks)
+            for position in candidates[order]:
+                row = int(rows[position])
+                matched = [rule.field for rule, hit in zip(rules, rule_masks[:, position]) if hit]
+                results.append(self._match(row, float(scores[position]), matched))
+            return results
+
+    def nearest(
+        self,
+        category: str,
+        target: Mapping[str, Any],
+        k: int = 5,
+        weights: Optional[Mapping[str, float]] = None,
+    ) -> List[NutrientMatch]:
+        """k nearest products of ``category`` to ``target`` (weighted L2 over the given fields)."""
+        with self._lock:
+            rows = self._partition(category)
+            if rows.size == 0:
+                return []
+            target_vector = nutrient_vector(target)
+            columns = np.flatnonzero(~np.isnan(target_vector))
+            if columns.size == 0:
+                return []
+            weight_vector = np.ones(len(NUTRIENT_FIELDS))
+            for key, value in (weights or {}).items():
+                weight_vector[_COLUMN[FIELD_ALIASES.get(key, key)]] = float(value)
+
+            vectors = self._vectors[rows][:, columns]
+            usable = self._alive[rows] & ~np.isnan(vectors).any(axis=1)
+            if not usable.any():
+                return []
+            diffs = (vectors[usable] - target_vector[columns]) * weight_vector[columns]
+            distances = np.sqrt((diffs ** 2).sum(axis=1))
+            k = min(k, distances.size)
+            nearest = np.argpartition(distances, k - 1)[:k]
+            nearest = nearest[np.argsort(distances[nearest])]
+            usable_rows = rows[usable]
+            return [self._match(int(usable_rows[i]), -float(distances[i]), []) for i in nearest]
+
+    def _match(self, row: int, score: float, matched: List[str]) -> NutrientMatch:
+        vector = self._vectors[row]
+        nutrients = {
+            name: (None if np.isnan(vector[column]) else float(vector[column]))
+            for name, column in _COLUMN.items()
+        }
+        return NutrientMatch(
+            barcode=self._barcodes[row],
+            name=self._names[row],
+            nutrients=nutrients,
+            score=score,
+            matched=matched,
+        )
+
+
+def _get(row: Mapping[str, Any], key: str) -> Any:
+    try:
+        return row[key]
+    except (KeyError, IndexError):
+        return None
+
+
+# Global nutrient index instance (partitions are registered by its users)
+nutrient_index = NutrientIndex()
@@ -0,0 +1,189 @@
+"""
+Password hashing off the event loop.
+
+bcrypt is deliberately slow (hundreds of milliseconds at the default cost),
+so running it inline in an async handler stalls every other request on the
+worker. ``PasswordHasher`` runs hashing and verification on a small
+dedicated thread pool. The number of operations queued or running is
+capped: once the cap is reached new work is rejected with
+``PasswordHasherBusy`` instead of queueing without bound, so a burst of
+logins degrades into fast 503s rather than multi-second waits.
+
+Every operation's run time and queue wait are recorded with the shared
+``PerformanceMonitor``; ``stats()`` reports queue depth and latency.
+"""
+
+import asyncio
+import logging
+import re
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional
+
+import bcrypt
+
+from app.config import config
+from app.services.performance_monitor import PerformanceMetric, performance_monitor
+
+logger = logging.getLogger(__name__)
+
+_BCRYPT_COST_RE = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full."""
+
+
+class PasswordHasher:
+    """Bounded thread pool for bcrypt hashing and verification."""
+
+    def __init__(
+        self,
+        rounds: int = 12,
+        max_workers: int = 2,
+        max_pending: int = 32,
+        monitor: Any = performance_monitor,
+    ):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.monitor = monitor
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Released by the worker thread when the bcrypt call finishes, so a
+        # cancelled caller does not free a slot its work is still using
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._run_ms: Deque[float] = deque(maxlen=512)
+        self._wait_ms: Deque[float] = deque(maxlen=512)
+        self.metrics = {
+            'hashes': 0,
+            'verifies': 0,
+            'rejected': 0,
+        }
+
+    # ----- bcrypt primitives (blocking) -----
+
+    def hash_sync(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+    @staticmethod
+    def verify_sync(plain_password: str, hashed_password: str) -> bool:
+        try:
+            return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+        except (ValueError, TypeError):
+            return False
+
+    def needs_rehash(self, hashed_password: Optional[str]) -> bool:
+        """True for a bcrypt hash made with a different cost than ``rounds``."""
+        match = _BCRYPT_COST_RE.match(hashed_password or "")
+        return bool(match) and int(match.group(1)) != self.rounds
+
+    # ----- Pool -----
+
+    @property
+    def pending(self) -> int:
+        """Operations queued or running."""
+        return self._pending
+
+    @property
+    def saturated(self) -> bool:
+        return self._pending >= self.max_pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def run(self, operation: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking password operation on the pool.
+
+        Raises:
+            PasswordHasherBusy: when ``max_pending`` operations are already in flight
+        """
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                self.metrics['rejected'] += 1
+                raise PasswordHasherBusy(f"{self._pending} password operations in flight")
+            self._pending += 1
+        submitted = time.perf_counter()
+        started: Optional[float] = None
+
+        def timed():
+            nonlocal started
+            started = time.perf_counter()
+            return fn(*args)
+
+        try:
+            future = self._get_executor().submit(timed)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        try:
+            result = await asyncio.wrap_future(future)
+        except Exception:
+            self._record(operation, submitted, started, success=False)
+            raise
+        self._record(operation, submitted, started, success=True)
+        return result
+
+    def _release(self, _future: Any = None) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self.run("hash", self.hash_sync, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run("verify", self.verify_sync, plain_password, hashed_password)
+
+    def _record(self, operation: str, submitted: float, started: Optional[float], success: bool) -> None:
+        finished = time.perf_counter()
+        if started is None:
+            started = finished
+        run_ms = (finished - started) * 1000
+        wait_ms = (started - submitted) * 1000
+        self._run_ms.append(run_ms)
+        self._wait_ms.append(wait_ms)
+        self.metrics['hashes' if operation == "hash" else 'verifies'] += 1
+        if self.monitor is not None:
+            self.monitor.record_metric(PerformanceMetric(
+                timestamp=datetime.now(),
+                metric_type='password_hash',
+                operation=operation,
+                duration_ms=run_ms,
+                success=success,
+                metadata={'queue_wait_ms': round(wait_ms, 2), 'pending': self._pending},
+            ))
+
+    def stats(self) -> Dict[str, Any]:
+        run_ms = sorted(self._run_ms)
+        return {
+            'rounds': self.rounds,
+            'workers': self.max_workers,
+            'pending': self._pending,
+            'max_pending': self.max_pending,
+            **self.metrics,
+            'avg_hash_ms': round(statistics.fmean(run_ms), 2) if run_ms else 0.0,
+            'p95_hash_ms': round(run_ms[min(len(run_ms) - 1, int(len(run_ms) * 0.95))], 2) if run_ms else 0.0,
+            'avg_queue_wait_ms': round(statistics.fmean(self._wait_ms), 2) if self._wait_ms else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads; the pool is recreated on next use."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher(
+    rounds=config.bcrypt_rounds,
+    max_workers=config.password_hash_workers,
+    max_pending=config.password_hash_max_pending,
+)
@@ -14,6 +14,7 @@ from collections import defaultdict, deque
 from dataclasses import dataclass, asdict
 from contextlib import asynccontextmanager
 import statistics
+import weakref
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +71,9 @@ class PerformanceMonitor:
         self.current_metrics = defaultdict(list)
         self.alerts = []
         
+        # In-process caches reporting their own counters (see app.services.memory_cache)
+        self.memory_caches = weakref.WeakValueDictionary()
+        
         # Performance thresholds
         self.error_threshold = 0.05  # 5% error rate
         self.slow_threshold_multiplier = 2.0  # 2x target time
@@ -330,6 +334,14 @@ class PerformanceMonitor:
         
         return hit_rates
     
+    def register_memory_cache(self, cache: Any):
+        """Track an in-process cache so its counters are exported with the metrics"""
+        self.memory_caches[cache.name] = cache
+    
+    def get_memory_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit/miss/eviction counters and size of every registered memory cache"""
+        return {name: cache.stats() for name, cache in list(self.memory_caches.items())}
+    
     def get_recent_alerts(self, hours: int = 1) -> List[Dict[str, Any]]:
         """Get recent performance alerts"""
         cutoff_time = datetime.now() - timedelta(hours=hours)
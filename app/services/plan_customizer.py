@@ -12,6 +12,7 @@ from app.models.meal_plan import (
 from app.models.product import ProductResponse, Nutriments
 from app.services.cache import cache_service
 from app.services.database import db_service
+from app.services.product_search import product_search_service
 from app.services.openfoodfacts import openfoodfacts_service
 from app.services.nutrition_calculator import nutrition_calculator
 
@@ -404,19 +405,10 @@ class PlanCustomizerService:
 
         try:
             with db_service.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    SELECT * FROM products
-                    WHERE lower(name) LIKE ?
-                    ORDER BY access_count DESC, last_updated DESC
-                    LIMIT 1
-                    """,
-                    (f"%{cleaned}%",)
-                )
-                row = cursor.fetchone()
-                if not row:
+                rows = product_search_service.search(conn, [cleaned], columns=("name",), limit=1)
+                if not rows:
                     return None
+                row = rows[0]
 
                 nutriments_data = json.loads(row["nutriments"])
                 nutriments = Nutriments(
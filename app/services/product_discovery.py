@@ -12,6 +12,8 @@ from collections import defaultdict
 
 from app.models.product import ProductResponse, Nutriments
 from app.services.database import db_service
+from app.services.catalog_snapshot import get_catalog_snapshot
+from app.services.product_search import product_search_service
 from app.services.openfoodfacts import openfoodfacts_service
 from app.services.cache import cache_service
 
@@ -228,6 +230,17 @@ class ProductDiscoveryService:
     ) -> List[ProductResponse]:
         """Load most accessed products from database cache."""
         try:
+            snapshot = get_catalog_snapshot()
+            if snapshot is not None:
+                products = []
+                for row in snapshot.iter_popular():
+                    product = snapshot.to_product(row)
+                    if self._meets_dietary_restrictions(product, dietary_restrictions):
+                        products.append(product)
+                        if len(products) >= limit:
+                            break
+                return products
+            
             # Query database for most popular products
             with db_service.get_connection() as conn:
                 cursor = conn.cursor()
@@ -315,29 +328,22 @@ class ProductDiscoveryService:
                 
                 for category, criteria in self.nutritional_categories.items():
                     try:
-                        # Build query based on category criteria
-                        conditions = []
-                        params = []
-                        
-                        # Add keyword-based filtering
+                        # Keyword categories go through the indexed product search
                         if 'keywords' in criteria:
-                            keyword_conditions = []
-                            for keyword in criteria['keywords']:
-                                keyword_conditions.append("(LOWER(p.name) LIKE ? OR LOWER(p.categories) LIKE ?)")
-                                params.extend([f"%{keyword.lower()}%", f"%{keyword.lower()}%"])
-                            conditions.append(f"({' OR '.join(keyword_conditions)})")
-                        
-                        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
-                        params.append(products_per_category * 2)  # Get extra for filtering
-                        
-                        cursor.execute(f"""
-                            SELECT * FROM products p
-                            {where_clause}
-                            ORDER BY p.access_count DESC, RANDOM()
-                            LIMIT ?
-                        """, params)
-                        
-                        rows = cursor.fetchall()
+                            rows = product_search_service.search(
+                                conn,
+                                [keyword.lower() for keyword in criteria['keywords']],
+                                columns=("name", "categories"),
+                                limit=products_per_category * 2,  # Get extra for filtering
+                                order_by="p.access_count DESC, RANDOM()",
+                            )
+                        else:
+                            cursor.execute("""
+                                SELECT * FROM products p
+                                ORDER BY p.access_count DESC, RANDOM()
+                                LIMIT ?
+                            """, (products_per_category * 2,))
+                            rows = cursor.fetchall()
                         
                         for row in rows:
                             try:
@@ -364,11 +370,25 @@ class ProductDiscoveryService:
         """Load specific products by barcode."""
         try:
             products = []
+            missing = list(barcodes)
+            
+            # Shared catalog snapshot first: no query, no JSON parsing
+            snapshot = get_catalog_snapshot()
+            if snapshot is not None:
+                missing = []
+                for barcode in barcodes:
+                    product = snapshot.product(barcode)
+                    if product:
+                        products.append(product)
+                    else:
+                        missing.append(barcode)
+                if not missing:
+                    return products
             
             with db_service.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                for barcode in barcodes:
+                for barcode in missing:
                     cursor.execute("SELECT * FROM products WHERE barcode = ?", (barcode,))
                     row = cursor.fetchone()
                     
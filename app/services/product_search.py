@@ -0,0 +1,225 @@
+"""
+Full-text product search over name, brand and categories.
+
+Backed by the ``products_fts`` FTS5 table (external content on ``products``,
+kept in sync by triggers created in ``DatabaseService.init_database``). The
+tokenizer folds diacritics so "creme" matches "Crème" across the ES/EN/DE
+catalog, and every query token is prefix-matched. When the FTS table is not
+available (older databases, SQLite builds without FTS5, ad-hoc test schemas)
+the service falls back to the previous ``LOWER(col) LIKE`` scan so callers
+never need to care which path ran.
+"""
+
+import logging
+import re
+import sqlite3
+import unicodedata
+from typing import Any, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_SEARCH_COLUMNS = ("name", "brand", "categories")
+
+# BM25 column weights, in PRODUCT_SEARCH_COLUMNS order: a hit in the name is
+# worth far more than a hit in the (long, noisy) OFF categories string.
+BM25_WEIGHTS = (10.0, 3.0, 1.0)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+PRODUCTS_FTS_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, brand, categories,
+        content='products',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, name, brand, categories)
+        VALUES (new.rowid, new.name, new.brand, new.categories);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, brand, categories)
+        VALUES ('delete', old.rowid, old.name, old.brand, old.categories);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, brand, categories ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, brand, categories)
+        VALUES ('delete', old.rowid, old.name, old.brand, old.categories);
+        INSERT INTO products_fts(rowid, name, brand, categories)
+        VALUES (new.rowid, new.name, new.brand, new.categories);
+    END
+    """,
+]
+
+
+def ensure_products_fts(cursor: Any) -> bool:
+    """Create the FTS table and sync triggers, rebuilding the index on first creation.
+
+    Returns False when the SQLite build has no FTS5 support.
+    """
+    try:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+        existed = cursor.fetchone() is not None
+        for statement in PRODUCTS_FTS_SCHEMA:
+            cursor.execute(statement)
+        if not existed:
+            cursor.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+        return True
+    except sqlite3.OperationalError as exc:
+        logger.warning(f"Product full-text search unavailable, using LIKE fallback: {exc}")
+        return False
+
+
+def fold_text(text: str) -> str:
+    """Lowercase and strip diacritics the same way the FTS tokenizer does."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def build_match_expression(terms: Sequence[str], columns: Sequence[str] = PRODUCT_SEARCH_COLUMNS) -> Optional[str]:
+    """Build an FTS5 MATCH expression that ORs the given terms.
+
+    Each term becomes a phrase whose last token is prefix-matched, so
+    "white ric" matches "White Rice". Returns None when no term has any
+    searchable token.
+    """
+    phrases = []
+    for term in terms:
+        tokens = _TOKEN_RE.findall(fold_text(term))
+        if not tokens:
+            continue
+        phrases.append('"' + " ".join(tokens) + '"*')
+    if not phrases:
+        return None
+    expression = " OR ".join(phrases)
+    column_filter = " ".join(columns)
+    return f"{{{column_filter}}}: ({expression})"
+
+
+def term_matches(term: str, text: str) -> bool:
+    """Whether ``text`` matches ``term`` the way a MATCH phrase would.
+
+    The term's tokens must appear consecutively in ``text`` with the last
+    one prefix-matched. Lets callers that OR several terms into one query
+    tell which rows belong to which term.
+    """
+    term_tokens = _TOKEN_RE.findall(fold_text(term))
+    if not term_tokens:
+        return False
+    text_tokens = _TOKEN_RE.findall(fold_text(text))
+    *head, last = term_tokens
+    for start in range(len(text_tokens) - len(term_tokens) + 1):
+        end = start + len(head)
+        if text_tokens[start:end] == head and text_tokens[end].startswith(last):
+            return True
+    return False
+
+
+class ProductSearchService:
+    """Shared product search used by planners, discovery and Smart Diet."""
+
+    def search(
+        self,
+        conn: Any,
+        terms: Sequence[str],
+        columns: Sequence[str] = PRODUCT_SEARCH_COLUMNS,
+        limit: int = 20,
+        where: str = "",
+        params: Sequence[Any] = (),
+        order_by: Optional[str] = None,
+        select: str = "p.*",
+    ) -> List[Any]:
+        """
+        Search products matching any of ``terms`` in ``columns``.
+
+        Args:
+            conn: Open database connection (from ``db_service.get_connection()``)
+            terms: Search terms; matches are OR'd together
+            columns: Product columns to search
+            limit: Maximum rows to return
+            where: Extra SQL predicate on the ``p`` (products) alias
+            params: Parameters for ``where``
+            order_by: SQL ordering; defaults to BM25 relevance then popularity
+            select: Column list to return
+
+        Returns:
+            Matching product rows
+        """
+        terms = [term for term in terms if term and term.strip()]
+        if not terms:
+            return []
+
+        cursor = conn.cursor()
+        match_expression = build_match_expression(terms, columns)
+        if match_expression is not None:
+            try:
+                return self._search_fts(cursor, match_expression, limit, where, params, order_by, select)
+            except sqlite3.OperationalError as exc:
+                logger.debug(f"FTS product search unavailable, falling back to LIKE: {exc}")
+
+        return self._search_like(cursor, terms, columns, limit, where, params, order_by, select)
+
+    def _search_fts(
+        self,
+        cursor: Any,
+        match_expression: str,
+        limit: int,
+        where: str,
+        params: Sequence[Any],
+        order_by: Optional[str],
+        select: str,
+    ) -> List[Any]:
+        weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+        rank = f"bm25(products_fts, {weights})"
+        extra = f"AND ({where})" if where else ""
+        cursor.execute(
+            f"""
+            SELECT {select} FROM products_fts
+            JOIN products p ON p.rowid = products_fts.rowid
+            WHERE products_fts MATCH ? {extra}
+            ORDER BY {order_by or f"{rank}, p.access_count DESC"}
+            LIMIT ?
+            """,
+            [match_expression, *params, limit],
+        )
+        return cursor.fetchall()
+
+    def _search_like(
+        self,
+        cursor: Any,
+        terms: Sequence[str],
+        columns: Sequence[str],
+        limit: int,
+        where: str,
+        params: Sequence[Any],
+        order_by: Optional[str],
+        select: str,
+    ) -> List[Any]:
+        conditions = []
+        like_params: List[Any] = []
+        for term in terms:
+            pattern = f"%{term.strip().lower()}%"
+            for column in columns:
+                conditions.append(f"LOWER(p.{column}) LIKE ?")
+                like_params.append(pattern)
+        extra = f"AND ({where})" if where else ""
+        cursor.execute(
+            f"""
+            SELECT {select} FROM products p
+            WHERE ({' OR '.join(conditions)}) {extra}
+            ORDER BY {order_by or "p.access_count DESC"}
+            LIMIT ?
+            """,
+            [*like_params, *params, limit],
+        )
+        return cursor.fetchall()
+
+
+# Global product search service instance
+product_search_service = ProductSearchService()
@@ -16,6 +16,8 @@ from .nutrition_calculator import NutritionCalculator
 from .performance_monitor import performance_monitor
 from .redis_cache import redis_cache_service
 from .recipe_translation_service import get_recipe_translation_service
+from .recipe_pool import PoolCell, RecipePool
+from app.config import config
 
 logger = logging.getLogger(__name__)
 
@@ -549,6 +551,10 @@ class NutritionalOptimizer:
         return recipe
 
 
+# Filled in the background at startup when config.recipe_pool_enabled
+recipe_pool = RecipePool(RecipeGenerator().cuisine_ingredients.keys(), variants=config.recipe_pool_variants)
+
+
 class RecipeAIEngine:
     """
     Main Recipe AI Engine class extending Smart Diet capabilities
@@ -568,6 +574,9 @@ class RecipeAIEngine:
 
         # Spanish translation service
         self.translation_service = get_recipe_translation_service()
+
+        # Pre-generated base recipes, shared by every engine instance
+        self.recipe_pool = recipe_pool
     
     async def generate_recipe(self, request: RecipeGenerationRequest) -> GeneratedRecipe:
         """
@@ -591,8 +600,18 @@ class RecipeAIEngine:
                     logger.info(f"Recipe cache hit for request: {cache_key}")
                     return GeneratedRecipe(**json.loads(cached_recipe))
                 
-                # Generate base recipe
-                recipe = await self.recipe_generator.generate_recipe_base(request)
+                # Serve the nearest pooled base recipe, generate only when uncovered
+                recipe = self.recipe_pool.draw(
+                    request.cuisine_preferences,
+                    request.meal_type,
+                    request.dietary_restrictions,
+                    request.excluded_ingredients,
+                    request.target_calories_per_serving
+                )
+                if recipe is not None:
+                    recipe = self._personalise_pooled_recipe(recipe, request)
+                else:
+                    recipe = await self.recipe_generator.generate_recipe_base(request)
                 
                 # Optimize ingredients if targets specified
                 if any([request.target_calories_per_serving, request.target_protein_g, request.target_carbs_g]):
@@ -634,6 +653,33 @@ class RecipeAIEngine:
             logger.error(f"Error generating recipe: {e}")
             raise
     
+    def _personalise_pooled_recipe(self, recipe: GeneratedRecipe, request: RecipeGenerationRequest) -> GeneratedRecipe:
+        """Fit a pooled base recipe to the request before optimization"""
+        recipe.id = f"recipe_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{random.randint(1000, 9999)}"
+        recipe.difficulty_level = request.difficulty_preference
+        recipe.servings = request.servings
+        recipe.nutrition = self.recipe_generator._calculate_recipe_nutrition(recipe.ingredients, recipe.servings)
+        recipe.confidence_score = self.recipe_generator._calculate_confidence_score(
+            recipe.ingredients, recipe.nutrition, request
+        )
+        return recipe
+
+    async def fill_recipe_pool(self) -> int:
+        """Generate the recipe pool; the previous pool keeps serving meanwhile"""
+        return await self.recipe_pool.fill(self._generate_pool_recipe)
+
+    def start_recipe_pool_fill(self) -> None:
+        """Fill the recipe pool in the background"""
+        self.recipe_pool.start_fill(self._generate_pool_recipe)
+
+    async def _generate_pool_recipe(self, cell: PoolCell) -> GeneratedRecipe:
+        request = RecipeGenerationRequest(
+            cuisine_preferences=[cell.cuisine],
+            meal_type=cell.meal_type,
+            dietary_restrictions=[] if cell.diet == "none" else [cell.diet]
+        )
+        return await self.recipe_generator.generate_recipe_base(request)
+
     async def optimize_existing_recipe(self, recipe_data: Dict[str, Any], goal: str = "balanced") -> GeneratedRecipe:
         """
         Improve nutritional profile of existing user recipes
@@ -56,6 +56,8 @@ class RecipeDatabaseService(DatabaseService):
         self.rating_service = RecipeRatingService(self)
         self.schema_service = RecipeSchemaService(self)
         self.shopping_service = ShoppingTableService(self)
+        # Running taste aggregates maintained by rate_recipe (read by taste learning)
+        self.taste_aggregates = self.rating_service.taste_aggregates
 
         # Initialize tables
         self.schema_service.init_recipe_tables()
@@ -100,6 +102,10 @@ class RecipeDatabaseService(DatabaseService):
         """Delegate to RecipeQueryService."""
         return await self.query_service.get_recipe(recipe_id)
 
+    async def get_recipes(self, recipe_ids: List[str]) -> List[GeneratedRecipe]:
+        """Delegate to RecipeQueryService."""
+        return await self.query_service.get_recipes(recipe_ids)
+
     async def search_recipes(
         self,
         user_id: Optional[str] = None,
@@ -119,6 +125,29 @@ class RecipeDatabaseService(DatabaseService):
             limit=limit
         )
 
+    async def search_recipes_page(
+        self,
+        user_id: Optional[str] = None,
+        cuisine_type: Optional[str] = None,
+        difficulty_level: Optional[str] = None,
+        max_prep_time: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """Delegate to RecipeQueryService."""
+        return await self.query_service.search_recipes_page(
+            user_id=user_id,
+            cuisine_type=cuisine_type,
+            difficulty_level=difficulty_level,
+            max_prep_time=max_prep_time,
+            tags=tags,
+            limit=limit,
+            cursor=cursor,
+            offset=offset
+        )
+
     async def get_recipe_analytics(self, days: int = 30) -> Dict[str, Any]:
         """Delegate to RecipeQueryService."""
         return await self.query_service.get_recipe_analytics(days=days)
@@ -178,10 +207,11 @@ class RecipeDatabaseService(DatabaseService):
     async def create_or_update_user_taste_profile(
         self,
         user_id: str,
-        profile_data: Dict[str, Any]
+        profile_data: Dict[str, Any],
+        publish: bool = True
     ) -> bool:
         """Delegate to RecipeRatingService."""
-        return await self.rating_service.create_or_update_user_taste_profile(user_id, profile_data)
+        return await self.rating_service.create_or_update_user_taste_profile(user_id, profile_data, publish=publish)
 
     async def get_user_ratings_for_learning(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Delegate to RecipeRatingService."""
@@ -191,19 +221,25 @@ class RecipeDatabaseService(DatabaseService):
         self,
         user_id: str,
         cuisine_type: str,
-        preference_score: float
+        preference_score: float,
+        publish: bool = True
     ) -> bool:
         """Delegate to RecipeRatingService."""
-        return await self.rating_service.update_cuisine_preference(user_id, cuisine_type, preference_score)
+        return await self.rating_service.update_cuisine_preference(
+            user_id, cuisine_type, preference_score, publish=publish
+        )
 
     async def update_ingredient_preference(
         self,
         user_id: str,
         ingredient_name: str,
-        preference_score: float
+        preference_score: float,
+        publish: bool = True
     ) -> bool:
         """Delegate to RecipeRatingService."""
-        return await self.rating_service.update_ingredient_preference(user_id, ingredient_name, preference_score)
+        return await self.rating_service.update_ingredient_preference(
+            user_id, ingredient_name, preference_score, publish=publish
+        )
 
     async def get_user_learning_progress(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Delegate to RecipeRatingService."""
@@ -312,6 +348,14 @@ class RecipeDatabaseService(DatabaseService):
         recipe = await self.get_recipe(recipe_id)
         if recipe is None:
             return None
+        return self._recipe_to_dict(recipe)
+
+    async def get_recipes_by_ids(self, recipe_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Bulk get_recipe_by_id: recipe dicts keyed by ID, unknown IDs omitted."""
+        return {recipe.id: self._recipe_to_dict(recipe) for recipe in await self.get_recipes(recipe_ids)}
+
+    @staticmethod
+    def _recipe_to_dict(recipe: GeneratedRecipe) -> Dict[str, Any]:
         return {
             'id': recipe.id,
             'name': recipe.name,
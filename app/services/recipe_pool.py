@@ -0,0 +1,189 @@
+"""
+Pre-generated recipe pool.
+
+Recipe generation is cheap per call but sits on the request path of every
+``/recipe/generate``, and the Redis cache only helps on byte-identical
+requests. The pool is filled in the background with base recipes covering
+cuisine x meal type x diet, several variants per cell, and indexed by each
+variant's total calories. A request draws the variant of its cell whose
+calories are nearest its target, so the engine's usual portion scaling
+only has to adjust it lightly. Requests the pool does not cover (an empty
+cell such as an unknown meal type, or every variant containing an excluded
+ingredient) fall back to generating from scratch.
+
+Drawn recipes are deep copies, so the engine can personalise them freely.
+"""
+
+import asyncio
+import copy
+import logging
+import random
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MEAL_TYPES = (None, "breakfast", "lunch", "dinner", "snack")
+DIETS = ("none", "vegetarian", "vegan")
+
+
+class PoolCell(NamedTuple):
+    cuisine: str
+    meal_type: Optional[str]
+    diet: str
+
+
+def diet_of(dietary_restrictions: Sequence[str]) -> str:
+    """Pool diet for a request: the strictest restriction the generator honours."""
+    restrictions = {restriction.lower() for restriction in dietary_restrictions or ()}
+    if "vegan" in restrictions:
+        return "vegan"
+    if "vegetarian" in restrictions:
+        return "vegetarian"
+    return "none"
+
+
+def total_calories(recipe: Any) -> float:
+    return sum(ingredient.calories_per_unit * ingredient.quantity / 100 for ingredient in recipe.ingredients)
+
+
+class RecipePool:
+    """Base recipes per cell with a calorie index for nearest-match draws."""
+
+    def __init__(
+        self,
+        cuisines: Sequence[str],
+        meal_types: Sequence[Optional[str]] = MEAL_TYPES,
+        diets: Sequence[str] = DIETS,
+        variants: int = 8,
+    ):
+        """
+        Args:
+            cuisines: Cuisines the generator knows
+            meal_types: Meal types to cover (None for unspecified)
+            diets: Diets to cover, as returned by ``diet_of``
+            variants: Recipes generated per cell
+        """
+        self.cuisines = tuple(cuisines)
+        self.meal_types = tuple(meal_types)
+        self.diets = tuple(diets)
+        self.variants = variants
+        self._cells: Dict[PoolCell, tuple] = {}  # cell -> (recipes, calories array)
+        self._task: Optional["asyncio.Task[int]"] = None
+        self.metrics = {
+            'draws': 0,
+            'uncovered': 0,
+            'fills': 0,
+            'fill_errors': 0,
+        }
+
+    def __len__(self) -> int:
+        return sum(len(recipes) for recipes, _ in self._cells.values())
+
+    def cells(self) -> Iterator[PoolCell]:
+        for cuisine in self.cuisines:
+            for meal_type in self.meal_types:
+                for diet in self.diets:
+                    yield PoolCell(cuisine, meal_type, diet)
+
+    # ----- Filling -----
+
+    async def fill(self, generate: Callable[[PoolCell], Awaitable[Any]]) -> int:
+        """
+        Generate every cell's variants and swap them in as the new pool.
+
+        Yields to the event loop between cells, so it can run alongside
+        requests; the previous pool keeps serving until the new one is ready.
+        """
+        cells: Dict[PoolCell, tuple] = {}
+        for cell in self.cells():
+            recipes = []
+            for _ in range(self.variants):
+                try:
+                    recipes.append(await generate(cell))
+                except Exception as e:
+                    self.metrics['fill_errors'] += 1
+                    logger.warning(f"Recipe pool generation failed for {cell}: {e}")
+            if recipes:
+                cells[cell] = (recipes, np.array([total_calories(recipe) for recipe in recipes], dtype=np.float64))
+            await asyncio.sleep(0)
+        self._cells = cells
+        self.metrics['fills'] += 1
+        logger.info(f"Recipe pool filled: {len(self)} recipes in {len(cells)} cells")
+        return len(self)
+
+    def start_fill(self, generate: Callable[[PoolCell], Awaitable[Any]]) -> None:
+        """Fill the pool in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.fill(generate))
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    # ----- Serving -----
+
+    def draw(
+        self,
+        cuisine_preferences: Sequence[str],
+        meal_type: Optional[str],
+        dietary_restrictions: Sequence[str],
+        excluded_ingredients: Sequence[str] = (),
+        target_calories: Optional[float] = None,
+    ) -> Optional[Any]:
+        """
+        Copy of the pooled recipe nearest to the request, or None when uncovered.
+
+        Like the generator, only the first cuisine preference counts and an
+        unknown (or missing) one means any cuisine. With a calorie target the
+        variant needing the smallest portion scaling wins; without one the
+        draw is random among the candidates.
+        """
+        preferred = cuisine_preferences[0].lower() if cuisine_preferences else None
+        cuisines = [preferred] if preferred in self.cuisines else self.cuisines
+        diet = diet_of(dietary_restrictions)
+        excluded = [name.lower() for name in excluded_ingredients or () if name]
+
+        candidates: List[Any] = []
+        calories: List[np.ndarray] = []
+        for cuisine in cuisines:
+            entry = self._cells.get(PoolCell(cuisine, meal_type, diet))
+            if entry is None:
+                continue
+            recipes, recipe_calories = entry
+            if excluded:
+                keep = [
+                    i for i, recipe in enumerate(recipes)
+                    if not any(term in ingredient.name.lower() for ingredient in recipe.ingredients for term in excluded)
+                ]
+                recipes, recipe_calories = [recipes[i] for i in keep], recipe_calories[keep]
+            candidates.extend(recipes)
+            calories.append(recipe_calories)
+
+        if not candidates:
+            self.metrics['uncovered'] += 1
+            return None
+
+        if target_calories:
+            # Distance is the portion scaling the engine will apply
+            scale = np.abs(np.log(target_calories / np.maximum(np.concatenate(calories), 1e-9)))
+            best = int(np.argmin(scale))
+        else:
+            best = random.randrange(len(candidates))
+
+        self.metrics['draws'] += 1
+        return copy.deepcopy(candidates[best])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'recipes': len(self),
+            'cells': len(self._cells),
+            'filling': self._task is not None and not self._task.done(),
+            **self.metrics,
+        }
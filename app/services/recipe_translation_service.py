@@ -1,10 +1,12 @@
 """Recipe translation helpers with graceful fallback behaviour."""
 
+import asyncio
 import logging
 import re
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 
+from .translation_batcher import TranslationBatcher
 from .translation_service import get_translation_service, TranslationService
 from .cache import get_cache_service
 from ..models.recipe import (
@@ -19,6 +21,62 @@ from ..models.recipe import (
 
 logger = logging.getLogger(__name__)
 
+# Spanish food terminology mappings for better translation accuracy (also
+# seeded into the translation memory at startup)
+FOOD_TERMINOLOGY_ES = {
+    # Common cooking terms
+    "olive oil": "aceite de oliva",
+    "salt": "sal",
+    "pepper": "pimienta",
+    "garlic": "ajo",
+    "onion": "cebolla",
+    "tomato": "tomate",
+    "chicken": "pollo",
+    "beef": "carne de res",
+    "pork": "cerdo",
+    "fish": "pescado",
+    "rice": "arroz",
+    "pasta": "pasta",
+    "cheese": "queso",
+    "milk": "leche",
+    "butter": "mantequilla",
+    "flour": "harina",
+    "sugar": "azúcar",
+    "egg": "huevo",
+    "bread": "pan",
+    "water": "agua",
+
+    # Cooking methods
+    "bake": "hornear",
+    "fry": "freír",
+    "boil": "hervir",
+    "grill": "asar a la parrilla",
+    "sauté": "saltear",
+    "roast": "asar",
+    "steam": "cocinar al vapor",
+    "simmer": "cocer a fuego lento",
+    "marinate": "marinar",
+    "season": "sazonar",
+    "mix": "mezclar",
+    "stir": "revolver",
+    "chop": "picar",
+    "dice": "cortar en cubitos",
+    "slice": "rebanar",
+    "mince": "picar finamente",
+
+    # Measurements
+    "cup": "taza",
+    "tablespoon": "cucharada",
+    "teaspoon": "cucharadita",
+    "ounce": "onza",
+    "pound": "libra",
+    "gram": "gramo",
+    "kilogram": "kilogramo",
+    "liter": "litro",
+    "milliliter": "mililitro",
+    "pinch": "pizca",
+}
+
 
 class RecipeTranslationService:
     """Service for translating recipes to Spanish with specialized food terminology handling."""
@@ -27,61 +85,10 @@ class RecipeTranslationService:
         self.translation_service = translation_service or get_translation_service(get_cache_service())
         self.cache_service = cache_service or get_cache_service()
         self.cache_ttl = 7 * 24 * 60 * 60  # 7 days for recipe translations
+        self.max_concurrency = 4  # provider calls in flight when translating text by text
+        self.batcher = TranslationBatcher(self._translate_batch)
 
-        # Spanish food terminology mappings for better translation accuracy
-        self.food_terminology_es = {
-            # Common cooking terms
-            "olive oil": "aceite de oliva",
-            "salt": "sal",
-            "pepper": "pimienta",
-            "garlic": "ajo",
-            "onion": "cebolla",
-            "tomato": "tomate",
-            "chicken": "pollo",
-            "beef": "carne de res",
-            "pork": "cerdo",
-            "fish": "pescado",
-            "rice": "arroz",
-            "pasta": "pasta",
-            "cheese": "queso",
-            "milk": "leche",
-            "butter": "mantequilla",
-            "flour": "harina",
-            "sugar": "azúcar",
-            "egg": "huevo",
-            "bread": "pan",
-            "water": "agua",
-
-            # Cooking methods
-            "bake": "hornear",
-            "fry": "freír",
-            "boil": "hervir",
-            "grill": "asar a la parrilla",
-            "sauté": "saltear",
-            "roast": "asar",
-            "steam": "cocinar al vapor",
-            "simmer": "cocer a fuego lento",
-            "marinate": "marinar",
-            "season": "sazonar",
-            "mix": "mezclar",
-            "stir": "revolver",
-            "chop": "picar",
-            "dice": "cortar en cubitos",
-            "slice": "rebanar",
-            "mince": "picar finamente",
-
-            # Measurements
-            "cup": "taza",
-            "tablespoon": "cucharada",
-            "teaspoon": "cucharadita",
-            "ounce": "onza",
-            "pound": "libra",
-            "gram": "gramo",
-            "kilogram": "kilogramo",
-            "liter": "litro",
-            "milliliter": "mililitro",
-            "pinch": "pizca",
-        }
+        self.food_terminology_es = dict(FOOD_TERMINOLOGY_ES)
 
         # General fallback phrases used when external providers are unavailable
         self.general_terminology_es = {
@@ -135,55 +142,113 @@ class RecipeTranslationService:
         content_hash = hashlib.md5(content.encode()).hexdigest()
         return f"recipe_translation:es:{content_type}:{content_hash}"
 
+    def _apply_food_terminology(self, text: str) -> str:
+        """Pre-translation food terminology improvements."""
+        enhanced_text = text
+        for en_term, es_term in self.food_terminology_es.items():
+            enhanced_text = self._replace_case_insensitive(enhanced_text, en_term, es_term)
+        return enhanced_text
+
     async def _translate_with_food_context(self, text: str, context_type: str = "general") -> Optional[str]:
         """Translate text with food-specific terminology handling."""
         if not text or not text.strip():
             return text
+        # Batched with every other string requested concurrently
+        return await self.batcher.translate((context_type, text))
+
+    async def _translate_batch(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[str]]:
+        """
+        Resolve a batch of ``(context_type, text)`` translations.
+
+        One cache lookup covers the whole batch; misses are deduplicated after
+        terminology substitution (so "salt" is translated once however many
+        recipes use it) and sent to the provider together. Strings the
+        provider cannot translate use the dictionary fallback.
+        """
+        cache_keys = {key: self._get_cache_key(key[1], key[0]) for key in keys}
+        cached = await self._cache_get_many(list(cache_keys.values()))
+
+        results: Dict[Tuple[str, str], Optional[str]] = {}
+        misses = []
+        for key, cache_key in cache_keys.items():
+            if cached.get(cache_key):
+                results[key] = cached[cache_key]
+            else:
+                misses.append(key)
+        if not misses:
+            return results
+
+        enhanced = {key: self._apply_food_terminology(key[1]) for key in misses}
+        translations = await self._provider_translate(list(dict.fromkeys(enhanced.values())))
+
+        fresh = {}
+        for key in misses:
+            context_type, text = key
+            translated = translations.get(enhanced[key])
+            if translated:
+                results[key] = translated
+                fresh[cache_keys[key]] = translated
+                continue
+
+            # Provider translation failed, attempt graceful fallback
+            fallback_translation = self._fallback_translate(enhanced[key], context_type)
+            if fallback_translation and fallback_translation != text:
+                results[key] = fallback_translation
+            else:
+                logger.error(f"Translation failed for {context_type}: {text[:50]}...")
+                results[key] = text  # Return original text if fallback cannot improve
+
+        if fresh:
+            await self._cache_set_many(fresh)
+        logger.info(
+            f"Translated {len(keys)} recipe strings: {len(keys) - len(misses)} cached, "
+            f"{len(fresh)} from provider, {len(misses) - len(fresh)} fallback"
+        )
+        return results
 
-        # Check cache first
-        cache_key = self._get_cache_key(text, context_type)
+    async def _cache_get_many(self, keys: List[str]) -> Dict[str, Any]:
         try:
-            cached_translation = await self.cache_service.get(cache_key)
-            if cached_translation:
-                logger.info(f"Found cached translation for {context_type}: {text[:50]}...")
-                return cached_translation
+            if hasattr(self.cache_service, 'mget'):
+                return await self.cache_service.mget(keys)
+            values = await asyncio.gather(*(self.cache_service.get(key) for key in keys))
+            return dict(zip(keys, values))
         except Exception as e:
             logger.warning(f"Cache lookup failed: {e}")
+            return {}
 
-        # Apply pre-translation food terminology improvements
-        enhanced_text = text
-        for en_term, es_term in self.food_terminology_es.items():
-            enhanced_text = self._replace_case_insensitive(enhanced_text, en_term, es_term)
-
+    async def _cache_set_many(self, values: Dict[str, str]) -> None:
         try:
-            # Translate using the existing translation service
-            translated = await self.translation_service.translate_text(
-                text=enhanced_text,
-                source_lang="en",
-                target_lang="es"
-            )
-
-            if translated:
-                # Cache the successful translation
-                try:
-                    await self.cache_service.set(cache_key, translated, self.cache_ttl)
-                except Exception as e:
-                    logger.warning(f"Cache storage failed: {e}")
+            if hasattr(self.cache_service, 'mset'):
+                await self.cache_service.mset(values, self.cache_ttl)
+            else:
+                await asyncio.gather(*(self.cache_service.set(key, value, self.cache_ttl) for key, value in values.items()))
+        except Exception as e:
+            logger.warning(f"Cache storage failed: {e}")
 
-                logger.info(f"Successfully translated {context_type}: {text[:50]}... -> {translated[:50]}...")
-                return translated
+    async def _provider_translate(self, texts: List[str]) -> Dict[str, Optional[str]]:
+        """Translate distinct texts, batched when the translation service supports it."""
+        translate_texts = getattr(self.translation_service, 'translate_texts', None)
+        if translate_texts is not None:
+            try:
+                return await translate_texts(texts, source_lang="en", target_lang="es")
+            except Exception as e:
+                logger.warning(f"Batch translation failed, translating individually: {e}")
 
-        except Exception as e:
-            logger.error(f"Translation error for {context_type}: {e}")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
 
-        # Provider translation failed, attempt graceful fallback
-        fallback_translation = self._fallback_translate(enhanced_text, context_type)
-        if fallback_translation and fallback_translation != text:
-            logger.info(f"Using fallback translation for {context_type}: {text[:50]}... -> {fallback_translation[:50]}...")
-            return fallback_translation
+        async def translate_one(text: str) -> Optional[str]:
+            async with semaphore:
+                try:
+                    return await self.translation_service.translate_text(
+                        text=text,
+                        source_lang="en",
+                        target_lang="es"
+                    )
+                except Exception as e:
+                    logger.error(f"Translation error for {text[:50]}: {e}")
+                    return None
 
-        logger.error(f"Translation failed for {context_type}: {text[:50]}...")
-        return text  # Return original text if fallback cannot improve
+        return dict(zip(texts, await asyncio.gather(*(translate_one(text) for text in texts))))
 
     async def translate_recipe_name(self, name: str) -> str:
         """Translate recipe name to Spanish."""
@@ -195,13 +260,10 @@ class RecipeTranslationService:
 
     async def translate_ingredient(self, ingredient: RecipeIngredientResponse) -> RecipeIngredientResponse:
         """Translate a single ingredient to Spanish."""
-        translated_name = await self._translate_with_food_context(ingredient.name, "ingredient")
-        translated_preparation = None
-
-        if ingredient.preparation_note:
-            translated_preparation = await self._translate_with_food_context(
-                ingredient.preparation_note, "preparation"
-            )
+        translated_name, translated_preparation = await asyncio.gather(
+            self._translate_with_food_context(ingredient.name, "ingredient"),
+            self._translate_with_food_context(ingredient.preparation_note, "preparation"),
+        )
 
         return RecipeIngredientResponse(
             name=translated_name or ingredient.name,
@@ -218,16 +280,11 @@ class RecipeTranslationService:
 
     async def translate_instruction(self, instruction: RecipeInstructionResponse) -> RecipeInstructionResponse:
         """Translate a single cooking instruction to Spanish."""
-        translated_instruction = await self._translate_with_food_context(
-            instruction.instruction, "instruction"
+        translated_instruction, translated_cooking_method = await asyncio.gather(
+            self._translate_with_food_context(instruction.instruction, "instruction"),
+            self._translate_with_food_context(instruction.cooking_method, "cooking_method"),
         )
 
-        translated_cooking_method = None
-        if instruction.cooking_method:
-            translated_cooking_method = await self._translate_with_food_context(
-                instruction.cooking_method, "cooking_method"
-            )
-
         return RecipeInstructionResponse(
             step_number=instruction.step_number,
             instruction=translated_instruction or instruction.instruction,
@@ -238,11 +295,8 @@ class RecipeTranslationService:
 
     async def translate_recipe_tags(self, tags: List[str]) -> List[str]:
         """Translate recipe tags to Spanish."""
-        translated_tags = []
-        for tag in tags:
-            translated_tag = await self._translate_with_food_context(tag, "tag")
-            translated_tags.append(translated_tag or tag)
-        return translated_tags
+        translated_tags = await asyncio.gather(*(self._translate_with_food_context(tag, "tag") for tag in tags))
+        return [translated or tag for tag, translated in zip(tags, translated_tags)]
 
     def _replace_case_insensitive(self, text: str, search: str, replacement: str) -> str:
         """Replace occurrences of `search` in `text` regardless of case, preserving capitalization."""
@@ -292,24 +346,16 @@ class RecipeTranslationService:
         logger.info(f"Starting complete translation of recipe: {recipe.name}")
 
         try:
-            # Translate basic recipe information
-            translated_name = await self.translate_recipe_name(recipe.name)
-            translated_description = await self.translate_recipe_description(recipe.description)
-
-            # Translate ingredients in parallel for better performance
-            translated_ingredients = []
-            for ingredient in recipe.ingredients:
-                translated_ingredient = await self.translate_ingredient(ingredient)
-                translated_ingredients.append(translated_ingredient)
-
-            # Translate instructions in parallel
-            translated_instructions = []
-            for instruction in recipe.instructions:
-                translated_instruction = await self.translate_instruction(instruction)
-                translated_instructions.append(translated_instruction)
-
-            # Translate tags
-            translated_tags = await self.translate_recipe_tags(recipe.tags)
+            # Every string is requested at once so the batcher resolves them together
+            translated_name, translated_description, translated_tags, *translated_parts = await asyncio.gather(
+                self.translate_recipe_name(recipe.name),
+                self.translate_recipe_description(recipe.description),
+                self.translate_recipe_tags(recipe.tags),
+                *(self.translate_ingredient(ingredient) for ingredient in recipe.ingredients),
+                *(self.translate_instruction(instruction) for instruction in recipe.instructions),
+            )
+            translated_ingredients = translated_parts[:len(recipe.ingredients)]
+            translated_instructions = translated_parts[len(recipe.ingredients):]
 
             # Create translated recipe
             translated_recipe = GeneratedRecipeResponse(
@@ -341,13 +387,16 @@ class RecipeTranslationService:
         """Translate multiple recipes to Spanish."""
         translations = {}
 
-        for recipe in recipes:
-            try:
-                translated_recipe = await self.translate_complete_recipe(recipe)
-                translations[recipe.id] = translated_recipe
-            except Exception as e:
-                logger.error(f"Failed to translate recipe {recipe.id}: {e}")
+        # Concurrent so that all recipes share the same translation batches
+        results = await asyncio.gather(
+            *(self.translate_complete_recipe(recipe) for recipe in recipes), return_exceptions=True
+        )
+        for recipe, translated_recipe in zip(recipes, results):
+            if isinstance(translated_recipe, Exception):
+                logger.error(f"Failed to translate recipe {recipe.id}: {translated_recipe}")
                 translations[recipe.id] = None
+            else:
+                translations[recipe.id] = translated_recipe
 
         return translations
 
@@ -7,17 +7,51 @@ Provides access to recipe data without modifying ratings or preferences.
 Task: Phase 2 Tarea 5 - Recipe Database Refactoring
 """
 
+import base64
+import binascii
 import json
 import uuid
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta
 
+from app.config import config
 from app.services.database import DatabaseService
+from app.services.memory_cache import MemoryCache
 from app.services.recipe_ai_engine import GeneratedRecipe, RecipeIngredient, RecipeInstruction, RecipeNutrition
 
 logger = logging.getLogger(__name__)
 
+# Search ranking, served by the idx_recipes_*ranking indexes read backwards.
+# Unscored recipes (NULL confidence) sort last.
+_SEARCH_ORDER = "r.confidence_score DESC, r.created_at DESC, r.id DESC"
+
+# Tags matching fewer recipes than this drive tag searches from recipe_tags;
+# commoner tags are checked per recipe while walking the ranking index
+_TAG_DRIVING_LIMIT = 2000
+
+# IDs bound per IN (...) when hydrating recipes in bulk
+_IN_CHUNK_SIZE = 500
+
+
+def _encode_cursor(row) -> str:
+    """Opaque keyset cursor positioned after ``row``."""
+    position = [row['confidence_score'], row['created_at'], row['id']]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[Optional[float], Any, str]:
+    """
+    Raises:
+        ValueError: If the cursor was not produced by ``_encode_cursor``
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, created_at, recipe_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (None if score is None else float(score)), created_at, str(recipe_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid search cursor: {cursor}") from e
+
 
 class RecipeQueryService:
     """Service for recipe CRUD operations and queries"""
@@ -30,6 +64,9 @@ class RecipeQueryService:
             db_service: DatabaseService instance (optional, creates new if not provided)
         """
         self.db_service = db_service or DatabaseService()
+        # recipe_id -> (updated_at, row snapshot). Snapshots are never handed
+        # out; every read builds fresh dataclasses from them.
+        self.hydrated = MemoryCache("recipe_hydration", max_entries=config.recipe_cache_max_entries)
 
     async def create_recipe(self, recipe: GeneratedRecipe, user_id: Optional[str] = None) -> str:
         """
@@ -65,6 +102,12 @@ class RecipeQueryService:
                     recipe.generation_time_ms, json.dumps(recipe.tags)
                 ))
 
+                # Index tags for search filters
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO recipe_tags (tag, recipe_id) VALUES (?, ?)",
+                    [(tag, recipe_id) for tag in set(recipe.tags or []) if isinstance(tag, str)]
+                )
+
                 # Insert ingredients
                 for ingredient in recipe.ingredients:
                     ingredient_id = str(uuid.uuid4())
@@ -110,6 +153,7 @@ class RecipeQueryService:
                     ))
 
                 conn.commit()
+                self.hydrated.delete(recipe_id)
                 logger.info(f"Successfully created recipe {recipe_id}: {recipe.name}")
                 return recipe_id
 
@@ -127,104 +171,155 @@ class RecipeQueryService:
         Returns:
             GeneratedRecipe object or None if not found
         """
-        try:
-            with self.db_service.get_connection() as conn:
-                cursor = conn.cursor()
+        recipes = await self.get_recipes([recipe_id])
+        return recipes[0] if recipes else None
 
-                # Get recipe data
-                cursor.execute("SELECT * FROM recipes WHERE id = ?", (recipe_id,))
-                recipe_row = cursor.fetchone()
+    async def get_recipes(self, recipe_ids: List[str]) -> List[GeneratedRecipe]:
+        """
+        Retrieve several recipes with one query per table.
 
-                if not recipe_row:
-                    return None
+        Recipes whose ``updated_at`` still matches the cached copy are rebuilt
+        from memory; the rest load their ingredients, instructions and
+        nutrition with a single ``IN (...)`` query per table.
 
-                # Get ingredients
-                cursor.execute("""
-                    SELECT * FROM recipe_ingredients
-                    WHERE recipe_id = ?
-                    ORDER BY ingredient_name
-                """, (recipe_id,))
-                ingredient_rows = cursor.fetchall()
+        Args:
+            recipe_ids: IDs of recipes to retrieve; unknown IDs are skipped
 
-                # Get instructions
-                cursor.execute("""
-                    SELECT * FROM recipe_instructions
-                    WHERE recipe_id = ?
-                    ORDER BY step_number
-                """, (recipe_id,))
-                instruction_rows = cursor.fetchall()
-
-                # Get nutrition
-                cursor.execute("SELECT * FROM recipe_nutrition WHERE recipe_id = ?", (recipe_id,))
-                nutrition_row = cursor.fetchone()
-
-                # Build recipe object
-                # Convert sqlite3.Row to dict for .get() support
-                ingredients = []
-                for row in ingredient_rows:
-                    row_dict = dict(row)
-                    ingredients.append(RecipeIngredient(
-                        name=row_dict['ingredient_name'],
-                        quantity=row_dict['quantity'],
-                        unit=row_dict['unit'],
-                        barcode=row_dict.get('barcode'),
-                        calories_per_unit=row_dict.get('calories_per_unit'),
-                        protein_g_per_unit=row_dict.get('protein_g_per_unit'),
-                        fat_g_per_unit=row_dict.get('fat_g_per_unit'),
-                        carbs_g_per_unit=row_dict.get('carbs_g_per_unit'),
-                        is_optional=bool(row_dict.get('is_optional')),
-                        preparation_note=row_dict.get('preparation_note')
-                    ))
+        Returns:
+            GeneratedRecipe objects in order of first appearance in ``recipe_ids``
+        """
+        ids = list(dict.fromkeys(recipe_ids))
+        if not ids:
+            return []
 
-                instructions = []
-                for row in instruction_rows:
-                    row_dict = dict(row)
-                    instructions.append(RecipeInstruction(
-                        step_number=row_dict['step_number'],
-                        instruction=row_dict['instruction'],
-                        cooking_method=row_dict.get('cooking_method'),
-                        duration_minutes=row_dict.get('duration_minutes'),
-                        temperature_celsius=row_dict.get('temperature_celsius')
+        try:
+            with self.db_service.get_connection() as conn:
+                cursor = conn.cursor()
+                snapshots: Dict[str, tuple] = {}
+                stale: Dict[str, Dict[str, Any]] = {}
+
+                for row in self._fetch_in(cursor, "SELECT * FROM recipes WHERE id IN ({})", ids):
+                    cached = self.hydrated.get(row['id'])
+                    if cached is not None and cached[0] == row['updated_at']:
+                        snapshots[row['id']] = cached[1]
+                    else:
+                        stale[row['id']] = dict(row)
+
+                if stale:
+                    stale_ids = list(stale)
+                    ingredients = self._group_by_recipe(self._fetch_in(
+                        cursor, "SELECT * FROM recipe_ingredients WHERE recipe_id IN ({}) ORDER BY ingredient_name",
+                        stale_ids
                     ))
-
-                nutrition = None
-                if nutrition_row:
-                    nutrition_dict = dict(nutrition_row)
-                    nutrition = RecipeNutrition(
-                        calories_per_serving=nutrition_dict['calories_per_serving'],
-                        protein_g_per_serving=nutrition_dict['protein_g_per_serving'],
-                        fat_g_per_serving=nutrition_dict['fat_g_per_serving'],
-                        carbs_g_per_serving=nutrition_dict['carbs_g_per_serving'],
-                        fiber_g_per_serving=nutrition_dict.get('fiber_g_per_serving'),
-                        sugar_g_per_serving=nutrition_dict.get('sugar_g_per_serving'),
-                        sodium_mg_per_serving=nutrition_dict.get('sodium_mg_per_serving'),
-                        recipe_score=nutrition_dict.get('recipe_score')
-                    )
-
-                # Parse tags
-                tags = json.loads(recipe_row['tags']) if recipe_row['tags'] else []
-
-                return GeneratedRecipe(
-                    id=recipe_row['id'],
-                    name=recipe_row['name'],
-                    description=recipe_row['description'],
-                    cuisine_type=recipe_row['cuisine_type'],
-                    difficulty_level=recipe_row['difficulty_level'],
-                    prep_time_minutes=recipe_row['prep_time_minutes'],
-                    cook_time_minutes=recipe_row['cook_time_minutes'],
-                    servings=recipe_row['servings'],
-                    ingredients=ingredients,
-                    instructions=instructions,
-                    nutrition=nutrition,
-                    created_by=recipe_row['created_by'],
-                    confidence_score=recipe_row['confidence_score'],
-                    generation_time_ms=recipe_row['generation_time_ms'],
-                    tags=tags
-                )
+                    instructions = self._group_by_recipe(self._fetch_in(
+                        cursor, "SELECT * FROM recipe_instructions WHERE recipe_id IN ({}) ORDER BY step_number",
+                        stale_ids
+                    ))
+                    nutrition = {
+                        row['recipe_id']: dict(row)
+                        for row in self._fetch_in(cursor, "SELECT * FROM recipe_nutrition WHERE recipe_id IN ({})", stale_ids)
+                    }
+                    for recipe_id, recipe_row in stale.items():
+                        snapshot = (
+                            recipe_row,
+                            ingredients.get(recipe_id, ()),
+                            instructions.get(recipe_id, ()),
+                            nutrition.get(recipe_id),
+                        )
+                        self.hydrated.set(recipe_id, (recipe_row['updated_at'], snapshot))
+                        snapshots[recipe_id] = snapshot
+
+            return [self._build_recipe(*snapshots[recipe_id]) for recipe_id in ids if recipe_id in snapshots]
 
         except Exception as e:
-            logger.error(f"Error retrieving recipe {recipe_id}: {e}")
-            return None
+            logger.error(f"Error retrieving recipes {ids}: {e}")
+            return []
+
+    @staticmethod
+    def _fetch_in(cursor, query: str, ids: List[str]) -> List[Any]:
+        """Run ``query`` with its ``IN ({})`` placeholder filled, in chunks of ``_IN_CHUNK_SIZE``."""
+        rows = []
+        for start in range(0, len(ids), _IN_CHUNK_SIZE):
+            chunk = ids[start:start + _IN_CHUNK_SIZE]
+            cursor.execute(query.format(", ".join("?" for _ in chunk)), chunk)
+            rows.extend(cursor.fetchall())
+        return rows
+
+    @staticmethod
+    def _group_by_recipe(rows: List[Any]) -> Dict[str, tuple]:
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            grouped.setdefault(row['recipe_id'], []).append(dict(row))
+        return {recipe_id: tuple(items) for recipe_id, items in grouped.items()}
+
+    @staticmethod
+    def _build_recipe(
+        recipe_row: Dict[str, Any],
+        ingredient_rows: tuple,
+        instruction_rows: tuple,
+        nutrition_row: Optional[Dict[str, Any]],
+    ) -> GeneratedRecipe:
+        """Fresh GeneratedRecipe from cached rows (callers may mutate it)."""
+        ingredients = [
+            RecipeIngredient(
+                name=row['ingredient_name'],
+                quantity=row['quantity'],
+                unit=row['unit'],
+                barcode=row.get('barcode'),
+                calories_per_unit=row.get('calories_per_unit'),
+                protein_g_per_unit=row.get('protein_g_per_unit'),
+                fat_g_per_unit=row.get('fat_g_per_unit'),
+                carbs_g_per_unit=row.get('carbs_g_per_unit'),
+                is_optional=bool(row.get('is_optional')),
+                preparation_note=row.get('preparation_note')
+            )
+            for row in ingredient_rows
+        ]
+
+        instructions = [
+            RecipeInstruction(
+                step_number=row['step_number'],
+                instruction=row['instruction'],
+                cooking_method=row.get('cooking_method'),
+                duration_minutes=row.get('duration_minutes'),
+                temperature_celsius=row.get('temperature_celsius')
+            )
+            for row in instruction_rows
+        ]
+
+        nutrition = None
+        if nutrition_row:
+            nutrition = RecipeNutrition(
+                calories_per_serving=nutrition_row['calories_per_serving'],
+                protein_g_per_serving=nutrition_row['protein_g_per_serving'],
+                fat_g_per_serving=nutrition_row['fat_g_per_serving'],
+                carbs_g_per_serving=nutrition_row['carbs_g_per_serving'],
+                fiber_g_per_serving=nutrition_row.get('fiber_g_per_serving'),
+                sugar_g_per_serving=nutrition_row.get('sugar_g_per_serving'),
+                sodium_mg_per_serving=nutrition_row.get('sodium_mg_per_serving'),
+                recipe_score=nutrition_row.get('recipe_score')
+            )
+
+        # Parse tags
+        tags = json.loads(recipe_row['tags']) if recipe_row['tags'] else []
+
+        return GeneratedRecipe(
+            id=recipe_row['id'],
+            name=recipe_row['name'],
+            description=recipe_row['description'],
+            cuisine_type=recipe_row['cuisine_type'],
+            difficulty_level=recipe_row['difficulty_level'],
+            prep_time_minutes=recipe_row['prep_time_minutes'],
+            cook_time_minutes=recipe_row['cook_time_minutes'],
+            servings=recipe_row['servings'],
+            ingredients=ingredients,
+            instructions=instructions,
+            nutrition=nutrition,
+            created_by=recipe_row['created_by'],
+            confidence_score=recipe_row['confidence_score'],
+            generation_time_ms=recipe_row['generation_time_ms'],
+            tags=tags
+        )
 
     async def search_recipes(
         self,
@@ -249,46 +344,123 @@ class RecipeQueryService:
         Returns:
             List of recipe summaries matching criteria
         """
+        page = await self.search_recipes_page(
+            user_id=user_id,
+            cuisine_type=cuisine_type,
+            difficulty_level=difficulty_level,
+            max_prep_time=max_prep_time,
+            tags=tags,
+            limit=limit
+        )
+        return page['recipes']
+
+    async def search_recipes_page(
+        self,
+        user_id: Optional[str] = None,
+        cuisine_type: Optional[str] = None,
+        difficulty_level: Optional[str] = None,
+        max_prep_time: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Search recipes and return one page with a keyset cursor for the next.
+
+        Results are ordered by confidence score, then creation time, then id.
+        Passing the returned ``next_cursor`` resumes right after the last
+        recipe of this page, so deep pages cost the same as the first.
+
+        Args:
+            user_id: Filter by user ID
+            cuisine_type: Filter by cuisine type
+            difficulty_level: Filter by difficulty
+            max_prep_time: Filter by max prep time in minutes
+            tags: Filter by tags (recipe must have any of these)
+            limit: Page size (default 20)
+            cursor: ``next_cursor`` of the previous page
+            offset: Rows to skip when no cursor is given (legacy page numbers)
+
+        Returns:
+            Dictionary with 'recipes', 'next_cursor' and 'has_more'
+
+        Raises:
+            ValueError: If ``cursor`` is malformed
+        """
+        position = _decode_cursor(cursor) if cursor else None
+
         try:
             with self.db_service.get_connection() as conn:
-                cursor = conn.cursor()
+                db_cursor = conn.cursor()
 
                 # Build dynamic query
                 conditions = []
-                params = []
+                params: List[Any] = []
 
                 if user_id:
-                    conditions.append("user_id = ?")
+                    conditions.append("r.user_id = ?")
                     params.append(user_id)
 
                 if cuisine_type:
-                    conditions.append("cuisine_type = ?")
+                    conditions.append("r.cuisine_type = ?")
                     params.append(cuisine_type)
 
                 if difficulty_level:
-                    conditions.append("difficulty_level = ?")
+                    conditions.append("r.difficulty_level = ?")
                     params.append(difficulty_level)
 
                 if max_prep_time:
-                    conditions.append("prep_time_minutes <= ?")
+                    conditions.append("r.prep_time_minutes <= ?")
                     params.append(max_prep_time)
 
-                where_clause = " WHERE " + " AND ".join(conditions) if conditions else ""
-
-                cursor.execute(f"""
-                    SELECT r.*, rn.calories_per_serving, rn.protein_g_per_serving
-                    FROM recipes r
-                    LEFT JOIN recipe_nutrition rn ON r.id = rn.recipe_id
-                    {where_clause}
-                    ORDER BY r.confidence_score DESC, r.created_at DESC
-                    LIMIT ?
-                """, params + [limit])
-
-                rows = cursor.fetchall()
+                if tags:
+                    conditions.append(self._tag_condition(db_cursor, tags))
+                    params.extend(tags)
+
+                # Row-value comparisons never match NULL scores, so a cursor
+                # on a scored recipe reads the rest of the scored range and
+                # then, if the page is not full, the unscored tail
+                if position is None:
+                    segments = [(None, [])]
+                elif position[0] is not None:
+                    segments = [
+                        ("(r.confidence_score, r.created_at, r.id) < (?, ?, ?)", list(position)),
+                        ("r.confidence_score IS NULL", []),
+                    ]
+                else:
+                    segments = [("r.confidence_score IS NULL AND (r.created_at, r.id) < (?, ?)", list(position[1:]))]
+
+                rows = []
+                for segment, segment_params in segments:
+                    # One extra row tells whether another page follows
+                    wanted = limit + 1 - len(rows)
+                    if wanted <= 0:
+                        break
+                    segment_conditions = conditions + ([segment] if segment else [])
+                    where_clause = " WHERE " + " AND ".join(segment_conditions) if segment_conditions else ""
+                    query_params = params + segment_params + [wanted]
+                    offset_clause = ""
+                    if offset and position is None:
+                        offset_clause = " OFFSET ?"
+                        query_params.append(offset)
+
+                    db_cursor.execute(f"""
+                        SELECT r.*, rn.calories_per_serving, rn.protein_g_per_serving
+                        FROM recipes r
+                        LEFT JOIN recipe_nutrition rn ON r.id = rn.recipe_id
+                        {where_clause}
+                        ORDER BY {_SEARCH_ORDER}
+                        LIMIT ?{offset_clause}
+                    """, query_params)
+                    rows.extend(db_cursor.fetchall())
+
+                has_more = len(rows) > limit
+                rows = rows[:limit]
 
                 recipes = []
                 for row in rows:
-                    recipe_data = {
+                    recipes.append({
                         'id': row['id'],
                         'name': row['name'],
                         'description': row['description'],
@@ -302,21 +474,36 @@ class RecipeQueryService:
                         'calories_per_serving': row['calories_per_serving'],
                         'protein_g_per_serving': row['protein_g_per_serving'],
                         'created_at': row['created_at']
-                    }
-
-                    # Filter by tags if specified
-                    if tags:
-                        recipe_tags = recipe_data['tags']
-                        if not any(tag in recipe_tags for tag in tags):
-                            continue
-
-                    recipes.append(recipe_data)
+                    })
 
-                return recipes
+                return {
+                    'recipes': recipes,
+                    'next_cursor': _encode_cursor(rows[-1]) if has_more else None,
+                    'has_more': has_more
+                }
 
         except Exception as e:
             logger.error(f"Error searching recipes: {e}")
-            return []
+            return {'recipes': [], 'next_cursor': None, 'has_more': False}
+
+    @staticmethod
+    def _tag_condition(db_cursor, tags: List[str]) -> str:
+        """
+        SQL condition matching recipes with any of ``tags`` (bind ``tags`` once).
+
+        SQLite does not cost the two plans against each other, so pick by a
+        bounded count: a rare tag is cheapest as the driving set (few rows
+        to sort), a common one as a per-row probe (the first page of the
+        ranking index already holds enough matches).
+        """
+        placeholders = ", ".join("?" for _ in tags)
+        db_cursor.execute(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM recipe_tags WHERE tag IN ({placeholders}) LIMIT ?)",
+            list(tags) + [_TAG_DRIVING_LIMIT],
+        )
+        if db_cursor.fetchone()[0] < _TAG_DRIVING_LIMIT:
+            return f"r.id IN (SELECT recipe_id FROM recipe_tags WHERE tag IN ({placeholders}))"
+        return f"EXISTS (SELECT 1 FROM recipe_tags t WHERE t.recipe_id = r.id AND t.tag IN ({placeholders}))"
 
     async def get_recipe_analytics(self, days: int = 30) -> Dict[str, Any]:
         """
@@ -12,7 +12,10 @@ import uuid
 import logging
 from typing import Optional, List, Dict, Any
 
+from app.config import config
 from app.services.database import DatabaseService
+from app.services.invalidation_bus import TASTE_PROFILE, invalidation_bus
+from app.services.recipes.taste_aggregates import TasteAggregateStore
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +31,9 @@ class RecipeRatingService:
             db_service: DatabaseService instance (optional)
         """
         self.db_service = db_service or DatabaseService()
+        self.taste_aggregates = TasteAggregateStore(
+            self.db_service, half_life_days=config.taste_decay_half_life_days
+        )
 
     async def rate_recipe(
         self,
@@ -41,6 +47,8 @@ class RecipeRatingService:
         """
         Add or update a recipe rating.
 
+        The user's taste aggregates are updated in the same transaction.
+
         Args:
             user_id: User ID
             recipe_id: Recipe ID to rate
@@ -61,12 +69,22 @@ class RecipeRatingService:
             with self.db_service.get_connection() as conn:
                 cursor = conn.cursor()
 
+                cursor.execute("""
+                    SELECT id, rating, made_modifications, would_make_again, created_at
+                    FROM user_recipe_ratings
+                    WHERE user_id = ? AND recipe_id = ?
+                """, (user_id, recipe_id))
+                previous = cursor.fetchall()
+
                 cursor.execute("""
                     INSERT OR REPLACE INTO user_recipe_ratings (
                         id, user_id, recipe_id, rating, review, made_modifications, would_make_again
                     ) VALUES (?, ?, ?, ?, ?, ?, ?)
                 """, (rating_id, user_id, recipe_id, rating, review, made_modifications, would_make_again))
 
+                self._record_taste_aggregates(
+                    conn, user_id, recipe_id, rating, made_modifications, would_make_again, previous
+                )
                 conn.commit()
                 logger.info(f"Added rating for recipe {recipe_id} by user {user_id}: {rating}/5")
                 return rating_id
@@ -75,6 +93,35 @@ class RecipeRatingService:
             logger.error(f"Error rating recipe: {e}")
             raise RuntimeError(f"Failed to rate recipe: {str(e)}")
 
+    def _record_taste_aggregates(
+        self,
+        conn,
+        user_id: str,
+        recipe_id: str,
+        rating: int,
+        made_modifications: bool,
+        would_make_again: Optional[bool],
+        previous: List[Any],
+    ) -> None:
+        """Fold a new rating into the taste aggregates; never fails the rating."""
+        try:
+            replaced = None
+            if previous:
+                # One rating per user and recipe: INSERT OR REPLACE removed the old row
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1 FROM user_recipe_ratings WHERE id = ?", (previous[-1]['id'],))
+                if cursor.fetchone() is None:
+                    replaced = previous[-1]
+            self.taste_aggregates.record_rating(
+                conn, user_id, recipe_id, rating, made_modifications, would_make_again, replaced
+            )
+        except Exception as e:
+            logger.warning(f"Taste aggregates for user {user_id} will be rebuilt: {e}")
+            try:
+                self.taste_aggregates.invalidate(conn, user_id)
+            except Exception as exc:
+                logger.error(f"Failed to invalidate taste aggregates for user {user_id}: {exc}")
+
     async def get_recipe_ratings(self, recipe_id: str) -> Dict[str, Any]:
         """
         Get rating statistics for a recipe.
@@ -203,7 +250,8 @@ class RecipeRatingService:
     async def create_or_update_user_taste_profile(
         self,
         user_id: str,
-        profile_data: Dict[str, Any]
+        profile_data: Dict[str, Any],
+        publish: bool = True
     ) -> bool:
         """
         Create or update user's taste profile.
@@ -211,6 +259,8 @@ class RecipeRatingService:
         Args:
             user_id: User ID
             profile_data: Profile data dictionary
+            publish: Announce the change on the invalidation bus; batch writers
+                pass False and publish once when the batch is done
 
         Returns:
             True if successful
@@ -239,7 +289,10 @@ class RecipeRatingService:
 
                 conn.commit()
                 logger.info(f"Updated taste profile for user {user_id}")
-                return True
+
+            if publish:
+                await invalidation_bus.publish(TASTE_PROFILE, user_id)
+            return True
 
         except Exception as e:
             logger.error(f"Error updating taste profile: {e}")
@@ -284,7 +337,8 @@ class RecipeRatingService:
         self,
         user_id: str,
         cuisine_type: str,
-        preference_score: float
+        preference_score: float,
+        publish: bool = True
     ) -> bool:
         """
         Update user's preference for a cuisine type.
@@ -293,6 +347,7 @@ class RecipeRatingService:
             user_id: User ID
             cuisine_type: Cuisine type
             preference_score: Preference score (-1 to 1)
+            publish: Announce the change on the invalidation bus
 
         Returns:
             True if successful
@@ -317,7 +372,7 @@ class RecipeRatingService:
             # Update confidence based on number of preferences
             profile['profile_confidence'] = min(1.0, len(existing) * 0.1)
 
-            return await self.create_or_update_user_taste_profile(user_id, profile)
+            return await self.create_or_update_user_taste_profile(user_id, profile, publish=publish)
 
         except Exception as e:
             logger.error(f"Error updating cuisine preference: {e}")
@@ -327,7 +382,8 @@ class RecipeRatingService:
         self,
         user_id: str,
         ingredient_name: str,
-        preference_score: float
+        preference_score: float,
+        publish: bool = True
     ) -> bool:
         """
         Update user's preference for an ingredient.
@@ -336,6 +392,7 @@ class RecipeRatingService:
             user_id: User ID
             ingredient_name: Ingredient name
             preference_score: Preference score (-1 to 1)
+            publish: Announce the change on the invalidation bus
 
         Returns:
             True if successful
@@ -361,7 +418,7 @@ class RecipeRatingService:
                 disliked.append({'ingredient': ingredient_name, 'preference': preference_score})
                 profile['disliked_ingredients'] = disliked
 
-            return await self.create_or_update_user_taste_profile(user_id, profile)
+            return await self.create_or_update_user_taste_profile(user_id, profile, publish=publish)
 
         except Exception as e:
             logger.error(f"Error updating ingredient preference: {e}")
@@ -89,6 +89,20 @@ class RecipeSchemaService:
                 )
             """)
 
+            # Recipe tags table (one row per recipe and tag, for indexed tag filters)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS recipe_tags (
+                    tag TEXT NOT NULL,
+                    recipe_id TEXT NOT NULL,
+                    PRIMARY KEY (tag, recipe_id),
+                    FOREIGN KEY (recipe_id) REFERENCES recipes(id) ON DELETE CASCADE
+                ) WITHOUT ROWID
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_recipe_tags_recipe_id ON recipe_tags(recipe_id, tag)")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_recipes_ranking ON recipes(confidence_score, created_at, id)"
+            )
+
             # Recipe ingredients table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS recipe_ingredients (
@@ -189,5 +203,24 @@ class RecipeSchemaService:
                 )
             """)
 
+            # Running rating aggregates per user and cuisine/ingredient (for learning)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS user_taste_aggregates (
+                    user_id TEXT NOT NULL,
+                    dimension TEXT NOT NULL,
+                    item TEXT NOT NULL,
+                    rating_count INTEGER NOT NULL DEFAULT 0,
+                    weight REAL NOT NULL DEFAULT 0,
+                    rating_sum REAL NOT NULL DEFAULT 0,
+                    rating_sq_sum REAL NOT NULL DEFAULT 0,
+                    again_weight REAL NOT NULL DEFAULT 0,
+                    again_sum REAL NOT NULL DEFAULT 0,
+                    mod_weight REAL NOT NULL DEFAULT 0,
+                    mod_sum REAL NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (user_id, dimension, item)
+                )
+            """)
+
             conn.commit()
             logger.info("Recipe tables created successfully")
@@ -0,0 +1,306 @@
+"""
+Taste Aggregate Store
+
+Running per-user rating aggregates for taste learning. Instead of reloading
+a user's rating history and regrouping it on every analysis, each rating
+updates a handful of rows in ``user_taste_aggregates`` (one per cuisine and
+ingredient of the rated recipe, plus a per-user total) holding count, sum,
+sum of squares and the would-make-again / modification tallies. Mean,
+variance and ratios are derived from those sums when read.
+
+With a half-life configured, older ratings decay exponentially: stored sums
+are scaled to the row's ``updated_at`` and brought forward to "now" on each
+update or read, so recent ratings dominate the weights while raw counts
+stay exact.
+
+Users who rated recipes before the table existed are backfilled from their
+history the first time they are read or rate something.
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TOTAL = "total"
+CUISINE = "cuisine"
+INGREDIENT = "ingredient"
+
+_COLUMNS = (
+    "rating_count", "weight", "rating_sum", "rating_sq_sum",
+    "again_weight", "again_sum", "mod_weight", "mod_sum", "updated_at",
+)
+
+
+@dataclass
+class TasteAggregate:
+    """Running sums for one (user, dimension, item)."""
+    rating_count: int = 0
+    weight: float = 0.0
+    rating_sum: float = 0.0
+    rating_sq_sum: float = 0.0
+    again_weight: float = 0.0
+    again_sum: float = 0.0
+    mod_weight: float = 0.0
+    mod_sum: float = 0.0
+    updated_at: float = 0.0
+
+    def decayed(self, now: float, half_life_seconds: Optional[float]) -> "TasteAggregate":
+        """Copy with weighted sums brought forward to ``now``."""
+        factor = _decay_factor(now - self.updated_at, half_life_seconds)
+        return TasteAggregate(
+            rating_count=self.rating_count,
+            weight=self.weight * factor,
+            rating_sum=self.rating_sum * factor,
+            rating_sq_sum=self.rating_sq_sum * factor,
+            again_weight=self.again_weight * factor,
+            again_sum=self.again_sum * factor,
+            mod_weight=self.mod_weight * factor,
+            mod_sum=self.mod_sum * factor,
+            updated_at=now,
+        )
+
+    def add(self, rating: float, made_modifications: Any, would_make_again: Any, weight: float = 1.0) -> None:
+        self._apply(1, rating, made_modifications, would_make_again, weight)
+
+    def remove(self, rating: float, made_modifications: Any, would_make_again: Any, weight: float = 1.0) -> None:
+        """Take back a contribution (a replaced rating) at its decayed weight."""
+        self._apply(-1, rating, made_modifications, would_make_again, -weight)
+
+    def _apply(self, count: int, rating: float, made_modifications: Any, would_make_again: Any, weight: float) -> None:
+        self.rating_count += count
+        self.weight += weight
+        self.rating_sum += weight * rating
+        self.rating_sq_sum += weight * rating * rating
+        if would_make_again is not None:
+            self.again_weight += weight
+            self.again_sum += weight * bool(would_make_again)
+        if made_modifications is not None:
+            self.mod_weight += weight
+            self.mod_sum += weight * bool(made_modifications)
+
+    @property
+    def mean(self) -> float:
+        return self.rating_sum / self.weight if self.weight else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the ratings (0.0 with fewer than two)."""
+        if self.rating_count < 2 or self.weight <= 1:
+            return 0.0
+        return max(0.0, (self.rating_sq_sum - self.rating_sum ** 2 / self.weight) / (self.weight - 1))
+
+    @property
+    def would_make_again_ratio(self) -> float:
+        return self.again_sum / self.again_weight if self.again_weight else 0.0
+
+    @property
+    def modification_ratio(self) -> float:
+        return self.mod_sum / self.mod_weight if self.mod_weight else 0.0
+
+
+def _decay_factor(elapsed_seconds: float, half_life_seconds: Optional[float]) -> float:
+    if not half_life_seconds or elapsed_seconds <= 0:
+        return 1.0
+    return math.exp(-math.log(2) * elapsed_seconds / half_life_seconds)
+
+
+def _parse_timestamp(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return time.time()
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class TasteAggregateStore:
+    """Maintains ``user_taste_aggregates`` alongside ``user_recipe_ratings``."""
+
+    def __init__(self, db_service: Any, half_life_days: Optional[float] = None):
+        """
+        Args:
+            db_service: DatabaseService providing connections
+            half_life_days: Age at which a rating counts half; None disables decay
+        """
+        self.db_service = db_service
+        self.half_life_seconds = half_life_days * 86400 if half_life_days else None
+
+    # ----- Writes -----
+
+    def record_rating(
+        self,
+        conn,
+        user_id: str,
+        recipe_id: str,
+        rating: float,
+        made_modifications: Any,
+        would_make_again: Any,
+        replaced: Optional[Any] = None,
+    ) -> None:
+        """
+        Fold one rating into the user's aggregates inside the caller's transaction.
+
+        The rating row must already be inserted: a user without aggregates is
+        backfilled from history instead, which includes it. ``replaced`` is
+        the user's previous rating row for the recipe when the new one
+        overwrote it; its contribution is taken back.
+        """
+        cursor = conn.cursor()
+        if not self._has_aggregates(cursor, user_id):
+            self._rebuild(cursor, user_id)
+            return
+
+        cursor.execute("SELECT cuisine_type FROM recipes WHERE id = ?", (recipe_id,))
+        recipe = cursor.fetchone()
+        if not recipe:
+            return
+
+        keys = [(TOTAL, "")]
+        if recipe["cuisine_type"]:
+            keys.append((CUISINE, recipe["cuisine_type"]))
+        keys.extend((INGREDIENT, name) for name in self._recipe_ingredients(cursor, [recipe_id]).get(recipe_id, ()))
+
+        now = time.time()
+        current = self._fetch(cursor, user_id, keys)
+        updated = {}
+        for key in keys:
+            aggregate = current.get(key, TasteAggregate(updated_at=now)).decayed(now, self.half_life_seconds)
+            if replaced is not None and key in current and replaced["rating"] is not None:
+                aggregate.remove(
+                    replaced["rating"], replaced["made_modifications"], replaced["would_make_again"],
+                    _decay_factor(now - _parse_timestamp(replaced["created_at"]), self.half_life_seconds),
+                )
+            aggregate.add(rating, made_modifications, would_make_again)
+            updated[key] = aggregate
+        self._write(cursor, user_id, updated)
+
+    def invalidate(self, conn, user_id: str) -> None:
+        """Drop a user's aggregates so the next read rebuilds them from history."""
+        conn.cursor().execute("DELETE FROM user_taste_aggregates WHERE user_id = ?", (user_id,))
+
+    # ----- Reads -----
+
+    def load(self, user_id: str, dimension: str) -> Tuple[int, Dict[str, TasteAggregate]]:
+        """
+        Aggregates for one dimension, decayed to now.
+
+        Returns:
+            (total ratings, {item: aggregate})
+        """
+        with self.db_service.get_connection() as conn:
+            cursor = conn.cursor()
+            if not self._has_aggregates(cursor, user_id):
+                self._rebuild(cursor, user_id)
+                conn.commit()
+            cursor.execute(
+                f"SELECT dimension, item, {', '.join(_COLUMNS)} FROM user_taste_aggregates "
+                "WHERE user_id = ? AND dimension IN (?, ?)",
+                (user_id, TOTAL, dimension),
+            )
+            rows = cursor.fetchall()
+
+        now = time.time()
+        total = 0
+        items: Dict[str, TasteAggregate] = {}
+        for row in rows:
+            aggregate = self._row_to_aggregate(row)
+            if row["dimension"] == TOTAL:
+                total = aggregate.rating_count
+            else:
+                items[row["item"]] = aggregate.decayed(now, self.half_life_seconds)
+        return total, items
+
+    # ----- Internals -----
+
+    @staticmethod
+    def _has_aggregates(cursor, user_id: str) -> bool:
+        cursor.execute(
+            "SELECT 1 FROM user_taste_aggregates WHERE user_id = ? AND dimension = ? AND item = ''",
+            (user_id, TOTAL),
+        )
+        return cursor.fetchone() is not None
+
+    def _rebuild(self, cursor, user_id: str) -> None:
+        """Recompute a user's aggregates from their full rating history."""
+        cursor.execute("""
+            SELECT urr.recipe_id, urr.rating, urr.made_modifications, urr.would_make_again,
+                   urr.created_at, r.cuisine_type
+            FROM user_recipe_ratings urr
+            JOIN recipes r ON urr.recipe_id = r.id
+            WHERE urr.user_id = ?
+        """, (user_id,))
+        ratings = cursor.fetchall()
+        ingredients = self._recipe_ingredients(cursor, {row["recipe_id"] for row in ratings})
+
+        now = time.time()
+        aggregates: Dict[Tuple[str, str], TasteAggregate] = {(TOTAL, ""): TasteAggregate(updated_at=now)}
+        for row in ratings:
+            if row["rating"] is None:
+                continue
+            weight = _decay_factor(now - _parse_timestamp(row["created_at"]), self.half_life_seconds)
+            keys = [(TOTAL, "")]
+            if row["cuisine_type"]:
+                keys.append((CUISINE, row["cuisine_type"]))
+            keys.extend((INGREDIENT, name) for name in ingredients.get(row["recipe_id"], ()))
+            for key in keys:
+                aggregates.setdefault(key, TasteAggregate(updated_at=now)).add(
+                    row["rating"], row["made_modifications"], row["would_make_again"], weight
+                )
+
+        cursor.execute("DELETE FROM user_taste_aggregates WHERE user_id = ?", (user_id,))
+        self._write(cursor, user_id, aggregates)
+        logger.info(f"Rebuilt taste aggregates for user {user_id} from {len(ratings)} ratings")
+
+    @staticmethod
+    def _recipe_ingredients(cursor, recipe_ids: Iterable[str]) -> Dict[str, List[str]]:
+        """Distinct normalised ingredient names per recipe."""
+        recipe_ids = list(recipe_ids)
+        if not recipe_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in recipe_ids)
+        cursor.execute(
+            f"SELECT recipe_id, ingredient_name FROM recipe_ingredients WHERE recipe_id IN ({placeholders})",
+            recipe_ids,
+        )
+        result: Dict[str, List[str]] = {}
+        for row in cursor.fetchall():
+            name = (row["ingredient_name"] or "").lower().strip()
+            names = result.setdefault(row["recipe_id"], [])
+            if name and name not in names:
+                names.append(name)
+        return result
+
+    def _fetch(self, cursor, user_id: str, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], TasteAggregate]:
+        clauses = " OR ".join("(dimension = ? AND item = ?)" for _ in keys)
+        params: List[Any] = [user_id]
+        for dimension, item in keys:
+            params.extend((dimension, item))
+        cursor.execute(
+            f"SELECT dimension, item, {', '.join(_COLUMNS)} FROM user_taste_aggregates "
+            f"WHERE user_id = ? AND ({clauses})",
+            params,
+        )
+        return {(row["dimension"], row["item"]): self._row_to_aggregate(row) for row in cursor.fetchall()}
+
+    @staticmethod
+    def _write(cursor, user_id: str, aggregates: Dict[Tuple[str, str], TasteAggregate]) -> None:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO user_taste_aggregates (user_id, dimension, item, {', '.join(_COLUMNS)}) "
+            f"VALUES (?, ?, ?, {', '.join('?' for _ in _COLUMNS)})",
+            [
+                (user_id, dimension, item, *(getattr(aggregate, column) for column in _COLUMNS))
+                for (dimension, item), aggregate in aggregates.items()
+            ],
+        )
+
+    @staticmethod
+    def _row_to_aggregate(row) -> TasteAggregate:
+        return TasteAggregate(**{column: row[column] for column in _COLUMNS})
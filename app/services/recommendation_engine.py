@@ -10,9 +10,14 @@ personalized recipe recommendations based on user taste profiles.
 
 import logging
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Tuple, Set
+from typing import Dict, List, Optional, Any, Tuple, Set, Sequence
 from datetime import datetime
 
+import numpy as np
+
+from app.config import config
+from app.services.invalidation_bus import TASTE_PROFILE, invalidation_bus
+from app.services.memory_cache import MemoryCache
 from app.services.recipe_database import RecipeDatabaseService
 from app.services.recipe_ai_engine import GeneratedRecipe, RecipeGenerationRequest as EngineRequest
 from app.models.product import Nutriments, ProductResponse
@@ -70,11 +75,20 @@ class RecommendationEngine:
     using specialized scorers. Acts as orchestrator for all recommendation logic.
     """
 
+    # Contribution of each scorer to the overall personalization score
+    PERSONALIZATION_WEIGHTS: Dict[str, float] = {
+        'cuisine': 0.35,
+        'ingredient': 0.30,
+        'time': 0.20,
+        'nutrition': 0.15,
+    }
+
     def __init__(
         self,
         db_service: Optional[RecipeDatabaseService] = None,
         strategies: Optional[List] = None,
-        scorers: Optional[Dict[str, Any]] = None
+        scorers: Optional[Dict[str, Any]] = None,
+        bus: Optional[Any] = None
     ):
         """
         Initialize recommendation engine with database connection and strategies/scorers.
@@ -83,6 +97,7 @@ class RecommendationEngine:
             db_service: Database service for user profiles (optional)
             strategies: List of personalization strategies (optional, uses defaults)
             scorers: Dictionary of scorers by type (optional, uses defaults)
+            bus: Invalidation bus announcing taste-profile writes (optional, uses the shared bus)
         """
         self.db_service = db_service or RecipeDatabaseService()
 
@@ -103,8 +118,22 @@ class RecommendationEngine:
             'nutrition': NutritionScorer(),
         }
 
+        # Taste profiles as stored, and the legacy preference profiles derived
+        # from them. Bounded per worker; entries expire after the TTL and are
+        # dropped as soon as a taste-profile write is announced on the bus.
+        self.taste_profiles = MemoryCache(
+            "recommendation_taste_profiles",
+            max_entries=config.profile_cache_max_entries,
+            default_ttl=config.profile_cache_ttl_seconds,
+        )
+        self.user_profiles = MemoryCache(
+            "recommendation_user_profiles",
+            max_entries=config.profile_cache_max_entries,
+            default_ttl=config.profile_cache_ttl_seconds,
+        )
+        (bus or invalidation_bus).subscribe(TASTE_PROFILE, self.invalidate_user_profile)
+
         # Legacy state used by tests and older API integrations
-        self.user_profiles: Dict[str, UserPreferenceProfile] = {}
         self.feedback_history: List[Any] = []
         self.recommendation_cache_ttl: int = 300
         self.scoring_weights: Dict[str, float] = {
@@ -135,7 +164,7 @@ class RecommendationEngine:
         """
         try:
             # Get user's taste profile
-            profile = await self.db_service.get_user_taste_profile(user_id)
+            profile = await self._get_taste_profile(user_id)
 
             if not profile or profile.get('profile_confidence', 0) < 0.3:
                 logger.info(f"User {user_id} has insufficient taste profile data for personalization")
@@ -187,66 +216,91 @@ class RecommendationEngine:
         """
         try:
             # Get user's taste profile
-            profile = await self.db_service.get_user_taste_profile(user_id)
+            profile = await self._get_taste_profile(user_id)
 
             if not profile:
-                return {
-                    'overall_score': 0.0,
-                    'cuisine_score': 0.0,
-                    'ingredient_score': 0.0,
-                    'time_score': 0.0,
-                    'nutrition_score': 0.0,
-                    'confidence': 0.0,
-                    'explanation': 'No taste profile available'
-                }
+                return self._empty_personalization_score('No taste profile available')
+
+            return self._score_batch([recipe], profile)[0]
 
-            # Orchestrate scorers to compute individual scores
-            cuisine_score = self.scorers['cuisine'].score(recipe, profile)
-            ingredient_score = self.scorers['ingredient'].score(recipe, profile)
-            time_score = self.scorers['time'].score(recipe, profile)
-            nutrition_score = self.scorers['nutrition'].score(recipe, profile)
-
-            # Calculate weighted overall score
-            weights = {
-                'cuisine': 0.35,
-                'ingredient': 0.30,
-                'time': 0.20,
-                'nutrition': 0.15
+        except Exception as e:
+            logger.error(f"Error scoring recipe personalization for user {user_id}: {e}")
+            return {
+                'overall_score': 0.0,
+                'error': str(e)
             }
 
-            overall_score = (
-                cuisine_score * weights['cuisine'] +
-                ingredient_score * weights['ingredient'] +
-                time_score * weights['time'] +
-                nutrition_score * weights['nutrition']
-            )
+    async def score_many(self, recipes: Sequence[GeneratedRecipe], user_id: str) -> List[Dict[str, Any]]:
+        """
+        Score candidate recipes against the user's taste profile in one call.
 
-            # Generate explanations for individual scores
-            explanations = [
-                self.scorers['cuisine'].explain(cuisine_score),
-                self.scorers['ingredient'].explain(ingredient_score),
-                self.scorers['time'].explain(time_score),
-                self.scorers['nutrition'].explain(nutrition_score),
+        The profile is loaded once and each scorer scores the whole batch.
+
+        Returns per-recipe scoring metrics (as score_recipe_personalization,
+        plus 'recipe_id'), best match first
+        """
+        if not recipes:
+            return []
+
+        try:
+            profile = await self._get_taste_profile(user_id)
+
+            if not profile:
+                return [
+                    {
+                        'recipe_id': recipe.id,
+                        **self._empty_personalization_score('No taste profile available'),
+                    }
+                    for recipe in recipes
+                ]
+
+            results = [
+                {'recipe_id': recipe.id, **result}
+                for recipe, result in zip(recipes, self._score_batch(recipes, profile))
             ]
+            results.sort(key=lambda result: result['overall_score'], reverse=True)
+            return results
+
+        except Exception as e:
+            logger.error(f"Error batch scoring {len(recipes)} recipes for user {user_id}: {e}")
+            return [{'recipe_id': recipe.id, 'overall_score': 0.0, 'error': str(e)} for recipe in recipes]
+
+    def _score_batch(self, recipes: Sequence[GeneratedRecipe], profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run every scorer over the batch and combine the weighted scores per recipe."""
+        scores = {
+            name: np.asarray(self.scorers[name].score_many(recipes, profile), dtype=float)
+            for name in self.PERSONALIZATION_WEIGHTS
+        }
+        overall = sum(scores[name] * weight for name, weight in self.PERSONALIZATION_WEIGHTS.items())
+
+        results = []
+        for index in range(len(recipes)):
+            recipe_scores = {name: float(scores[name][index]) for name in self.PERSONALIZATION_WEIGHTS}
+
+            # Generate explanations for individual scores
+            explanations = [self.scorers[name].explain(score) for name, score in recipe_scores.items()]
             # Filter out only the most relevant explanations
             explanations = [e for e in explanations if e]
 
-            return {
-                'overall_score': round(overall_score, 3),
-                'cuisine_score': round(cuisine_score, 3),
-                'ingredient_score': round(ingredient_score, 3),
-                'time_score': round(time_score, 3),
-                'nutrition_score': round(nutrition_score, 3),
+            results.append({
+                'overall_score': round(float(overall[index]), 3),
+                **{f'{name}_score': round(score, 3) for name, score in recipe_scores.items()},
                 'confidence': profile['profile_confidence'],
                 'explanation': "; ".join(explanations) if explanations else "moderately matches your taste profile"
-            }
-
-        except Exception as e:
-            logger.error(f"Error scoring recipe personalization for user {user_id}: {e}")
-            return {
-                'overall_score': 0.0,
-                'error': str(e)
-            }
+            })
+        return results
+
+    @staticmethod
+    def _empty_personalization_score(explanation: str) -> Dict[str, Any]:
+        return {
+            'overall_score': 0.0,
+            'cuisine_score': 0.0,
+            'ingredient_score': 0.0,
+            'time_score': 0.0,
+            'nutrition_score': 0.0,
+            'confidence': 0.0,
+            'explanation': explanation
+        }
 
     def _calculate_nutritional_quality(self, nutriments: Optional[Nutriments]) -> float:
         """Legacy helper retained for compatibility with historical tests."""
@@ -269,14 +323,29 @@ class RecommendationEngine:
             logger.warning(f"Failed to calculate nutritional quality: {exc}")
             return 0.0
 
+    async def _get_taste_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return the user's taste profile from the cache, reading the database on a miss."""
+        profile = self.taste_profiles.get(user_id)
+        if profile is None:
+            # Users without a profile are cached as {} so they are not re-read either
+            profile = await self.db_service.get_user_taste_profile(user_id) or {}
+            self.taste_profiles.set(user_id, profile)
+        return profile or None
+
+    def invalidate_user_profile(self, user_id: str) -> None:
+        """Forget cached profiles for ``user_id`` (called by the invalidation bus)."""
+        self.taste_profiles.delete(user_id)
+        self.user_profiles.delete(user_id)
+
     async def _load_user_profile(self, user_id: str) -> Optional[UserPreferenceProfile]:
         """Retrieve cached user profile or fall back to database lookup."""
 
-        if user_id in self.user_profiles:
-            return self.user_profiles[user_id]
+        profile = self.user_profiles.get(user_id)
+        if profile is not None:
+            return profile
 
         try:
-            profile_data = await self.db_service.get_user_taste_profile(user_id)
+            profile_data = await self._get_taste_profile(user_id)
         except Exception as exc:
             logger.warning(f"Failed to load user profile for {user_id}: {exc}")
             return None
@@ -296,7 +365,7 @@ class RecommendationEngine:
             last_updated=datetime.utcnow(),
         )
 
-        self.user_profiles[user_id] = profile
+        self.user_profiles.set(user_id, profile)
         return profile
 
     def _load_available_products(self, request: SmartRecommendationRequest) -> List[ProductResponse]:
@@ -313,7 +382,7 @@ class RecommendationEngine:
         profile = self.user_profiles.get(feedback.user_id)
         if not profile:
             profile = UserPreferenceProfile(interaction_count=0)
-            self.user_profiles[feedback.user_id] = profile
+            self.user_profiles.set(feedback.user_id, profile)
 
         profile.interaction_count += 1
         profile.last_updated = datetime.utcnow()
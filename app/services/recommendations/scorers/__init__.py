@@ -9,6 +9,7 @@ Task: Phase 2 Tarea 4 - Recommendation Engine Refactoring
 from .base_scorer import RecipeScorer
 from .cuisine_scorer import CuisineScorer
 from .ingredient_scorer import IngredientScorer
+from .ingredient_matcher import IngredientMatcher
 from .time_scorer import TimeScorer
 from .nutrition_scorer import NutritionScorer
 
@@ -16,6 +17,7 @@ __all__ = [
     "RecipeScorer",
     "CuisineScorer",
     "IngredientScorer",
+    "IngredientMatcher",
     "TimeScorer",
     "NutritionScorer",
 ]
@@ -8,7 +8,9 @@ Task: Phase 2 Tarea 4 - Recommendation Engine Refactoring
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Sequence
+
+import numpy as np
 
 from app.services.recipe_ai_engine import GeneratedRecipe
 
@@ -22,6 +24,8 @@ class RecipeScorer(ABC):
 
     Contract:
     - score() must return a float between 0.0 and 1.0
+    - score_many() must agree with score() element-wise; override it to
+      score a batch without per-recipe Python work
     - explain() should provide human-readable explanation of the score
     - Scorers should be stateless and reusable
     """
@@ -44,6 +48,23 @@ class RecipeScorer(ABC):
         """
         pass
 
+    def score_many(
+        self,
+        recipes: Sequence[GeneratedRecipe],
+        profile: Dict[str, Any]
+    ) -> np.ndarray:
+        """
+        Score a batch of recipes against one profile.
+
+        Args:
+            recipes: The recipes to score
+            profile: User taste profile data from database
+
+        Returns:
+            Array of scores aligned with ``recipes``
+        """
+        return np.fromiter((self.score(recipe, profile) for recipe in recipes), dtype=float, count=len(recipes))
+
     @abstractmethod
     def explain(self, score: float) -> str:
         """
@@ -8,7 +8,9 @@ Task: Phase 2 Tarea 4 - Recommendation Engine Refactoring
 
 import logging
 import statistics
-from typing import Dict, Any
+from typing import Dict, Any, Sequence
+
+import numpy as np
 
 from app.services.recipe_ai_engine import GeneratedRecipe
 from app.services.recommendations.scorers.base_scorer import RecipeScorer
@@ -56,6 +58,33 @@ class CuisineScorer(RecipeScorer):
 
         return max(0.0, min(1.0, (avg_score + 1.0) / 2.0))
 
+    def score_many(
+        self,
+        recipes: Sequence[GeneratedRecipe],
+        profile: Dict[str, Any]
+    ) -> np.ndarray:
+        """Score a batch with one lookup table built from the profile."""
+
+        cuisine_preferences = profile.get('cuisine_preferences', [])
+        if not cuisine_preferences:
+            return np.full(len(recipes), 0.5)
+
+        # First preference listed for a cuisine wins, as in score()
+        raw_scores: Dict[str, float] = {}
+        for pref in cuisine_preferences:
+            raw_scores.setdefault(pref.get('cuisine', '').lower(), pref.get('score', 0.0))
+        fallback = statistics.mean([pref.get('score', 0.0) for pref in cuisine_preferences])
+
+        raw = np.fromiter(
+            (
+                raw_scores.get(recipe.cuisine_type.lower() if recipe.cuisine_type else "", fallback)
+                for recipe in recipes
+            ),
+            dtype=float,
+            count=len(recipes),
+        )
+        return np.clip((raw + 1.0) / 2.0, 0.0, 1.0)
+
     def explain(self, score: float) -> str:
         """Generate explanation for cuisine score."""
         if score >= 0.7:
@@ -0,0 +1,79 @@
+"""
+Ingredient Matcher
+
+Aho-Corasick automaton over a profile's liked and disliked ingredient names.
+Finds every pattern occurring as a substring of an ingredient name in one
+pass over the name, instead of testing each preference against each recipe
+ingredient in turn. Matches are memoised per distinct ingredient name, so
+common ingredients (salt, olive oil, ...) are scanned once per batch.
+"""
+
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List
+
+
+class IngredientMatcher:
+    """Multi-pattern substring matcher returning pattern ids per text."""
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Args:
+            patterns: Lower-cased names; a pattern's id is its position
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[FrozenSet[int]] = [frozenset()]
+        self._cache: Dict[str, FrozenSet[int]] = {}
+
+        outputs: List[set] = [set()]
+        for pattern_id, pattern in enumerate(patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(pattern_id)
+
+        # Breadth-first failure links; each state inherits its fallback's matches
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                outputs[next_state] |= outputs[self._fail[next_state]]
+        self._output = [frozenset(ids) for ids in outputs]
+
+    def match(self, text: str) -> FrozenSet[int]:
+        """Ids of all patterns occurring in ``text``."""
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+
+        found: set = set()
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            found |= self._output[state]
+        result = frozenset(found)
+        self._cache[text] = result
+        return result
+
+    def match_any(self, texts: Iterable[str]) -> FrozenSet[int]:
+        """Ids of patterns occurring in at least one of ``texts``."""
+        found: set = set()
+        for text in texts:
+            found |= self.match(text)
+        return frozenset(found)
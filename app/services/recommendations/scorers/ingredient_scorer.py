@@ -7,10 +7,13 @@ Task: Phase 2 Tarea 4 - Recommendation Engine Refactoring
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Sequence
+
+import numpy as np
 
 from app.services.recipe_ai_engine import GeneratedRecipe
 from app.services.recommendations.scorers.base_scorer import RecipeScorer
+from app.services.recommendations.scorers.ingredient_matcher import IngredientMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +72,51 @@ class IngredientScorer(RecipeScorer):
         net_score = (positive_score - negative_score) / matches
         return max(0.0, min(1.0, (net_score + 1.0) / 2.0))
 
+    def score_many(
+        self,
+        recipes: Sequence[GeneratedRecipe],
+        profile: Dict[str, Any]
+    ) -> np.ndarray:
+        """
+        Score a batch with the preferences compiled into one matcher.
+
+        Each liked or disliked entry becomes a pattern; a recipe's matches
+        form a row of a (recipes x preferences) matrix, and the net score is
+        a matrix-vector product over signed preference weights.
+        """
+
+        liked_ingredients = profile.get('liked_ingredients', [])
+        disliked_ingredients = profile.get('disliked_ingredients', [])
+
+        if not liked_ingredients and not disliked_ingredients:
+            return np.full(len(recipes), 0.5)
+
+        patterns = []
+        weights = []
+        for liked in liked_ingredients:
+            patterns.append(liked.get('ingredient', '').lower())
+            weights.append(liked.get('preference', 0.0))
+        for disliked in disliked_ingredients:
+            patterns.append(disliked.get('ingredient', '').lower())
+            weights.append(-abs(disliked.get('preference', 0.0)))
+
+        matcher = IngredientMatcher(patterns)
+        hits = np.zeros((len(recipes), len(patterns)), dtype=float)
+        for row, recipe in enumerate(recipes):
+            names = [ing.name.lower() for ing in recipe.ingredients] if recipe.ingredients else []
+            matched = matcher.match_any(names)
+            if matched:
+                hits[row, list(matched)] = 1.0
+
+        matches = hits.sum(axis=1)
+        net_score = np.divide(
+            hits @ np.asarray(weights, dtype=float), matches,
+            out=np.zeros(len(recipes)), where=matches > 0
+        )
+        scores = np.clip((net_score + 1.0) / 2.0, 0.0, 1.0)
+        # No ingredient matches, neutral score
+        return np.where(matches > 0, scores, 0.5)
+
     def explain(self, score: float) -> str:
         """Generate explanation for ingredient score."""
         if score >= 0.7:
@@ -7,7 +7,9 @@ Task: Phase 2 Tarea 4 - Recommendation Engine Refactoring
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Sequence
+
+import numpy as np
 
 from app.services.recipe_ai_engine import GeneratedRecipe
 from app.services.recommendations.scorers.base_scorer import RecipeScorer
@@ -66,6 +68,29 @@ class NutritionScorer(RecipeScorer):
         # For now, calorie score is the primary signal
         return calorie_score
 
+    def score_many(
+        self,
+        recipes: Sequence[GeneratedRecipe],
+        profile: Dict[str, Any]
+    ) -> np.ndarray:
+        """Score a batch of recipe calories as arrays."""
+
+        preferred_calories = profile.get(
+            'preferred_calories_per_serving',
+            self.preferred_calories_per_serving
+        )
+
+        # NaN marks recipes without nutrition data, which score neutral
+        calories = np.array(
+            [
+                (recipe.nutrition.calories_per_serving or 0.0) if recipe.nutrition else np.nan
+                for recipe in recipes
+            ],
+            dtype=float,
+        )
+        calorie_score = np.maximum(0.0, 1.0 - np.abs(calories - preferred_calories) / self.max_calorie_penalty)
+        return np.where(np.isnan(calories), 0.5, calorie_score)
+
     def explain(self, score: float) -> str:
         """Generate explanation for nutrition score."""
         if score >= 0.7:
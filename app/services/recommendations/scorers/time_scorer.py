@@ -7,7 +7,9 @@ Task: Phase 2 Tarea 4 - Recommendation Engine Refactoring
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Sequence
+
+import numpy as np
 
 from app.services.recipe_ai_engine import GeneratedRecipe
 from app.services.recommendations.scorers.base_scorer import RecipeScorer
@@ -73,6 +75,25 @@ class TimeScorer(RecipeScorer):
         # Average the two scores
         return (prep_score + cook_score) / 2.0
 
+    def score_many(
+        self,
+        recipes: Sequence[GeneratedRecipe],
+        profile: Dict[str, Any]
+    ) -> np.ndarray:
+        """Score a batch of recipe timings as arrays."""
+
+        preferred_prep = profile.get('preferred_prep_time_minutes', self.preferred_prep_minutes)
+        preferred_cook = profile.get('preferred_cook_time_minutes', self.preferred_cook_minutes)
+
+        times = np.array(
+            [(recipe.prep_time_minutes or 0.0, recipe.cook_time_minutes or 0.0) for recipe in recipes],
+            dtype=float,
+        ).reshape(-1, 2)
+
+        prep_score = np.maximum(0.0, 1.0 - np.abs(times[:, 0] - preferred_prep) / self.max_prep_penalty)
+        cook_score = np.maximum(0.0, 1.0 - np.abs(times[:, 1] - preferred_cook) / self.max_cook_penalty)
+        return (prep_score + cook_score) / 2.0
+
     def explain(self, score: float) -> str:
         """Generate explanation for time score."""
         if score >= 0.7:
@@ -0,0 +1,117 @@
+"""
+Request-scoped data loader.
+
+Authentication, profiles, follows and blocks keep re-reading the same rows
+for the viewer and the users on screen, often several times within one
+request (the discover feed checks block and visibility state for every
+candidate post). ``RequestLoader`` is an identity map that lives for a single
+request: each (namespace, key) is read from the database at most once.
+Services that know up front which keys they will need call ``prime`` with
+the result of one batched query, so the per-item reads that follow are
+answered from memory.
+
+``request_scope`` installs a loader for the current context; ``main.py``
+opens one per HTTP request. Outside a scope every lookup gets a throwaway
+loader, so code paths behave exactly as they would without it. Writers call
+``invalidate_request_cache`` so later reads in the same request see their
+changes.
+"""
+
+import asyncio
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_current_loader: ContextVar[Optional["RequestLoader"]] = ContextVar("request_loader", default=None)
+
+
+class RequestLoader:
+    """Identity map for one request, keyed by (namespace, key)."""
+
+    def __init__(self):
+        self._maps: Dict[str, Dict[Hashable, Any]] = {}
+        self._inflight: Dict[Tuple[str, Hashable], "asyncio.Task[Any]"] = {}
+        self.metrics = {
+            'hits': 0,
+            'loads': 0,
+            'primed': 0,
+        }
+
+    def _map(self, namespace: str) -> Dict[Hashable, Any]:
+        return self._maps.setdefault(namespace, {})
+
+    def missing(self, namespace: str, keys: Iterable[Hashable]) -> List[Hashable]:
+        """Distinct ``keys`` not yet known in ``namespace``, in input order."""
+        known = self._map(namespace)
+        return [key for key in dict.fromkeys(keys) if key not in known]
+
+    def prime(self, namespace: str, values: Dict[Hashable, Any]) -> None:
+        """Record values fetched by a batched query."""
+        self._map(namespace).update(values)
+        self.metrics['primed'] += len(values)
+
+    def load(self, namespace: str, key: Hashable, fetch: Callable[[Hashable], Any]) -> Any:
+        """Return the value for ``key``, calling ``fetch(key)`` only the first time."""
+        known = self._map(namespace)
+        if key in known:
+            self.metrics['hits'] += 1
+            return known[key]
+        value = known[key] = fetch(key)
+        self.metrics['loads'] += 1
+        return value
+
+    async def load_async(self, namespace: str, key: Hashable, fetch: Callable[[Hashable], Awaitable[Any]]) -> Any:
+        """Async ``load``; concurrent loads of the same key share a single fetch."""
+        known = self._map(namespace)
+        if key in known:
+            self.metrics['hits'] += 1
+            return known[key]
+
+        slot = (namespace, key)
+        task = self._inflight.get(slot)
+        if task is None:
+            task = self._inflight[slot] = asyncio.ensure_future(fetch(key))
+            task.add_done_callback(lambda _: self._inflight.pop(slot, None))
+            self.metrics['loads'] += 1
+        value = await asyncio.shield(task)
+        known[key] = value
+        return value
+
+    def invalidate(self, namespace: Optional[str] = None, key: Optional[Hashable] = None) -> None:
+        """Forget one key, one namespace, or everything."""
+        if namespace is None:
+            self._maps.clear()
+        elif key is None:
+            self._maps.pop(namespace, None)
+        else:
+            self._map(namespace).pop(key, None)
+
+
+def get_request_loader() -> RequestLoader:
+    """The loader of the current request, or a throwaway one outside a scope."""
+    return _current_loader.get() or RequestLoader()
+
+
+@contextmanager
+def request_scope() -> Iterator[RequestLoader]:
+    """Share one loader for the enclosed code; nested scopes reuse the outer one."""
+    loader = _current_loader.get()
+    if loader is not None:
+        yield loader
+        return
+    loader = RequestLoader()
+    token = _current_loader.set(loader)
+    try:
+        yield loader
+    finally:
+        _current_loader.reset(token)
+
+
+def invalidate_request_cache(namespace: Optional[str] = None, key: Optional[Hashable] = None) -> None:
+    """Drop stale entries from the active loader after a write."""
+    loader = _current_loader.get()
+    if loader is not None:
+        loader.invalidate(namespace, key)
@@ -6,9 +6,12 @@ Coverage Goal: 88%+ (target: 80%+)
 
 from typing import Optional
 from datetime import datetime
+import asyncio
 import uuid
 import logging
 from app.services.database import DatabaseService
+from app.services.maintenance import delete_in_batches
+from app.services.token_revocation import SESSION, USER, TokenRevocationStore, token_revocations
 from app.models.user import UserSession
 
 
@@ -26,15 +29,17 @@ class SessionService:
     - Cleanup of expired sessions
     """
 
-    def __init__(self, db_service: DatabaseService):
+    def __init__(self, db_service: DatabaseService, revocations: Optional[TokenRevocationStore] = None):
         """Initialize SessionService with database dependency.
 
         Args:
             db_service: DatabaseService instance for database operations
+            revocations: Revocation set told about deleted sessions
 
         Task: Phase 2 Batch 7 - Session Service Extraction
         """
         self.db = db_service
+        self.revocations = revocations or token_revocations
 
     async def create_session(self, session: UserSession) -> str:
         """Create a new user session with tokens.
@@ -43,13 +48,13 @@ class SessionService:
             session: UserSession object with user_id, tokens, expiration
 
         Returns:
-            Created session ID (UUID)
+            Created session ID (``session.id`` when preassigned, else a new UUID)
 
         Coverage Goal: Test successful creation, UUID generation, token storage
 
         Task: Phase 2 Batch 7 - Session Service Extraction
         """
-        session_id = str(uuid.uuid4())
+        session_id = session.id or str(uuid.uuid4())
 
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
@@ -194,6 +199,7 @@ class SessionService:
             cursor = conn.cursor()
             try:
                 cursor.execute("DELETE FROM user_sessions WHERE id = ?", (session_id,))
+                self.revocations.revoke(SESSION, session_id, conn=conn)
                 conn.commit()
 
                 logger.info(f"Deleted session {session_id}")
@@ -219,6 +225,7 @@ class SessionService:
             cursor = conn.cursor()
             try:
                 cursor.execute("DELETE FROM user_sessions WHERE user_id = ?", (user_id,))
+                self.revocations.revoke(USER, user_id, conn=conn)
                 conn.commit()
 
                 deleted = cursor.rowcount
@@ -230,9 +237,16 @@ class SessionService:
                 logger.error(f"Failed to delete sessions for user {user_id}: {e}")
                 return 0
 
-    async def cleanup_expired_sessions(self) -> int:
+    async def cleanup_expired_sessions(self, batch_size: int = 500, pause: float = 0.0) -> int:
         """Clean up expired sessions (housekeeping task).
 
+        Rows are deleted ``batch_size`` at a time on a worker thread, so the
+        SQLite writer lock is released between chunks.
+
+        Args:
+            batch_size: Maximum sessions deleted per transaction
+            pause: Seconds to wait between chunks
+
         Returns:
             Number of sessions deleted
 
@@ -240,23 +254,18 @@ class SessionService:
 
         Task: Phase 2 Batch 7 - Session Service Extraction
         """
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            try:
-                now = datetime.utcnow().isoformat()
-                cursor.execute(
-                    "DELETE FROM user_sessions WHERE expires_at < ?", (now,)
-                )
-                conn.commit()
-
-                deleted = cursor.rowcount
-                if deleted > 0:
-                    logger.info(f"Cleaned up {deleted} expired sessions")
+        try:
+            now = datetime.utcnow().isoformat()
+            deleted = await asyncio.to_thread(
+                delete_in_batches, self.db, "user_sessions", "expires_at < ?", (now,), batch_size, pause
+            )
+            if deleted > 0:
+                logger.info(f"Cleaned up {deleted} expired sessions")
 
-                return deleted
-            except Exception as e:
-                logger.error(f"Failed to cleanup expired sessions: {e}")
-                return 0
+            return deleted
+        except Exception as e:
+            logger.error(f"Failed to cleanup expired sessions: {e}")
+            return 0
 
     def _row_to_session(self, row) -> UserSession:
         """Convert database row to UserSession object.
@@ -1252,9 +1252,10 @@ class ShoppingOptimizationService:
         """
         # Task 11 related comment: Retrieve recipe data for ingredient extraction
         recipes_data = []
+        recipes_by_id = await self.db_service.get_recipes_by_ids(recipe_ids)
 
         for recipe_id in recipe_ids:
-            recipe = await self.db_service.get_recipe_by_id(recipe_id)
+            recipe = recipes_by_id.get(recipe_id)
             if recipe:
                 recipes_data.append(recipe)
             else:
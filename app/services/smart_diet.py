@@ -26,14 +26,34 @@ from app.models.product import ProductResponse
 from app.models.meal_plan import MealPlanResponse
 from app.services.cache import cache_service
 from app.services.smart_diet_cache import get_smart_diet_cache
+from app.services.learning_signals import LearningSignalStore
+from app.services.stage_graph import Stage, run_stages
 from app.services.plan_storage import plan_storage
 from app.services.product_discovery import product_discovery_service
 from app.services.database import db_service
+from app.services.product_search import product_search_service, term_matches
+from app.services.memory_cache import MemoryCache
+from app.services.nutrient_index import NutrientRule, nutrient_index
 from app.services.translation_service import get_translation_service
 from app.services.openfoodfacts import openfoodfacts_service
 
 logger = logging.getLogger(__name__)
 
+# Swap criteria matched against the nutrient index: ≥20% fewer calories,
+# ≥20% more protein or ≥30% less fat than the current item.
+HEALTHIER_SWAP_RULES = (
+    NutrientRule("kcal", 0.8),
+    NutrientRule("protein", 1.2),
+    NutrientRule("fat", 0.7),
+)
+
+# Name -> product resolutions only change when the catalog does; misses are
+# retried sooner so newly imported products are picked up.
+PRODUCT_RESOLUTION_TTL = 6 * 3600
+PRODUCT_MISS_TTL = 10 * 60
+# Cached marker for a name that resolved to no product
+_NOT_FOUND = object()
+
 
 class OptimizationEngine:
     """
@@ -41,9 +61,16 @@ class OptimizationEngine:
     Analyzes existing meal plans and suggests improvements.
     """
     
+    # Rows fetched per name when several names share one search query
+    BATCH_ROWS_PER_NAME = 5
+    
     def __init__(self):
         self.optimization_rules = self._initialize_optimization_rules()
         self.food_swap_database = self._initialize_swap_database()
+        nutrient_index.register_partitions(self.food_swap_database)
+        self.product_cache = MemoryCache(
+            "smart_diet_products", max_entries=2048, default_ttl=PRODUCT_RESOLUTION_TTL
+        )
     
     def _initialize_optimization_rules(self) -> List[Dict[str, Any]]:
         """Initialize optimization rules and logic"""
@@ -112,61 +139,151 @@ class OptimizationEngine:
             "fruits": ["apple", "banana", "orange", "berries", "grapes"]
         }
 
+    @staticmethod
+    def _normalise_product_name(name: Optional[str]) -> str:
+        return " ".join((name or "").lower().split())
+
     async def _resolve_product_for_name(self, name: str) -> Optional[ProductResponse]:
         """Resolve a product by name from DB, with emergency fallback."""
-        cleaned = (name or "").strip().lower()
-        if not cleaned:
+        key = self._normalise_product_name(name)
+        if not key:
             return None
+        resolved = await self.resolve_products([key])
+        return resolved.get(key)
 
+    async def resolve_products(
+        self,
+        names: List[str],
+        allow_remote: bool = True
+    ) -> Dict[str, Optional[ProductResponse]]:
+        """
+        Resolve product names, keyed by normalised name.
+
+        Cached names are answered from memory; the rest are looked up in the
+        product database with a single search, and only names the database
+        does not know go to OpenFoodFacts (concurrently). Misses are cached
+        for a shorter time so they are not retried on every request.
+        """
+        resolved: Dict[str, Optional[ProductResponse]] = {}
+        pending: List[str] = []
+        for name in names:
+            key = self._normalise_product_name(name)
+            if not key or key in resolved or key in pending:
+                continue
+            cached = self.product_cache.get(key)
+            if cached is None:
+                pending.append(key)
+            else:
+                resolved[key] = None if cached is _NOT_FOUND else cached
+        if not pending:
+            return resolved
+
+        found = self._lookup_products(pending)
+        lookup_failed = found is None
+        found = found or {}
+
+        remote = [key for key in pending if key not in found]
+        if remote and allow_remote:
+            results = await asyncio.gather(
+                *(openfoodfacts_service.search_product_by_name(key) for key in remote),
+                return_exceptions=True,
+            )
+            for key, result in zip(remote, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"OpenFoodFacts search failed for {key}: {result}")
+                    lookup_failed = True
+                elif result is not None:
+                    found[key] = result
+
+        for key in pending:
+            product = found.get(key)
+            resolved[key] = product
+            if product is not None:
+                self.product_cache.set(key, product)
+            elif allow_remote and not lookup_failed:
+                self.product_cache.set(key, _NOT_FOUND, ttl=PRODUCT_MISS_TTL)
+        return resolved
+
+    def _lookup_products(self, keys: List[str]) -> Optional[Dict[str, ProductResponse]]:
+        """Match normalised names to products in one query; None when the lookup failed."""
         try:
             with db_service.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    SELECT * FROM products
-                    WHERE lower(name) LIKE ?
-                    ORDER BY access_count DESC, last_updated DESC
-                    LIMIT 1
-                    """,
-                    (f"%{cleaned}%",)
-                )
-                row = cursor.fetchone()
-                if row:
-                    try:
-                        import json as _json
-                        from app.models.product import Nutriments
-
-                        nutriments_data = _json.loads(row["nutriments"])
-                        nutriments = Nutriments(
-                            energy_kcal_per_100g=nutriments_data.get("energy_kcal_per_100g"),
-                            protein_g_per_100g=nutriments_data.get("protein_g_per_100g"),
-                            fat_g_per_100g=nutriments_data.get("fat_g_per_100g"),
-                            carbs_g_per_100g=nutriments_data.get("carbs_g_per_100g"),
-                            sugars_g_per_100g=nutriments_data.get("sugars_g_per_100g"),
-                            salt_g_per_100g=nutriments_data.get("salt_g_per_100g"),
-                        )
-                        return ProductResponse(
-                            source=row["source"] or "Database",
-                            barcode=row["barcode"],
-                            name=row["name"],
-                            brand=row["brand"],
-                            image_url=row["image_url"],
-                            serving_size=row["serving_size"],
-                            nutriments=nutriments,
-                            fetched_at=datetime.fromisoformat(row["last_updated"]),
-                        )
-                    except Exception as exc:
-                        logger.warning(f"Failed to build product from DB row for {name}: {exc}")
+                limit = len(keys) * self.BATCH_ROWS_PER_NAME
+                rows = product_search_service.search(conn, keys, columns=("name",), limit=limit)
+                matches: Dict[str, Any] = {}
+                for row in rows:
+                    for key in keys:
+                        if key not in matches and term_matches(key, row["name"] or ""):
+                            matches[key] = row
+                if len(rows) >= limit:
+                    # Truncated result: popular names may have crowded others out
+                    for key in keys:
+                        if key not in matches:
+                            rows = product_search_service.search(conn, [key], columns=("name",), limit=1)
+                            if rows:
+                                matches[key] = rows[0]
         except Exception as exc:
-            logger.warning(f"Product lookup by name failed for {name}: {exc}")
+            logger.warning(f"Product lookup by name failed for {keys}: {exc}")
+            return None
 
+        products = {}
+        for key, row in matches.items():
+            product = self._product_from_row(row)
+            if product is not None:
+                products[key] = product
+        return products
+
+    def _product_from_row(self, row) -> Optional[ProductResponse]:
         try:
-            return await openfoodfacts_service.search_product_by_name(cleaned)
+            from app.models.product import Nutriments
+
+            nutriments_data = json.loads(row["nutriments"])
+            nutriments = Nutriments(
+                energy_kcal_per_100g=nutriments_data.get("energy_kcal_per_100g"),
+                protein_g_per_100g=nutriments_data.get("protein_g_per_100g"),
+                fat_g_per_100g=nutriments_data.get("fat_g_per_100g"),
+                carbs_g_per_100g=nutriments_data.get("carbs_g_per_100g"),
+                sugars_g_per_100g=nutriments_data.get("sugars_g_per_100g"),
+                salt_g_per_100g=nutriments_data.get("salt_g_per_100g"),
+            )
+            return ProductResponse(
+                source=row["source"] or "Database",
+                barcode=row["barcode"],
+                name=row["name"],
+                brand=row["brand"],
+                image_url=row["image_url"],
+                serving_size=row["serving_size"],
+                nutriments=nutriments,
+                fetched_at=datetime.fromisoformat(row["last_updated"]),
+            )
         except Exception as exc:
-            logger.warning(f"OpenFoodFacts search failed for {name}: {exc}")
+            logger.warning(f"Failed to build product from DB row for {row['name']}: {exc}")
             return None
 
-        return None
+    def _rule_product_names(self, rules: List[Dict]) -> List[str]:
+        """Names of the products suggested by ``rules`` that need resolving"""
+        names = []
+        for rule in rules:
+            for suggestion_def in rule.get("suggestions", []):
+                target = suggestion_def.get("to") or suggestion_def.get("add")
+                if not target:
+                    continue
+                barcode = target.get("barcode")
+                if not barcode or not barcode.isdigit():
+                    names.append(target.get("name", ""))
+        return names
+
+    async def warm_product_cache(self) -> int:
+        """
+        Preload rule product resolutions and swap-category candidates.
+
+        Only the local database is consulted, so startup never waits on
+        OpenFoodFacts. Returns the number of cached entries.
+        """
+        await self.resolve_products(self._rule_product_names(self.optimization_rules), allow_remote=False)
+        for category in self.food_swap_database:
+            self._category_candidates(category)
+        return len(self.product_cache)
 
     def _nutrition_from_product(self, product: Optional[ProductResponse]) -> Optional[Dict[str, float]]:
         """Extract a complete macro snapshot from a ProductResponse."""
@@ -194,17 +311,26 @@ class OptimizationEngine:
         optimizations = []
         
         try:
+            # Decide which rules fire per meal first so every product they
+            # suggest is resolved in one batch rather than per meal item
+            triggered = []
             for meal in meal_plan.meals:
-                # Calculate current meal nutrition
                 meal_nutrition = self._calculate_meal_nutrition(meal)
-                
-                # Check against optimization rules
-                for rule in self.optimization_rules:
-                    if self._should_apply_rule(rule, meal_nutrition, user_goals):
-                        suggestions = await self._generate_rule_suggestions(
-                            rule, meal, meal_nutrition, user_goals
-                        )
-                        optimizations.extend(suggestions)
+                rules = [
+                    rule for rule in self.optimization_rules
+                    if self._should_apply_rule(rule, meal_nutrition, user_goals)
+                ]
+                triggered.append((meal, meal_nutrition, rules))
+            await self.resolve_products(
+                self._rule_product_names([rule for _, _, rules in triggered for rule in rules])
+            )
+            
+            for meal, meal_nutrition, rules in triggered:
+                for rule in rules:
+                    suggestions = await self._generate_rule_suggestions(
+                        rule, meal, meal_nutrition, user_goals
+                    )
+                    optimizations.extend(suggestions)
                 
                 # Check for specific food swaps
                 swap_suggestions = await self._generate_swap_suggestions(meal, user_goals)
@@ -450,92 +576,41 @@ class OptimizationEngine:
         category: str, 
         goals: Dict
     ) -> List[Dict]:
-        """Find healthier alternatives from database"""
+        """Find healthier alternatives from the nutrient index, falling back to a database search"""
         try:
             alternatives = []
             
             # Get current item's nutritional profile
-            current_calories = getattr(current_item.macros, 'calories', 0)
-            current_protein = getattr(current_item.macros, 'protein_g', 0)
-            current_fat = getattr(current_item.macros, 'fat_g', 0)
+            current = {
+                "calories": getattr(current_item.macros, 'calories', 0),
+                "protein": getattr(current_item.macros, 'protein_g', 0),
+                "fat": getattr(current_item.macros, 'fat_g', 0),
+            }
             
-            # Search database for similar products in same category
-            with db_service.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Build search query based on category
-                category_keywords = self.food_swap_database.get(category, [])
-                keyword_conditions = []
-                params = []
-                
-                for keyword in category_keywords:
-                    keyword_conditions.append("(LOWER(name) LIKE ? OR LOWER(categories) LIKE ?)")
-                    params.extend([f"%{keyword}%", f"%{keyword}%"])
-                
-                if not keyword_conditions:
-                    return alternatives
-                
-                where_clause = f"WHERE {' OR '.join(keyword_conditions)}"
-                params.append(10)  # Limit results
-                
-                cursor.execute(f"""
-                    SELECT * FROM products p
-                    {where_clause}
-                    AND json_extract(p.nutriments, '$.energy_kcal_per_100g') IS NOT NULL
-                    AND json_extract(p.nutriments, '$.protein_g_per_100g') IS NOT NULL
-                    AND json_extract(p.nutriments, '$.fat_g_per_100g') IS NOT NULL
-                    AND json_extract(p.nutriments, '$.carbs_g_per_100g') IS NOT NULL
-                    ORDER BY p.access_count DESC
-                    LIMIT ?
-                """, params)
-                
-                rows = cursor.fetchall()
-                
-                for row in rows:
-                    try:
-                        import json
-                        nutriments = json.loads(row['nutriments'])
-                        
-                        # Calculate improvement potential
-                        alt_calories = nutriments.get('energy_kcal_per_100g', 0) or 0
-                        alt_protein = nutriments.get('protein_g_per_100g', 0) or 0
-                        alt_fat = nutriments.get('fat_g_per_100g', 0) or 0
-                        alt_carbs = nutriments.get('carbs_g_per_100g', 0) or 0
-
-                        # Determine if this is a better alternative
-                        improvements = {}
-                        reasoning_parts = []
-                        
-                        if alt_calories < current_calories * 0.8:  # 20% fewer calories
-                            improvements['calories'] = current_calories - alt_calories
-                            reasoning_parts.append("lower calorie option")
-                        
-                        if alt_protein > current_protein * 1.2:  # 20% more protein
-                            improvements['protein_g'] = alt_protein - current_protein
-                            reasoning_parts.append("higher protein content")
-                        
-                        if alt_fat < current_fat * 0.7:  # 30% less fat
-                            improvements['fat_g'] = current_fat - alt_fat
-                            reasoning_parts.append("reduced fat")
-                        
-                        # Only suggest if there are meaningful improvements
-                        if improvements:
-                            alternatives.append({
-                                "name": row['name'],
-                                "barcode": row['barcode'],
-                                "nutrition": {
-                                    "calories": alt_calories,
-                                    "protein": alt_protein,
-                                    "fat": alt_fat,
-                                    "carbs": alt_carbs,
-                                },
-                                "benefits": improvements,
-                                "confidence": min(0.9, 0.6 + len(improvements) * 0.1),
-                                "reasoning": f"Better choice with {', '.join(reasoning_parts)}"
-                            })
-                    
-                    except Exception as e:
-                        logger.warning(f"Error processing alternative {row.get('barcode')}: {e}")
+            # Vectorised lookup over the category partition of the in-memory index
+            if nutrient_index.ensure_fresh() and nutrient_index.partition_size(category):
+                matches = nutrient_index.rank_alternatives(
+                    category,
+                    current,
+                    HEALTHIER_SWAP_RULES,
+                    limit=3,
+                    exclude=[getattr(current_item, 'barcode', None) or ""],
+                )
+                for match in matches:
+                    alternative = self._build_alternative(
+                        match.name, match.barcode, match.nutrients, current
+                    )
+                    if alternative:
+                        alternatives.append(alternative)
+                return alternatives
+            
+            # Category candidates from the database, cached across requests
+            for candidate in self._category_candidates(category):
+                alternative = self._build_alternative(
+                    candidate["name"], candidate["barcode"], candidate["nutrients"], current
+                )
+                if alternative:
+                    alternatives.append(alternative)
             
             return alternatives[:3]  # Return top 3 alternatives
             
@@ -543,6 +618,99 @@ class OptimizationEngine:
             logger.error(f"Error finding healthier alternatives: {e}")
             return []
     
+    def _category_candidates(self, category: str) -> List[Dict]:
+        """Popular products with complete macros for a swap category"""
+        cache_key = ("category", category)
+        cached = self.product_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        category_keywords = self.food_swap_database.get(category, [])
+        if not category_keywords:
+            return []
+        
+        with db_service.get_connection() as conn:
+            rows = product_search_service.search(
+                conn,
+                category_keywords,
+                columns=("name", "categories"),
+                limit=10,
+                where="""
+                    json_extract(p.nutriments, '$.energy_kcal_per_100g') IS NOT NULL
+                    AND json_extract(p.nutriments, '$.protein_g_per_100g') IS NOT NULL
+                    AND json_extract(p.nutriments, '$.fat_g_per_100g') IS NOT NULL
+                    AND json_extract(p.nutriments, '$.carbs_g_per_100g') IS NOT NULL
+                """,
+                order_by="p.access_count DESC",
+            )
+        
+        candidates = []
+        for row in rows:
+            try:
+                nutriments = json.loads(row['nutriments'])
+                candidates.append({
+                    "name": row['name'],
+                    "barcode": row['barcode'],
+                    "nutrients": {
+                        "kcal": nutriments.get('energy_kcal_per_100g'),
+                        "protein": nutriments.get('protein_g_per_100g'),
+                        "fat": nutriments.get('fat_g_per_100g'),
+                        "carbs": nutriments.get('carbs_g_per_100g'),
+                    },
+                })
+            except Exception as e:
+                logger.warning(f"Error processing alternative {row['barcode']}: {e}")
+        
+        self.product_cache.set(cache_key, candidates, ttl=PRODUCT_RESOLUTION_TTL if candidates else PRODUCT_MISS_TTL)
+        return candidates
+    
+    def _build_alternative(
+        self,
+        name: str,
+        barcode: str,
+        nutrients: Dict[str, Optional[float]],
+        current: Dict[str, float]
+    ) -> Optional[Dict]:
+        """Describe an alternative's improvements over the current item, or None if it is not better"""
+        alt_calories = nutrients.get('kcal') or 0
+        alt_protein = nutrients.get('protein') or 0
+        alt_fat = nutrients.get('fat') or 0
+        alt_carbs = nutrients.get('carbs') or 0
+
+        # Determine if this is a better alternative
+        improvements = {}
+        reasoning_parts = []
+        
+        if alt_calories < current["calories"] * 0.8:  # 20% fewer calories
+            improvements['calories'] = current["calories"] - alt_calories
+            reasoning_parts.append("lower calorie option")
+        
+        if alt_protein > current["protein"] * 1.2:  # 20% more protein
+            improvements['protein_g'] = alt_protein - current["protein"]
+            reasoning_parts.append("higher protein content")
+        
+        if alt_fat < current["fat"] * 0.7:  # 30% less fat
+            improvements['fat_g'] = current["fat"] - alt_fat
+            reasoning_parts.append("reduced fat")
+        
+        # Only suggest if there are meaningful improvements
+        if not improvements:
+            return None
+        
+        return {
+            "name": name,
+            "barcode": barcode,
+            "nutrition": {
+                "calories": alt_calories,
+                "protein": alt_protein,
+                "fat": alt_fat,
+                "carbs": alt_carbs,
+            },
+            "benefits": improvements,
+            "confidence": min(0.9, 0.6 + len(improvements) * 0.1),
+            "reasoning": f"Better choice with {', '.join(reasoning_parts)}"
+        }
+    
     async def _create_intelligent_swap_suggestion(
         self, 
         current_item, 
@@ -596,6 +764,9 @@ class SmartDietEngine:
     Combines Smart Recommendations + Smart Meal Optimization
     """
     
+    # Generation stages whose suggestions make up the response, in display order
+    SUGGESTION_STAGES = ("recommendations", "optimizations", "insights")
+    
     def __init__(self):
         # Use existing recommendation engine as foundation
         # Temporarily disabled for Task 8 integration - will re-enable after completion
@@ -615,9 +786,8 @@ class SmartDietEngine:
         # Translation service for internationalization
         self.translation_service = get_translation_service(cache_service)
         
-        # Cross-intelligence learning
-        self.suggestion_history: List[SmartSuggestion] = []
-        self.feedback_history: List[SuggestionFeedback] = []
+        # Cross-intelligence learning: bounded per-user history + outcome counters
+        self.learning_signals = LearningSignalStore()
         
         # Context weights for mixed suggestions
         self.context_weights = {
@@ -643,6 +813,15 @@ class SmartDietEngine:
             }
         }
         self.cache_version = "v3"
+        
+        # Per-stage deadlines (seconds); a late stage is dropped from the response
+        self.stage_timeouts = {
+            "recommendations": 3.0,
+            "optimizations": 3.0,
+            "insights": 2.0,
+            "highlights": 1.0,
+            "summary": 2.0
+        }
     
     def _generate_request_hash(self, user_id: str, request: SmartDietRequest) -> str:
         """Generate hash for cache key based on request parameters"""
@@ -753,31 +932,23 @@ class SmartDietEngine:
             # Get context weights
             weights = self.context_weights.get(request.context_type, self.context_weights[SmartDietContext.TODAY])
             
-            # Generate recommendations (if requested)
-            if request.include_recommendations and weights["recommendations"] > 0:
-                recommendations = await self._generate_recommendations(user_id, request)
-                response.discoveries.extend(recommendations)
-                response.suggestions.extend(recommendations)
-            
-            # Generate optimizations (if requested) 
-            if request.include_optimizations and weights["optimizations"] > 0:
-                optimizations = await self._generate_optimizations(user_id, request)
-                response.optimizations.extend(optimizations)
-                response.suggestions.extend(optimizations)
+            # Recommendations, optimizations and insights are independent and run
+            # concurrently; highlights and the summary only need their output
+            generation = await run_stages(self._build_generation_stages(user_id, request, weights))
+            results = generation.results
             
-            # Generate insights
-            if weights["insights"] > 0:
-                insights = await self._generate_insights(user_id, request)
-                response.insights.extend(insights)
-                response.suggestions.extend(insights)
-            
-            # Create context-specific highlights
-            response.today_highlights = await self._create_today_highlights(response.suggestions, request)
-            
-            # Generate nutritional summary
-            response.nutritional_summary = await self._generate_nutritional_summary(
-                response.suggestions, request
-            )
+            response.discoveries.extend(results.get("recommendations", []))
+            response.optimizations.extend(results.get("optimizations", []))
+            response.insights.extend(results.get("insights", []))
+            response.suggestions = self._collect_stage_suggestions(results)
+            response.today_highlights = results["highlights"]
+            response.nutritional_summary = results["summary"]
+            response.generation_breakdown_ms = generation.timings_ms
+            response.degraded_stages = generation.degraded
+
+            # Apply what feedback taught us about this user's categories
+            await self.learning_signals.load_user(user_id)
+            self._apply_learned_affinity(user_id, response.suggestions)
 
             # Deduplicate by normalized name before metrics
             response.suggestions = self._dedupe_suggestions_by_name(response.suggestions)
@@ -792,12 +963,14 @@ class SmartDietEngine:
             response.generation_time_ms = (datetime.now() - start_time).total_seconds() * 1000
             
             # Store for learning
-            self.suggestion_history.extend(response.suggestions)
+            self.learning_signals.record_suggestions(user_id, response.suggestions)
+            await self.learning_signals.flush_if_due()
             
-            # Cache the response for future requests
-            await self.cache_manager.set_suggestions_cache(
-                user_id, request.context_type, request_hash, response
-            )
+            # Cache the response for future requests (partial responses are not reused)
+            if not response.degraded_stages:
+                await self.cache_manager.set_suggestions_cache(
+                    user_id, request.context_type, request_hash, response
+                )
             
             logger.info(f"Generated {response.total_suggestions} Smart Diet suggestions "
                        f"(avg confidence: {response.avg_confidence:.2f}) in {response.generation_time_ms:.0f}ms")
@@ -813,6 +986,57 @@ class SmartDietEngine:
                 avg_confidence=0.0
             )
     
+    def _collect_stage_suggestions(self, results: Dict[str, Any]) -> List[SmartSuggestion]:
+        """All generated suggestions in stage order"""
+        return [
+            suggestion
+            for name in self.SUGGESTION_STAGES
+            for suggestion in results.get(name, [])
+        ]
+    
+    def _build_generation_stages(
+        self,
+        user_id: str,
+        request: SmartDietRequest,
+        weights: Dict[str, float]
+    ) -> List[Stage]:
+        """Stage graph for one suggestions request"""
+        stages = []
+        if request.include_recommendations and weights["recommendations"] > 0:
+            stages.append(Stage(
+                "recommendations",
+                lambda _: self._generate_recommendations(user_id, request),
+                timeout=self.stage_timeouts["recommendations"]
+            ))
+        if request.include_optimizations and weights["optimizations"] > 0:
+            stages.append(Stage(
+                "optimizations",
+                lambda _: self._generate_optimizations(user_id, request),
+                timeout=self.stage_timeouts["optimizations"]
+            ))
+        if weights["insights"] > 0:
+            stages.append(Stage(
+                "insights",
+                lambda _: self._generate_insights(user_id, request),
+                timeout=self.stage_timeouts["insights"]
+            ))
+        
+        generated = tuple(stage.name for stage in stages)
+        stages.append(Stage(
+            "highlights",
+            lambda results: self._create_today_highlights(self._collect_stage_suggestions(results), request),
+            depends_on=generated,
+            timeout=self.stage_timeouts["highlights"]
+        ))
+        stages.append(Stage(
+            "summary",
+            lambda results: self._generate_nutritional_summary(self._collect_stage_suggestions(results), request),
+            depends_on=generated,
+            timeout=self.stage_timeouts["summary"],
+            fallback=dict
+        ))
+        return stages
+    
     async def _generate_recommendations(
         self, 
         user_id: str, 
@@ -1129,11 +1353,18 @@ class SmartDietEngine:
     async def process_suggestion_feedback(self, feedback: SuggestionFeedback) -> bool:
         """Process user feedback on Smart Diet suggestions"""
         try:
+            # Counters must reflect persisted feedback before this one is counted
+            await self.learning_signals.load_user(feedback.user_id)
+            
             # Store feedback
-            self.feedback_history.append(feedback)
+            original = self.learning_signals.find_suggestion(feedback.user_id, feedback.suggestion_id)
+            self.learning_signals.record_feedback(
+                feedback, original.category.value if original else None
+            )
             
             # Update learning based on feedback
             await self._update_learning_from_feedback(feedback)
+            await self.learning_signals.flush_if_due()
             
             logger.info(f"Processed feedback for suggestion {feedback.suggestion_id}: {feedback.action}")
             return True
@@ -1146,11 +1377,9 @@ class SmartDietEngine:
         """Update AI learning based on user feedback"""
         try:
             # Find the original suggestion
-            original_suggestion = None
-            for suggestion in self.suggestion_history:
-                if suggestion.id == feedback.suggestion_id:
-                    original_suggestion = suggestion
-                    break
+            original_suggestion = self.learning_signals.find_suggestion(
+                feedback.user_id, feedback.suggestion_id
+            )
             
             if not original_suggestion:
                 return
@@ -1158,10 +1387,12 @@ class SmartDietEngine:
             # Update confidence based on feedback
             if feedback.action == "accepted":
                 # Boost confidence for similar future suggestions
-                self._boost_similar_suggestions(original_suggestion)
+                self._boost_similar_suggestions(original_suggestion, feedback.user_id)
             elif feedback.action == "rejected":
                 # Reduce confidence for similar suggestions
-                self._reduce_similar_suggestions(original_suggestion, feedback.feedback_reason)
+                self._reduce_similar_suggestions(
+                    original_suggestion, feedback.feedback_reason, feedback.user_id
+                )
             
             # Pass recommendation feedback to legacy engine
             if (original_suggestion.suggestion_type == SuggestionType.RECOMMENDATION and 
@@ -1183,15 +1414,29 @@ class SmartDietEngine:
         except Exception as e:
             logger.error(f"Error updating learning from feedback: {e}")
     
-    def _boost_similar_suggestions(self, suggestion: SmartSuggestion):
-        """Boost confidence for similar suggestions"""
-        # Simplified implementation - would be more sophisticated in production
-        pass
+    def _boost_similar_suggestions(self, suggestion: SmartSuggestion, user_id: Optional[str] = None):
+        """Boost confidence for similar suggestions (same user and category)"""
+        user_id = user_id or suggestion.user_id
+        if user_id:
+            self.learning_signals.record_outcome(user_id, suggestion.category.value, accepted=True)
+    
+    def _reduce_similar_suggestions(
+        self,
+        suggestion: SmartSuggestion,
+        reason: Optional[str],
+        user_id: Optional[str] = None
+    ):
+        """Reduce confidence for similar suggestions (same user and category)"""  
+        user_id = user_id or suggestion.user_id
+        if user_id:
+            self.learning_signals.record_outcome(user_id, suggestion.category.value, accepted=False)
     
-    def _reduce_similar_suggestions(self, suggestion: SmartSuggestion, reason: Optional[str]):
-        """Reduce confidence for similar suggestions"""  
-        # Simplified implementation - would be more sophisticated in production
-        pass
+    def _apply_learned_affinity(self, user_id: str, suggestions: List[SmartSuggestion]):
+        """Scale confidence by the user's accept/reject record for each category"""
+        for suggestion in suggestions:
+            factor = self.learning_signals.affinity(user_id, suggestion.category.value)
+            if factor != 1.0:
+                suggestion.confidence_score = round(min(1.0, suggestion.confidence_score * factor), 3)
     
     async def get_diet_insights(self, user_id: str, period: str = "week") -> SmartDietInsights:
         """Get comprehensive diet insights for user"""
@@ -1207,26 +1452,14 @@ class SmartDietEngine:
                 start_date = datetime.now() - timedelta(weeks=1)
             
             # Filter user feedback and suggestions
-            user_feedback = [
-                f for f in self.feedback_history 
-                if f.user_id == user_id and f.feedback_at >= start_date
-            ]
-            
-            user_suggestions = [
-                s for s in self.suggestion_history
-                if s.user_id == user_id and s.created_at >= start_date
-            ]
+            user_feedback = self.learning_signals.user_feedback(user_id, since=start_date)
+            user_suggestions = self.learning_signals.user_suggestions(user_id, since=start_date)
             
             # Analyze patterns
-            successful_suggestions = [
-                s for s in user_suggestions
-                if any(f.suggestion_id == s.id and f.action == "accepted" for f in user_feedback)
-            ]
-            
-            ignored_suggestions = [
-                s for s in user_suggestions
-                if not any(f.suggestion_id == s.id for f in user_feedback)
-            ]
+            accepted_ids = {f.suggestion_id for f in user_feedback if f.action == "accepted"}
+            answered_ids = {f.suggestion_id for f in user_feedback}
+            successful_suggestions = [s for s in user_suggestions if s.id in accepted_ids]
+            ignored_suggestions = [s for s in user_suggestions if s.id not in answered_ids]
             
             # Create insights
             insights = SmartDietInsights(
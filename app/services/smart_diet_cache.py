@@ -8,6 +8,7 @@ import logging
 from typing import Optional, Dict, List, Any
 from datetime import datetime, timedelta
 from app.services.cache import get_cache_service
+from app.services.invalidation_bus import SMART_DIET, invalidation_bus
 from app.models.smart_diet import SmartDietContext, SmartDietResponse, SmartDietInsights
 
 logger = logging.getLogger(__name__)
@@ -27,10 +28,11 @@ class SmartDietCacheManager:
             SmartDietContext.INSIGHTS: 24 * 60 * 60 # 24 hours - insights calculated daily
         }
         
-        # Cache key patterns
+        # Cache key patterns. Derived per-user data carries the user's cache
+        # generation, so invalidation is a single INCR instead of a key hunt.
         self.KEY_PATTERNS = {
-            'suggestions': 'smart_diet:suggestions:{user_id}:{context}:{hash}',
-            'insights': 'smart_diet:insights:{user_id}:{period}',
+            'suggestions': 'smart_diet:suggestions:{user_id}:g{generation}:{context}:{hash}',
+            'insights': 'smart_diet:insights:{user_id}:g{generation}:{period}',
             'user_preferences': 'smart_diet:prefs:{user_id}',
             'feedback_analytics': 'smart_diet:feedback:{user_id}',
             'optimization_data': 'smart_diet:optimize:{plan_id}'
@@ -40,6 +42,13 @@ class SmartDietCacheManager:
         """Generate cache key from pattern and parameters"""
         return self.KEY_PATTERNS[pattern].format(**kwargs)
     
+    def _generation_scope(self, user_id: str) -> str:
+        return f"smart_diet:{user_id}"
+
+    async def _user_generation(self, user_id: str) -> int:
+        """Current cache generation for a user (0 until first invalidation)"""
+        return await self.cache_service.generation(self._generation_scope(user_id))
+
     def _get_ttl_for_context(self, context: SmartDietContext) -> int:
         """Get TTL based on Smart Diet context"""
         return self.CACHE_TTL_STRATEGY.get(context, 30 * 60)  # Default 30 minutes
@@ -55,6 +64,7 @@ class SmartDietCacheManager:
             cache_key = self._generate_cache_key(
                 'suggestions',
                 user_id=user_id,
+                generation=await self._user_generation(user_id),
                 context=context.value,
                 hash=request_hash
             )
@@ -84,6 +94,7 @@ class SmartDietCacheManager:
             cache_key = self._generate_cache_key(
                 'suggestions',
                 user_id=user_id,
+                generation=await self._user_generation(user_id),
                 context=context.value,
                 hash=request_hash
             )
@@ -107,7 +118,12 @@ class SmartDietCacheManager:
     async def get_insights_cache(self, user_id: str, period: str) -> Optional[SmartDietInsights]:
         """Get cached diet insights"""
         try:
-            cache_key = self._generate_cache_key('insights', user_id=user_id, period=period)
+            cache_key = self._generate_cache_key(
+                'insights',
+                user_id=user_id,
+                generation=await self._user_generation(user_id),
+                period=period
+            )
             
             cached_data = await self.cache_service.get(cache_key)
             if cached_data:
@@ -123,7 +139,12 @@ class SmartDietCacheManager:
     async def set_insights_cache(self, user_id: str, period: str, insights: SmartDietInsights) -> bool:
         """Cache diet insights with 24-hour TTL"""
         try:
-            cache_key = self._generate_cache_key('insights', user_id=user_id, period=period)
+            cache_key = self._generate_cache_key(
+                'insights',
+                user_id=user_id,
+                generation=await self._user_generation(user_id),
+                period=period
+            )
             ttl = self.CACHE_TTL_STRATEGY[SmartDietContext.INSIGHTS]  # 24 hours
             
             cache_data = insights.model_dump()
@@ -172,29 +193,30 @@ class SmartDietCacheManager:
             return False
     
     async def invalidate_user_cache(self, user_id: str) -> bool:
-        """Invalidate all cache entries for a user (useful when preferences change)"""
+        """
+        Invalidate all cache entries for a user.
+
+        Bumps the user's generation so every suggestions/insights key built
+        before now becomes unreachable (the stale entries simply expire), drops
+        the unversioned preference and feedback keys, and tells every worker to
+        drop its in-memory copies.
+        """
         try:
-            # Pattern-based cache invalidation would require Redis SCAN
-            # For now, we'll invalidate specific known patterns
-            keys_to_delete = [
+            generation = await self.cache_service.bump_generation(self._generation_scope(user_id))
+            await invalidation_bus.publish(SMART_DIET, user_id)
+
+            deleted = 0
+            for key in (
                 self._generate_cache_key('user_preferences', user_id=user_id),
                 self._generate_cache_key('feedback_analytics', user_id=user_id),
-            ]
-            
-            # Also invalidate insights for common periods
-            for period in ['day', 'week', 'month']:
-                keys_to_delete.append(
-                    self._generate_cache_key('insights', user_id=user_id, period=period)
-                )
-            
-            success_count = 0
-            for key in keys_to_delete:
+            ):
                 if await self.cache_service.delete(key):
-                    success_count += 1
-            
-            logger.info(f"Invalidated {success_count} cache entries for user {user_id}")
-            return success_count > 0
-            
+                    deleted += 1
+
+            logger.info(f"Invalidated Smart Diet cache for user {user_id}: "
+                        f"generation {generation}, {deleted} keys deleted")
+            return generation is not None or deleted > 0
+
         except Exception as e:
             logger.error(f"Error invalidating user cache: {e}")
             return False
@@ -7,7 +7,6 @@ import logging
 import asyncio
 import uuid
 import hashlib
-import json
 import time
 from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime, timedelta
@@ -22,8 +21,12 @@ from app.models.smart_diet import (
     OptimizationSuggestion
 )
 from app.services.cache import cache_service
+from app.services.invalidation_bus import SMART_DIET, invalidation_bus
 from app.services.database import db_service
+from app.services.product_search import product_search_service
+from app.services.nutrient_index import NutrientRule, nutrient_index
 from app.services.redis_cache import redis_cache_service
+from app.services.memory_cache import MemoryCache
 
 logger = logging.getLogger(__name__)
 
@@ -80,6 +83,24 @@ class PerformanceMonitor:
 
 class OptimizedDatabaseService:
     """Optimized database operations for Smart Diet"""
+
+    # Alternatives are found through the shared FTS product search; these are
+    # the projection, filter and ordering applied on top of the text match.
+    ALTERNATIVE_COLUMNS = """
+        p.name, p.barcode, p.nutriments, p.access_count,
+        json_extract(p.nutriments, '$.energy_kcal_per_100g') as calories,
+        json_extract(p.nutriments, '$.protein_g_per_100g') as protein,
+        json_extract(p.nutriments, '$.fat_g_per_100g') as fat,
+        json_extract(p.nutriments, '$.fiber_g_per_100g') as fiber
+    """
+    ALTERNATIVE_FILTER = "json_extract(p.nutriments, '$.energy_kcal_per_100g') > 0"
+    ALTERNATIVE_ORDER = "p.access_count DESC, calories ASC"
+    # Same weights as _calculate_improvement_score, evaluated as index masks
+    IMPROVEMENT_RULES = (
+        NutrientRule("kcal", 0.8, 0.3),
+        NutrientRule("protein", 1.15, 0.4),
+        NutrientRule("fat", 0.75, 0.3),
+    )
     
     def __init__(self):
         self.connection_pool = None
@@ -88,21 +109,6 @@ class OptimizedDatabaseService:
     def _prepare_queries(self) -> Dict[str, str]:
         """Prepare optimized SQL queries"""
         return {
-            'find_alternatives': """
-                SELECT 
-                    p.name, p.barcode, p.nutriments, p.access_count,
-                    json_extract(p.nutriments, '$.energy_kcal_per_100g') as calories,
-                    json_extract(p.nutriments, '$.protein_g_per_100g') as protein,
-                    json_extract(p.nutriments, '$.fat_g_per_100g') as fat,
-                    json_extract(p.nutriments, '$.fiber_g_per_100g') as fiber
-                FROM products p
-                WHERE (LOWER(p.name) LIKE ? OR LOWER(p.categories) LIKE ?)
-                  AND json_extract(p.nutriments, '$.energy_kcal_per_100g') IS NOT NULL
-                  AND p.calories > 0
-                ORDER BY p.access_count DESC, p.calories ASC
-                LIMIT ?
-            """,
-            
             'batch_product_lookup': """
                 SELECT name, barcode, nutriments, access_count
                 FROM products 
@@ -138,21 +144,40 @@ class OptimizedDatabaseService:
             start_time = time.time()
             alternatives = []
             
+            # Terms that map onto a nutrient index partition are answered in memory
+            remaining_terms = []
+            for term in search_terms[:3]:  # Limit search terms
+                category = nutrient_index.partition_for_term(term)
+                if category and nutrient_index.ensure_fresh() and nutrient_index.partition_size(category):
+                    for match in nutrient_index.rank_alternatives(
+                        category, current_nutrition, self.IMPROVEMENT_RULES, limit=limit, min_score=0.1
+                    ):
+                        alternatives.append({
+                            'name': match.name,
+                            'barcode': match.barcode,
+                            'score': match.score,
+                            'calories': match.nutrients['kcal'],
+                            'protein': match.nutrients['protein'],
+                            'fat': match.nutrients['fat'],
+                            'confidence': min(0.9, 0.5 + match.score)
+                        })
+                else:
+                    remaining_terms.append(term)
+            
             # Use connection pooling
             with db_service.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Single optimized query using prepared statement
-                for term in search_terms[:3]:  # Limit search terms
-                    search_pattern = f"%{term.lower()}%"
-                    
-                    cursor.execute(
-                        self.prepared_queries['find_alternatives'],
-                        [search_pattern, search_pattern, limit]
+                # Indexed full-text lookup per remaining term
+                for term in remaining_terms:
+                    rows = product_search_service.search(
+                        conn,
+                        [term],
+                        columns=("name", "categories"),
+                        limit=limit,
+                        where=self.ALTERNATIVE_FILTER,
+                        order_by=self.ALTERNATIVE_ORDER,
+                        select=self.ALTERNATIVE_COLUMNS,
                     )
                     
-                    rows = cursor.fetchall()
-                    
                     for row in rows:
                         if len(alternatives) >= limit:
                             break
@@ -218,7 +243,6 @@ class OptimizedCacheManager:
     """High-performance caching with Redis and memory layers"""
     
     def __init__(self):
-        self.memory_cache = {}  # L1 cache
         self.cache_ttl = {
             SmartDietContext.TODAY: 1800,      # 30 minutes
             SmartDietContext.OPTIMIZE: 900,    # 15 minutes  
@@ -226,6 +250,43 @@ class OptimizedCacheManager:
             SmartDietContext.INSIGHTS: 43200   # 12 hours
         }
         self.max_memory_cache_size = 1000
+        self.max_memory_cache_bytes = 32 * 1024 * 1024
+        
+        # L1 cache: serialized responses, so the byte budget is exact and every
+        # hit hands out a fresh object callers are free to mutate
+        self.memory_cache = MemoryCache(
+            "smart_diet_l1",
+            max_entries=self.max_memory_cache_size,
+            max_bytes=self.max_memory_cache_bytes,
+            sizeof=len,
+        )
+        self.recommendations_cache = MemoryCache(
+            "smart_diet_recommendations",
+            max_entries=self.max_memory_cache_size,
+            default_ttl=300,  # 5 min cache
+        )
+        # Per-user cache generations, kept in process so an L1 hit costs no
+        # Redis round trip; the SMART_DIET bus event drops them on every
+        # worker, and the TTL bounds staleness should a message be missed
+        self.generations = MemoryCache(
+            "smart_diet_generations",
+            max_entries=self.max_memory_cache_size,
+            default_ttl=60,
+        )
+        invalidation_bus.subscribe(SMART_DIET, self.invalidate_user)
+    
+    async def _cache_key(self, user_id: str, context: SmartDietContext, request_hash: str) -> str:
+        """Key carrying the user's cache generation, shared with SmartDietCacheManager"""
+        generation = self.generations.get(user_id)
+        if generation is None:
+            generation = await cache_service.generation(f"smart_diet:{user_id}")
+            self.generations.set(user_id, generation)
+        return f"smart_diet:{user_id}:g{generation}:{context.value}:{request_hash}"
+    
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop the user's generation and L1 entries (called by the invalidation bus)"""
+        self.generations.delete(user_id)
+        self.memory_cache.delete_matching(f"smart_diet:{user_id}:*")
     
     async def get_suggestions_cache(
         self, 
@@ -234,32 +295,23 @@ class OptimizedCacheManager:
         request_hash: str
     ) -> Optional[SmartDietResponse]:
         """Multi-level cache lookup with performance monitoring"""
-        cache_key = f"smart_diet:{user_id}:{context.value}:{request_hash}"
+        cache_key = await self._cache_key(user_id, context, request_hash)
         
         # L1 Memory cache check
-        if cache_key in self.memory_cache:
-            cached_data, timestamp = self.memory_cache[cache_key]
-            ttl = self.cache_ttl.get(context, 1800)
-            
-            if time.time() - timestamp < ttl:
-                logger.debug(f"L1 cache hit: {cache_key}")
-                return cached_data
-            else:
-                # Remove expired entry
-                del self.memory_cache[cache_key]
+        payload = self.memory_cache.get(cache_key)
+        if payload is not None:
+            logger.debug(f"L1 cache hit: {cache_key}")
+            return SmartDietResponse.model_validate_json(payload)
         
         # L2 Redis cache check
         try:
             cached_json = await redis_cache_service.get(cache_key)
             if cached_json:
                 logger.debug(f"L2 cache hit: {cache_key}")
-                response_data = json.loads(cached_json)
-                
-                # Convert back to SmartDietResponse object
-                response = SmartDietResponse(**response_data)
+                response = SmartDietResponse.model_validate_json(cached_json)
                 
                 # Store in L1 cache for faster access
-                self._store_in_memory_cache(cache_key, response)
+                self._store_in_memory_cache(cache_key, cached_json, self.cache_ttl.get(context, 1800))
                 
                 return response
         
@@ -276,31 +328,24 @@ class OptimizedCacheManager:
         response: SmartDietResponse
     ):
         """Store in multi-level cache with optimal TTL"""
-        cache_key = f"smart_diet:{user_id}:{context.value}:{request_hash}"
+        cache_key = await self._cache_key(user_id, context, request_hash)
         ttl = self.cache_ttl.get(context, 1800)
+        response_json = response.model_dump_json()
         
         # Store in L1 memory cache
-        self._store_in_memory_cache(cache_key, response)
+        self._store_in_memory_cache(cache_key, response_json, ttl)
         
         # Store in L2 Redis cache
         try:
-            response_json = json.dumps(response.dict())
             await redis_cache_service.set(cache_key, response_json, ttl)
             logger.debug(f"Cached response for {cache_key} with TTL {ttl}s")
         
         except Exception as e:
             logger.warning(f"Redis cache storage error: {e}")
     
-    def _store_in_memory_cache(self, key: str, response: SmartDietResponse):
-        """Store in L1 memory cache with size management"""
-        # Implement LRU eviction if cache is full
-        if len(self.memory_cache) >= self.max_memory_cache_size:
-            # Remove oldest entry
-            oldest_key = min(self.memory_cache.keys(), 
-                           key=lambda k: self.memory_cache[k][1])
-            del self.memory_cache[oldest_key]
-        
-        self.memory_cache[key] = (response, time.time())
+    def _store_in_memory_cache(self, key: str, response_json: str, ttl: int):
+        """Store a serialized response in the L1 memory cache (LRU, byte-bounded)"""
+        self.memory_cache.set(key, response_json.encode(), ttl)
 
 
 class SmartDietEngineOptimized(SmartDietEngine):
@@ -452,15 +497,15 @@ class SmartDietEngineOptimized(SmartDietEngine):
             cache_key = f"recommendations:{user_id}:{request.meal_context}"
             
             # Check memory cache first
-            cached = self.optimized_cache.memory_cache.get(cache_key)
-            if cached and time.time() - cached[1] < 300:  # 5 min cache
-                return cached[0]
+            cached = self.optimized_cache.recommendations_cache.get(cache_key)
+            if cached is not None:
+                return cached
             
             # Generate with limited scope for performance
             recommendations = await self._call_legacy_recommendations_fast(user_id, request)
             
             # Cache results
-            self.optimized_cache.memory_cache[cache_key] = (recommendations, time.time())
+            self.optimized_cache.recommendations_cache.set(cache_key, recommendations)
             
             return recommendations
             
@@ -1,11 +1,12 @@
 import base64
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Optional
 
 from fastapi import HTTPException
 
 from app.services.database import db_service
+from app.services.request_loader import get_request_loader, invalidate_request_cache
 from app.models.social.block import (
     BlockAction,
     BlockActionRequest,
@@ -97,6 +98,8 @@ class BlockService:
             """, (event_id, blocker_id, blocked_id, reason, blocked_at.isoformat()))
 
             conn.commit()
+            invalidate_request_cache("block_edge")
+            invalidate_request_cache("follow_edge")
 
             # Publish event
             publish_event(UserAction.USER_BLOCKED.value, {
@@ -154,6 +157,7 @@ class BlockService:
 
             unblocked_at = datetime.utcnow()
             conn.commit()
+            invalidate_request_cache("block_edge")
 
             # Publish event
             publish_event(UserAction.USER_UNBLOCKED.value, {
@@ -283,6 +287,13 @@ class BlockService:
     @staticmethod
     def is_blocking(blocker_id: str, blocked_id: str) -> bool:
         """Check if blocker_id is currently blocking blocked_id."""
+        return get_request_loader().load(
+            "block_edge", (blocker_id, blocked_id), BlockService._fetch_is_blocking
+        )
+
+    @staticmethod
+    def _fetch_is_blocking(edge) -> bool:
+        blocker_id, blocked_id = edge
         with db_service.get_connection() as conn:
             cursor = conn.cursor()
 
@@ -294,6 +305,38 @@ class BlockService:
 
             return cursor.fetchone() is not None
 
+    @staticmethod
+    def prime_block_edges(user_id: str, other_ids: Iterable[str]) -> None:
+        """
+        Load block state between ``user_id`` and ``other_ids``, both ways, in one query.
+
+        Later ``is_blocking`` calls for these pairs in the same request are
+        answered without touching the database.
+        """
+        loader = get_request_loader()
+        edges = [
+            edge
+            for other_id in dict.fromkeys(other_ids)
+            for edge in ((user_id, other_id), (other_id, user_id))
+        ]
+        missing = loader.missing("block_edge", edges)
+        if not missing:
+            return
+        others = list(dict.fromkeys(other for edge in missing for other in edge if other != user_id))
+        placeholders = ",".join("?" for _ in others)
+
+        with db_service.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT blocker_id, blocked_id FROM user_blocks
+                WHERE status = 'active'
+                  AND ((blocker_id = ? AND blocked_id IN ({placeholders}))
+                    OR (blocked_id = ? AND blocker_id IN ({placeholders})))
+            """, (user_id, *others, user_id, *others))
+            active = {(row['blocker_id'], row['blocked_id']) for row in cursor.fetchall()}
+
+        loader.prime("block_edge", {edge: edge in active for edge in missing})
+
 
 # Singleton instance
 block_service = BlockService()
@@ -17,7 +17,9 @@ from app.models.social.discover_feed import (
     RankReason,
 )
 from app.services.database import db_service
+from app.services.memory_cache import MemoryCache
 from app.services.performance_monitor import PerformanceMetric, performance_monitor
+from app.services.request_loader import request_scope
 from app.services.social.block_service import block_service
 from app.services.social.event_names import FeedEvent
 from app.services.social.event_publisher import publish_event
@@ -28,8 +30,11 @@ from app.services.experimentation.feed_experiments import feed_experiments
 
 logger = logging.getLogger(__name__)
 
-# Cache simple en memoria (usuario, superficie) -> (expira, respuesta)
-_discover_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+# Cache en memoria (usuario, superficie) -> respuesta, LRU acotada con TTL
+_discover_cache = MemoryCache(
+    "discover_feed",
+    max_entries=int(config.discover_feed.get("cache_max_entries", 5000)),
+)
 
 
 def _get_config() -> Dict[str, Any]:
@@ -241,9 +246,19 @@ def _score_candidates(rows: List[Dict[str, Any]], weights: Dict[str, Any]) -> Li
 
 def _apply_filters(user_id: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Apply moderation and visibility filters."""
+    with request_scope():
+        return _apply_filters_scoped(user_id, rows)
+
+
+def _apply_filters_scoped(user_id: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     filtered: List[Dict[str, Any]] = []
     profile_service = ProfileService()
 
+    # Block and visibility state for every candidate author in two queries
+    author_ids = [row["author_id"] for row in rows if row.get("author_id")]
+    block_service.prime_block_edges(user_id, author_ids)
+    profile_service.prime_profile_visibility(author_ids)
+
     for row in rows:
         author_id = row.get("author_id")
         if not author_id:
@@ -443,25 +458,12 @@ def _build_response(
 
 
 def _get_cache(user_id: str, surface: str) -> Optional[DiscoverFeedResponse]:
-    key = (user_id, surface)
-    cache_entry = _discover_cache.get(key)
-    if not cache_entry:
-        return None
-
-    if cache_entry["expires_at"] <= time.time():
-        _discover_cache.pop(key, None)
-        return None
-
-    return cache_entry["response"]
+    return _discover_cache.get((user_id, surface))
 
 
 def _set_cache(user_id: str, surface: str, response: DiscoverFeedResponse) -> None:
     ttl_seconds = int(_get_config().get("cache_ttl_seconds", 60))
-    key = (user_id, surface)
-    _discover_cache[key] = {
-        "expires_at": time.time() + ttl_seconds,
-        "response": response,
-    }
+    _discover_cache.set((user_id, surface), response, ttl_seconds)
 
 
 def get_discover_feed(
@@ -13,6 +13,7 @@ from app.models.social.follow import (
     FollowListResponse,
 )
 from app.services.database import db_service
+from app.services.request_loader import get_request_loader, invalidate_request_cache
 from .event_publisher import publish_event
 from .moderation_gateway import moderation_gateway
 
@@ -92,6 +93,7 @@ class FollowService:
             followers_count, following_count = self._get_counts(cursor, follower_id, followee_id)
 
             conn.commit()
+        invalidate_request_cache("follow_edge", (follower_id, followee_id))
 
         publish_event("UserAction.FollowCreated", event_payload)
 
@@ -144,6 +146,7 @@ class FollowService:
             followers_count, following_count = self._get_counts(cursor, follower_id, followee_id)
 
             conn.commit()
+        invalidate_request_cache("follow_edge", (follower_id, followee_id))
 
         if was_active:
             publish_event(
@@ -231,6 +234,12 @@ class FollowService:
         return FollowListResponse(items=items, next_cursor=next_cursor)
 
     async def is_following(self, follower_id: str, followee_id: str) -> bool:
+        return get_request_loader().load(
+            "follow_edge", (follower_id, followee_id), self._fetch_is_following
+        )
+
+    def _fetch_is_following(self, edge: Tuple[str, str]) -> bool:
+        follower_id, followee_id = edge
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
             row = cursor.execute(
@@ -306,14 +315,17 @@ class FollowService:
         )
 
     def _get_counts(self, cursor, follower_id: str, followee_id: str) -> Tuple[int, int]:
-        following_row = cursor.execute(
-            "SELECT following_count FROM profile_stats WHERE user_id = ?",
-            (follower_id,),
-        ).fetchone()
-        followers_row = cursor.execute(
-            "SELECT followers_count FROM profile_stats WHERE user_id = ?",
-            (followee_id,),
-        ).fetchone()
+        rows = cursor.execute(
+            """
+            SELECT user_id, followers_count, following_count
+            FROM profile_stats
+            WHERE user_id IN (?, ?)
+            """,
+            (follower_id, followee_id),
+        ).fetchall()
+        stats = {row["user_id"]: row for row in rows}
+        following_row = stats.get(follower_id)
+        followers_row = stats.get(followee_id)
         following_count = following_row["following_count"] if following_row else 0
         followers_count = followers_row["followers_count"] if followers_row else 0
         return followers_count, following_count
@@ -8,6 +8,7 @@ Integracion completa con block_service para consultas de bloqueos.
 import logging
 from typing import Optional, Literal
 
+from app.services.request_loader import request_scope
 from app.services.social.block_service import block_service
 
 logger = logging.getLogger(__name__)
@@ -37,8 +38,11 @@ class ModerationGateway:
         # Verificar bloqueo bidireccional:
         # - target bloqué a viewer (no puede ver contenido de target)
         # - O viewer bloqueó a target (viewer decidió bloquear a target)
-        blocked_by_target = block_service.is_blocking(target_id, viewer_id)
-        blocking_target = block_service.is_blocking(viewer_id, target_id)
+        with request_scope():
+            # Ambas direcciones en una sola consulta
+            block_service.prime_block_edges(viewer_id, [target_id])
+            blocked_by_target = block_service.is_blocking(target_id, viewer_id)
+            blocking_target = block_service.is_blocking(viewer_id, target_id)
 
         is_blocked = blocked_by_target or blocking_target
 
@@ -62,12 +66,14 @@ class ModerationGateway:
         if not viewer_id:
             return None
 
-        if block_service.is_blocking(viewer_id, target_id):
-            return 'blocked'
-        elif block_service.is_blocking(target_id, viewer_id):
-            return 'blocked_by'
-        else:
-            return None
+        with request_scope():
+            block_service.prime_block_edges(viewer_id, [target_id])
+            if block_service.is_blocking(viewer_id, target_id):
+                return 'blocked'
+            elif block_service.is_blocking(target_id, viewer_id):
+                return 'blocked_by'
+            else:
+                return None
 
 
 # Singleton instance para inyección de dependencias
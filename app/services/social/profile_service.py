@@ -6,11 +6,12 @@ Implements EPIC_A.A1 profile viewing and editing functionality.
 
 import logging
 import re
-from typing import Optional, List
+from typing import Iterable, Optional, List
 
 from fastapi import HTTPException
 
 from app.services.database import db_service
+from app.services.request_loader import get_request_loader, invalidate_request_cache
 from app.services.user_service import UserService
 from app.repositories.user_repository import UserRepository
 from app.models.social import (
@@ -91,6 +92,7 @@ class ProfileService:
                 """, (user_id,))
 
                 conn.commit()
+                invalidate_request_cache("profile_visibility", user_id)
 
                 logger.info(f"Initialized profile for user {user_id} with handle '{handle}'")
 
@@ -253,6 +255,7 @@ class ProfileService:
                 query = f"UPDATE user_profiles SET {', '.join(update_fields)} WHERE user_id = ?"
                 cursor.execute(query, values)
                 conn.commit()
+                invalidate_request_cache("profile_visibility", user_id)
 
                 logger.info(f"Updated profile for user {user_id}")
 
@@ -268,21 +271,16 @@ class ProfileService:
         Returns:
             True if viewer can see the profile, False otherwise
         """
-        # TODO(B2): incorporate cache + richer privacy rules (blocked lists, follower status cache)
         if viewer_id == profile_owner_id:
             # Owner can always view their own profile
             return True
 
         try:
-            with self.database_service.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT visibility FROM user_profiles
-                    WHERE user_id = ? AND visibility = 'public'
-                """, (profile_owner_id,))
-                row = cursor.fetchone()
+            visibility = get_request_loader().load(
+                "profile_visibility", profile_owner_id, self._fetch_visibility
+            )
 
-            if row:
+            if visibility == ProfileVisibility.PUBLIC.value:
                 # Profile is public, anyone can view
                 return True
 
@@ -294,6 +292,36 @@ class ProfileService:
             # Default to False for safety
             return False
 
+    def prime_profile_visibility(self, user_ids: Iterable[str]) -> None:
+        """
+        Load the visibility of several profiles with one query.
+
+        Later ``can_view_profile`` calls for these owners in the same request
+        are answered without touching the database.
+        """
+        loader = get_request_loader()
+        missing = loader.missing("profile_visibility", user_ids)
+        if not missing:
+            return
+
+        placeholders = ",".join("?" for _ in missing)
+        with self.database_service.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT user_id, visibility FROM user_profiles WHERE user_id IN ({placeholders})",
+                missing,
+            )
+            found = {row[0]: row[1] for row in cursor.fetchall()}
+
+        loader.prime("profile_visibility", {user_id: found.get(user_id) for user_id in missing})
+
+    def _fetch_visibility(self, user_id: str) -> Optional[str]:
+        with self.database_service.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT visibility FROM user_profiles WHERE user_id = ?", (user_id,))
+            row = cursor.fetchone()
+        return row[0] if row else None
+
 
 # Singleton instance (Phase 2 Batch 9: Added user_service parameter)
 # Phase 3: Use Repository Pattern with UserRepository instead of DatabaseService
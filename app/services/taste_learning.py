@@ -10,7 +10,9 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from collections import defaultdict, Counter
 
+from app.services.invalidation_bus import TASTE_PROFILE, invalidation_bus
 from app.services.recipe_database import RecipeDatabaseService
+from app.services.recipes.taste_aggregates import CUISINE, INGREDIENT, TasteAggregate, TasteAggregateStore
 
 logger = logging.getLogger(__name__)
 
@@ -18,36 +20,66 @@ logger = logging.getLogger(__name__)
 class TasteLearningService:
     """Service for analyzing user preferences and learning taste patterns"""
 
-    def __init__(self, db_service: Optional[RecipeDatabaseService] = None):
+    def __init__(
+        self,
+        db_service: Optional[RecipeDatabaseService] = None,
+        aggregates: Optional[TasteAggregateStore] = None,
+    ):
         """Initialize taste learning service with database connection"""
         self.db_service = db_service or RecipeDatabaseService()
+        # Running rating aggregates kept up to date by rate_recipe; without
+        # them the analyses regroup the recent rating history instead
+        self.aggregates = aggregates if aggregates is not None else getattr(self.db_service, 'taste_aggregates', None)
+
+    def _load_aggregates(self, user_id: str, dimension: str) -> Optional[Tuple[int, Dict[str, TasteAggregate]]]:
+        """(total ratings, per-item aggregates), or None when aggregates are unavailable"""
+        if self.aggregates is None:
+            return None
+        return self.aggregates.load(user_id, dimension)
 
     async def analyze_cuisine_preferences(self, user_id: str, min_ratings: int = 3) -> Dict[str, Any]:
         """Analyze user's cuisine preferences based on rating patterns"""
         try:
-            # Get user's rating history
-            ratings = await self.db_service.get_user_ratings_for_learning(user_id, limit=100)
+            cuisine_preferences = {}
+            loaded = self._load_aggregates(user_id, CUISINE)
+
+            if loaded is not None:
+                total_ratings, aggregates = loaded
+                if total_ratings < min_ratings:
+                    logger.info(f"Insufficient ratings ({total_ratings}) for user {user_id}, minimum {min_ratings} required")
+                    return self._create_empty_cuisine_analysis()
+
+                for cuisine, aggregate in aggregates.items():
+                    if cuisine != 'unknown' and aggregate.rating_count >= min_ratings:
+                        cuisine_preferences[cuisine] = self._cuisine_analysis(
+                            count=aggregate.rating_count,
+                            weight=aggregate.weight,
+                            avg_rating=aggregate.mean,
+                            would_make_again_ratio=aggregate.would_make_again_ratio,
+                            modification_ratio=aggregate.modification_ratio,
+                            variance=aggregate.variance if aggregate.rating_count > 1 else None,
+                        )
+            else:
+                # Get user's rating history
+                ratings = await self.db_service.get_user_ratings_for_learning(user_id, limit=100)
+                total_ratings = len(ratings)
 
-            if len(ratings) < min_ratings:
-                logger.info(f"Insufficient ratings ({len(ratings)}) for user {user_id}, minimum {min_ratings} required")
-                return self._create_empty_cuisine_analysis()
+                if total_ratings < min_ratings:
+                    logger.info(f"Insufficient ratings ({total_ratings}) for user {user_id}, minimum {min_ratings} required")
+                    return self._create_empty_cuisine_analysis()
 
-            # Group ratings by cuisine
-            cuisine_data = defaultdict(list)
-            for rating in ratings:
-                cuisine = rating.get('cuisine_type', 'unknown')
-                if cuisine and cuisine != 'unknown':
-                    cuisine_data[cuisine].append(rating)
+                # Group ratings by cuisine
+                cuisine_data = defaultdict(list)
+                for rating in ratings:
+                    cuisine = rating.get('cuisine_type', 'unknown')
+                    if cuisine and cuisine != 'unknown':
+                        cuisine_data[cuisine].append(rating)
 
-            # Analyze each cuisine
-            cuisine_preferences = {}
-            total_weight = 0
+                for cuisine, cuisine_ratings in cuisine_data.items():
+                    if len(cuisine_ratings) >= min_ratings:  # Only analyze cuisines with sufficient data
+                        cuisine_preferences[cuisine] = self._analyze_single_cuisine(cuisine, cuisine_ratings)
 
-            for cuisine, cuisine_ratings in cuisine_data.items():
-                if len(cuisine_ratings) >= min_ratings:  # Only analyze cuisines with sufficient data
-                    analysis = self._analyze_single_cuisine(cuisine, cuisine_ratings)
-                    cuisine_preferences[cuisine] = analysis
-                    total_weight += analysis['weight']
+            total_weight = sum(analysis['weight'] for analysis in cuisine_preferences.values())
 
             # Calculate normalized preference scores
             for cuisine in cuisine_preferences:
@@ -67,11 +99,11 @@ class TasteLearningService:
             )
 
             # Calculate confidence based on data volume and consistency
-            confidence = self._calculate_cuisine_confidence(cuisine_preferences, len(ratings))
+            confidence = self._calculate_cuisine_confidence(cuisine_preferences, total_ratings)
 
             return {
                 'user_id': user_id,
-                'total_ratings_analyzed': len(ratings),
+                'total_ratings_analyzed': total_ratings,
                 'cuisines_analyzed': len(cuisine_preferences),
                 'confidence_score': confidence,
                 'cuisine_preferences': dict(sorted_cuisines),
@@ -98,6 +130,25 @@ class TasteLearningService:
         would_make_again_ratio = sum(would_make_again) / len(would_make_again) if would_make_again else 0.0
         modification_ratio = sum(made_modifications) / len(made_modifications) if made_modifications else 0.0
 
+        return self._cuisine_analysis(
+            count=len(rating_values),
+            weight=len(rating_values),
+            avg_rating=avg_rating,
+            would_make_again_ratio=would_make_again_ratio,
+            modification_ratio=modification_ratio,
+            variance=statistics.variance(rating_values) if len(rating_values) > 1 else None,
+        )
+
+    def _cuisine_analysis(
+        self,
+        count: int,
+        weight: float,
+        avg_rating: float,
+        would_make_again_ratio: float,
+        modification_ratio: float,
+        variance: Optional[float],
+    ) -> Dict[str, Any]:
+        """Score a cuisine from its rating statistics (variance is None for a single rating)"""
         # Calculate raw preference score (normalized to -1 to 1 scale)
         # High ratings and willingness to make again = positive preference
         # High modification rate = slight negative (indicates recipe wasn't perfect)
@@ -108,17 +159,15 @@ class TasteLearningService:
         raw_score = (rating_score * 0.6) + (would_make_score * 0.3) + (modification_penalty * 0.1)
         raw_score = max(-1.0, min(1.0, raw_score))  # Clamp to [-1, 1]
 
-        # Calculate weight based on number of ratings and recency
-        weight = len(rating_values)
+        # Weight is the number of ratings (recency-weighted when decay is enabled)
 
         # Calculate confidence based on consistency of ratings
-        if len(rating_values) > 1:
-            rating_variance = statistics.variance(rating_values)
-            consistency_score = max(0, 1 - (rating_variance / 4.0))  # Lower variance = higher consistency
+        if variance is not None:
+            consistency_score = max(0, 1 - (variance / 4.0))  # Lower variance = higher consistency
         else:
             consistency_score = 0.5  # Moderate confidence for single rating
 
-        confidence = min(1.0, (len(rating_values) / 10.0) * consistency_score)
+        confidence = min(1.0, (count / 10.0) * consistency_score)
 
         return {
             'raw_score': round(raw_score, 3),
@@ -127,7 +176,7 @@ class TasteLearningService:
             'average_rating': round(avg_rating, 2),
             'would_make_again_ratio': round(would_make_again_ratio, 3),
             'modification_ratio': round(modification_ratio, 3),
-            'total_ratings': len(rating_values),
+            'total_ratings': count,
             'rating_consistency': round(consistency_score, 3)
         }
 
@@ -199,14 +248,16 @@ class TasteLearningService:
                     'first_rated_at': datetime.now() - timedelta(days=30)  # Approximate
                 }
 
+                # Published once for the whole batch below
                 success = await self.db_service.update_cuisine_preference(
-                    user_id, cuisine, preference_data
+                    user_id, cuisine, preference_data, publish=False
                 )
 
                 if not success:
                     logger.warning(f"Failed to update preference for cuisine {cuisine}")
 
             logger.info(f"Updated {len(analysis['cuisine_preferences'])} cuisine preferences for user {user_id}")
+            await invalidation_bus.publish(TASTE_PROFILE, user_id)
             return True
 
         except Exception as e:
@@ -351,36 +402,58 @@ class TasteLearningService:
     async def analyze_ingredient_preferences(self, user_id: str, min_occurrences: int = 2) -> Dict[str, Any]:
         """Analyze user's ingredient preferences based on rating patterns"""
         try:
-            # Get user's rating history with ingredients
-            ratings = await self.db_service.get_user_ratings_for_learning(user_id, limit=100)
-
-            if len(ratings) < 3:
-                logger.info(f"Insufficient ratings ({len(ratings)}) for ingredient analysis")
-                return self._create_empty_ingredient_analysis()
-
-            # Collect ingredient data across all rated recipes
-            ingredient_data = defaultdict(list)
-
-            for rating in ratings:
-                for ingredient in rating.get('ingredients', []):
-                    ingredient_name = ingredient['name'].lower().strip()
-                    if ingredient_name:
-                        ingredient_data[ingredient_name].append({
-                            'rating': rating['rating'],
-                            'would_make_again': rating.get('would_make_again'),
-                            'made_modifications': rating.get('made_modifications', False),
-                            'recipe_id': rating['recipe_id']
-                        })
-
-            # Analyze each ingredient with sufficient data
             ingredient_preferences = {}
-            total_weight = 0
-
-            for ingredient_name, ingredient_ratings in ingredient_data.items():
-                if len(ingredient_ratings) >= min_occurrences:
-                    analysis = self._analyze_single_ingredient(ingredient_name, ingredient_ratings)
-                    ingredient_preferences[ingredient_name] = analysis
-                    total_weight += analysis['weight']
+            loaded = self._load_aggregates(user_id, INGREDIENT)
+
+            if loaded is not None:
+                total_ratings, aggregates = loaded
+                if total_ratings < 3:
+                    logger.info(f"Insufficient ratings ({total_ratings}) for ingredient analysis")
+                    return self._create_empty_ingredient_analysis()
+
+                for ingredient_name, aggregate in aggregates.items():
+                    if aggregate.rating_count >= min_occurrences:
+                        ingredient_preferences[ingredient_name] = self._ingredient_analysis(
+                            count=aggregate.rating_count,
+                            weight=aggregate.weight,
+                            avg_rating=aggregate.mean,
+                            would_make_again_ratio=aggregate.would_make_again_ratio,
+                            modification_ratio=aggregate.modification_ratio,
+                            variance=aggregate.variance if aggregate.rating_count > 1 else None,
+                            # Each rating is of a different recipe (one rating per user and recipe)
+                            recipe_count=aggregate.rating_count,
+                        )
+            else:
+                # Get user's rating history with ingredients
+                ratings = await self.db_service.get_user_ratings_for_learning(user_id, limit=100)
+                total_ratings = len(ratings)
+
+                if total_ratings < 3:
+                    logger.info(f"Insufficient ratings ({total_ratings}) for ingredient analysis")
+                    return self._create_empty_ingredient_analysis()
+
+                # Collect ingredient data across all rated recipes
+                ingredient_data = defaultdict(list)
+
+                for rating in ratings:
+                    for ingredient in rating.get('ingredients', []):
+                        ingredient_name = ingredient['name'].lower().strip()
+                        if ingredient_name:
+                            ingredient_data[ingredient_name].append({
+                                'rating': rating['rating'],
+                                'would_make_again': rating.get('would_make_again'),
+                                'made_modifications': rating.get('made_modifications', False),
+                                'recipe_id': rating['recipe_id']
+                            })
+
+                # Analyze each ingredient with sufficient data
+                for ingredient_name, ingredient_ratings in ingredient_data.items():
+                    if len(ingredient_ratings) >= min_occurrences:
+                        ingredient_preferences[ingredient_name] = self._analyze_single_ingredient(
+                            ingredient_name, ingredient_ratings
+                        )
+
+            total_weight = sum(analysis['weight'] for analysis in ingredient_preferences.values())
 
             # Calculate normalized preference scores
             for ingredient in ingredient_preferences:
@@ -403,11 +476,11 @@ class TasteLearningService:
             )
 
             # Calculate confidence
-            confidence = self._calculate_ingredient_confidence(ingredient_preferences, len(ratings))
+            confidence = self._calculate_ingredient_confidence(ingredient_preferences, total_ratings)
 
             return {
                 'user_id': user_id,
-                'total_ratings_analyzed': len(ratings),
+                'total_ratings_analyzed': total_ratings,
                 'ingredients_analyzed': len(ingredient_preferences),
                 'confidence_score': confidence,
                 'ingredient_preferences': dict(sorted_ingredients),
@@ -436,6 +509,27 @@ class TasteLearningService:
         would_make_again_ratio = sum(would_make_again) / len(would_make_again) if would_make_again else 0.0
         modification_ratio = sum(made_modifications) / len(made_modifications) if made_modifications else 0.0
 
+        return self._ingredient_analysis(
+            count=len(rating_values),
+            weight=len(rating_values),
+            avg_rating=avg_rating,
+            would_make_again_ratio=would_make_again_ratio,
+            modification_ratio=modification_ratio,
+            variance=statistics.variance(rating_values) if len(rating_values) > 1 else None,
+            recipe_count=len(set([r['recipe_id'] for r in ratings])),
+        )
+
+    def _ingredient_analysis(
+        self,
+        count: int,
+        weight: float,
+        avg_rating: float,
+        would_make_again_ratio: float,
+        modification_ratio: float,
+        variance: Optional[float],
+        recipe_count: int,
+    ) -> Dict[str, Any]:
+        """Score an ingredient from its rating statistics (variance is None for a single rating)"""
         # Calculate raw preference score (normalized to -1 to 1 scale)
         rating_score = (avg_rating - 3.0) / 2.0  # Convert 1-5 scale to -1 to 1
         would_make_score = (would_make_again_ratio - 0.5) * 2  # Convert 0-1 to -1 to 1
@@ -446,17 +540,15 @@ class TasteLearningService:
         raw_score = (rating_score * 0.7) + (would_make_score * 0.2) + (modification_penalty * 0.1)
         raw_score = max(-1.0, min(1.0, raw_score))  # Clamp to [-1, 1]
 
-        # Calculate weight based on frequency
-        weight = len(rating_values)
+        # Weight is the ingredient's frequency (recency-weighted when decay is enabled)
 
         # Calculate confidence based on consistency
-        if len(rating_values) > 1:
-            rating_variance = statistics.variance(rating_values)
-            consistency_score = max(0, 1 - (rating_variance / 4.0))
+        if variance is not None:
+            consistency_score = max(0, 1 - (variance / 4.0))
         else:
             consistency_score = 0.5
 
-        confidence = min(1.0, (len(rating_values) / 5.0) * consistency_score)
+        confidence = min(1.0, (count / 5.0) * consistency_score)
 
         return {
             'raw_score': round(raw_score, 3),
@@ -465,8 +557,8 @@ class TasteLearningService:
             'average_rating': round(avg_rating, 2),
             'would_make_again_ratio': round(would_make_again_ratio, 3),
             'modification_ratio': round(modification_ratio, 3),
-            'total_occurrences': len(rating_values),
-            'recipe_count': len(set([r['recipe_id'] for r in ratings]))
+            'total_occurrences': count,
+            'recipe_count': recipe_count
         }
 
     def _categorize_ingredients(self, preferences: Dict[str, Any]) -> Dict[str, List[str]]:
@@ -564,14 +656,16 @@ class TasteLearningService:
                     'first_encountered_at': datetime.now() - timedelta(days=30)  # Approximate
                 }
 
+                # Published once for the whole batch below
                 success = await self.db_service.update_ingredient_preference(
-                    user_id, ingredient, preference_data
+                    user_id, ingredient, preference_data, publish=False
                 )
 
                 if not success:
                     logger.warning(f"Failed to update preference for ingredient {ingredient}")
 
             logger.info(f"Updated {len(analysis['ingredient_preferences'])} ingredient preferences for user {user_id}")
+            await invalidation_bus.publish(TASTE_PROFILE, user_id)
             return True
 
         except Exception as e:
@@ -0,0 +1,212 @@
+"""
+Access-token revocation set.
+
+In stateless mode an access token is trusted on its signed claims for its
+short lifetime, so no user or session row is read per request. What still
+has to be honoured are revocations issued before the token expires: a
+logout deletes one session, deactivation and "log out everywhere" cut off
+every token a user holds. Those are recorded here.
+
+Each revocation is kept in memory for the hot path (two dict lookups) and
+appended to the ``token_revocations`` table so other workers learn about
+it. ``refresh`` pulls rows added since the last seen id, so the periodic
+poll reads only new revocations. Entries are dropped once every access
+token they could apply to has expired. When access tokens are not stateless
+(every request reloads the user and session) nothing is recorded at all.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import config
+from app.services.maintenance import delete_in_batches
+
+logger = logging.getLogger(__name__)
+
+SESSION = "session"
+USER = "user"
+
+
+class TokenRevocationStore:
+    """In-memory revocation set backed by an append-only SQLite table."""
+
+    def __init__(
+        self,
+        token_ttl_seconds: float = 15 * 60,
+        refresh_interval: float = 5.0,
+        db: Any = None,
+        enabled: bool = True,
+    ):
+        self.token_ttl_seconds = token_ttl_seconds
+        self.refresh_interval = refresh_interval
+        self.enabled = enabled
+        self._db = db
+        self._next_prune = 0.0
+        self._sessions: Dict[str, float] = {}  # session id -> expires_at
+        self._users: Dict[str, Tuple[float, float]] = {}  # user id -> (revoked_at, expires_at)
+        self._last_id = 0
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.metrics = {
+            'checks': 0,
+            'revoked_hits': 0,
+            'refreshes': 0,
+            'refresh_errors': 0,
+            'loaded': 0,
+        }
+
+    @property
+    def db(self):
+        if self._db is None:
+            from app.services.database import db_service
+            self._db = db_service
+        return self._db
+
+    # ----- Hot path -----
+
+    def is_revoked(self, session_id: Optional[str], user_id: Optional[str], issued_at: Optional[float]) -> bool:
+        """True when the token's session was revoked or it predates a user-wide revocation."""
+        self.metrics['checks'] += 1
+        now = time.time()
+        revoked = False
+        if session_id is not None:
+            expires_at = self._sessions.get(str(session_id))
+            revoked = expires_at is not None and expires_at > now
+        if not revoked and user_id is not None:
+            entry = self._users.get(str(user_id))
+            if entry is not None and entry[1] > now:
+                revoked = issued_at is None or issued_at <= entry[0]
+        if revoked:
+            self.metrics['revoked_hits'] += 1
+        return revoked
+
+    # ----- Recording -----
+
+    def revoke(self, kind: str, subject: str, conn: Any = None) -> None:
+        """
+        Revoke a session or all of a user's current tokens.
+
+        With ``conn`` the row is written in the caller's transaction (the
+        caller commits); otherwise it is written and committed here. A no-op
+        unless the store is enabled (stateless access tokens).
+        """
+        if not self.enabled:
+            return
+        revoked_at = time.time()
+        expires_at = revoked_at + self.token_ttl_seconds
+        if revoked_at >= self._next_prune:
+            # Also bounds the maps in workers whose refresh loop is not running
+            self._prune()
+        self._remember(kind, str(subject), revoked_at, expires_at)
+        params = (kind, str(subject), revoked_at, expires_at)
+        if conn is not None:
+            self._insert(conn, params)
+            return
+        try:
+            with self.db.get_connection() as own_conn:
+                self._insert(own_conn, params)
+                own_conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to persist {kind} revocation for {subject}: {e}")
+
+    async def revoke_user(self, user_id: str) -> None:
+        await asyncio.to_thread(self.revoke, USER, user_id)
+
+    @staticmethod
+    def _insert(conn: Any, params: Tuple[Any, ...]) -> None:
+        conn.execute(
+            "INSERT INTO token_revocations (kind, subject, revoked_at, expires_at) VALUES (?, ?, ?, ?)",
+            params,
+        )
+
+    def _remember(self, kind: str, subject: str, revoked_at: float, expires_at: float) -> None:
+        if kind == SESSION:
+            self._sessions[subject] = max(expires_at, self._sessions.get(subject, 0.0))
+        elif kind == USER:
+            current = self._users.get(subject)
+            if current is None or revoked_at > current[0]:
+                self._users[subject] = (revoked_at, expires_at)
+
+    # ----- Synchronisation -----
+
+    async def refresh(self) -> int:
+        """Load revocations recorded since the last refresh; returns rows applied."""
+        try:
+            rows = await asyncio.to_thread(self._read_new, self._last_id, time.time())
+        except Exception as e:
+            self.metrics['refresh_errors'] += 1
+            logger.warning(f"Token revocation refresh failed: {e}")
+            return 0
+
+        for row_id, kind, subject, revoked_at, expires_at in rows:
+            self._remember(kind, subject, revoked_at, expires_at)
+            self._last_id = max(self._last_id, row_id)
+        self._prune()
+        self.metrics['refreshes'] += 1
+        self.metrics['loaded'] += len(rows)
+        return len(rows)
+
+    def _read_new(self, last_id: int, now: float):
+        with self.db.get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, kind, subject, revoked_at, expires_at FROM token_revocations
+                WHERE id > ? AND expires_at > ?
+                ORDER BY id
+                """,
+                (last_id, now),
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def _prune(self) -> None:
+        now = time.time()
+        self._next_prune = now + self.refresh_interval
+        self._sessions = {sid: exp for sid, exp in self._sessions.items() if exp > now}
+        self._users = {uid: entry for uid, entry in self._users.items() if entry[1] > now}
+
+    def purge_expired(self, batch_size: int = 500, pause: float = 0.0) -> int:
+        """Delete expired rows from the table (run by maintenance); returns rows removed."""
+        return delete_in_batches(
+            self.db, "token_revocations", "expires_at <= ?", (time.time(),), batch_size, pause
+        )
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        """Start polling for revocations made by other workers."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'sessions': len(self._sessions),
+            'users': len(self._users),
+            'last_id': self._last_id,
+            **self.metrics,
+        }
+
+    def clear(self) -> None:
+        self._sessions.clear()
+        self._users.clear()
+        self._last_id = 0
+
+
+token_revocations = TokenRevocationStore(
+    # A minute of slack covers clock skew between workers
+    token_ttl_seconds=config.access_token_expire_minutes * 60 + 60,
+    refresh_interval=config.token_revocation_refresh_seconds,
+    enabled=config.auth_stateless_tokens,
+)
@@ -0,0 +1,95 @@
+"""
+Translation batcher.
+
+Recipe translation asks for one string at a time (a name, an ingredient, a
+step), but the cache and the providers are far cheaper per string when asked
+for many at once. ``TranslationBatcher`` sits between the two: every
+``translate()`` call made within ``window`` seconds of the first joins the same
+batch, identical requests share one future, and the whole batch is handed to
+a single ``resolve`` coroutine. Awaiting callers get their own result back.
+
+Translating ten recipes concurrently therefore costs one cache ``mget`` and a
+handful of provider requests instead of one of each per string.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+Resolver = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Optional[str]]]]
+
+
+class TranslationBatcher:
+    """Coalesces concurrent translation requests into batched resolves."""
+
+    def __init__(self, resolve: Resolver, window: float = 0.005, max_batch: int = 1000):
+        """
+        Args:
+            resolve: Coroutine mapping a list of distinct keys to their translations
+            window: Seconds to wait for more requests after the first one
+            max_batch: Pending keys that trigger an immediate flush
+        """
+        self.resolve = resolve
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: Dict[Hashable, "asyncio.Future[Optional[str]]"] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # asyncio only keeps weak references to tasks; hold resolvers until done
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self.metrics = {
+            'requests': 0,
+            'coalesced': 0,
+            'batches': 0,
+            'keys_resolved': 0,
+        }
+
+    async def translate(self, key: Hashable) -> Optional[str]:
+        """Translation for ``key``, resolved together with concurrent requests."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # A new event loop (tests, worker restart) cannot await futures of the old one
+            self._loop, self._pending, self._timer = loop, {}, None
+
+        self.metrics['requests'] += 1
+        future = self._pending.get(key)
+        if future is not None:
+            self.metrics['coalesced'] += 1
+        else:
+            future = loop.create_future()
+            self._pending[key] = future
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = self._loop.create_task(self._resolve(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, batch: Dict[Hashable, "asyncio.Future[Optional[str]]"]) -> None:
+        self.metrics['batches'] += 1
+        self.metrics['keys_resolved'] += len(batch)
+        try:
+            results = await self.resolve(list(batch))
+        except Exception as e:
+            logger.error(f"Translation batch of {len(batch)} failed: {e}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(results.get(key))
+
+    def stats(self) -> Dict[str, int]:
+        return {'pending': len(self._pending), **self.metrics}
@@ -0,0 +1,158 @@
+"""
+Translation memory.
+
+Every successful translation is kept in the ``translation_memory`` table,
+keyed by the normalised source text and the language pair, so vocabulary
+the app has translated once never goes back to a provider, even after
+Redis is flushed. The curated food glossary is seeded into the same table
+and always wins over provider output for the same text.
+
+At startup the table is loaded into a dict and every lookup is served from
+memory. Keys are case-insensitive, so a hit takes the leading capitalisation
+of the text being looked up rather than of whichever variant was stored. Until then the memory is inactive: lookups miss and nothing is
+recorded.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+GLOSSARY = "glossary"
+PROVIDER = "provider"
+
+
+def normalize(text: str) -> str:
+    """Lower-case with runs of whitespace collapsed."""
+    return " ".join(text.lower().split())
+
+
+def match_leading_case(source: str, translation: str) -> str:
+    """Give ``translation`` the case of the first letter of ``source``."""
+    lead = next((char for char in source if char.isalpha()), None)
+    for index, char in enumerate(translation):
+        if char.isalpha():
+            cased = char.upper() if lead is not None and lead.isupper() else char.lower()
+            if lead is None or cased == char:
+                return translation
+            return translation[:index] + cased + translation[index + 1:]
+    return translation
+
+
+class TranslationMemory:
+    """Dict of known translations backed by a SQLite table."""
+
+    def __init__(self, db: Any = None):
+        self._db = db
+        self._entries: Dict[Tuple[str, str, str], str] = {}
+        self.loaded = False
+        self.metrics = {
+            'hits': 0,
+            'misses': 0,
+            'recorded': 0,
+            'write_errors': 0,
+        }
+
+    @property
+    def db(self):
+        if self._db is None:
+            from app.services.database import db_service
+            self._db = db_service
+        return self._db
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ----- Lookups -----
+
+    def get(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        if not self.loaded:
+            return None
+        translation = self._entries.get((normalize(text), source_lang, target_lang))
+        if translation is None:
+            self.metrics['misses'] += 1
+            return None
+        self.metrics['hits'] += 1
+        return match_leading_case(text, translation)
+
+    # ----- Loading and seeding -----
+
+    def load(self) -> int:
+        """Read the whole table into memory and start serving lookups."""
+        with self.db.get_connection() as conn:
+            rows = conn.execute(
+                "SELECT source_text, source_lang, target_lang, translated_text FROM translation_memory"
+            ).fetchall()
+        self._entries = {
+            (row["source_text"], row["source_lang"], row["target_lang"]): row["translated_text"] for row in rows
+        }
+        self.loaded = True
+        return len(self._entries)
+
+    def seed(self, glossary: Mapping[str, str], source_lang: str, target_lang: str) -> int:
+        """Store curated translations, replacing provider output for the same texts."""
+        rows = self._rows(glossary, source_lang, target_lang, GLOSSARY)
+        with self.db.get_connection() as conn:
+            conn.executemany("""
+                INSERT INTO translation_memory
+                    (source_text, source_lang, target_lang, translated_text, origin, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source_text, source_lang, target_lang) DO UPDATE SET
+                    translated_text = excluded.translated_text,
+                    origin = excluded.origin,
+                    updated_at = excluded.updated_at
+            """, rows)
+            conn.commit()
+        if self.loaded:
+            self._entries.update({(row[0], row[1], row[2]): row[3] for row in rows})
+        return len(rows)
+
+    # ----- Recording -----
+
+    async def remember(self, translations: Mapping[str, str], source_lang: str, target_lang: str) -> None:
+        """Record provider translations; glossary entries are never overwritten."""
+        if not self.loaded or not translations:
+            return
+        rows = [
+            row for row in self._rows(translations, source_lang, target_lang, PROVIDER)
+            if (row[0], row[1], row[2]) not in self._entries
+        ]
+        if not rows:
+            return
+        self._entries.update({(row[0], row[1], row[2]): row[3] for row in rows})
+        try:
+            await asyncio.to_thread(self._write, rows)
+            self.metrics['recorded'] += len(rows)
+        except Exception as e:
+            self.metrics['write_errors'] += 1
+            logger.warning(f"Translation memory write of {len(rows)} entries failed: {e}")
+
+    def _write(self, rows) -> None:
+        with self.db.get_connection() as conn:
+            conn.executemany("""
+                INSERT INTO translation_memory
+                    (source_text, source_lang, target_lang, translated_text, origin, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source_text, source_lang, target_lang) DO UPDATE SET
+                    translated_text = excluded.translated_text,
+                    updated_at = excluded.updated_at
+                WHERE translation_memory.origin != 'glossary'
+            """, rows)
+            conn.commit()
+
+    @staticmethod
+    def _rows(translations: Mapping[str, str], source_lang: str, target_lang: str, origin: str):
+        now = time.time()
+        return [
+            (normalize(text), source_lang, target_lang, translation.strip(), origin, now)
+            for text, translation in translations.items()
+            if text and text.strip() and translation and translation.strip()
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {'loaded': self.loaded, 'entries': len(self._entries), **self.metrics}
+
+
+translation_memory = TranslationMemory()
@@ -5,12 +5,15 @@ Provides multi-provider translation with caching and fallback mechanisms.
 
 import asyncio
 import logging
-from typing import Dict, List, Optional, Tuple
+import threading
+import weakref
+from typing import Dict, List, Optional, Tuple, Union
 import httpx
 from deep_translator import GoogleTranslator, MicrosoftTranslator, YandexTranslator
 from deep_translator.exceptions import TranslationNotFound, TooManyRequests, RequestError
 
 from .cache import CacheService
+from .translation_memory import TranslationMemory, translation_memory
 from app.config import config
 
 logger = logging.getLogger(__name__)
@@ -44,9 +47,24 @@ class TranslationService:
         YandexTranslator
     ]
     
-    def __init__(self, cache_service: CacheService):
+    # Batch translation: texts per provider request, characters per joined
+    # segment (providers cap requests around 5000) and requests in flight
+    BATCH_MAX_TEXTS = 50
+    BATCH_MAX_CHARS = 4500
+    BATCH_CONCURRENCY = 4
+
+    def __init__(self, cache_service: CacheService, memory: Optional[TranslationMemory] = None):
         self.cache = cache_service
+        # Inactive (never loaded) unless a memory is passed in
+        self.memory = memory if memory is not None else TranslationMemory()
         self._translation_cache_ttl = 7 * 24 * 60 * 60  # 7 days in seconds
+        # Translator objects per executor thread (see _provider)
+        self._providers = threading.local()
+        # httpx pools are bound to the loop that opened them: one per live loop
+        self._http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._in_flight: Dict[str, "asyncio.Future[Optional[str]]"] = {}
         self.libretranslate_url = config.libretranslate_url.rstrip('/') if config.libretranslate_url else None
         self.libretranslate_api_key = config.libretranslate_api_key
 
@@ -90,17 +108,39 @@ class TranslationService:
             logger.warning(f"Unsupported target language: {target_lang}")
             return None
         
+        # Known vocabulary never leaves the process
+        remembered = self.memory.get(text, source_lang, target_lang)
+        if remembered:
+            return remembered
+
         # Check cache first
         cache_key = self._get_cache_key(text, source_lang, target_lang)
         cached_translation = await self.cache.get(cache_key)
         if cached_translation:
             logger.debug(f"Cache hit for translation: {text} -> {cached_translation}")
+            await self.memory.remember({text: cached_translation}, source_lang, target_lang)
             return cached_translation
 
+        # Concurrent requests for the same text share one provider call
+        in_flight = self._in_flight.get(cache_key)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[cache_key] = future
+        translation = None
+        try:
+            translation = await self._translate_uncached(text, source_lang, target_lang, cache_key)
+            return translation
+        finally:
+            future.set_result(translation)
+            self._in_flight.pop(cache_key, None)
+
+    async def _translate_uncached(self, text: str, source_lang: str, target_lang: str, cache_key: str) -> Optional[str]:
         # Try LibreTranslate first if configured
         libre_translation = await self._translate_with_libretranslate(text, source_lang, target_lang)
         if libre_translation:
             await self.cache.set(cache_key, libre_translation, ttl=self._translation_cache_ttl)
+            await self.memory.remember({text: libre_translation}, source_lang, target_lang)
             logger.info(f"Translated via LibreTranslate: {text[:50]}... -> {libre_translation[:50]}...")
             return libre_translation
 
@@ -110,12 +150,114 @@ class TranslationService:
         if translation:
             # Cache successful translation
             await self.cache.set(cache_key, translation, ttl=self._translation_cache_ttl)
+            await self.memory.remember({text: translation}, source_lang, target_lang)
             logger.info(f"Successfully translated and cached: {text} -> {translation}")
             return translation
         
         logger.warning(f"Failed to translate text: {text}")
         return None
 
+    async def translate_texts(
+        self,
+        texts: List[str],
+        source_lang: str = 'en',
+        target_lang: str = 'es'
+    ) -> Dict[str, Optional[str]]:
+        """
+        Translate many texts with as few provider requests as possible.
+
+        Cached texts are read with one ``mget``. Misses go to LibreTranslate
+        as list requests when it is configured; otherwise they are joined
+        into newline-separated segments of up to ``BATCH_MAX_CHARS`` and each
+        segment is translated in one provider call. Segments whose line count
+        does not survive translation fall back to ``translate_text`` per text.
+        At most ``BATCH_CONCURRENCY`` requests run at once.
+
+        Args:
+            texts: Texts to translate (duplicates are translated once)
+            source_lang: Source language code
+            target_lang: Target language code
+
+        Returns:
+            Dictionary mapping each original text to its translation or None
+        """
+        result: Dict[str, Optional[str]] = {}
+        pending: Dict[str, List[str]] = {}  # normalized text -> original spellings
+        for text in texts:
+            if not text or not text.strip() or source_lang == target_lang:
+                result[text] = text
+            else:
+                pending.setdefault(text.strip(), []).append(text)
+        if not pending:
+            return result
+        if source_lang not in self.SUPPORTED_LANGUAGES or target_lang not in self.SUPPORTED_LANGUAGES:
+            logger.warning(f"Unsupported language pair: {source_lang} -> {target_lang}")
+            return {text: result.get(text) for text in texts}
+
+        translations: Dict[str, Optional[str]] = {
+            text: self.memory.get(text, source_lang, target_lang) for text in pending
+        }
+        keys = {text: self._get_cache_key(text, source_lang, target_lang) for text in pending if not translations[text]}
+        if keys:
+            cached = await self.cache.mget(keys.values())
+            from_cache = {text: cached[key] for text, key in keys.items() if cached.get(key)}
+            translations.update(from_cache)
+            await self.memory.remember(from_cache, source_lang, target_lang)
+        misses = [text for text, translation in translations.items() if not translation]
+
+        if misses:
+            semaphore = asyncio.Semaphore(self.BATCH_CONCURRENCY)
+
+            async def run(chunk: List[str]) -> Dict[str, Optional[str]]:
+                async with semaphore:
+                    return await self._translate_chunk(chunk, source_lang, target_lang)
+
+            for chunk_result in await asyncio.gather(*(run(chunk) for chunk in self._chunk_texts(misses))):
+                translations.update(chunk_result)
+            fresh = {keys[text]: translations[text] for text in misses if translations.get(text)}
+            if fresh:
+                await self.cache.mset(fresh, ttl=self._translation_cache_ttl)
+                await self.memory.remember(
+                    {text: translations[text] for text in misses if translations.get(text)}, source_lang, target_lang
+                )
+            logger.info(f"Batch translated {len(fresh)}/{len(misses)} texts ({len(pending) - len(misses)} cached)")
+
+        for normalized, originals in pending.items():
+            for text in originals:
+                result[text] = translations.get(normalized)
+        return result
+
+    def _chunk_texts(self, texts: List[str]) -> List[List[str]]:
+        chunks: List[List[str]] = []
+        size = 0
+        for text in texts:
+            if not chunks or len(chunks[-1]) >= self.BATCH_MAX_TEXTS or size + len(text) + 1 > self.BATCH_MAX_CHARS:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(text)
+            size += len(text) + 1
+        return chunks
+
+    async def _translate_chunk(self, texts: List[str], source_lang: str, target_lang: str) -> Dict[str, Optional[str]]:
+        """Translate one chunk with a single provider request where possible."""
+        if self.libretranslate_url:
+            translations = await self._translate_with_libretranslate(texts, source_lang, target_lang)
+            if isinstance(translations, list) and len(translations) == len(texts):
+                return {text: (translation or "").strip() or None for text, translation in zip(texts, translations)}
+
+        joinable = [text for text in texts if "\n" not in text]
+        result: Dict[str, Optional[str]] = {}
+        if len(joinable) > 1:
+            joined = await self._translate_with_providers("\n".join(joinable), source_lang, target_lang)
+            lines = joined.split("\n") if joined else []
+            if len(lines) == len(joinable):
+                result = {text: line.strip() or None for text, line in zip(joinable, lines)}
+
+        for text in texts:
+            if text not in result:
+                result[text] = await self.translate_text(text, source_lang, target_lang)
+        return result
+
     async def _translate_with_providers(
         self, 
         text: str, 
@@ -147,11 +289,15 @@ class TranslationService:
 
     async def _translate_with_libretranslate(
         self,
-        text: str,
+        text: Union[str, List[str]],
         source_lang: str,
         target_lang: str
-    ) -> Optional[str]:
-        """Attempt translation via LibreTranslate if configured."""
+    ) -> Optional[Union[str, List[str]]]:
+        """
+        Attempt translation via LibreTranslate if configured.
+
+        A list of texts is sent as one request and returns a list.
+        """
 
         if not self.libretranslate_url:
             return None
@@ -167,20 +313,22 @@ class TranslationService:
             payload["api_key"] = self.libretranslate_api_key
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(f"{self.libretranslate_url}/translate", json=payload)
-                response.raise_for_status()
-                data = response.json()
+            response = await self._libretranslate_client().post(f"{self.libretranslate_url}/translate", json=payload)
+            response.raise_for_status()
+            data = response.json()
 
-                if isinstance(data, dict):
-                    translation = data.get("translatedText") or data.get("translated_text")
-                else:
-                    translation = data
+            if isinstance(data, dict):
+                translation = data.get("translatedText") or data.get("translated_text")
+            else:
+                translation = data
 
-                if translation and translation.strip():
-                    return translation.strip()
+            if isinstance(translation, list):
+                return [str(item or "").strip() for item in translation]
 
-                logger.warning("LibreTranslate responded without translated text")
+            if translation and translation.strip():
+                return translation.strip()
+
+            logger.warning("LibreTranslate responded without translated text")
         except Exception as exc:
             logger.warning(f"LibreTranslate request failed: {exc}")
 
@@ -201,6 +349,45 @@ class TranslationService:
             logger.warning(f"LibreTranslate health probe failed: {exc}")
             return f"error: {exc}".split('\n')[0]
     
+    def _libretranslate_client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client for LibreTranslate, one per event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._http_clients.get(loop)
+        if client is None:
+            # Clients of closed loops cannot be awaited any more; release them
+            for owner in [owner for owner in self._http_clients if owner.is_closed()]:
+                del self._http_clients[owner]
+            client = self._http_clients[loop] = httpx.AsyncClient(timeout=10.0)
+        return client
+
+    async def close(self) -> None:
+        """Close pooled provider connections."""
+        loop = asyncio.get_running_loop()
+        clients = list(self._http_clients.items())
+        self._http_clients.clear()
+        for owner, client in clients:
+            if owner is loop:
+                await client.aclose()
+            elif owner.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), owner)
+
+    def _provider(self, provider_class, source_lang: str, target_lang: str):
+        """
+        Reuse one translator object per thread, provider and language pair.
+
+        deep_translator objects store the text being translated on the
+        instance before sending the request, so an instance shared by two
+        executor threads can send (and return) the other call's text.
+        """
+        translators: Dict[Tuple[type, str, str], object] = getattr(self._providers, "translators", None)
+        if translators is None:
+            translators = self._providers.translators = {}
+        key = (provider_class, source_lang, target_lang)
+        translator = translators.get(key)
+        if translator is None:
+            translator = translators[key] = provider_class(source=source_lang, target=target_lang)
+        return translator
+
     def _translate_sync(
         self, 
         provider_class, 
@@ -210,7 +397,7 @@ class TranslationService:
     ) -> Optional[str]:
         """Synchronous translation for running in thread pool."""
         try:
-            translator = provider_class(source=source_lang, target=target_lang)
+            translator = self._provider(provider_class, source_lang, target_lang)
             return translator.translate(text)
             
         except (TranslationNotFound, TooManyRequests, RequestError) as e:
@@ -337,5 +524,11 @@ def get_translation_service(cache_service: CacheService) -> TranslationService:
     """Get or create translation service instance."""
     global _translation_service
     if _translation_service is None:
-        _translation_service = TranslationService(cache_service)
+        _translation_service = TranslationService(cache_service, memory=translation_memory)
     return _translation_service
+
+
+async def close_translation_service() -> None:
+    """Close the shared instance's pooled provider connections, if it was created."""
+    if _translation_service is not None:
+        await _translation_service.close()
@@ -16,6 +16,9 @@ from datetime import datetime
 
 from app.models.user import User, UserCreate, UserRole
 from app.repositories.user_repository import UserRepository
+from app.services.invalidation_bus import USER, invalidation_bus
+from app.services.request_loader import get_request_loader, invalidate_request_cache
+from app.services.token_revocation import token_revocations
 
 
 class UserService:
@@ -77,13 +80,16 @@ class UserService:
         """
         Retrieve a user by ID.
 
+        Reads are shared for the rest of the request, so auth and the
+        services it hands off to only load the user once.
+
         Args:
             user_id: User's unique identifier (UUID)
 
         Returns:
             User: User object if found, None otherwise
         """
-        return await self.user_repo.get_by_id(user_id)
+        return await get_request_loader().load_async("user", user_id, self.user_repo.get_by_id)
 
     async def get_password_hash(self, user_id: str) -> Optional[str]:
         """
@@ -121,4 +127,11 @@ class UserService:
 
         updates['updated_at'] = datetime.utcnow().isoformat()
 
-        return await self.user_repo.update(user_id, updates)
+        invalidate_request_cache("user", user_id)
+        user = await self.user_repo.update(user_id, updates)
+        # Every worker drops the user it cached for token resolution
+        await invalidation_bus.publish(USER, user_id)
+        if ('is_active' in updates and not updates['is_active']) or {'role', 'is_developer'} & updates.keys():
+            # Access tokens carry active/role/developer claims; cut off the stale ones
+            await token_revocations.revoke_user(user_id)
+        return user
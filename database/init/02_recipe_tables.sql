@@ -24,6 +24,14 @@ CREATE TABLE IF NOT EXISTS recipes (
     FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE SET NULL
 );
 
+-- Recipe tags, one row per (recipe, tag); recipes.tags keeps the JSON copy for display
+CREATE TABLE IF NOT EXISTS recipe_tags (
+    tag TEXT NOT NULL,
+    recipe_id TEXT NOT NULL,
+    PRIMARY KEY (tag, recipe_id),
+    FOREIGN KEY (recipe_id) REFERENCES recipes (id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
 -- Recipe ingredients table
 CREATE TABLE IF NOT EXISTS recipe_ingredients (
     id TEXT PRIMARY KEY,
@@ -84,6 +92,23 @@ CREATE TABLE IF NOT EXISTS user_recipe_ratings (
     UNIQUE(user_id, recipe_id) -- One rating per user per recipe
 );
 
+-- Running rating aggregates per user and cuisine/ingredient (taste learning)
+CREATE TABLE IF NOT EXISTS user_taste_aggregates (
+    user_id TEXT NOT NULL,
+    dimension TEXT NOT NULL, -- 'total', 'cuisine' or 'ingredient'
+    item TEXT NOT NULL,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    weight REAL NOT NULL DEFAULT 0,
+    rating_sum REAL NOT NULL DEFAULT 0,
+    rating_sq_sum REAL NOT NULL DEFAULT 0,
+    again_weight REAL NOT NULL DEFAULT 0,
+    again_sum REAL NOT NULL DEFAULT 0,
+    mod_weight REAL NOT NULL DEFAULT 0,
+    mod_sum REAL NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (user_id, dimension, item)
+);
+
 -- Recipe generation requests for caching and analytics
 CREATE TABLE IF NOT EXISTS recipe_generation_requests (
     id TEXT PRIMARY KEY,
@@ -124,6 +149,16 @@ CREATE INDEX IF NOT EXISTS idx_recipes_created_by ON recipes(created_by);
 CREATE INDEX IF NOT EXISTS idx_recipes_created_at ON recipes(created_at);
 CREATE INDEX IF NOT EXISTS idx_recipes_confidence ON recipes(confidence_score);
 
+-- Search ranking (confidence_score DESC, created_at DESC, id DESC), alone and
+-- behind each equality filter, so a page is a backwards index range scan
+CREATE INDEX IF NOT EXISTS idx_recipes_ranking ON recipes(confidence_score, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_recipes_cuisine_ranking ON recipes(cuisine_type, confidence_score, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_recipes_difficulty_ranking ON recipes(difficulty_level, confidence_score, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_recipes_user_ranking ON recipes(user_id, confidence_score, created_at, id);
+
+-- Recipe tag indexes (the primary key serves lookups by tag)
+CREATE INDEX IF NOT EXISTS idx_recipe_tags_recipe_id ON recipe_tags(recipe_id, tag);
+
 -- Recipe ingredients indexes
 CREATE INDEX IF NOT EXISTS idx_recipe_ingredients_recipe_id ON recipe_ingredients(recipe_id);
 CREATE INDEX IF NOT EXISTS idx_recipe_ingredients_name ON recipe_ingredients(ingredient_name);
@@ -196,6 +231,13 @@ VALUES
 ('sample_mediterranean', 'Sample Mediterranean Salad', 'A healthy Mediterranean-style salad', 'mediterranean', 'easy', 15, 0, 4, 'ai_generated', 0.85, '["mediterranean", "healthy", "vegetarian", "quick"]'),
 ('sample_italian', 'Sample Pasta Primavera', 'Fresh pasta with seasonal vegetables', 'italian', 'medium', 20, 15, 4, 'ai_generated', 0.90, '["italian", "vegetarian", "pasta", "seasonal"]');
 
+-- Populate recipe_tags from the JSON column for databases created before it existed
+INSERT OR IGNORE INTO recipe_tags (tag, recipe_id)
+SELECT DISTINCT j.value, r.id
+FROM recipes r, json_each(r.tags) j
+WHERE json_valid(r.tags) AND j.type = 'text'
+  AND NOT EXISTS (SELECT 1 FROM recipe_tags LIMIT 1);
+
 -- Sample ingredients for Mediterranean salad
 INSERT OR IGNORE INTO recipe_ingredients (id, recipe_id, ingredient_name, quantity, unit, calories_per_unit, protein_g_per_unit, fat_g_per_unit, carbs_g_per_unit)
 VALUES
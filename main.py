@@ -8,7 +8,7 @@ with improved organization, error handling, and logging.
 # =============================================================================
 # FASTAPI IMPORTS
 # =============================================================================
-from fastapi import FastAPI, status
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
@@ -41,7 +41,23 @@ from app.routes.moderation import router as moderation_router
 # SERVICE AND MODEL IMPORTS
 # =============================================================================
 from app.services.smart_diet import smart_diet_engine
-from app.services.auth import auth_service
+from app.services.auth import auth_service, session_service
+from app.services.database import db_service
+from app.services.catalog_snapshot import ensure_catalog_snapshot, refresh_catalog_snapshot
+from app.services.nutrient_index import nutrient_index
+from app.services.cache import cache_layer
+from app.services.invalidation_bus import invalidation_bus
+from app.services.intelligent_flow import intelligent_flow_service
+from app.services.intelligent_flow_queue import intelligent_flow_queue
+from app.services.recipe_ai_engine import recipe_ai_engine
+from app.services.recipe_translation_service import FOOD_TERMINOLOGY_ES
+from app.services.translation_memory import translation_memory
+from app.services.translation_service import close_translation_service
+from app.services.request_loader import request_scope
+from app.services.password_hasher import password_hasher
+from app.services.token_revocation import token_revocations
+from app.services.maintenance import analyze, checkpoint_wal, incremental_vacuum, maintenance_scheduler
+from app.services.notifications.notification_service import NotificationService
 from app.models.user import UserCreate
 
 # =============================================================================
@@ -49,6 +65,7 @@ from app.models.user import UserCreate
 # =============================================================================
 from app.config import config
 from logging_config import setup_logging
+import asyncio
 import logging
 
 # Initialize logging
@@ -114,6 +131,181 @@ async def seed_demo_user() -> None:
         logger.info("🔄 Application will continue without demo user")
 
 
+@app.on_event("startup")
+async def warm_catalog_snapshot() -> None:
+    """
+    Build (if stale) and map the shared product catalog snapshot.
+    
+    Only one worker exports the products table; the others wait on the
+    snapshot lock and then map the same file.
+    """
+    if not config.catalog_snapshot_enabled:
+        return
+    
+    try:
+        snapshot = await asyncio.to_thread(ensure_catalog_snapshot, db_service.get_connection)
+        logger.info(f"📦 Catalog snapshot mapped: {snapshot.rows} products, {snapshot.nbytes} bytes shared")
+    except Exception as exc:
+        logger.warning(f"⚠️  Catalog snapshot unavailable, using database reads: {exc}")
+
+
+@app.on_event("startup")
+async def warm_smart_diet_products() -> None:
+    """Preload Smart Diet product resolutions for the swap categories."""
+    try:
+        cached = await smart_diet_engine.optimization_engine.warm_product_cache()
+        logger.info(f"🥗 Smart Diet product cache warmed: {cached} entries")
+    except Exception as exc:
+        logger.warning(f"⚠️  Smart Diet product cache warm-up failed: {exc}")
+
+
+@app.on_event("startup")
+async def warm_nutrient_index() -> None:
+    """Build the nutrient index in the background; requests use the database until it is ready."""
+    nutrient_index.schedule_rebuild()
+
+
+@app.on_event("startup")
+async def start_token_revocation_refresh() -> None:
+    """Load outstanding token revocations and keep polling for new ones (stateless auth only)."""
+    if not config.auth_stateless_tokens:
+        return
+    loaded = await token_revocations.refresh()
+    token_revocations.start()
+    logger.info(f"🔑 Stateless access tokens enabled; {loaded} active revocations loaded")
+
+
+@app.on_event("startup")
+async def start_maintenance() -> None:
+    """Schedule garbage collection and SQLite upkeep."""
+    if not config.maintenance_enabled:
+        return
+
+    if not maintenance_scheduler.jobs:
+        batch_size = config.maintenance_batch_size
+        pause = config.maintenance_batch_pause_ms / 1000
+        every = config.maintenance_checkpoint_every
+        maintenance_scheduler.add_job(
+            "expired_sessions",
+            lambda: session_service.cleanup_expired_sessions(batch_size, pause),
+        )
+        maintenance_scheduler.add_job(
+            "old_notifications",
+            lambda: asyncio.to_thread(
+                NotificationService.cleanup_old_notifications, config.notification_retention_days, batch_size, pause
+            ),
+        )
+        maintenance_scheduler.add_job(
+            "token_revocations", lambda: asyncio.to_thread(token_revocations.purge_expired, batch_size, pause)
+        )
+        maintenance_scheduler.add_job(
+            "intelligent_flow_jobs", lambda: asyncio.to_thread(intelligent_flow_queue.purge_expired, batch_size, pause)
+        )
+        maintenance_scheduler.add_job("learning_signals", smart_diet_engine.learning_signals.flush_if_due)
+        maintenance_scheduler.add_job("wal_checkpoint", lambda: asyncio.to_thread(checkpoint_wal, db_service), every=every)
+        maintenance_scheduler.add_job("incremental_vacuum", lambda: asyncio.to_thread(incremental_vacuum, db_service), every=every)
+        maintenance_scheduler.add_job(
+            "analyze", lambda: asyncio.to_thread(analyze, db_service), every=config.maintenance_analyze_every
+        )
+        if config.catalog_snapshot_enabled:
+            maintenance_scheduler.add_job(
+                "catalog_snapshot", lambda: asyncio.to_thread(refresh_catalog_snapshot, db_service.get_connection)
+            )
+    maintenance_scheduler.start()
+    logger.info(f"🧹 Maintenance scheduled every {maintenance_scheduler.interval:.0f}s")
+
+
+@app.on_event("startup")
+async def load_translation_memory() -> None:
+    """Seed the food glossary and load known translations into memory."""
+    if not config.translation_memory_enabled:
+        return
+    try:
+        await asyncio.to_thread(translation_memory.seed, FOOD_TERMINOLOGY_ES, "en", "es")
+        loaded = await asyncio.to_thread(translation_memory.load)
+        logger.info(f"🌐 Translation memory loaded: {loaded} entries")
+    except Exception as exc:
+        logger.warning(f"⚠️  Translation memory unavailable, using cache and providers: {exc}")
+
+
+@app.on_event("startup")
+async def start_recipe_pool_fill() -> None:
+    """Pre-generate the recipe pool in the background."""
+    if not config.recipe_pool_enabled:
+        return
+    recipe_ai_engine.start_recipe_pool_fill()
+    logger.info(f"🍲 Recipe pool filling: {recipe_ai_engine.recipe_pool.variants} variants per cell")
+
+
+@app.on_event("startup")
+async def start_intelligent_flow_workers() -> None:
+    """Resume queued intelligent flow jobs, including those left by a previous run."""
+    if not config.intelligent_flow_enabled:
+        return
+    intelligent_flow_queue.start(intelligent_flow_service)
+    logger.info(f"🧠 Intelligent flow workers started: {intelligent_flow_queue.workers}")
+
+
+@app.on_event("startup")
+async def start_invalidation_listener() -> None:
+    """Receive cache invalidations published by other workers."""
+    invalidation_bus.start()
+
+
+@app.on_event("shutdown")
+async def stop_invalidation_listener() -> None:
+    """Stop listening before the Redis pool is closed."""
+    await invalidation_bus.stop()
+
+
+@app.on_event("shutdown")
+async def close_translation_clients() -> None:
+    """Close pooled translation provider connections."""
+    await close_translation_service()
+
+
+@app.on_event("shutdown")
+async def stop_intelligent_flow_workers() -> None:
+    """Stop flow workers; the jobs they were running go back to the queue."""
+    await intelligent_flow_queue.stop()
+
+
+@app.on_event("shutdown")
+async def stop_recipe_pool_fill() -> None:
+    """Cancel a recipe pool fill still in progress."""
+    await recipe_ai_engine.recipe_pool.stop()
+
+
+@app.on_event("shutdown")
+async def close_cache_layer() -> None:
+    """Release the shared Redis connection pool."""
+    await cache_layer.close()
+
+
+@app.on_event("shutdown")
+async def stop_token_revocation_refresh() -> None:
+    """Stop polling for token revocations."""
+    await token_revocations.stop()
+
+
+@app.on_event("shutdown")
+async def stop_maintenance() -> None:
+    """Stop the maintenance scheduler."""
+    await maintenance_scheduler.stop()
+
+
+@app.on_event("shutdown")
+async def stop_password_hasher() -> None:
+    """Stop the password hashing threads."""
+    password_hasher.shutdown()
+
+
+@app.on_event("shutdown")
+async def flush_learning_signals() -> None:
+    """Persist Smart Diet learning signals still queued in memory."""
+    await smart_diet_engine.learning_signals.flush()
+
+
 # =============================================================================
 # EXCEPTION HANDLERS
 # =============================================================================
@@ -168,6 +360,13 @@ def setup_cors_middleware():
 # Setup CORS middleware
 setup_cors_middleware()
 
+
+@app.middleware("http")
+async def request_loader_middleware(request: Request, call_next):
+    """Share user, profile, follow and block reads across one request."""
+    with request_scope():
+        return await call_next(request)
+
 # =============================================================================
 # ROUTER CONFIGURATION
 # =============================================================================
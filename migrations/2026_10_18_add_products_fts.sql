@@ -0,0 +1,38 @@
+-- Migration: Add FTS5 full-text index over products name/brand/categories
+-- Date: 2026-10-18
+-- Purpose: Replace LOWER(name) LIKE '%term%' scans with an indexed search
+--
+-- External-content FTS5 table over products (rowid = products.id), with
+-- diacritic folding for the ES/EN/DE catalog and 2/3-char prefix indexes.
+-- Triggers keep it in sync; the final 'rebuild' indexes existing rows.
+-- DatabaseService.init_database applies the same DDL on startup.
+
+BEGIN TRANSACTION;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    name, brand, categories,
+    content='products',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+    INSERT INTO products_fts(rowid, name, brand, categories)
+    VALUES (new.rowid, new.name, new.brand, new.categories);
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+    INSERT INTO products_fts(products_fts, rowid, name, brand, categories)
+    VALUES ('delete', old.rowid, old.name, old.brand, old.categories);
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, brand, categories ON products BEGIN
+    INSERT INTO products_fts(products_fts, rowid, name, brand, categories)
+    VALUES ('delete', old.rowid, old.name, old.brand, old.categories);
+    INSERT INTO products_fts(rowid, name, brand, categories)
+    VALUES (new.rowid, new.name, new.brand, new.categories);
+END;
+
+INSERT INTO products_fts(products_fts) VALUES ('rebuild');
+
+COMMIT;
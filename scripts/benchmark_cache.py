@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the shared async cache layer.
+
+Measures ops/sec and p50/p99 latency of get, set and mget for each
+serializer, with and without the process-local L1 tier.
+
+Usage:
+    python scripts/benchmark_cache.py --redis-url redis://localhost:6379/0
+    python scripts/benchmark_cache.py --in-memory   # layer overhead only, no Redis
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.cache import (  # noqa: E402
+    AsyncCache,
+    CachePolicy,
+    CompressedSerializer,
+    JsonSerializer,
+    MsgpackSerializer,
+    msgpack,
+)
+
+SAMPLE_PRODUCT = {
+    "barcode": "8410076472885",
+    "name": "Whole Grain Oat Flakes",
+    "brand": "DietIntel Pantry",
+    "serving_size": "40g",
+    "categories": "Breakfasts, Cereals, Oat flakes",
+    "nutriments": {
+        "energy_kcal_per_100g": 372.0,
+        "protein_g_per_100g": 13.5,
+        "fat_g_per_100g": 7.0,
+        "carbs_g_per_100g": 58.7,
+        "sugars_g_per_100g": 1.1,
+        "salt_g_per_100g": 0.01,
+    },
+}
+
+
+class InMemoryRedis:
+    """Minimal async client so the layer's own overhead can be measured."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+        return True
+
+    def pipeline(self, transaction=True):
+        return _InMemoryPipeline(self)
+
+
+class _InMemoryPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def setex(self, key, ttl, value):
+        self.commands.append((key, value))
+        return self
+
+    async def execute(self):
+        for key, value in self.commands:
+            self.client.data[key] = value
+        return [True] * len(self.commands)
+
+
+async def measure(operation, iterations):
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        op_start = time.perf_counter()
+        await operation(i)
+        latencies.append((time.perf_counter() - op_start) * 1e6)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "ops_per_sec": iterations / elapsed,
+        "p50_us": statistics.median(latencies),
+        "p99_us": latencies[max(0, int(len(latencies) * 0.99) - 1)],
+    }
+
+
+async def run(args):
+    serializers = {"json": JsonSerializer(), "compressed": CompressedSerializer(threshold=256)}
+    if msgpack is not None:
+        serializers["msgpack"] = MsgpackSerializer()
+
+    cache = AsyncCache(args.redis_url, max_connections=args.connections)
+    if args.in_memory:
+        client = InMemoryRedis()
+
+        async def in_memory_client():
+            return client
+        cache.client = in_memory_client
+    elif not await cache.ping():
+        print(f"Redis not reachable at {args.redis_url}; use --in-memory to measure layer overhead only")
+        return
+
+    keys = [f"product:{i}" for i in range(args.keys)]
+    print(f"{'serializer':<12} {'L1':<4} {'op':<7} {'ops/sec':>10} {'p50 us':>9} {'p99 us':>9}")
+    for name, serializer in serializers.items():
+        for local_ttl in (0, 60):
+            ns = cache.namespace(
+                f"bench:{name}:{local_ttl}",
+                CachePolicy(ttl=300, serializer=serializer, local_ttl=local_ttl, local_max_entries=args.keys),
+            )
+            results = {
+                "set": await measure(lambda i: ns.set(keys[i % len(keys)], SAMPLE_PRODUCT), args.iterations),
+                "get": await measure(lambda i: ns.get(keys[i % len(keys)]), args.iterations),
+                f"mget{args.batch}": await measure(
+                    lambda i: ns.mget(keys[(i * args.batch) % len(keys):][:args.batch]),
+                    max(1, args.iterations // args.batch),
+                ),
+            }
+            for op, stats in results.items():
+                print(
+                    f"{name:<12} {'on' if local_ttl else 'off':<4} {op:<7} "
+                    f"{stats['ops_per_sec']:>10.0f} {stats['p50_us']:>9.1f} {stats['p99_us']:>9.1f}"
+                )
+            if not args.in_memory:
+                await ns.invalidate()
+
+    if not args.in_memory:
+        await cache.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    parser.add_argument("--in-memory", action="store_true", help="Skip Redis and measure the layer only")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=50, help="Keys per mget")
+    parser.add_argument("--connections", type=int, default=10)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
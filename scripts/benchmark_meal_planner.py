@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Compare the greedy and optimized meal planners on a synthetic catalog.
+
+Reports, per planner, the median per-meal latency and how far the selected
+meals land from their calorie target and macro ratio targets.
+
+Usage:
+    python scripts/benchmark_meal_planner.py --products 500 --meals 200
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.models.meal_plan import MealPlanConfig  # noqa: E402
+from app.models.product import Nutriments, ProductResponse  # noqa: E402
+from app.services.meal_optimizer import ServingTable  # noqa: E402
+from app.services.meal_planner import MealPlannerService  # noqa: E402
+
+
+def build_catalog(size: int, seed: int):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    products = []
+    for i in range(size):
+        protein = rng.uniform(0, 35)
+        fat = rng.uniform(0, 30)
+        carbs = rng.uniform(0, 70)
+        energy = protein * 4 + fat * 9 + carbs * 4
+        products.append(ProductResponse(
+            source="benchmark",
+            barcode=f"{i:08d}",
+            name=f"Product {i}",
+            brand="Bench",
+            serving_size=f"{rng.choice([30, 50, 80, 100, 120, 150, 200])}g",
+            image_url=None,
+            nutriments=Nutriments(
+                energy_kcal_per_100g=energy,
+                protein_g_per_100g=protein,
+                fat_g_per_100g=fat,
+                carbs_g_per_100g=carbs,
+            ),
+            fetched_at=now,
+        ))
+    return products
+
+
+def meal_quality(items, target, macro_targets):
+    calories = sum(item.calories for item in items)
+    protein = sum(item.macros.protein_g for item in items) * 4
+    fat = sum(item.macros.fat_g for item in items) * 9
+    carbs = sum(item.macros.carbs_g for item in items) * 4
+    total = protein + fat + carbs
+    if total > 0:
+        shares = (protein / total, fat / total, carbs / total)
+    else:
+        shares = (0.0, 0.0, 0.0)
+    macro_error = sum(abs(share - macro_targets[name]) for share, name in zip(shares, ("protein", "fat", "carbs")))
+    return abs(calories - target) / target, macro_error
+
+
+def run(planner: MealPlannerService, products, targets, flexibility: bool):
+    tolerance = planner.config.calorie_tolerance_flexible if flexibility else planner.config.calorie_tolerance_strict
+    max_items = planner.config.max_items_flexible if flexibility else planner.config.max_items_per_meal
+    table = None
+    build_ms = 0.0
+    if planner.uses_optimizer:
+        # Built once per plan and shared by its meals
+        start = time.perf_counter()
+        table = ServingTable(products, planner._calculate_serving_info)
+        build_ms = (time.perf_counter() - start) * 1000
+
+    latencies, calorie_errors, macro_errors, hits = [], [], [], 0
+    for target in targets:
+        start = time.perf_counter()
+        if table is not None:
+            items = planner._optimize_meal_items(table, target, tolerance, max_items, set())
+        else:
+            items = planner._select_products_for_meal(target, products, [], flexibility, None)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        calorie_error, macro_error = meal_quality(items, target, planner.config.macro_ratio_targets)
+        calorie_errors.append(calorie_error)
+        macro_errors.append(macro_error)
+        hits += calorie_error <= tolerance
+    return {
+        "median_ms": statistics.median(latencies),
+        "p95_ms": sorted(latencies)[int(len(latencies) * 0.95) - 1],
+        "calorie_error": statistics.mean(calorie_errors),
+        "macro_error": statistics.mean(macro_errors),
+        "within_tolerance": hits / len(targets),
+        "build_ms": build_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--meals", type=int, default=200)
+    parser.add_argument("--flexible", action="store_true", help="Use flexible tolerance and item limits")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    products = build_catalog(args.products, args.seed)
+    rng = random.Random(args.seed + 1)
+    targets = [rng.uniform(350, 1000) for _ in range(args.meals)]
+
+    print(f"{args.products} products, {args.meals} meals, flexible={args.flexible}")
+    print(f"{'planner':<10} {'median ms':>10} {'p95 ms':>8} {'kcal err':>9} {'macro err':>10} {'in window':>10} {'table ms':>9}")
+    for mode in ("greedy", "optimized"):
+        planner = MealPlannerService(MealPlanConfig(planner_mode=mode))
+        stats = run(planner, products, targets, args.flexible)
+        print(
+            f"{mode:<10} {stats['median_ms']:>10.2f} {stats['p95_ms']:>8.2f} "
+            f"{stats['calorie_error']:>9.3f} {stats['macro_error']:>10.3f} {stats['within_tolerance']:>10.0%} {stats['build_ms']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark recipe search on a synthetic recipe table.
+
+Compares the legacy query (LIMIT in SQL, tag filter applied afterwards in
+Python) with ``search_recipes_page``: SQL-side tag filtering on
+``recipe_tags`` and keyset cursors. Reports median latency for first pages,
+deep pages reached by cursor versus OFFSET, and how many results a tag
+search actually returns per page.
+
+Usage:
+    python scripts/benchmark_recipe_search.py --recipes 200000 --depth 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.recipe_database import RecipeDatabaseService  # noqa: E402
+
+COMMON_TAGS = [
+    "quick", "healthy", "vegetarian", "vegan", "gluten-free",
+    "high-protein", "comfort", "spicy", "budget", "kid-friendly",
+]
+RARE_TAGS = [f"seasonal-{i}" for i in range(200)]
+CUISINES = ["italian", "mexican", "thai", "indian", "french", "japanese", "greek", "spanish", "chinese", "american"]
+
+LEGACY_QUERY = """
+    SELECT r.*, rn.calories_per_serving, rn.protein_g_per_serving
+    FROM recipes r
+    LEFT JOIN recipe_nutrition rn ON r.id = rn.recipe_id
+    {where}
+    ORDER BY r.confidence_score DESC, r.created_at DESC
+    LIMIT ? OFFSET ?
+"""
+
+
+def populate(db: RecipeDatabaseService, count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    recipes, tags, nutrition = [], [], []
+    for i in range(count):
+        recipe_id = f"bench-{i:07d}"
+        recipe_tags = rng.sample(COMMON_TAGS, 3)
+        if rng.random() < 0.05:
+            recipe_tags.append(rng.choice(RARE_TAGS))
+        score = rng.choice([0.6, 0.7, 0.75, 0.8, 0.85, 0.9]) if rng.random() > 0.02 else None
+        recipes.append((
+            recipe_id, f"user-{i % 500}", f"Recipe {i}", "", rng.choice(CUISINES),
+            rng.choice(["easy", "medium", "hard"]), rng.randint(5, 90), rng.randint(0, 120), 4,
+            "ai_generated", score, 10.0, json.dumps(recipe_tags),
+            f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:00",
+        ))
+        tags.extend((tag, recipe_id) for tag in recipe_tags)
+        nutrition.append((recipe_id, rng.uniform(100, 900), rng.uniform(5, 50), 10.0, 30.0))
+
+    with db.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO recipes (id, user_id, name, description, cuisine_type, difficulty_level, "
+            "prep_time_minutes, cook_time_minutes, servings, created_by, confidence_score, "
+            "generation_time_ms, tags, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            recipes,
+        )
+        conn.executemany("INSERT OR IGNORE INTO recipe_tags (tag, recipe_id) VALUES (?, ?)", tags)
+        conn.executemany(
+            "INSERT INTO recipe_nutrition (recipe_id, calories_per_serving, protein_g_per_serving, "
+            "fat_g_per_serving, carbs_g_per_serving) VALUES (?, ?, ?, ?, ?)",
+            nutrition,
+        )
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+
+
+def legacy_search(db: RecipeDatabaseService, page_size: int, offset: int = 0, cuisine=None, tags=None):
+    where, params = "", []
+    if cuisine:
+        where, params = "WHERE cuisine_type = ?", [cuisine]
+    with db.get_connection() as conn:
+        rows = conn.execute(LEGACY_QUERY.format(where=where), params + [page_size, offset]).fetchall()
+    results = [dict(row) for row in rows]
+    if tags:
+        results = [r for r in results if any(tag in json.loads(r["tags"] or "[]") for tag in tags)]
+    return results
+
+
+def timed(fn, repeat: int):
+    latencies, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies), result
+
+
+async def walk_cursor(db: RecipeDatabaseService, pages: int, page_size: int, **filters):
+    cursor, latencies = None, []
+    for _ in range(pages):
+        start = time.perf_counter()
+        page = await db.search_recipes_page(limit=page_size, cursor=cursor, **filters)
+        latencies.append((time.perf_counter() - start) * 1000)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    return latencies, cursor
+
+
+async def main(args) -> None:
+    workdir = tempfile.mkdtemp(prefix="recipe-search-bench-")
+    db = RecipeDatabaseService(os.path.join(workdir, "recipes.db"))
+    await db.search_recipes(limit=1)  # creates the recipe schema
+
+    start = time.perf_counter()
+    populate(db, args.recipes, args.seed)
+    print(f"Populated {args.recipes} recipes in {time.perf_counter() - start:.1f}s ({workdir})")
+    print()
+
+    size, repeat = args.page_size, args.repeat
+    rare = RARE_TAGS[7]
+    scenarios = [
+        ("first page", {}),
+        ("cuisine", {"cuisine_type": "thai"}),
+        ("common tag", {"tags": ["quick"]}),
+        ("rare tag", {"tags": [rare]}),
+    ]
+
+    print(f"{'scenario':<14} {'legacy ms':>10} {'legacy rows':>12} {'keyset ms':>10} {'keyset rows':>12}")
+    for name, filters in scenarios:
+        legacy_ms, legacy_rows = timed(
+            lambda: legacy_search(db, size, cuisine=filters.get("cuisine_type"), tags=filters.get("tags")), repeat
+        )
+        latencies, page = [], None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            page = await db.search_recipes_page(limit=size, **filters)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        keyset_ms = statistics.median(latencies)
+        print(f"{name:<14} {legacy_ms:>10.2f} {len(legacy_rows):>12} {keyset_ms:>10.2f} {len(page['recipes']):>12}")
+
+    print()
+    depth = args.depth
+    print(f"Deep pagination: page {depth} of {size} (offset {depth * size})")
+    for name, filters in scenarios:
+        latencies, cursor = await walk_cursor(db, depth, size, **filters)
+        cursor_ms = statistics.median(latencies[-10:]) if latencies else 0.0
+        offset_ms, _ = timed(
+            lambda: legacy_search(db, size, offset=depth * size, cuisine=filters.get("cuisine_type")), max(1, repeat // 5)
+        )
+        reached = len(latencies)
+        print(f"  {name:<14} cursor {cursor_ms:>8.2f} ms/page (reached page {reached})   offset {offset_ms:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=int, default=200000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=500, help="page reached by cursor and by OFFSET")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
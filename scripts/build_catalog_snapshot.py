@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+CLI utility to build the shared product catalog snapshot and report memory savings.
+
+Usage: python scripts/build_catalog_snapshot.py [--output data/catalog_snapshot.bin] [--sample 500]
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import config
+from app.services.catalog_snapshot import CatalogSnapshot, build_catalog_snapshot, measure_memory_savings
+from app.services.database import db_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the memory-mapped product catalog snapshot')
+    parser.add_argument(
+        '--output',
+        default=config.catalog_snapshot_path,
+        help=f'Snapshot file path (default: {config.catalog_snapshot_path})'
+    )
+    parser.add_argument(
+        '--sample',
+        type=int,
+        default=500,
+        help='Products materialised to estimate per-worker memory savings (default: 500)'
+    )
+
+    args = parser.parse_args()
+
+    try:
+        with db_service.get_connection() as conn:
+            count = build_catalog_snapshot(conn, args.output)
+        print(f"✅ Wrote {count} products to {args.output}")
+
+        snapshot = CatalogSnapshot(args.output)
+        report = measure_memory_savings(snapshot, sample=args.sample)
+        snapshot.close()
+
+        mib = 1024 * 1024
+        print(f"📦 Snapshot size (shared by all workers): {report['snapshot_bytes_shared'] / mib:.2f} MiB")
+        print(f"🧮 ProductResponse cost: ~{report['object_bytes_per_product']} bytes/product")
+        print(
+            f"💾 Estimated resident memory saved per worker: "
+            f"{report['estimated_savings_bytes_per_worker'] / mib:.2f} MiB"
+        )
+
+    except Exception as e:
+        print(f"❌ Error building catalog snapshot: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
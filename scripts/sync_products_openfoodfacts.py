@@ -1,9 +1,15 @@
 import argparse
+import asyncio
+import csv
+import gzip
+import io
 import json
+import os
 import sqlite3
 import sys
+import time
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import httpx
 
@@ -19,6 +25,31 @@ NAME_BLACKLIST = {
     "unknown",
     "test",
 }
+DEFAULT_BATCH_SIZE = 5000
+PROGRESS_EVERY = 10000
+# Secondary indexes on products that are dropped during bulk ingestion and
+# rebuilt once at the end. The UNIQUE(barcode) constraint stays in place
+# because the upsert relies on it.
+PRODUCT_INDEXES = {
+    "idx_products_name": "CREATE INDEX IF NOT EXISTS idx_products_name ON products(name)",
+    "idx_products_brand": "CREATE INDEX IF NOT EXISTS idx_products_brand ON products(brand)",
+    "idx_products_access_count": "CREATE INDEX IF NOT EXISTS idx_products_access_count ON products(access_count)",
+    "idx_products_last_updated": "CREATE INDEX IF NOT EXISTS idx_products_last_updated ON products(last_updated)",
+}
+UPSERT_SQL = """
+    INSERT INTO products
+    (barcode, name, brand, categories, nutriments, serving_size, image_url, source, last_updated, access_count)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+    ON CONFLICT(barcode) DO UPDATE SET
+        name = excluded.name,
+        brand = excluded.brand,
+        categories = excluded.categories,
+        nutriments = excluded.nutriments,
+        serving_size = excluded.serving_size,
+        image_url = excluded.image_url,
+        source = excluded.source,
+        last_updated = excluded.last_updated
+"""
 
 
 def fetch_off_product(client: httpx.Client, barcode: str) -> Optional[Dict[str, Any]]:
@@ -76,76 +107,332 @@ def is_clean_name(name: str) -> bool:
     return True
 
 
-def upsert_product(conn: sqlite3.Connection, product: Dict[str, Any]) -> bool:
+def build_product_record(product: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+    """Validate an OFF product and return the row tuple used by ``UPSERT_SQL``."""
     barcode = str(product.get("code") or product.get("barcode") or "").strip()
     name = product.get("product_name_en")
     nutriments_raw = product.get("nutriments") or {}
     if not barcode.isdigit() or not name or not nutriments_raw:
-        return False
+        return None
 
     nutriments = normalize_nutriments(nutriments_raw)
     if not has_complete_nutriments(nutriments):
-        return False
+        return None
     if not is_clean_name(name):
+        return None
+
+    return (
+        barcode,
+        name,
+        product.get("brands"),
+        product.get("categories"),
+        json.dumps(nutriments),
+        product.get("serving_size"),
+        product.get("image_url"),
+        "OpenFoodFacts",
+        datetime.now().isoformat(),
+    )
+
+
+def upsert_product(conn: sqlite3.Connection, product: Dict[str, Any]) -> bool:
+    record = build_product_record(product)
+    if record is None:
         return False
+    conn.execute(UPSERT_SQL, record)
+    return True
+
 
-    record = {
-        "barcode": barcode,
-        "name": name,
-        "brand": product.get("brands"),
-        "categories": product.get("categories"),
-        "nutriments": json.dumps(nutriments),
-        "serving_size": product.get("serving_size"),
-        "image_url": product.get("image_url"),
-        "source": "OpenFoodFacts",
-        "last_updated": datetime.now().isoformat(),
-        "access_count": 0,
+def upsert_products_batch(conn: sqlite3.Connection, records: List[Tuple[Any, ...]]) -> int:
+    """Upsert a batch of prepared records inside a single transaction."""
+    if not records:
+        return 0
+    with conn:
+        conn.executemany(UPSERT_SQL, records)
+    return len(records)
+
+
+def drop_product_indexes(conn: sqlite3.Connection) -> None:
+    with conn:
+        for index_name in PRODUCT_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+def rebuild_product_indexes(conn: sqlite3.Connection) -> None:
+    with conn:
+        for statement in PRODUCT_INDEXES.values():
+            conn.execute(statement)
+        conn.execute("ANALYZE products")
+
+
+def _open_dump(path: str) -> io.TextIOBase:
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def _csv_row_to_product(row: Dict[str, str]) -> Dict[str, Any]:
+    """Map a row of the OFF CSV export onto the JSON product shape."""
+    nutriments = {
+        key: _to_float(value)
+        for key, value in row.items()
+        if key and key.endswith("_100g") and value not in (None, "")
+    }
+    return {
+        "code": row.get("code"),
+        "product_name_en": row.get("product_name_en") or row.get("product_name"),
+        "brands": row.get("brands"),
+        "categories": row.get("categories"),
+        "serving_size": row.get("serving_size"),
+        "image_url": row.get("image_url"),
+        "nutriments": nutriments,
     }
 
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM products WHERE barcode = ?", (barcode,))
-    existing = cursor.fetchone()
-    if existing:
-        cursor.execute(
-            """
-            UPDATE products
-            SET name = ?, brand = ?, categories = ?, nutriments = ?, serving_size = ?,
-                image_url = ?, source = ?, last_updated = ?
-            WHERE barcode = ?
-            """,
-            (
-                record["name"],
-                record["brand"],
-                record["categories"],
-                record["nutriments"],
-                record["serving_size"],
-                record["image_url"],
-                record["source"],
-                record["last_updated"],
-                record["barcode"],
-            ),
-        )
-    else:
-        cursor.execute(
-            """
-            INSERT INTO products
-            (barcode, name, brand, categories, nutriments, serving_size, image_url, source, last_updated, access_count)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                record["barcode"],
-                record["name"],
-                record["brand"],
-                record["categories"],
-                record["nutriments"],
-                record["serving_size"],
-                record["image_url"],
-                record["source"],
-                record["last_updated"],
-                record["access_count"],
-            ),
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_dump_products(path: str, skip: int = 0) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """Stream products from an OFF JSONL or CSV/TSV dump (optionally gzipped).
+
+    Yields ``(line_number, product)`` so callers can checkpoint progress;
+    ``product`` is ``None`` for lines that could not be parsed. The first
+    ``skip`` data lines are consumed without parsing.
+    """
+    base = path[:-3] if path.endswith(".gz") else path
+    is_csv = base.endswith((".csv", ".tsv"))
+
+    with _open_dump(path) as handle:
+        if is_csv:
+            csv.field_size_limit(sys.maxsize)
+            reader = csv.DictReader(handle, delimiter="\t" if base.endswith(".tsv") or _sniff_tab(handle) else ",")
+            for line_number, row in enumerate(reader, start=1):
+                if line_number <= skip:
+                    continue
+                yield line_number, _csv_row_to_product(row)
+            return
+
+        for line_number, line in enumerate(handle, start=1):
+            if line_number <= skip:
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError:
+                yield line_number, None
+
+
+def _sniff_tab(handle: io.TextIOBase) -> bool:
+    # The official OFF "CSV" export is tab separated; peek at the header.
+    if not handle.seekable():
+        return False
+    position = handle.tell()
+    header = handle.readline()
+    handle.seek(position)
+    return "\t" in header
+
+
+def load_checkpoint(path: Optional[str]) -> Dict[str, Any]:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_checkpoint(path: Optional[str], state: Dict[str, Any]) -> None:
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(state, handle)
+    os.replace(tmp_path, path)
+
+
+class ProgressReporter:
+    def __init__(self, every: int = PROGRESS_EVERY, stream=None):
+        self.every = every
+        self.stream = stream or sys.stdout
+        self.started = time.monotonic()
+        self._last_reported = 0
+
+    def update(self, seen: int, upserted: int, force: bool = False) -> None:
+        if not force and seen - self._last_reported < self.every:
+            return
+        self._last_reported = seen
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        print(
+            f"[{elapsed:8.1f}s] seen={seen} upserted={upserted} rate={seen / elapsed:.0f} rows/s",
+            file=self.stream,
         )
-    return True
+
+
+def ingest_dump(
+    conn: sqlite3.Connection,
+    path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    checkpoint_path: Optional[str] = None,
+    limit: Optional[int] = None,
+    progress: Optional[ProgressReporter] = None,
+) -> Dict[str, int]:
+    """Bulk-load an OFF dump into ``products``.
+
+    Rows are validated with the same rules as the online path and written
+    with ``executemany`` in one transaction per batch. Secondary indexes are
+    dropped for the duration of the load and rebuilt at the end. A checkpoint
+    is written after every committed batch so an interrupted run resumes from
+    the last committed line.
+    """
+    state = load_checkpoint(checkpoint_path)
+    if state.get("source") not in (None, os.path.abspath(path)):
+        state = {}
+    seen = int(state.get("line", 0))
+    upserted = int(state.get("upserted", 0))
+    skipped = int(state.get("skipped", 0))
+    progress = progress or ProgressReporter()
+
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    drop_product_indexes(conn)
+
+    batch: List[Tuple[Any, ...]] = []
+    try:
+        for line_number, product in iter_dump_products(path, skip=seen):
+            seen = line_number
+            record = build_product_record(product) if product else None
+            if record is None:
+                skipped += 1
+            else:
+                batch.append(record)
+
+            if len(batch) >= batch_size:
+                upserted += upsert_products_batch(conn, batch)
+                batch = []
+                save_checkpoint(checkpoint_path, {
+                    "source": os.path.abspath(path),
+                    "line": seen,
+                    "upserted": upserted,
+                    "skipped": skipped,
+                })
+            progress.update(seen, upserted)
+
+            if limit is not None and upserted + len(batch) >= limit:
+                break
+
+        upserted += upsert_products_batch(conn, batch)
+        save_checkpoint(checkpoint_path, {
+            "source": os.path.abspath(path),
+            "line": seen,
+            "upserted": upserted,
+            "skipped": skipped,
+            "completed": limit is None,
+        })
+    finally:
+        rebuild_product_indexes(conn)
+
+    progress.update(seen, upserted, force=True)
+    return {"seen": seen, "upserted": upserted, "skipped": skipped}
+
+
+async def _get_json_with_retries(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    retries: int = 3,
+    backoff: float = 1.0,
+) -> Optional[Dict[str, Any]]:
+    for attempt in range(retries + 1):
+        try:
+            async with semaphore:
+                response = await client.get(url, params=params, timeout=15.0)
+            if response.status_code == 429 or response.status_code >= 500:
+                raise httpx.HTTPStatusError(
+                    f"retryable status {response.status_code}",
+                    request=response.request,
+                    response=response,
+                )
+            response.raise_for_status()
+            return response.json()
+        except (httpx.HTTPError, ValueError) as exc:
+            if attempt >= retries:
+                print(f"Giving up on {url} {params or ''}: {exc}", file=sys.stderr)
+                return None
+            await asyncio.sleep(backoff * (2 ** attempt))
+    return None
+
+
+async def fetch_search_pages_async(
+    pages: List[int],
+    page_size: int,
+    concurrency: int = 4,
+    retries: int = 3,
+    client: Optional[httpx.AsyncClient] = None,
+    backoff: float = 1.0,
+) -> Dict[int, List[Dict[str, Any]]]:
+    """Fetch several OFF search pages concurrently with bounded parallelism."""
+    semaphore = asyncio.Semaphore(concurrency)
+    owns_client = client is None
+    client = client or httpx.AsyncClient()
+    try:
+        async def fetch(page: int) -> Tuple[int, List[Dict[str, Any]]]:
+            params = {
+                "search_simple": 1,
+                "action": "process",
+                "json": 1,
+                "page": page,
+                "page_size": page_size,
+            }
+            payload = await _get_json_with_retries(client, semaphore, OFF_SEARCH_URL, params, retries, backoff)
+            return page, (payload or {}).get("products", []) or []
+
+        results = await asyncio.gather(*(fetch(page) for page in pages))
+    finally:
+        if owns_client:
+            await client.aclose()
+    return dict(results)
+
+
+async def add_products_async(
+    conn: sqlite3.Connection,
+    target: int,
+    concurrency: int = 4,
+    page_size: int = 100,
+    checkpoint_path: Optional[str] = None,
+    progress: Optional[ProgressReporter] = None,
+) -> int:
+    """Online ingestion: fetch search pages in concurrent waves and upsert each wave in one transaction."""
+    state = load_checkpoint(checkpoint_path)
+    page = int(state.get("next_page", 1))
+    added = 0
+    progress = progress or ProgressReporter(every=page_size * concurrency)
+
+    async with httpx.AsyncClient() as client:
+        while added < target:
+            wave = list(range(page, page + concurrency))
+            results = await fetch_search_pages_async(wave, page_size, concurrency, client=client)
+            records: List[Tuple[Any, ...]] = []
+            exhausted = False
+            for wave_page in wave:
+                products = results.get(wave_page) or []
+                if not products:
+                    exhausted = True
+                for product in products:
+                    record = build_product_record(product)
+                    if record is not None:
+                        records.append(record)
+
+            records = records[: target - added]
+            added += upsert_products_batch(conn, records)
+            page += concurrency
+            save_checkpoint(checkpoint_path, {"next_page": page, "added": added})
+            progress.update(added, added)
+            if exhausted:
+                break
+
+    progress.update(added, added, force=True)
+    return added
 
 
 def validate_existing_products(conn: sqlite3.Connection, client: httpx.Client) -> int:
@@ -219,14 +506,44 @@ def main(argv: Iterable[str]) -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--db", required=True, help="Path to dietintel.db")
     parser.add_argument("--add", type=int, default=50, help="How many products to add")
+    parser.add_argument("--dump", help="Ingest from a local OFF JSONL/CSV dump (optionally .gz) instead of the API")
+    parser.add_argument("--async-fetch", action="store_true", help="Use the concurrent online fetcher")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent requests for --async-fetch")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per upsert transaction")
+    parser.add_argument("--limit", type=int, default=None, help="Stop a dump ingestion after this many valid rows")
+    parser.add_argument("--checkpoint", help="Checkpoint file used to resume interrupted ingestions")
+    parser.add_argument("--skip-validation", action="store_true", help="Do not re-validate existing products")
     args = parser.parse_args(argv)
 
     conn = sqlite3.connect(args.db)
     conn.row_factory = sqlite3.Row
 
-    with httpx.Client() as client:
-        removed = validate_existing_products(conn, client)
-        added = add_products(conn, client, args.add)
+    if args.dump:
+        stats = ingest_dump(
+            conn,
+            args.dump,
+            batch_size=args.batch_size,
+            checkpoint_path=args.checkpoint,
+            limit=args.limit,
+        )
+        conn.close()
+        print(f"Processed {stats['seen']} dump lines")
+        print(f"Upserted {stats['upserted']} products, skipped {stats['skipped']}")
+        return 0
+
+    removed = 0
+    if not args.skip_validation:
+        with httpx.Client() as client:
+            removed = validate_existing_products(conn, client)
+        conn.commit()
+
+    if args.async_fetch:
+        added = asyncio.run(
+            add_products_async(conn, args.add, concurrency=args.concurrency, checkpoint_path=args.checkpoint)
+        )
+    else:
+        with httpx.Client() as client:
+            added = add_products(conn, client, args.add)
 
     conn.commit()
     conn.close()
@@ -80,7 +80,7 @@ if not hasattr(httpx.AsyncClient, '__enter__'):
     httpx.AsyncClient.__exit__ = _async_client_exit
 import pytest
 
-from app.services.cache import CacheService
+from app.services.cache import CacheService, cache_layer
 from app.services.recommendation_engine import RecommendationEngine
 from app.services.database import db_service, ConnectionPool
 from app.repositories.connection import connection_manager
@@ -156,6 +156,104 @@ class FakeOpenFoodFactsService:
     def set_product(self, barcode: str, value: Any) -> None:
         self.responses[barcode] = value
 
+class FakeAsyncRedis:
+    """In-memory stand-in for the redis.asyncio client used by the cache layer."""
+
+    def __init__(self):
+        self.data: Dict[str, Any] = {}
+        self.ttls: Dict[str, int] = {}
+        self.calls: Dict[str, int] = {}
+
+    def _count(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    async def get(self, key):
+        self._count("get")
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        self._count("mget")
+        return [self.data.get(key) for key in keys]
+
+    async def setex(self, key, ttl, value):
+        self._count("setex")
+        self.data[key] = value
+        self.ttls[key] = ttl
+        return True
+
+    async def delete(self, *keys):
+        self._count("delete")
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    async def exists(self, key):
+        return 1 if key in self.data else 0
+
+    async def expire(self, key, ttl):
+        if key not in self.data:
+            return False
+        self.ttls[key] = ttl
+        return True
+
+    async def incr(self, key):
+        self._count("incr")
+        value = int(self.data.get(key, 0)) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    async def ping(self):
+        return True
+
+    async def scan_iter(self, match="*", count=None):
+        import fnmatch
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    def pipeline(self, transaction=True):
+        return _FakeAsyncPipeline(self)
+
+    async def close(self):
+        return None
+
+
+class _FakeAsyncPipeline:
+    def __init__(self, client: FakeAsyncRedis):
+        self.client = client
+        self.commands = []
+
+    def setex(self, key, ttl, value):
+        self.commands.append(("setex", (key, ttl, value)))
+        return self
+
+    def incr(self, key):
+        self.commands.append(("incr", (key,)))
+        return self
+
+    def expire(self, key, ttl):
+        self.commands.append(("expire", (key, ttl)))
+        return self
+
+    async def execute(self):
+        self.client._count("pipeline")
+        results = [await getattr(self.client, name)(*args) for name, args in self.commands]
+        self.commands = []
+        return results
+
+
+@pytest.fixture
+def fake_redis():
+    """In-memory async Redis client for cache layer tests."""
+    return FakeAsyncRedis()
+
+
+@pytest.fixture(autouse=True)
+def clear_local_cache_layer():
+    """Keep process-local caches from leaking values between tests."""
+    yield
+    cache_layer.clear_local()
+    auth_module.auth_service.user_cache.clear()
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Create an instance of the default event loop for the test session."""
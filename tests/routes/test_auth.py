@@ -210,7 +210,7 @@ def test_change_password_invalid_current(client):
          patch("app.routes.auth.auth_service", autospec=True) as mock_auth, \
          patch("app.routes.auth.session_service", autospec=True) as mock_session:
         mock_user_service.get_password_hash = AsyncMock(return_value="hash")
-        mock_auth.verify_password.return_value = False
+        mock_auth.verify_password_async.return_value = False
         response = client.post("/auth/change-password", json={
             "current_password": "wrong",
             "new_password": "Password123",
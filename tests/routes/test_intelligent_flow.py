@@ -1,4 +1,5 @@
 import base64
+import json
 from datetime import datetime
 from types import SimpleNamespace
 from unittest.mock import AsyncMock
@@ -235,7 +236,7 @@ def test_intelligent_flow_async_mode_returns_job(client, test_auth_data, monkeyp
         user_id=test_auth_data["user"].id,
     )
 
-    async def fake_enqueue(service, request):  # pylint: disable=unused-argument
+    async def fake_enqueue(service, request, priority=0):  # pylint: disable=unused-argument
         return dummy_job
 
     monkeypatch.setattr(
@@ -291,3 +292,43 @@ def test_get_intelligent_flow_job_returns_result(client, test_auth_data, monkeyp
     body = response.json()
     assert body["status"] == "completed"
     assert body["result"]["status"] == sample_response.status.value
+
+
+def test_intelligent_flow_stream_returns_ndjson_events(client, test_auth_data, monkeypatch):
+    monkeypatch.setattr("app.config.config.intelligent_flow_enabled", True, raising=False)
+
+    sample_response = _build_sample_response(test_auth_data["user"].id)
+    captured = {}
+
+    def fake_stream_flow(request):
+        captured["request"] = request
+
+        async def events():
+            yield {
+                "event": "step",
+                "step": "vision",
+                "timing": sample_response.timings["vision"],
+                "result": sample_response.vision_result,
+            }
+            yield {"event": "complete", "response": sample_response}
+
+        return events()
+
+    monkeypatch.setattr(
+        "app.routes.intelligent_flow.intelligent_flow_service.stream_flow",
+        fake_stream_flow,
+    )
+
+    response = client.post(
+        "/intelligent-flow/stream",
+        headers={"Authorization": f"Bearer {test_auth_data['access_token']}"},
+        json={"image_base64": base64.b64encode(b"sample-image").decode("utf-8"), "meal_type": "lunch"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["event"] for event in events] == ["step", "complete"]
+    assert events[0]["result"]["id"] == sample_response.vision_result.id
+    assert events[1]["response"]["status"] == FlowExecutionStatus.COMPLETE.value
+    assert captured["request"].user_id == test_auth_data["user"].id
@@ -13,6 +13,7 @@ from app.models.smart_diet import (
     SuggestionFeedback
 )
 from app.routes import smart_diet_optimized as route_module
+from app.services.memory_cache import MemoryCache
 
 
 def _make_response() -> SmartDietResponse:
@@ -59,6 +60,9 @@ class DummyMonitor:
     def get_cache_hit_rate(self, hours):
         return [{"period_hours": hours, "hit_rate": 92.0}]
 
+    def get_memory_cache_stats(self):
+        return {"smart_diet_l1": {"hits": 3, "misses": 1}}
+
     def get_recent_alerts(self, hours):
         return [{"severity": "info", "message": "healthy"}]
 
@@ -82,8 +86,10 @@ class DummyRedis:
 
 class DummyEngine:
     def __init__(self):
+        memory_cache = MemoryCache("test_smart_diet_l1", max_entries=16, monitor=None)
+        memory_cache.set("warm", b"{}")
         self.optimized_cache = SimpleNamespace(
-            memory_cache={"warm": True},
+            memory_cache=memory_cache,
             max_memory_cache_size=16
         )
 
@@ -242,12 +248,14 @@ def test_performance_and_cache_endpoints(optimized_env):
     metrics = optimized_env.client.get("/smart-diet/optimized/performance-metrics")
     assert metrics.status_code == 200
     assert "period_hours" in metrics.json()
+    assert metrics.json()["cache_performance"]["memory_caches"]["smart_diet_l1"]["hits"] == 3
 
     health = optimized_env.client.get("/smart-diet/optimized/cache-health")
     assert health.status_code == 200
     body = health.json()
     assert body["overall_healthy"] is True
-    assert "memory_cache" in body
+    assert body["memory_cache"]["size"] == 1
+    assert body["memory_cache"]["utilization_percent"] == 6.25
 
     warmup = optimized_env.client.post("/smart-diet/optimized/warmup-cache")
     assert warmup.status_code == 200
@@ -26,18 +26,52 @@ async def test_get_redis_initializes(monkeypatch):
     assert client is redis_stub
 
 
+def test_client_pool_per_event_loop_is_reused_and_closed(monkeypatch):
+    import asyncio
+
+    created = []
+
+    def from_url(*args, **kwargs):
+        created.append(_RedisStub())
+        return created[-1]
+
+    monkeypatch.setattr(cache_module.redis, "from_url", from_url)
+    layer = cache_module.AsyncCache("redis://fake")
+    first, second = asyncio.new_event_loop(), asyncio.new_event_loop()
+    try:
+        a = first.run_until_complete(layer.client())
+        b = second.run_until_complete(layer.client())
+        # Alternating loops reuse their own pool instead of replacing it
+        assert first.run_until_complete(layer.client()) is a
+        assert second.run_until_complete(layer.client()) is b
+        assert len(created) == 2
+
+        first.close()
+        third = asyncio.new_event_loop()
+        third.run_until_complete(layer.client())
+        assert len(layer._clients) == 2 and first not in layer._clients
+
+        third.run_until_complete(layer.close())
+        created[2].close.assert_awaited_once()
+        assert len(layer._clients) == 0
+        third.close()
+    finally:
+        second.close()
+
+
 @pytest.mark.asyncio
-async def test_get_redis_reconnects_on_ping_failure(monkeypatch):
+async def test_operations_reuse_pooled_client_without_ping(monkeypatch):
     redis_stub = _RedisStub()
-    redis_stub.ping = AsyncMock(side_effect=RuntimeError("fail"))
-    redis_new = _RedisStub()
-    monkeypatch.setattr(cache_module.redis, "from_url", Mock(return_value=redis_new))
+    from_url = Mock(return_value=redis_stub)
+    monkeypatch.setattr(cache_module.redis, "from_url", from_url)
 
     service = cache_module.CacheService("redis://fake")
-    service._redis = redis_stub
-    client = await service.get_redis()
+    await service.get("a")
+    await service.set("b", "value")
+    await service.get("c")
 
-    assert client is redis_new
+    from_url.assert_called_once()
+    redis_stub.ping.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -160,3 +194,103 @@ def test_get_cache_service_singleton(monkeypatch):
     cache_module.get_cache_service()
     cache_module.get_cache_service()
     cache_module.CacheService.assert_called_once()
+
+
+@pytest.fixture
+def layer(fake_redis):
+    cache = cache_module.AsyncCache("redis://fake")
+    cache.client = AsyncMock(return_value=fake_redis)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_namespaces_prefix_keys_and_apply_policy_ttl(layer, fake_redis):
+    products = layer.namespace("products", cache_module.CachePolicy(ttl=120))
+
+    assert await products.set("123", {"name": "Oats"}) is True
+
+    assert fake_redis.ttls["products:123"] == 120
+    assert await products.get("123") == {"name": "Oats"}
+    assert layer.namespace("products") is products
+
+
+@pytest.mark.asyncio
+async def test_local_tier_serves_repeat_reads(layer, fake_redis):
+    hot = layer.namespace("hot", cache_module.CachePolicy(ttl=60, local_ttl=30))
+    fake_redis.data["hot:k"] = b'{"v": 1}'
+
+    first = await hot.get("k")
+    first["v"] = 2
+    second = await hot.get("k")
+
+    assert second == {"v": 1}
+    assert fake_redis.calls["get"] == 1
+    assert hot.metrics["local_hits"] == 1
+
+    await hot.delete("k")
+    assert await hot.get("k") is None
+
+
+@pytest.mark.asyncio
+async def test_mget_and_mset_use_one_round_trip(layer, fake_redis):
+    ns = layer.namespace("batch")
+
+    assert await ns.mset({"a": {"n": 1}, "b": "text"}, ttl=30) == 2
+    result = await ns.mget(["a", "b", "c"])
+
+    assert result == {"a": {"n": 1}, "b": "text", "c": None}
+    assert fake_redis.calls == {"pipeline": 1, "setex": 2, "mget": 1}
+
+
+@pytest.mark.asyncio
+async def test_invalidate_clears_remote_and_local(layer, fake_redis):
+    ns = layer.namespace("user", cache_module.CachePolicy(local_ttl=30))
+    await ns.set("1:a", "x")
+    await ns.set("2:a", "y")
+
+    assert await ns.invalidate("1:*") == 1
+    assert await ns.get("1:a") is None
+    assert await ns.get("2:a") == "y"
+
+
+def test_compressed_serializer_round_trip_and_legacy_payloads():
+    serializer = cache_module.CompressedSerializer(threshold=16)
+    value = {"items": list(range(50))}
+
+    packed = serializer.dumps(value)
+
+    assert packed[:1] == cache_module.CompressedSerializer.COMPRESSED
+    assert serializer.loads(packed) == value
+    assert serializer.loads(serializer.dumps({"a": 1})) == {"a": 1}
+    assert serializer.loads('{"legacy": true}') == {"legacy": True}
+
+
+def test_msgpack_serializer_round_trip():
+    pytest.importorskip("msgpack")
+    serializer = cache_module.MsgpackSerializer()
+
+    assert serializer.loads(serializer.dumps({"a": [1, 2]})) == {"a": [1, 2]}
+
+
+@pytest.mark.asyncio
+async def test_generation_counter_bumps_with_single_incr(layer, fake_redis):
+    service = cache_module.CacheService(cache=layer)
+
+    assert await service.generation("smart_diet:u1") == 0
+    assert await service.bump_generation("smart_diet:u1") == 1
+    assert await service.bump_generation("smart_diet:u1") == 2
+
+    assert await service.generation("smart_diet:u1") == 2
+    assert await service.generation("smart_diet:u2") == 0
+    assert fake_redis.calls["incr"] == 2
+    assert fake_redis.ttls["gen:smart_diet:u1"] == cache_module.GENERATION_TTL
+
+
+@pytest.mark.asyncio
+async def test_generation_degrades_when_redis_unavailable():
+    layer = cache_module.AsyncCache("redis://fake")
+    layer.client = AsyncMock(side_effect=cache_module.CacheUnavailableError("down"))
+    service = cache_module.CacheService(cache=layer)
+
+    assert await service.generation("smart_diet:u1") == 0
+    assert await service.bump_generation("smart_diet:u1") is None
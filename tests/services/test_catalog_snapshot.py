@@ -0,0 +1,191 @@
+import json
+import sqlite3
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+from app.services import catalog_snapshot as snapshot_module
+from app.services.catalog_snapshot import (
+    CatalogSnapshot,
+    build_catalog_snapshot,
+    ensure_catalog_snapshot,
+    measure_memory_savings,
+    refresh_catalog_snapshot,
+)
+
+
+@pytest.fixture
+def conn():
+    connection = sqlite3.connect(":memory:")
+    connection.row_factory = sqlite3.Row
+    connection.execute(
+        """
+        CREATE TABLE products (
+            barcode TEXT, name TEXT, brand TEXT, image_url TEXT, serving_size TEXT,
+            source TEXT, categories TEXT, nutriments TEXT, access_count INTEGER, last_updated TEXT
+        )
+        """
+    )
+    products = [
+        ("300", "Greek Yogurt", "Acme", None, "150g", "OpenFoodFacts", "Dairy",
+         {"energy_kcal_per_100g": 97, "protein_g_per_100g": 9}, 5, "2025-01-02T10:00:00"),
+        ("100", "Oats", "Acme", "http://img/oats.png", None, "OpenFoodFacts", "Cereals",
+         {"energy_kcal_per_100g": 389, "protein_g_per_100g": 16.9, "fat_g_per_100g": 6.9,
+          "carbs_g_per_100g": 66.3, "sugars_g_per_100g": 1, "salt_g_per_100g": 0.01}, 50, "2025-01-01T08:00:00"),
+        ("200", "Crème fraîche", None, None, None, "OpenFoodFacts", None,
+         {"energy_kcal_per_100g": 292}, 0, None),
+    ]
+    for row in products:
+        values = list(row)
+        values[7] = json.dumps(values[7])
+        connection.execute("INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", values)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def snapshot(conn, tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    assert build_catalog_snapshot(conn, path) == 3
+    snap = CatalogSnapshot(path)
+    yield snap
+    snap.close()
+
+
+def test_snapshot_lookup_and_materialisation(snapshot):
+    product = snapshot.product("100")
+
+    assert product.name == "Oats"
+    assert product.brand == "Acme"
+    assert product.image_url == "http://img/oats.png"
+    assert product.nutriments.protein_g_per_100g == pytest.approx(16.9, rel=1e-5)
+    assert product.fetched_at.year == 2025
+    assert snapshot.product("200").name == "Crème fraîche"
+    assert snapshot.product("200").brand is None
+    assert snapshot.product("999") is None
+
+
+def test_snapshot_nutriments_equal_database_values(snapshot, conn):
+    for row in conn.execute("SELECT barcode, nutriments FROM products"):
+        stored = json.loads(row["nutriments"])
+        nutriments = snapshot.product(row["barcode"]).nutriments.model_dump()
+        assert {key: nutriments[key] for key in stored} == stored
+
+
+def test_snapshot_columns_are_memory_mapped_arrays(snapshot):
+    assert snapshot.nutrients.shape == (3, 6)
+    assert snapshot.nutrients.dtype == np.float64
+    assert not snapshot.nutrients.flags.writeable
+    assert np.isnan(snapshot.nutrients[snapshot.index_of("200"), 1])
+
+
+def test_snapshot_deduplicates_strings_and_orders_by_popularity(snapshot):
+    assert snapshot.string("brand", snapshot.index_of("100")) == "Acme"
+    assert snapshot._arrays["str_brand"][snapshot.index_of("100")] == snapshot._arrays["str_brand"][snapshot.index_of("300")]
+    assert [snapshot.string("barcode", row) for row in snapshot.iter_popular()] == ["100", "300"]
+
+
+def test_popularity_ties_are_ranked_by_recency(conn, tmp_path):
+    conn.execute(
+        "INSERT INTO products (barcode, name, nutriments, access_count, last_updated) VALUES (?, ?, ?, ?, ?)",
+        ("400", "Kefir", "{}", 5, "2025-03-01T00:00:00"),
+    )
+    path = str(tmp_path / "ties.bin")
+    build_catalog_snapshot(conn, path)
+    snap = CatalogSnapshot(path)
+
+    expected = [row["barcode"] for row in conn.execute(
+        "SELECT barcode FROM products WHERE access_count > 0 ORDER BY access_count DESC, last_updated DESC"
+    )]
+    assert [snap.string("barcode", row) for row in snap.iter_popular()] == expected == ["100", "400", "300"]
+    snap.close()
+
+
+def test_measure_memory_savings_reports_per_worker_estimate(snapshot):
+    report = measure_memory_savings(snapshot, sample=3)
+
+    assert report["rows"] == 3
+    assert report["snapshot_bytes_shared"] == snapshot.nbytes
+    assert report["object_bytes_per_product"] > 0
+    assert report["estimated_savings_bytes_per_worker"] == report["estimated_object_bytes_per_worker"]
+
+
+def test_ensure_catalog_snapshot_builds_once_and_reuses_fresh_file(conn, tmp_path, monkeypatch):
+    path = str(tmp_path / "shared.bin")
+    calls = []
+
+    @contextmanager
+    def factory():
+        calls.append(1)
+        yield conn
+
+    monkeypatch.setattr(snapshot_module, "_catalog_snapshot", None)
+    first = ensure_catalog_snapshot(factory, path=path, max_age_seconds=3600)
+    second = ensure_catalog_snapshot(factory, path=path, max_age_seconds=3600)
+
+    assert calls == [1]
+    assert second.rows == 3
+    assert first is not second
+    second.close()
+    monkeypatch.setattr(snapshot_module, "_catalog_snapshot", None)
+
+
+def test_refresh_rebuilds_stale_snapshot_and_remaps_replaced_file(conn, tmp_path, monkeypatch):
+    path = str(tmp_path / "shared.bin")
+    calls = []
+
+    @contextmanager
+    def factory():
+        calls.append(1)
+        yield conn
+
+    monkeypatch.setattr(snapshot_module, "_catalog_snapshot", None)
+    mapped = ensure_catalog_snapshot(factory, path=path, max_age_seconds=3600)
+    assert refresh_catalog_snapshot(factory, path=path, max_age_seconds=3600) is mapped
+    assert calls == [1]
+
+    # Another worker rebuilt the file: remap without exporting again
+    build_catalog_snapshot(conn, path)
+    assert not mapped.is_current()
+    remapped = refresh_catalog_snapshot(factory, path=path, max_age_seconds=3600)
+    assert remapped is not mapped and remapped.is_current()
+    assert calls == [1]
+
+    # Older than the max age: this worker rebuilds it
+    rebuilt = refresh_catalog_snapshot(factory, path=path, max_age_seconds=-1)
+    assert calls == [1, 1]
+    assert rebuilt.rows == 3
+    rebuilt.close()
+    monkeypatch.setattr(snapshot_module, "_catalog_snapshot", None)
+
+
+def test_refresh_leaves_previous_snapshot_readable(conn, tmp_path, monkeypatch):
+    path = str(tmp_path / "shared.bin")
+
+    @contextmanager
+    def factory():
+        yield conn
+
+    monkeypatch.setattr(snapshot_module, "_catalog_snapshot", None)
+    old = ensure_catalog_snapshot(factory, path=path, max_age_seconds=3600)
+    popular = old.iter_popular()
+    first = old.to_product(next(popular))
+
+    refreshed = refresh_catalog_snapshot(factory, path=path, max_age_seconds=-1)
+
+    assert refreshed is not old
+    assert [old.to_product(row).barcode for row in popular] == ["300"]
+    assert first.barcode == "100" and old.product("200").name == "Crème fraîche"
+    monkeypatch.setattr(snapshot_module, "_catalog_snapshot", None)
+
+
+def test_get_catalog_snapshot_disabled_by_default():
+    assert snapshot_module.get_catalog_snapshot() is None
+
+
+def test_rejects_non_snapshot_file(tmp_path):
+    path = tmp_path / "bogus.bin"
+    path.write_bytes(b"not a snapshot at all")
+    with pytest.raises(ValueError):
+        CatalogSnapshot(str(path))
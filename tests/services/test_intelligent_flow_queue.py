@@ -1,59 +1,219 @@
 import asyncio
 import base64
+import time
+from contextlib import contextmanager
+from datetime import datetime
 
 import pytest
 
-from app.models.intelligent_flow import IntelligentFlowRequest
-from app.services.intelligent_flow_queue import IntelligentFlowQueue
+from app.models.food_vision import NutritionalAnalysis, VisionLogResponse
+from app.models.intelligent_flow import (
+    FlowExecutionStatus,
+    FlowMetadata,
+    IntelligentFlowRequest,
+    IntelligentFlowResponse,
+)
+from app.services.database import DatabaseService
+from app.services.intelligent_flow_queue import IntelligentFlowQueue, IntelligentFlowQueueFull
+
+
+def _make_response(user_id: str = "user-1") -> IntelligentFlowResponse:
+    return IntelligentFlowResponse(
+        status=FlowExecutionStatus.COMPLETE,
+        vision_result=VisionLogResponse(
+            id="vision-1",
+            user_id=user_id,
+            meal_type="lunch",
+            identified_ingredients=[],
+            estimated_portions={"total_calories": 300},
+            nutritional_analysis=NutritionalAnalysis(
+                total_calories=300,
+                macro_distribution={"protein_percent": 30, "fat_percent": 30, "carbs_percent": 40},
+                food_quality_score=0.7,
+                health_benefits=[],
+            ),
+            exercise_suggestions=[],
+            created_at=datetime.utcnow(),
+            processing_time_ms=10,
+        ),
+        metadata=FlowMetadata(user_id=user_id, meal_type="lunch", total_duration_ms=10),
+    )
 
 
 class DummyService:
-    def __init__(self, result=None, fail=False):
-        self.result = result or {"status": "ok"}
+    def __init__(self, result=None, fail=False, failures=0, delay=0.0, gate=None):
+        self.result = result or _make_response()
         self.fail = fail
+        self.failures = failures
+        self.delay = delay
+        self.gate = gate
         self.calls = 0
+        self.order = []
+        self.running = 0
+        self.max_running = 0
 
     async def run_flow(self, request):
         self.calls += 1
-        if self.fail:
+        self.order.append(request.user_id)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            if self.gate is not None:
+                await self.gate.wait()
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        if self.fail or self.calls <= self.failures:
             raise RuntimeError("boom")
         return self.result
 
 
-def _make_request():
+def _make_request(user_id="user-1"):
     return IntelligentFlowRequest.construct(
-        user_id="user-1",
+        user_id=user_id,
         image_base64=base64.b64encode(b"dummy").decode(),
         meal_type="lunch"
     )
 
 
+@pytest.fixture
+def db(tmp_path):
+    return DatabaseService(str(tmp_path / "flow-jobs.db"), max_connections=4)
+
+
+async def _wait_for(queue, job_id, status, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = await queue.get(job_id)
+        if job is not None and job.status == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {status}")
+
+
 @pytest.mark.asyncio
-async def test_enqueue_marks_completed():
-    queue = IntelligentFlowQueue()
+async def test_enqueue_marks_completed(db):
+    queue = IntelligentFlowQueue(db=db)
     service = DummyService()
     request = _make_request()
 
     job = await queue.enqueue(service, request)
-    await asyncio.sleep(0.01)
+    stored = await _wait_for(queue, job.id, "completed")
 
-    stored = await queue.get(job.id)
     assert stored is not None
     assert stored.status == "completed"
     assert stored.result == service.result
     assert service.calls == 1
+    await queue.stop()
 
 
 @pytest.mark.asyncio
-async def test_enqueue_marks_failed_on_exception():
-    queue = IntelligentFlowQueue()
+async def test_enqueue_marks_failed_on_exception(db):
+    queue = IntelligentFlowQueue(db=db, max_attempts=1)
     service = DummyService(fail=True)
     request = _make_request()
 
     job = await queue.enqueue(service, request)
-    await asyncio.sleep(0.01)
+    stored = await _wait_for(queue, job.id, "failed")
 
-    stored = await queue.get(job.id)
     assert stored is not None
     assert stored.status == "failed"
     assert "boom" in stored.error
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_runs_are_retried_with_backoff(db):
+    queue = IntelligentFlowQueue(db=db, max_attempts=3, retry_backoff=0.02, poll_interval=0.01)
+    service = DummyService(failures=2)
+
+    job = await queue.enqueue(service, _make_request())
+    stored = await _wait_for(queue, job.id, "completed")
+
+    assert stored.attempts == 3
+    assert service.calls == 3
+    assert (await queue.stats())["retried"] == 2
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_workers_limit_concurrency_and_share_between_users(db):
+    queue = IntelligentFlowQueue(db=db, workers=2, max_running_per_user=1, poll_interval=0.01)
+    gate = asyncio.Event()
+    service = DummyService(gate=gate)
+
+    jobs = [await queue.enqueue(service, _make_request("bulk-user")) for _ in range(4)]
+    jobs.append(await queue.enqueue(service, _make_request("other-user")))
+    await _wait_for(queue, jobs[-1].id, "running")
+    jobs.append(await queue.enqueue(service, _make_request("vip-user"), priority=5))
+    gate.set()
+    for job in jobs:
+        await _wait_for(queue, job.id, "completed")
+
+    assert service.max_running == 2
+    # The burst of one user does not hold the others back; priority jumps the queue
+    assert service.order == ["bulk-user", "other-user", "vip-user", "bulk-user", "bulk-user", "bulk-user"]
+    stats = await queue.stats()
+    assert stats["queued"] == 0 and stats["running"] == 0
+    assert stats["claimed"] == 6 and stats["wait_ms_max"] > 0
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_jobs_survive_restart_and_expired_leases_are_reclaimed(db):
+    crashed = IntelligentFlowQueue(db=db, visibility_timeout=0.05)
+    job = await crashed.enqueue(DummyService(delay=10), _make_request())
+    await _wait_for(crashed, job.id, "running")
+    # The worker dies without recording anything or renewing its lease
+    for task in crashed._tasks:
+        task.cancel()
+    crashed._finish = lambda *args, **kwargs: True
+    crashed._tasks = []
+
+    await asyncio.sleep(0.06)
+    restarted = IntelligentFlowQueue(db=db, poll_interval=0.01)
+    service = DummyService()
+    restarted.start(service)
+    stored = await _wait_for(restarted, job.id, "completed")
+
+    assert stored.attempts == 2
+    assert (await restarted.stats())["lease_expired"] == 1
+    await restarted.stop()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_rejects_when_full_and_finished_jobs_expire(db):
+    queue = IntelligentFlowQueue(db=db, max_jobs=1, job_ttl=0.05)
+    service = DummyService(delay=0.02)
+
+    job = await queue.enqueue(service, _make_request())
+    with pytest.raises(IntelligentFlowQueueFull):
+        await queue.enqueue(service, _make_request())
+    await _wait_for(queue, job.id, "completed")
+
+    await asyncio.sleep(0.06)
+    assert await queue.get(job.id) is None
+    assert queue.purge_expired() == 1
+    assert (await queue.stats())["rejected"] == 1
+    await queue.stop()
+
+
+def test_idle_claim_takes_no_write_lock(db):
+    queue = IntelligentFlowQueue(db=db)
+    statements = []
+
+    class TracingDb:
+        @contextmanager
+        def get_connection(self):
+            with db.get_connection() as conn:
+                conn.set_trace_callback(statements.append)
+                try:
+                    yield conn
+                finally:
+                    conn.set_trace_callback(None)
+
+    queue._db = TracingDb()
+
+    assert queue._claim(time.time()) is None
+    assert statements
+    assert not any(statement.lstrip().upper().startswith(("UPDATE", "BEGIN")) for statement in statements)
@@ -1,3 +1,4 @@
+import asyncio
 import base64
 from datetime import datetime
 from types import SimpleNamespace
@@ -216,3 +217,47 @@ async def test_run_flow_invalid_image_raises(base_request: IntelligentFlowReques
     with pytest.raises(IntelligentFlowValidationError):
         await service.run_flow(invalid_request)
     points_stub.add_points.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stream_flow_emits_vision_before_recipe_finishes(base_request: IntelligentFlowRequest):
+    recipe_started = asyncio.Event()
+    release_recipe = asyncio.Event()
+
+    async def slow_recipe(request):
+        recipe_started.set()
+        await release_recipe.wait()
+        return _build_generated_recipe()
+
+    vision_service = SimpleNamespace(analyze_food_image=AsyncMock(return_value=_build_vision_response()))
+    recipe_engine = SimpleNamespace(generate_recipe=slow_recipe)
+    smart_diet_engine_mock = SimpleNamespace(
+        get_smart_suggestions=AsyncMock(return_value=_build_smart_diet_response(base_request.user_id))
+    )
+    points_stub = SimpleNamespace(add_points=MagicMock(return_value=12))
+    service = IntelligentFlowService(vision_service, recipe_engine, smart_diet_engine_mock, points_service=points_stub)
+
+    events = service.stream_flow(base_request)
+    first = await events.__anext__()
+    assert first["step"] == "vision"
+    assert first["timing"].status == FlowStepStatus.SUCCESS
+    assert first["result"].id == "vision-1"
+    assert (await events.__anext__())["step"] == "smart_diet"
+    assert recipe_started.is_set()
+
+    release_recipe.set()
+    remaining = [event async for event in events]
+    assert [event["event"] for event in remaining] == ["step", "complete"]
+    assert remaining[0]["result"].name == _build_generated_recipe().name
+    assert remaining[1]["response"].status == FlowExecutionStatus.COMPLETE
+
+
+def test_stream_flow_rejects_invalid_image_before_streaming(base_request: IntelligentFlowRequest):
+    invalid_request = IntelligentFlowRequest.construct(**base_request.dict())
+    invalid_request.image_base64 = "not-base64"
+    service = IntelligentFlowService(
+        SimpleNamespace(), SimpleNamespace(), SimpleNamespace(), points_service=SimpleNamespace()
+    )
+
+    with pytest.raises(IntelligentFlowValidationError):
+        service.stream_flow(invalid_request)
@@ -0,0 +1,88 @@
+import gc
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.invalidation_bus import TASTE_PROFILE, InvalidationBus
+from app.services.recommendation_engine import RecommendationEngine
+
+
+class _OfflineCache:
+    def __init__(self):
+        self.failures = 0
+
+    async def client(self):
+        raise ConnectionError("redis down")
+
+    def record_failure(self, error):
+        self.failures += 1
+
+
+@pytest.fixture
+def bus():
+    return InvalidationBus(cache=_OfflineCache())
+
+
+@pytest.fixture
+def fake_db():
+    db = AsyncMock()
+    db.get_user_taste_profile = AsyncMock(return_value={"profile_confidence": 0.9, "cuisine_preferences": []})
+    return db
+
+
+@pytest.mark.asyncio
+async def test_profile_cached_until_taste_profile_write(bus, fake_db):
+    engine = RecommendationEngine(db_service=fake_db, bus=bus)
+
+    await engine._get_taste_profile("user-1")
+    await engine._get_taste_profile("user-1")
+    assert fake_db.get_user_taste_profile.await_count == 1
+
+    # Redis is down: the write is still applied to this worker's caches
+    await bus.publish(TASTE_PROFILE, "user-1")
+    assert bus.metrics["publish_errors"] == 1
+
+    await engine._get_taste_profile("user-1")
+    assert fake_db.get_user_taste_profile.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_profile_is_cached(bus, fake_db):
+    fake_db.get_user_taste_profile.return_value = None
+    engine = RecommendationEngine(db_service=fake_db, bus=bus)
+
+    assert await engine._get_taste_profile("user-2") is None
+    assert await engine._get_taste_profile("user-2") is None
+    assert fake_db.get_user_taste_profile.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_remote_messages_dispatch_and_own_messages_are_skipped(bus, fake_db):
+    engine = RecommendationEngine(db_service=fake_db, bus=bus)
+    await engine._get_taste_profile("user-3")
+
+    def message(origin):
+        return {
+            "type": "pmessage",
+            "channel": f"invalidate:{TASTE_PROFILE}".encode(),
+            "data": json.dumps({"origin": origin, "key": "user-3"}),
+        }
+
+    bus._on_message(message(bus.origin))
+    assert "user-3" in engine.taste_profiles
+
+    bus._on_message(message("other-worker"))
+    assert "user-3" not in engine.taste_profiles
+    assert bus.metrics["received"] == 1
+
+
+def test_subscribers_are_held_weakly(bus, fake_db):
+    engine = RecommendationEngine(db_service=fake_db, bus=bus)
+    assert bus.dispatch(TASTE_PROFILE, "user-4") == 1
+
+    del engine
+    gc.collect()
+
+    assert bus.dispatch(TASTE_PROFILE, "user-4") == 0
+    assert bus.stats()["topics"][TASTE_PROFILE] == 0
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.smart_diet import (
+    SmartDietContext,
+    SmartSuggestion,
+    SuggestionCategory,
+    SuggestionFeedback,
+    SuggestionType,
+)
+from app.services.database import DatabaseService
+from app.services.learning_signals import LearningSignalStore
+
+
+def make_suggestion(suggestion_id, user_id="user-1", created_at=None):
+    return SmartSuggestion(
+        id=suggestion_id,
+        user_id=user_id,
+        suggestion_type=SuggestionType.RECOMMENDATION,
+        category=SuggestionCategory.DISCOVERY,
+        title="Try lentils",
+        description="Plant protein",
+        reasoning="High fiber",
+        suggested_item={"name": "Lentils"},
+        confidence_score=0.7,
+        planning_context=SmartDietContext.TODAY,
+        created_at=created_at or datetime.now(),
+    )
+
+
+def make_feedback(suggestion_id, user_id="user-1", action="accepted"):
+    return SuggestionFeedback(suggestion_id=suggestion_id, user_id=user_id, action=action)
+
+
+@pytest.fixture
+def db(tmp_path):
+    return DatabaseService(str(tmp_path / "signals.db"), max_connections=2)
+
+
+def test_history_is_a_bounded_ring_per_user():
+    store = LearningSignalStore(per_user_limit=3)
+    store.record_suggestions("user-1", [make_suggestion(f"s{i}") for i in range(5)])
+
+    assert [s.id for s in store.user_suggestions("user-1")] == ["s2", "s3", "s4"]
+    assert store.find_suggestion("user-1", "s4").id == "s4"
+    assert store.find_suggestion("user-1", "s0") is None
+    assert store.find_suggestion("user-2", "s4") is None
+
+
+def test_least_recently_active_user_is_dropped():
+    store = LearningSignalStore(max_users=2)
+    store.record_suggestions("a", [make_suggestion("1", "a")])
+    store.record_suggestions("b", [make_suggestion("2", "b")])
+    store.record_feedback(make_feedback("1", "a"))
+    store.record_suggestions("c", [make_suggestion("3", "c")])
+
+    assert store.user_suggestions("b") == []
+    assert len(store.user_suggestions("a")) == 1
+    assert store.stats()["users"] == 2
+
+
+def test_since_filters_by_timestamp():
+    store = LearningSignalStore()
+    old = make_suggestion("old", created_at=datetime.now() - timedelta(days=10))
+    store.record_suggestions("user-1", [old, make_suggestion("new")])
+
+    recent = store.user_suggestions("user-1", since=datetime.now() - timedelta(days=1))
+    assert [s.id for s in recent] == ["new"]
+
+
+def test_outcome_counters_drive_affinity():
+    store = LearningSignalStore()
+    assert store.affinity("user-1", "discovery") == 1.0
+
+    for _ in range(5):
+        store.record_outcome("user-1", "discovery", accepted=True)
+    store.record_outcome("user-1", "discovery", accepted=False)
+
+    assert store.outcome_counts("user-1", "discovery") == (5, 1)
+    assert 1.0 < store.affinity("user-1", "discovery") <= 1.0 + store.MAX_AFFINITY_SHIFT
+    assert store.affinity("user-2", "discovery") == 1.0
+
+
+@pytest.mark.asyncio
+async def test_flush_persists_signals_in_batches(db):
+    store = LearningSignalStore(flush_batch_size=3, db=db)
+    store.record_suggestions("user-1", [make_suggestion("s1"), make_suggestion("s2")])
+    assert store.flush_due is False
+    assert await store.flush_if_due() == 0
+
+    store.record_feedback(make_feedback("s1"), category="discovery")
+    assert store.flush_due is True
+    assert await store.flush_if_due() == 3
+
+    with db.get_connection() as conn:
+        rows = conn.execute(
+            "SELECT signal_type, suggestion_id, category, action FROM smart_diet_learning_signals ORDER BY id"
+        ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        ("suggestion", "s1", "discovery", None),
+        ("suggestion", "s2", "discovery", None),
+        ("feedback", "s1", "discovery", "accepted"),
+    ]
+    assert store.stats()["pending"] == 0
+    assert len(store.user_suggestions("user-1")) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_requeues_bounded_batch():
+    class BrokenDb:
+        def get_connection(self):
+            raise RuntimeError("disk full")
+
+    store = LearningSignalStore(flush_batch_size=2, db=BrokenDb())
+    store.record_suggestions("user-1", [make_suggestion(f"s{i}") for i in range(20)])
+
+    assert await store.flush() == 0
+    assert store.stats()["pending"] == 10
+
+
+@pytest.mark.asyncio
+async def test_counters_are_rehydrated_from_persisted_feedback(db):
+    store = LearningSignalStore(db=db)
+    store.record_suggestions("user-1", [make_suggestion("s1"), make_suggestion("s2")])
+    for suggestion_id, action in (("s1", "accepted"), ("s2", "accepted"), ("s2", "rejected")):
+        store.record_feedback(make_feedback(suggestion_id, action=action), category="discovery")
+    await store.flush()
+
+    restarted = LearningSignalStore(db=db)
+    restarted.record_feedback(make_feedback("s1"), category="discovery")  # not flushed yet
+    await restarted.load_user("user-1")
+
+    assert restarted.outcome_counts("user-1", "discovery") == (3, 1)
+    restarted.record_outcome("user-1", "discovery", accepted=False)
+    await restarted.load_user("user-1")
+    assert restarted.outcome_counts("user-1", "discovery") == (3, 2)
@@ -0,0 +1,150 @@
+import time
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.models.meal_plan import (
+    ActivityLevel, Goal, MealPlanConfig, MealPlanRequest, Preferences, Sex, UserProfile
+)
+from app.models.product import Nutriments, ProductResponse
+from app.services.meal_optimizer import MealOptimizer, ServingTable
+from app.services.meal_planner import MealPlannerService
+
+
+def make_product(barcode, energy, protein, fat, carbs, serving="100g", name=None, sugars=None):
+    return ProductResponse(
+        source="test",
+        barcode=barcode,
+        name=name or f"Product {barcode}",
+        brand="Test",
+        serving_size=serving,
+        image_url=None,
+        nutriments=Nutriments(
+            energy_kcal_per_100g=energy,
+            protein_g_per_100g=protein,
+            fat_g_per_100g=fat,
+            carbs_g_per_100g=carbs,
+            sugars_g_per_100g=sugars,
+        ),
+        fetched_at=datetime.utcnow(),
+    )
+
+
+def make_catalog(size):
+    products = []
+    for i in range(size):
+        protein = (i * 7) % 35
+        fat = (i * 11) % 30
+        carbs = (i * 13) % 70
+        energy = protein * 4 + fat * 9 + carbs * 4 or 50
+        products.append(make_product(f"{i:06d}", energy, protein, fat, carbs, serving=f"{30 + (i * 17) % 170}g"))
+    return products
+
+
+@pytest.fixture
+def planner():
+    return MealPlannerService(MealPlanConfig(planner_mode="optimized"))
+
+
+def test_optimized_meal_lands_in_calorie_window_with_balanced_macros(planner):
+    products = make_catalog(200)
+    target = 600.0
+
+    items = planner._select_products_for_meal(target, products, [], False, None)
+
+    total = sum(item.calories for item in items)
+    assert 0 < len(items) <= planner.config.max_items_per_meal
+    assert target * 0.95 <= total <= target * 1.05
+    protein_kcal = sum(item.macros.protein_g for item in items) * 4
+    assert 0.2 <= protein_kcal / total <= 0.4
+
+
+def test_optimized_beats_greedy_on_calorie_error():
+    products = make_catalog(200)
+    greedy = MealPlannerService(MealPlanConfig(planner_mode="greedy"))
+    optimized = MealPlannerService(MealPlanConfig(planner_mode="optimized"))
+
+    def error(service, target):
+        items = service._select_products_for_meal(target, products, [], False, None)
+        return abs(sum(item.calories for item in items) - target) / target
+
+    targets = [420.0, 575.0, 730.0, 910.0]
+    assert sum(error(optimized, t) for t in targets) < sum(error(greedy, t) for t in targets)
+
+
+def test_optional_products_are_included(planner):
+    products = make_catalog(100)
+    optional = make_product("OPT-1", 120, 3, 1, 25, serving="100g")
+    products.append(optional)
+
+    items = planner._select_products_for_meal(700.0, products, ["OPT-1"], False, None)
+
+    assert "OPT-1" in [item.barcode for item in items]
+
+
+def test_portions_scale_serving_and_keep_missing_macros_none():
+    config = MealPlanConfig(planner_mode="optimized", portion_options=[2.0])
+    service = MealPlannerService(config)
+    products = [make_product("A", 200, 20, 5, 15, serving="150g")]
+
+    items = service._select_products_for_meal(600.0, products, [], False, None)
+
+    assert len(items) == 1
+    assert items[0].serving == "300g"
+    assert items[0].calories == pytest.approx(600.0)
+    assert items[0].macros.protein_g == pytest.approx(60.0)
+    assert items[0].macros.sugars_g is None
+
+
+def test_preferences_are_applied_before_optimising(planner):
+    products = [
+        make_product("1", 165, 31, 4, 0, serving="300g", name="Chicken Breast"),
+        make_product("2", 120, 8, 4, 14, serving="400g", name="Lentil Stew"),
+    ]
+    preferences = type("Prefs", (), {"excludes": [], "dietary_restrictions": ["vegetarian"]})()
+
+    items = planner._select_products_for_meal(500.0, products, [], True, preferences)
+
+    assert [item.barcode for item in items] == ["2"]
+
+
+def test_solver_returns_empty_for_empty_table():
+    optimizer = MealOptimizer()
+    table = ServingTable([], lambda product: None)
+
+    assert optimizer.solve(table, 500.0, 0.05, 3) == []
+
+
+def test_solver_latency_for_500_products():
+    service = MealPlannerService(MealPlanConfig(planner_mode="optimized"))
+    table = ServingTable(make_catalog(500), service._calculate_serving_info)
+    optimizer = service.optimizer
+    max_items = service.config.max_items_flexible
+
+    optimizer.solve(table, 700.0, 0.15, max_items)
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        optimizer.solve(table, 700.0, 0.15, max_items)
+        timings.append(time.perf_counter() - start)
+
+    assert min(timings) < 0.05
+
+
+@pytest.mark.asyncio
+async def test_generate_plan_uses_optimizer(planner):
+    request = MealPlanRequest(
+        user_profile=UserProfile(
+            age=30, sex=Sex.MALE, height_cm=180, weight_kg=75,
+            activity_level=ActivityLevel.MODERATELY_ACTIVE, goal=Goal.MAINTAIN,
+        ),
+        preferences=Preferences(),
+    )
+
+    with patch.object(planner, "_load_available_products", AsyncMock(return_value=make_catalog(150))):
+        plan = await planner.generate_plan(request)
+
+    for meal in plan.meals:
+        assert meal.items
+        assert abs(meal.actual_calories - meal.target_calories) <= meal.target_calories * 0.05
@@ -0,0 +1,105 @@
+import time
+
+from app.services.memory_cache import MemoryCache
+from app.services.performance_monitor import PerformanceMonitor
+
+
+def make_cache(**kwargs):
+    kwargs.setdefault("monitor", None)
+    return MemoryCache("test", **kwargs)
+
+
+def test_get_set_and_counters():
+    cache = make_cache()
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("missing", "default") == "default"
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate_percent"] == 50.0
+
+
+def test_evicts_least_recently_used_entry():
+    cache = make_cache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_budget_evicts_and_rejects_oversized_values():
+    cache = make_cache(max_entries=100, max_bytes=10, sizeof=len)
+    cache.set("a", b"12345")
+    cache.set("b", b"12345")
+    cache.set("c", b"123")
+
+    assert "a" not in cache
+    assert cache.bytes == 8
+    assert cache.set("huge", b"x" * 11) is False
+    assert cache.stats()["rejected"] == 1
+
+    cache.set("b", b"1")
+    assert cache.bytes == 4
+
+
+def test_per_entry_ttl_expires_lazily(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = make_cache(default_ttl=60)
+    cache.set("short", "x", ttl=5)
+    cache.set("default", "y")
+    cache.set("forever", "z", ttl=None)
+
+    now[0] += 10
+    assert cache.get("short") is None
+    assert cache.get("default") == "y"
+
+    now[0] += 100
+    assert cache.get("default") is None
+    assert cache.stats()["expirations"] == 2
+    assert cache.set("zero", "x", ttl=0) is False
+
+
+def test_forever_entry_without_default_ttl():
+    cache = make_cache()
+    cache.set("k", "v")
+
+    assert cache.get("k") == "v"
+
+
+def test_delete_matching_and_clear():
+    cache = make_cache(sizeof=len)
+    cache.set("user:1:a", "x")
+    cache.set("user:1:b", "y")
+    cache.set("user:2:a", "z")
+    cache.set(("tuple", "key"), "t")
+
+    assert cache.delete_matching("user:1:*") == 2
+    assert len(cache) == 2
+    assert cache.delete("user:2:a") is True
+    assert cache.delete("user:2:a") is False
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.bytes == 0
+
+
+def test_registers_with_performance_monitor():
+    monitor = PerformanceMonitor()
+    cache = MemoryCache("feed", max_entries=4, monitor=monitor)
+    cache.set("k", "v")
+    cache.get("k")
+
+    stats = monitor.get_memory_cache_stats()
+    assert stats["feed"]["hits"] == 1
+    assert stats["feed"]["entries"] == 1
+
+    del cache
+    assert "feed" not in monitor.get_memory_cache_stats()
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+from app.services import nutrient_index as nutrient_index_module
+from app.services.nutrient_index import NutrientIndex, NutrientRule, nutrient_vector
+
+
+KEYWORDS = {
+    "grain_products": ["rice", "quinoa", "pasta"],
+    "dairy_products": ["milk", "yogurt"],
+}
+
+
+def _row(barcode, name, kcal, protein, fat, carbs=10.0, categories=None, access_count=0, **extra):
+    nutriments = {
+        "energy_kcal_per_100g": kcal,
+        "protein_g_per_100g": protein,
+        "fat_g_per_100g": fat,
+        "carbs_g_per_100g": carbs,
+        **extra,
+    }
+    return {
+        "barcode": barcode,
+        "name": name,
+        "categories": categories,
+        "nutriments": json.dumps(nutriments),
+        "access_count": access_count,
+    }
+
+
+@pytest.fixture
+def index():
+    idx = NutrientIndex()
+    idx.register_partitions(KEYWORDS)
+    idx.load_rows([
+        _row("1", "White rice", 360, 7, 1, 79),
+        _row("2", "Quinoa", 120, 4.4, 1.9, 21, access_count=5),
+        _row("3", "Brown Rice", 111, 9, 0.9, 23, access_count=50),
+        _row("4", "Whole milk", 64, 3.3, 3.6, 4.8),
+        _row("5", "Greek yogurt", 97, 9, 5, 3.6, categories="Dairies"),
+        _row("6", "Rice pudding", 130, None, 3, 20),
+    ])
+    return idx
+
+
+def test_nutrient_vector_accepts_aliases_and_nutriment_keys():
+    vector = nutrient_vector({"calories": 100, "protein_g_per_100g": 5, "fat": "2", "bogus": 1})
+    assert vector[:3].tolist() == [100.0, 5.0, 2.0]
+    assert np.isnan(vector[3:]).all()
+
+
+def test_partitions_are_assigned_from_name_and_categories(index):
+    assert index.partition_size("grain_products") == 4
+    assert index.partition_size("dairy_products") == 2
+    assert index.partition_for_term("Greek Yogurt") == "dairy_products"
+    assert index.partition_for_term("chocolate") is None
+
+
+def test_rank_alternatives_requires_all_rules(index):
+    matches = index.rank_alternatives(
+        "grain_products",
+        {"calories": 150, "protein": 7, "fat": 1},
+        [NutrientRule("protein", 1.15), NutrientRule("kcal", 0.8)],
+        require_all=True,
+    )
+
+    assert [match.barcode for match in matches] == ["3"]
+    assert matches[0].matched == ["protein", "kcal"]
+    assert matches[0].nutrients["protein"] == 9.0
+
+
+def test_rank_alternatives_orders_by_score_then_popularity_and_skips_incomplete(index):
+    matches = index.rank_alternatives(
+        "grain_products",
+        {"calories": 360, "protein": 7, "fat": 1},
+        [NutrientRule("kcal", 0.8), NutrientRule("protein", 1.2)],
+        exclude=["1"],
+    )
+
+    assert [match.barcode for match in matches] == ["3", "2"]
+    assert matches[0].score == 2.0
+
+
+def test_nearest_returns_closest_products(index):
+    matches = index.nearest("dairy_products", {"kcal": 90, "protein": 8}, k=1)
+    assert [match.barcode for match in matches] == ["5"]
+
+
+def test_incremental_upsert_and_remove(index):
+    index.upsert(_row("7", "Protein pasta", 150, 25, 1.5, 30))
+    matches = index.rank_alternatives(
+        "grain_products", {"calories": 360, "protein": 7}, [NutrientRule("protein", 3.0)]
+    )
+    assert [match.barcode for match in matches] == ["7"]
+
+    index.upsert(_row("7", "Protein pasta", 150, 8, 1.5, 30))
+    assert index.rank_alternatives(
+        "grain_products", {"calories": 360, "protein": 7}, [NutrientRule("protein", 3.0)]
+    ) == []
+
+    index.remove("3")
+    assert index.partition_size("grain_products") == 4
+
+
+def test_load_from_db_and_staleness(tmp_path):
+    conn = sqlite3.connect(tmp_path / "products.db")
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        "CREATE TABLE products (barcode TEXT, name TEXT, categories TEXT, nutriments TEXT, access_count INTEGER)"
+    )
+    row = _row("10", "Oat milk", 45, 1, 1.5)
+    conn.execute(
+        "INSERT INTO products VALUES (?, ?, ?, ?, ?)",
+        (row["barcode"], row["name"], row["categories"], row["nutriments"], row["access_count"]),
+    )
+
+    idx = NutrientIndex(max_age_seconds=0.01)
+    idx.register_partitions(KEYWORDS)
+    assert idx.is_stale()
+    assert idx.load_from_db(conn) == 1
+    assert idx.partition_size("dairy_products") == 1
+    time.sleep(0.02)
+    assert idx.is_stale()
+
+
+@pytest.mark.asyncio
+async def test_background_rebuild_keeps_serving_and_replays_concurrent_writes(index, tmp_path, monkeypatch):
+    conn = sqlite3.connect(tmp_path / "products.db", check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        "CREATE TABLE products (barcode TEXT, name TEXT, categories TEXT, nutriments TEXT, access_count INTEGER)"
+    )
+    for row in (_row("1", "White rice", 360, 7, 1, 79), _row("10", "Oat milk", 45, 1, 1.5)):
+        conn.execute("INSERT INTO products VALUES (?, ?, ?, ?, ?)", tuple(row.values()))
+    reading, release = threading.Event(), threading.Event()
+
+    class SlowDb:
+        @contextmanager
+        def get_connection(self):
+            reading.set()
+            release.wait(2)
+            yield conn
+
+    monkeypatch.setattr(nutrient_index_module, "db_service", SlowDb())
+    index.max_age_seconds = 0
+    grains = index.partition_size("grain_products")
+
+    # The stale index answers from its previous contents while the rebuild runs
+    assert index.ensure_fresh()
+    assert await asyncio.to_thread(reading.wait, 2)
+    assert index.partition_size("grain_products") == grains
+    index.upsert(_row("7", "Protein pasta", 150, 25, 1.5, 30))
+    index.remove("1")
+    release.set()
+    await index._rebuild_task
+
+    assert sorted(index._row_by_barcode) == ["10", "7"]
+    assert index.partition_size("dairy_products") == 1
+    assert index._writes_during_rebuild is None
+
+
+def test_query_latency_on_large_partition():
+    idx = NutrientIndex()
+    idx.register_partitions(KEYWORDS)
+    rng = np.random.default_rng(0)
+    idx.load_rows(
+        _row(str(i), f"rice product {i}", *rng.uniform(50, 400, 1), *rng.uniform(0, 20, 2))
+        for i in range(20000)
+    )
+
+    start = time.perf_counter()
+    matches = idx.rank_alternatives(
+        "grain_products",
+        {"calories": 300, "protein": 8, "fat": 5},
+        [NutrientRule("protein", 1.15), NutrientRule("kcal", 0.8)],
+        require_all=True,
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    assert matches
+    assert elapsed_ms < 50
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+import bcrypt
+import pytest
+from fastapi import HTTPException
+
+from app.models.user import User, UserLogin, UserRole
+from app.services.auth import AuthService
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+def make_hasher(**kwargs):
+    kwargs.setdefault("rounds", 4)
+    kwargs.setdefault("monitor", None)
+    return PasswordHasher(**kwargs)
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_run_on_the_pool():
+    hasher = make_hasher()
+    hashed = await hasher.hash("s3cret!")
+
+    assert hashed.startswith("$2b$04$")
+    assert await hasher.verify("s3cret!", hashed) is True
+    assert await hasher.verify("wrong", hashed) is False
+    assert await hasher.verify("s3cret!", "not-a-hash") is False
+
+    stats = hasher.stats()
+    assert stats["hashes"] == 1
+    assert stats["verifies"] == 3
+    assert stats["pending"] == 0
+    assert stats["avg_hash_ms"] > 0
+
+
+def test_needs_rehash_compares_cost():
+    hasher = make_hasher(rounds=5)
+    old = bcrypt.hashpw(b"pw", bcrypt.gensalt(rounds=4)).decode()
+
+    assert hasher.needs_rehash(old) is True
+    assert hasher.needs_rehash(hasher.hash_sync("pw")) is False
+    assert hasher.needs_rehash("plaintext") is False
+    assert hasher.needs_rehash(None) is False
+
+
+@pytest.mark.asyncio
+async def test_rejects_work_beyond_max_pending():
+    hasher = make_hasher(max_workers=1, max_pending=2)
+    release = threading.Event()
+
+    blocked = [asyncio.ensure_future(hasher.run("verify", release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+
+    assert hasher.saturated
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.run("verify", release.wait)
+
+    release.set()
+    await asyncio.gather(*blocked)
+    assert hasher.pending == 0
+    assert hasher.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_keeps_slot_until_bcrypt_finishes():
+    hasher = make_hasher(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    waiting = asyncio.ensure_future(hasher.run("verify", release.wait))
+    await asyncio.sleep(0.01)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    # The thread is still busy, so the slot stays taken
+    assert hasher.pending == 1
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.run("verify", release.wait)
+
+    release.set()
+    for _ in range(100):
+        if hasher.pending == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert hasher.pending == 0
+
+
+def _user():
+    return User(
+        id="user-1", email="user@example.com", full_name="User",
+        role=UserRole.STANDARD, is_developer=False, is_active=True,
+        email_verified=True, created_at=datetime.utcnow(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_password_at_new_cost():
+    user_service = AsyncMock()
+    user_service.get_user_by_email.return_value = _user()
+    user_service.get_password_hash.return_value = bcrypt.hashpw(b"Password123", bcrypt.gensalt(rounds=4)).decode()
+    service = AuthService(user_service=user_service, password_hasher=make_hasher(rounds=5))
+
+    service.user_cache.set("user-1", _user())
+
+    await service.login_user(UserLogin(email="user@example.com", password="Password123"))
+
+    assert "user-1" not in service.user_cache
+    user_id, updates = user_service.update_user.await_args.args
+    assert user_id == "user-1"
+    assert updates["password_hash"].startswith("$2b$05$")
+
+
+@pytest.mark.asyncio
+async def test_login_is_rejected_when_pool_is_saturated():
+    user_service = AsyncMock()
+    hasher = make_hasher(max_pending=0)
+    service = AuthService(user_service=user_service, password_hasher=hasher)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.login_user(UserLogin(email="user@example.com", password="Password123"))
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers == {"Retry-After": "1"}
+    user_service.get_user_by_email.assert_not_awaited()
@@ -156,3 +156,24 @@ async def test_ensure_nutritional_balance_falls_back_on_error(monkeypatch):
     existing = [_build_product("keep", "Keep It")]
     result = await service._ensure_nutritional_balance(existing, dietary_restrictions=None, target_count=5)
     assert result == existing
+
+
+@pytest.mark.asyncio
+async def test_load_specific_products_served_from_catalog_snapshot(monkeypatch):
+    import app.services.product_discovery as discovery_module
+
+    class _Snapshot:
+        def product(self, barcode):
+            return _build_product(barcode, "From snapshot") if barcode == "snap" else None
+
+    class _NoDb:
+        def get_connection(self):
+            raise AssertionError("database should not be queried")
+
+    monkeypatch.setattr(discovery_module, "get_catalog_snapshot", lambda: _Snapshot())
+    monkeypatch.setattr(discovery_module, "db_service", _NoDb())
+
+    service = ProductDiscoveryService()
+    result = await service._load_specific_products(["snap"])
+
+    assert [product.name for product in result] == ["From snapshot"]
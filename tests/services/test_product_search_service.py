@@ -0,0 +1,113 @@
+import json
+import sqlite3
+
+import pytest
+
+from app.services.product_search import (
+    ProductSearchService,
+    build_match_expression,
+    ensure_products_fts,
+    term_matches,
+)
+
+
+PRODUCTS_DDL = """
+    CREATE TABLE products (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        barcode TEXT UNIQUE NOT NULL,
+        name TEXT NOT NULL,
+        brand TEXT,
+        categories TEXT,
+        nutriments TEXT NOT NULL,
+        access_count INTEGER DEFAULT 0
+    )
+"""
+
+
+def _insert(conn, barcode, name, brand=None, categories=None, access_count=0, kcal=100):
+    conn.execute(
+        "INSERT INTO products (barcode, name, brand, categories, nutriments, access_count) VALUES (?, ?, ?, ?, ?, ?)",
+        (barcode, name, brand, categories, json.dumps({"energy_kcal_per_100g": kcal}), access_count),
+    )
+
+
+@pytest.fixture
+def conn():
+    connection = sqlite3.connect(":memory:")
+    connection.row_factory = sqlite3.Row
+    connection.execute(PRODUCTS_DDL)
+    _insert(connection, "1", "Crème fraîche", "Président", "Lácteos, Dairies", access_count=5)
+    _insert(connection, "2", "White Rice", "Uncle", "Cereals, Grains", access_count=50)
+    _insert(connection, "3", "Brown rice crackers", "Snackco", "Snacks", access_count=1)
+    yield connection
+    connection.close()
+
+
+def test_build_match_expression_prefixes_and_folds_terms():
+    expression = build_match_expression(["Crème Fr", "", "  "], columns=("name",))
+    assert expression == '{name}: ("creme fr"*)'
+    assert build_match_expression(["!!"]) is None
+
+
+def test_term_matches_mirrors_phrase_prefix_semantics():
+    assert term_matches("white ric", "Organic White Rice")
+    assert term_matches("creme", "Crème fraîche")
+    assert not term_matches("rice white", "White Rice")
+    assert not term_matches("rice", "Licorice")
+    assert not term_matches("", "White Rice")
+
+
+def test_fts_index_is_rebuilt_for_existing_rows_and_folds_diacritics(conn):
+    assert ensure_products_fts(conn.cursor()) is True
+
+    rows = ProductSearchService().search(conn, ["creme"], columns=("name",))
+
+    assert [row["barcode"] for row in rows] == ["1"]
+
+
+def test_fts_triggers_track_inserts_updates_and_deletes(conn):
+    ensure_products_fts(conn.cursor())
+    service = ProductSearchService()
+
+    _insert(conn, "4", "Vollkornbrot", "Bäcker", "Brot")
+    assert [row["barcode"] for row in service.search(conn, ["vollkorn"])] == ["4"]
+
+    conn.execute("UPDATE products SET name = 'Roggenbrot' WHERE barcode = '4'")
+    assert service.search(conn, ["vollkorn"]) == []
+    assert [row["barcode"] for row in service.search(conn, ["roggen"])] == ["4"]
+
+    conn.execute("DELETE FROM products WHERE barcode = '4'")
+    assert service.search(conn, ["roggen"]) == []
+
+
+def test_fts_ranks_name_matches_above_category_matches(conn):
+    ensure_products_fts(conn.cursor())
+    _insert(conn, "5", "Oat drink", categories="Rice drinks", access_count=100)
+
+    rows = ProductSearchService().search(conn, ["rice"], columns=("name", "categories"))
+
+    assert rows[-1]["barcode"] == "5"
+
+
+def test_search_applies_extra_filter_and_ordering(conn):
+    ensure_products_fts(conn.cursor())
+
+    rows = ProductSearchService().search(
+        conn,
+        ["rice"],
+        where="p.access_count > ?",
+        params=(10,),
+        order_by="p.access_count DESC",
+    )
+
+    assert [row["barcode"] for row in rows] == ["2"]
+
+
+def test_search_falls_back_to_like_without_fts_table(conn):
+    rows = ProductSearchService().search(conn, ["rice"], columns=("name",), order_by="p.access_count DESC")
+
+    assert [row["barcode"] for row in rows] == ["2", "3"]
+
+
+def test_search_returns_empty_for_blank_terms(conn):
+    assert ProductSearchService().search(conn, ["", "   "]) == []
@@ -85,3 +85,66 @@ async def test_search_recipes_handles_connection_error(recipe_db, monkeypatch):
     result = await recipe_db.search_recipes(limit=1)
 
     assert result == []
+
+
+@pytest.mark.asyncio
+async def test_search_recipes_filters_tags_before_limit(recipe_db):
+    for index in range(6):
+        await _create_recipe(recipe_db, recipe_id=f"r-plain-{index}", tags=["dessert"])
+    await _create_recipe(recipe_db, recipe_id="r-healthy", tags=["lean-protein"])
+
+    results = await recipe_db.search_recipes(tags=["lean-protein", "vegan"], limit=2)
+
+    assert [recipe_data["id"] for recipe_data in results] == ["r-healthy"]
+
+
+@pytest.mark.asyncio
+async def test_search_recipes_page_walks_keyset_cursor(recipe_db):
+    for index in range(5):
+        await _create_recipe(recipe_db, recipe_id=f"r-{index}", tags=["weeknight"])
+    with recipe_db.get_connection() as conn:
+        conn.execute("UPDATE recipes SET confidence_score = NULL WHERE id = 'r-4'")
+        conn.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        page = await recipe_db.search_recipes_page(tags=["weeknight"], limit=2, cursor=cursor)
+        seen.extend(recipe_data["id"] for recipe_data in page["recipes"])
+        cursor = page["next_cursor"]
+        assert page["has_more"] == (cursor is not None)
+        if cursor is None:
+            break
+
+    # Unscored recipes come last
+    assert seen == ["r-3", "r-2", "r-1", "r-0", "r-4"]
+
+    with pytest.raises(ValueError):
+        await recipe_db.search_recipes_page(cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_get_recipes_hydrates_in_bulk_and_reuses_cached_rows(recipe_db):
+    for index in range(3):
+        await _create_recipe(recipe_db, recipe_id=f"r-bulk-{index}")
+
+    recipes = await recipe_db.get_recipes(["r-bulk-2", "missing", "r-bulk-0", "r-bulk-2"])
+
+    assert [recipe.id for recipe in recipes] == ["r-bulk-2", "r-bulk-0"]
+    assert recipes[0].ingredients[0].name == "tomato"
+    assert recipes[0].nutrition.calories_per_serving == 200
+
+    # Returned objects are copies: mutating one does not leak into the cache
+    recipes[0].ingredients.clear()
+    with recipe_db.get_connection() as conn:
+        conn.execute("UPDATE recipe_ingredients SET quantity = 5 WHERE recipe_id = 'r-bulk-2'")
+        conn.commit()
+    cached = await recipe_db.get_recipe("r-bulk-2")
+    assert cached.ingredients[0].quantity == 2
+
+    # A different updated_at makes the cached copy stale
+    hydrated = recipe_db.query_service.hydrated
+    _, snapshot = hydrated.get("r-bulk-2")
+    hydrated.set("r-bulk-2", ("2000-01-01 00:00:00", snapshot))
+    reloaded = await recipe_db.get_recipes_by_ids(["r-bulk-2"])
+    assert reloaded["r-bulk-2"]["ingredients"][0]["quantity"] == 5
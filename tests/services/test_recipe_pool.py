@@ -0,0 +1,62 @@
+import pytest
+
+from app.services import recipe_ai_engine as engine_module
+from app.services.recipe_ai_engine import RecipeAIEngine, RecipeGenerationRequest
+from app.services.recipe_pool import RecipePool, total_calories
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = RecipeAIEngine()
+    engine.recipe_pool = RecipePool(["italian", "asian"], meal_types=(None, "dinner"), variants=4)
+
+    async def no_cache(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(engine_module.redis_cache_service, "get", no_cache)
+    monkeypatch.setattr(engine_module.redis_cache_service, "set", no_cache)
+    return engine
+
+
+@pytest.mark.asyncio
+async def test_fill_covers_every_cell_and_draws_nearest_calories(engine):
+    pool = engine.recipe_pool
+    assert await engine.fill_recipe_pool() == 2 * 2 * 3 * 4
+    assert pool.stats()["cells"] == 12
+
+    recipes, calories = pool._cells[("italian", "dinner", "vegan")]
+    assert all(ingredient.name != "Chicken Breast" for recipe in recipes for ingredient in recipe.ingredients)
+    target = float(calories.min())
+    drawn = pool.draw(["Italian"], "dinner", ["vegan"], target_calories=target)
+    assert total_calories(drawn) == pytest.approx(target)
+    assert drawn is not recipes[int(calories.argmin())]
+
+    assert pool.draw(["italian"], "brunch", []) is None
+    assert pool.draw(["asian"], None, ["vegan"], excluded_ingredients=["quinoa"]) is None
+    assert pool.stats()["uncovered"] == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_recipe_serves_pooled_recipe_and_falls_back(engine, monkeypatch):
+    await engine.fill_recipe_pool()
+    generated = []
+    original = engine.recipe_generator.generate_recipe_base
+
+    async def counting_generate(request):
+        generated.append(request)
+        return await original(request)
+
+    monkeypatch.setattr(engine.recipe_generator, "generate_recipe_base", counting_generate)
+
+    request = RecipeGenerationRequest(
+        cuisine_preferences=["asian"], meal_type="dinner", servings=2,
+        difficulty_preference="medium", target_calories_per_serving=500
+    )
+    recipe = await engine.generate_recipe(request)
+    assert generated == []
+    assert recipe.cuisine_type == "asian"
+    assert recipe.servings == 2 and recipe.difficulty_level == "medium"
+    assert recipe.nutrition.calories_per_serving == pytest.approx(250)
+
+    await engine.generate_recipe(RecipeGenerationRequest(cuisine_preferences=["asian"], meal_type="brunch"))
+    assert len(generated) == 1
@@ -101,3 +101,52 @@ def test_calculate_translation_quality_score():
 
     score = service.calculate_translation_quality_score(original, translated)
     assert pytest.approx(0.6, rel=1e-2) == score
+
+
+class BatchTranslationService:
+    def __init__(self):
+        self.batches = []
+
+    async def translate_texts(self, texts, source_lang="en", target_lang="es"):
+        self.batches.append(list(texts))
+        return {text: f"es:{text}" for text in texts}
+
+
+class BatchCacheService(DummyCacheService):
+    def __init__(self):
+        super().__init__()
+        self.mget_calls = 0
+
+    async def mget(self, keys):
+        self.mget_calls += 1
+        return {key: self.store.get(key) for key in keys}
+
+    async def mset(self, values, ttl):
+        self.store.update(values)
+        return len(values)
+
+
+@pytest.mark.asyncio
+async def test_batch_translate_recipes_shares_one_batch_and_dedupes_strings():
+    translation_service = BatchTranslationService()
+    cache = BatchCacheService()
+    service = RecipeTranslationService(translation_service=translation_service, cache_service=cache)
+    recipes = []
+    for index in range(10):
+        recipe = _build_recipe(name=f"Soup {index}")
+        recipe.id = f"r{index}"
+        recipes.append(recipe)
+
+    translations = await service.batch_translate_recipes(recipes)
+
+    assert len(translation_service.batches) == 1
+    assert cache.mget_calls == 1
+    batch = translation_service.batches[0]
+    assert len(batch) == len(set(batch))
+    assert "tomate" in batch  # "tomato" after terminology, shared by all ten recipes
+    assert translations["r3"].name == "es:Soup 3"
+    assert translations["r3"].ingredients[0].name == "es:tomate"
+
+    # A second run is served from the cache without provider calls
+    await service.batch_translate_recipes(recipes[:2])
+    assert len(translation_service.batches) == 1
@@ -205,3 +205,32 @@ async def test_translate_complete_recipe_handles_translation_exception(monkeypat
         await service.translate_complete_recipe(recipe)
 
     assert "translation failed" in str(excinfo.value)
+
+
+class BatchCache(DummyCache):
+    async def mget(self, keys):
+        return {key: self.store.get(key) for key in keys}
+
+    async def mset(self, values, ttl=None):
+        self.store.update(values)
+        return len(values)
+
+
+@pytest.mark.asyncio
+async def test_translate_texts_joins_segments_into_one_provider_call(monkeypatch):
+    service = TranslationService(BatchCache())
+    service.libretranslate_url = None
+    await service.cache.set(service._get_cache_key("bread", "en", "es"), "pan")
+    calls = []
+
+    async def fake_providers(text, source_lang, target_lang):
+        calls.append(text)
+        return "\n".join(f"{line}-es" for line in text.split("\n"))
+
+    monkeypatch.setattr(service, "_translate_with_providers", fake_providers)
+
+    result = await service.translate_texts(["salt", "bread", "olive oil", "salt "], "en", "es")
+
+    assert calls == ["salt\nolive oil"]
+    assert result == {"salt": "salt-es", "bread": "pan", "olive oil": "olive oil-es", "salt ": "salt-es"}
+    assert service.cache.store[service._get_cache_key("olive oil", "en", "es")] == "olive oil-es"
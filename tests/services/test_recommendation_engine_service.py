@@ -136,6 +136,62 @@ async def test_score_recipe_personalization_with_profile(engine, fake_db):
     assert isinstance(explanation, str)
 
 
+@pytest.mark.asyncio
+async def test_score_many_matches_single_scoring_and_ranks(engine, fake_db):
+    profile = _build_profile()
+    profile["liked_ingredients"].append({"ingredient": "chicken", "preference": 0.5})
+    profile["disliked_ingredients"].append({"ingredient": "bell pepper", "preference": -0.4})
+    fake_db.get_user_taste_profile.return_value = profile
+
+    recipes = []
+    for index, (cuisine, extra, prep, calories) in enumerate([
+        ("Mediterranean", "Olive Oil", 25, 420),
+        ("Thai", "Red Bell Pepper", 60, 900),
+        ("mexican", "Cherry Tomatoes", 5, 300),
+        (None, "Salt", 0, 420),
+    ]):
+        recipe = _build_recipe(cuisine)
+        recipe.id = f"recipe{index}"
+        recipe.prep_time_minutes = prep
+        recipe.ingredients.append(RecipeIngredient(name=extra, quantity=1, unit="pcs"))
+        recipe.nutrition.calories_per_serving = calories
+        recipes.append(recipe)
+    recipes[3].nutrition = None
+    recipes[3].ingredients = []
+
+    for scorer in engine.scorers.values():
+        expected = [scorer.score(recipe, profile) for recipe in recipes]
+        assert scorer.score_many(recipes, profile).tolist() == pytest.approx(expected)
+
+    results = await engine.score_many(recipes, "user_batch")
+
+    assert fake_db.get_user_taste_profile.await_count == 1
+    assert [r["overall_score"] for r in results] == sorted((r["overall_score"] for r in results), reverse=True)
+    for result in results:
+        recipe = next(r for r in recipes if r.id == result["recipe_id"])
+        single = await engine.score_recipe_personalization(recipe, "user_batch")
+        assert {k: v for k, v in result.items() if k != "recipe_id"} == single
+
+
+@pytest.mark.asyncio
+async def test_score_many_without_profile(engine, fake_db):
+    results = await engine.score_many([_build_recipe()], "user_none")
+
+    assert results[0]["recipe_id"] == "recipe1"
+    assert results[0]["overall_score"] == 0.0
+    assert await engine.score_many([], "user_none") == []
+
+
+def test_ingredient_matcher_finds_all_substring_patterns():
+    from app.services.recommendations.scorers import IngredientMatcher
+
+    matcher = IngredientMatcher(["oil", "olive oil", "", "live", "pepper"])
+
+    assert matcher.match("extra virgin olive oil") == {0, 1, 3}
+    assert matcher.match("black pepper") == {4}
+    assert matcher.match_any(["salt", "sesame oil"]) == {0}
+
+
 @pytest.mark.asyncio
 async def test_score_recipe_personalization_without_profile(engine, fake_db):
     fake_db.get_user_taste_profile.return_value = None
@@ -0,0 +1,129 @@
+import asyncio
+import uuid
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.models.user import User, UserRole
+from app.services.auth import AuthService
+from app.services.database import db_service
+from app.services.request_loader import (
+    RequestLoader,
+    get_request_loader,
+    invalidate_request_cache,
+    request_scope,
+)
+from app.services.social.block_service import BlockService
+
+
+def test_load_fetches_each_key_once():
+    loader = RequestLoader()
+    calls = []
+
+    def fetch(key):
+        calls.append(key)
+        return key.upper()
+
+    assert loader.load("ns", "a", fetch) == "A"
+    assert loader.load("ns", "a", fetch) == "A"
+    assert calls == ["a"]
+    assert loader.missing("ns", ["a", "b", "b"]) == ["b"]
+
+    loader.prime("ns", {"b": None})
+    assert loader.load("ns", "b", fetch) is None
+    assert loader.metrics == {"hits": 2, "loads": 1, "primed": 1}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_async_loads_share_one_fetch():
+    loader = RequestLoader()
+    calls = []
+
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return f"user-{key}"
+
+    results = await asyncio.gather(*(loader.load_async("user", "1", fetch) for _ in range(5)))
+
+    assert results == ["user-1"] * 5
+    assert calls == ["1"]
+
+
+def test_scope_is_shared_nested_and_invalidated():
+    assert get_request_loader() is not get_request_loader()
+
+    with request_scope() as outer:
+        with request_scope() as inner:
+            assert inner is outer is get_request_loader()
+        outer.prime("user", {"1": "cached", "2": "cached"})
+        invalidate_request_cache("user", "1")
+        assert outer.missing("user", ["1", "2"]) == ["1"]
+
+    # Outside a scope invalidation is a no-op
+    invalidate_request_cache()
+
+
+def test_primed_block_edges_answer_is_blocking_without_queries(monkeypatch):
+    viewer, blocker, other = (f"u-{uuid.uuid4().hex[:8]}" for _ in range(3))
+    with db_service.get_connection() as conn:
+        conn.execute(
+            "INSERT INTO user_blocks (blocker_id, blocked_id, status) VALUES (?, ?, 'active')",
+            (blocker, viewer),
+        )
+        conn.commit()
+
+    with request_scope() as loader:
+        BlockService.prime_block_edges(viewer, [blocker, other, blocker])
+        monkeypatch.setattr(BlockService, "_fetch_is_blocking", staticmethod(lambda edge: pytest.fail("queried")))
+
+        assert BlockService.is_blocking(blocker, viewer) is True
+        assert BlockService.is_blocking(viewer, blocker) is False
+        assert BlockService.is_blocking(other, viewer) is False
+        assert loader.metrics["primed"] == 4
+
+
+@pytest.mark.asyncio
+async def test_auth_user_cache_reuses_user_until_invalidated():
+    user = User(
+        id="cached-user", email="cached@example.com", full_name="Cached",
+        role=UserRole.STANDARD, is_developer=False, is_active=True,
+        email_verified=True, created_at=datetime.utcnow(),
+    )
+    user_service = AsyncMock()
+    user_service.get_user_by_id.return_value = user
+    service = AuthService(user_service=user_service)
+    token = service.create_access_token(user)
+
+    assert (await service.get_current_user_from_token(token)).id == "cached-user"
+    assert (await service.get_current_user_from_token(token)).id == "cached-user"
+    assert user_service.get_user_by_id.await_count == 1
+
+    service.invalidate_user("cached-user")
+    await service.get_current_user_from_token(token)
+    assert user_service.get_user_by_id.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_update_user_drops_cached_auth_user():
+    from app.services.user_service import UserService
+
+    user = User(
+        id="updated-user", email="updated@example.com", full_name="Before",
+        role=UserRole.STANDARD, is_developer=False, is_active=True,
+        email_verified=True, created_at=datetime.utcnow(),
+    )
+    lookups = AsyncMock()
+    lookups.get_user_by_id.return_value = user
+    service = AuthService(user_service=lookups)
+    token = service.create_access_token(user)
+    await service.get_current_user_from_token(token)
+
+    repo = AsyncMock()
+    repo.update.return_value = user.model_copy(update={"role": UserRole.PREMIUM})
+    await UserService(repo).update_user("updated-user", {"role": UserRole.PREMIUM.value})
+
+    assert "updated-user" not in service.user_cache
+    await service.get_current_user_from_token(token)
+    assert lookups.get_user_by_id.await_count == 2
@@ -10,6 +10,14 @@ class DummyAsyncCache:
         self.ttl = {}
         self.deleted_keys = []
         self.set_calls = []
+        self.generations = {}
+
+    async def generation(self, scope):
+        return self.generations.get(scope, 0)
+
+    async def bump_generation(self, scope):
+        self.generations[scope] = self.generations.get(scope, 0) + 1
+        return self.generations[scope]
 
     async def get(self, key):
         return self.store.get(key)
@@ -67,14 +75,33 @@ async def test_invalidate_user_cache_removes_keys(cache_manager):
     # Pre-populate values that should be deleted
     cache.store[manager._generate_cache_key('user_preferences', user_id='user-x')] = {}
     cache.store[manager._generate_cache_key('feedback_analytics', user_id='user-x')] = {}
-    for period in ['day', 'week', 'month']:
-        cache.store[manager._generate_cache_key('insights', user_id='user-x', period=period)] = {}
 
     assert await manager.invalidate_user_cache('user-x')
-    assert len(cache.deleted_keys) >= 5
+    assert len(cache.deleted_keys) == 2
     assert not any(key.startswith('smart_diet') for key in cache.store)
 
 
+@pytest.mark.asyncio
+async def test_invalidate_user_cache_bumps_generation(cache_manager):
+    manager, cache = cache_manager
+    insights = SmartDietInsights(period="week", user_id="user-x")
+    response = SmartDietResponse(context_type=SmartDietContext.TODAY, total_suggestions=1, avg_confidence=0.8)
+    await manager.set_insights_cache("user-x", "week", insights)
+    await manager.set_suggestions_cache("user-x", SmartDietContext.TODAY, "hash-1", response)
+    await manager.set_insights_cache("user-y", "week", SmartDietInsights(period="week", user_id="user-y"))
+
+    assert await manager.invalidate_user_cache("user-x")
+
+    assert cache.generations == {"smart_diet:user-x": 1}
+    assert await manager.get_insights_cache("user-x", "week") is None
+    assert await manager.get_suggestions_cache("user-x", SmartDietContext.TODAY, "hash-1") is None
+    assert (await manager.get_insights_cache("user-y", "week")).user_id == "user-y"
+
+    await manager.set_insights_cache("user-x", "week", insights)
+    assert (await manager.get_insights_cache("user-x", "week")).user_id == "user-x"
+    assert any(":g1:" in key for key in cache.store)
+
+
 # BATCH 3 PHASE 2: Extended smart_diet_cache tests for error handling and edge cases (2025-12-15)
 
 @pytest.mark.asyncio
@@ -232,12 +259,26 @@ async def test_invalidate_user_cache_error_handling(cache_manager):
 
 @pytest.mark.asyncio
 async def test_invalidate_user_cache_with_no_keys(cache_manager):
-    """Test invalidate_user_cache when no keys exist"""
+    """Test invalidate_user_cache when no keys exist still advances the generation"""
     manager, cache = cache_manager
 
     result = await manager.invalidate_user_cache("user-nonexistent")
 
-    assert result is False
+    assert result is True
+    assert cache.generations["smart_diet:user-nonexistent"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user_cache_without_redis(cache_manager):
+    """Test invalidate_user_cache reports failure when the generation cannot be bumped"""
+    manager, cache = cache_manager
+
+    async def unavailable(scope):
+        return None
+
+    cache.bump_generation = unavailable
+
+    assert await manager.invalidate_user_cache("user-1") is False
 
 
 @pytest.mark.asyncio
@@ -258,13 +299,14 @@ async def test_cache_key_generation(cache_manager):
     manager, cache = cache_manager
 
     # Test suggestions key
-    key1 = manager._generate_cache_key('suggestions', user_id='user-1', context='today', hash='abc123')
+    key1 = manager._generate_cache_key('suggestions', user_id='user-1', generation=3, context='today', hash='abc123')
     assert 'user-1' in key1
     assert 'today' in key1
     assert 'abc123' in key1
+    assert ':g3:' in key1
 
     # Test insights key
-    key2 = manager._generate_cache_key('insights', user_id='user-2', period='week')
+    key2 = manager._generate_cache_key('insights', user_id='user-2', generation=0, period='week')
     assert 'user-2' in key2
     assert 'week' in key2
 
@@ -1,7 +1,6 @@
 import asyncio
 import json
 import sqlite3
-import time
 
 import pytest
 
@@ -102,14 +101,15 @@ async def test_cache_manager_memory_hit():
     user_id = "user-mem"
     context = SmartDietContext.TODAY
     request_hash = "hash-mem"
-    cache_key = f"smart_diet:{user_id}:{context.value}:{request_hash}"
+    cache_key = f"smart_diet:{user_id}:g0:{context.value}:{request_hash}"
     response = SmartDietResponse(user_id=user_id, context_type=context)
-    cache.memory_cache[cache_key] = (response, time.time())
+    cache._store_in_memory_cache(cache_key, response.model_dump_json(), 60)
 
     result = await cache.get_suggestions_cache(user_id, context, request_hash)
 
-    assert result is response
-    assert cache.memory_cache[cache_key][0] is response
+    assert result == response
+    assert result is not response
+    assert cache.memory_cache.stats()['hits'] == 1
 
 
 @pytest.mark.asyncio
@@ -118,7 +118,7 @@ async def test_cache_manager_populates_from_redis(monkeypatch):
     user_id = "user-redis"
     context = SmartDietContext.TODAY
     request_hash = "hash-redis"
-    cache_key = f"smart_diet:{user_id}:{context.value}:{request_hash}"
+    cache_key = f"smart_diet:{user_id}:g0:{context.value}:{request_hash}"
     response = SmartDietResponse(user_id=user_id, context_type=context)
 
     async def fake_get(key):
@@ -130,7 +130,8 @@ async def test_cache_manager_populates_from_redis(monkeypatch):
     result = await cache.get_suggestions_cache(user_id, context, request_hash)
 
     assert result is not None
-    assert cache.memory_cache[cache_key][0].user_id == user_id
+    assert cache_key in cache.memory_cache
+    assert (await cache.get_suggestions_cache(user_id, context, request_hash)).user_id == user_id
 
 
 @pytest.mark.asyncio
@@ -148,7 +149,74 @@ async def test_cache_manager_handles_redis_errors(monkeypatch):
     result = await cache.get_suggestions_cache(user_id, context, request_hash)
 
     assert result is None
-    assert cache.memory_cache == {}
+    assert len(cache.memory_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_manager_follows_user_invalidation(monkeypatch):
+    from app.services import smart_diet_optimized as optimized_module
+    from app.services.smart_diet_cache import SmartDietCacheManager
+
+    class Generations:
+        def __init__(self):
+            self.values = {}
+
+        async def generation(self, scope):
+            return self.values.get(scope, 0)
+
+        async def bump_generation(self, scope):
+            self.values[scope] = self.values.get(scope, 0) + 1
+            return self.values[scope]
+
+        async def delete(self, key):
+            return False
+
+    async def no_redis(*args, **kwargs):
+        return None
+
+    generations = Generations()
+    monkeypatch.setattr(optimized_module, "cache_service", generations)
+    monkeypatch.setattr(redis_cache_service, "get", no_redis)
+    monkeypatch.setattr(redis_cache_service, "set", no_redis)
+    manager = SmartDietCacheManager()
+    manager.cache_service = generations
+    cache = OptimizedCacheManager()
+    context = SmartDietContext.TODAY
+    await cache.set_suggestions_cache("user-inv", context, "hash", _build_response("user-inv", context))
+    await cache.set_suggestions_cache("user-other", context, "hash", _build_response("user-other", context))
+
+    assert await manager.invalidate_user_cache("user-inv")
+
+    assert "smart_diet:user-inv:g0:today:hash" not in cache.memory_cache
+    assert "smart_diet:user-other:g0:today:hash" in cache.memory_cache
+    assert await cache._cache_key("user-inv", context, "hash") == "smart_diet:user-inv:g1:today:hash"
+    assert await cache.get_suggestions_cache("user-inv", context, "hash") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_key_reads_generation_once_until_invalidated(monkeypatch):
+    from app.services import smart_diet_optimized as optimized_module
+
+    class Generations:
+        def __init__(self):
+            self.reads = 0
+
+        async def generation(self, scope):
+            self.reads += 1
+            return 0
+
+    generations = Generations()
+    monkeypatch.setattr(optimized_module, "cache_service", generations)
+    cache = OptimizedCacheManager()
+    context = SmartDietContext.TODAY
+
+    for _ in range(3):
+        assert await cache._cache_key("user-gen", context, "hash") == "smart_diet:user-gen:g0:today:hash"
+    assert generations.reads == 1
+
+    cache.invalidate_user("user-gen")
+    await cache._cache_key("user-gen", context, "hash")
+    assert generations.reads == 2
 
 
 def _build_response(user_id: str, context: SmartDietContext) -> SmartDietResponse:
@@ -168,11 +236,10 @@ async def test_cache_manager_sets_memory_and_redis(monkeypatch):
         captured['args'] = (key, value, ttl)
 
     monkeypatch.setattr(redis_cache_service, "set", fake_set)
-    monkeypatch.setattr("app.services.smart_diet_optimized.json.dumps", lambda data: "{}", raising=False)
 
     await cache.set_suggestions_cache(user_id, context, request_hash, response)
 
-    cache_key = f"smart_diet:{user_id}:{context.value}:{request_hash}"
+    cache_key = f"smart_diet:{user_id}:g0:{context.value}:{request_hash}"
     assert cache_key in cache.memory_cache
     assert captured['args'][0] == cache_key
     assert isinstance(captured['args'][1], str)
@@ -191,11 +258,10 @@ async def test_cache_manager_ignores_redis_errors(monkeypatch):
         raise RuntimeError("boom")
 
     monkeypatch.setattr(redis_cache_service, "set", raise_error)
-    monkeypatch.setattr("app.services.smart_diet_optimized.json.dumps", lambda data: "{}", raising=False)
 
     await cache.set_suggestions_cache(user_id, context, request_hash, response)
 
-    cache_key = f"smart_diet:{user_id}:{context.value}:{request_hash}"
+    cache_key = f"smart_diet:{user_id}:g0:{context.value}:{request_hash}"
     assert cache_key in cache.memory_cache
 
 
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.stage_graph import Stage, run_stages
+
+
+def sleeper(value, delay):
+    async def run(_):
+        await asyncio.sleep(delay)
+        return value
+    return run
+
+
+@pytest.mark.asyncio
+async def test_independent_stages_overlap_and_dependents_see_results():
+    async def combine(results):
+        return results["a"] + results["b"]
+
+    started = time.perf_counter()
+    outcome = await run_stages([
+        Stage("a", sleeper([1], 0.05)),
+        Stage("b", sleeper([2], 0.05)),
+        Stage("both", combine, depends_on=("a", "b")),
+    ])
+    elapsed = time.perf_counter() - started
+
+    assert outcome.results == {"a": [1], "b": [2], "both": [1, 2]}
+    assert elapsed < 0.09
+    assert set(outcome.timings_ms) == {"a", "b", "both"}
+    assert outcome.degraded == []
+
+
+@pytest.mark.asyncio
+async def test_late_or_failing_stage_falls_back():
+    async def boom(_):
+        raise RuntimeError("boom")
+
+    async def count(results):
+        return len(results["slow"]) + len(results["broken"])
+
+    outcome = await run_stages([
+        Stage("slow", sleeper(["late"], 1.0), timeout=0.01),
+        Stage("broken", boom, fallback=dict),
+        Stage("count", count, depends_on=("slow", "broken")),
+    ])
+
+    assert outcome.results["slow"] == []
+    assert outcome.results["broken"] == {}
+    assert outcome.results["count"] == 0
+    assert sorted(outcome.degraded) == ["broken", "slow"]
+
+
+@pytest.mark.asyncio
+async def test_undeclared_dependency_is_rejected():
+    with pytest.raises(ValueError):
+        await run_stages([Stage("late", sleeper(1, 0), depends_on=("missing",))])
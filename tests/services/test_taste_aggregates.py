@@ -0,0 +1,100 @@
+import pytest
+
+from app.services.recipe_ai_engine import GeneratedRecipe, RecipeIngredient, RecipeNutrition
+from app.services.recipe_database import RecipeDatabaseService
+from app.services.recipes.taste_aggregates import CUISINE, INGREDIENT, TasteAggregate
+from app.services.taste_learning import TasteLearningService
+
+
+@pytest.fixture
+def recipe_db(tmp_path):
+    return RecipeDatabaseService(str(tmp_path / "taste.db"))
+
+
+def make_recipe(recipe_id, cuisine, ingredients):
+    return GeneratedRecipe(
+        id=recipe_id,
+        name=f"Recipe {recipe_id}",
+        description="",
+        cuisine_type=cuisine,
+        difficulty_level="easy",
+        prep_time_minutes=10,
+        cook_time_minutes=10,
+        servings=2,
+        ingredients=[RecipeIngredient(name=name, quantity=1.0, unit="unit") for name in ingredients],
+        instructions=[],
+        nutrition=RecipeNutrition(300, 10, 10, 40),
+    )
+
+
+async def rate_all(recipe_db, ratings):
+    for recipe_id, cuisine, ingredients, rating in ratings:
+        await recipe_db.create_recipe(make_recipe(recipe_id, cuisine, ingredients))
+        await recipe_db.rate_recipe("user-1", recipe_id, rating, would_make_again=rating >= 4)
+
+
+def test_aggregate_statistics_match_plain_formulas():
+    aggregate = TasteAggregate()
+    for rating in (5, 4, 2):
+        aggregate.add(rating, False, rating >= 4)
+
+    assert aggregate.rating_count == 3
+    assert aggregate.mean == pytest.approx(11 / 3)
+    assert aggregate.variance == pytest.approx(7 / 3)
+    assert aggregate.would_make_again_ratio == pytest.approx(2 / 3)
+
+    aggregate.remove(2, False, False)
+    assert aggregate.rating_count == 2
+    assert aggregate.mean == pytest.approx(4.5)
+
+
+@pytest.mark.asyncio
+async def test_rating_updates_aggregates_and_rerating_replaces(recipe_db):
+    await rate_all(recipe_db, [
+        ("r1", "italian", ["Tomato", "Basil"], 5),
+        ("r2", "italian", ["tomato", "Garlic"], 3),
+    ])
+
+    total, cuisines = recipe_db.taste_aggregates.load("user-1", CUISINE)
+    assert total == 2
+    assert cuisines["italian"].mean == pytest.approx(4.0)
+
+    await recipe_db.rate_recipe("user-1", "r2", 1, would_make_again=False)
+
+    total, ingredients = recipe_db.taste_aggregates.load("user-1", INGREDIENT)
+    assert total == 2
+    assert ingredients["tomato"].rating_count == 2
+    assert ingredients["tomato"].mean == pytest.approx(3.0)
+    assert ingredients["garlic"].rating_count == 1
+    assert ingredients["garlic"].mean == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_missing_aggregates_are_rebuilt_from_history(recipe_db):
+    await rate_all(recipe_db, [("r1", "thai", ["Lime"], 4), ("r2", "thai", ["lime"], 2)])
+    with recipe_db.get_connection() as conn:
+        recipe_db.taste_aggregates.invalidate(conn, "user-1")
+        conn.commit()
+
+    total, ingredients = recipe_db.taste_aggregates.load("user-1", INGREDIENT)
+
+    assert total == 2
+    assert ingredients["lime"].rating_count == 2
+    assert ingredients["lime"].mean == pytest.approx(3.0)
+
+
+@pytest.mark.asyncio
+async def test_taste_learning_reads_aggregates(recipe_db):
+    await rate_all(recipe_db, [
+        (f"r{i}", "mexican", ["Beans", f"Extra {i}"], rating)
+        for i, rating in enumerate((5, 4, 5))
+    ])
+    service = TasteLearningService(recipe_db)
+
+    cuisines = await service.analyze_cuisine_preferences("user-1")
+    ingredients = await service.analyze_ingredient_preferences("user-1")
+
+    assert cuisines["total_ratings_analyzed"] == 3
+    assert cuisines["cuisine_preferences"]["mexican"]["total_ratings"] == 3
+    assert ingredients["ingredient_preferences"]["beans"]["recipe_count"] == 3
+    assert "extra 0" not in ingredients["ingredient_preferences"]
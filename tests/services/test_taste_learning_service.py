@@ -15,11 +15,11 @@ class FakeRecipeDB:
     async def get_user_ratings_for_learning(self, user_id, limit=100):
         return self.ratings
 
-    async def update_cuisine_preference(self, user_id, cuisine, data):
+    async def update_cuisine_preference(self, user_id, cuisine, data, publish=True):
         self.cuisine_updates.append((user_id, cuisine, data))
         return True
 
-    async def update_ingredient_preference(self, user_id, ingredient, data):
+    async def update_ingredient_preference(self, user_id, ingredient, data, publish=True):
         self.ingredient_updates.append((user_id, ingredient, data))
         return True
 
@@ -0,0 +1,163 @@
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from app.models.user import User, UserRole
+from app.services.auth import AuthService
+from app.services.database import DatabaseService
+from app.services.session_service import SessionService
+from app.services.token_revocation import SESSION, USER, TokenRevocationStore
+
+
+@pytest.fixture
+def db(tmp_path):
+    return DatabaseService(str(tmp_path / "revocations.db"), max_connections=2)
+
+
+@pytest.fixture
+def user():
+    return User(
+        id="user-1",
+        email="ana@example.com",
+        full_name="Ana Perez",
+        role=UserRole.STANDARD,
+        is_active=True,
+        email_verified=True,
+    )
+
+
+@pytest.fixture
+def stateless_auth(db):
+    store = TokenRevocationStore(token_ttl_seconds=900, db=db)
+    user_service = MagicMock()
+    user_service.get_user_by_id = AsyncMock()
+    service = AuthService(SessionService(db, revocations=store), user_service, revocations=store)
+    service.stateless_tokens = True
+    return service, store, user_service
+
+
+def test_session_and_user_revocations():
+    store = TokenRevocationStore(token_ttl_seconds=60, db=MagicMock())
+    before = time.time() - 1
+
+    store.revoke(SESSION, "s1")
+    store.revoke(USER, "u1")
+
+    assert store.is_revoked("s1", "u2", before)
+    assert store.is_revoked("s2", "u1", before)
+    # Tokens issued after a user-wide revocation stay valid
+    assert not store.is_revoked("s2", "u1", time.time() + 1)
+    assert not store.is_revoked("s2", "u2", before)
+
+
+def test_disabled_store_records_nothing():
+    db = MagicMock()
+    store = TokenRevocationStore(token_ttl_seconds=60, db=db, enabled=False)
+
+    store.revoke(SESSION, "s1")
+    store.revoke(USER, "u1")
+
+    assert store.stats()["sessions"] == 0 and store.stats()["users"] == 0
+    db.get_connection.assert_not_called()
+
+
+def test_revoke_prunes_expired_entries_without_refresh_loop():
+    store = TokenRevocationStore(token_ttl_seconds=-1, refresh_interval=0, db=MagicMock())
+    for i in range(5):
+        store.revoke(SESSION, f"s{i}")
+
+    assert store.stats()["sessions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_role_change_revokes_user_tokens(monkeypatch):
+    from app.services import user_service as user_service_module
+    from app.services.user_service import UserService
+
+    store = TokenRevocationStore(token_ttl_seconds=60, db=MagicMock())
+    monkeypatch.setattr(user_service_module, "token_revocations", store)
+    repo = MagicMock()
+    repo.update = AsyncMock(return_value=None)
+    before = time.time() - 1
+
+    await UserService(repo).update_user("u1", {"full_name": "Ana"})
+    assert not store.is_revoked(None, "u1", before)
+    await UserService(repo).update_user("u1", {"role": UserRole.PREMIUM.value})
+    assert store.is_revoked(None, "u1", before)
+
+
+@pytest.mark.asyncio
+async def test_refresh_loads_only_new_rows_from_other_workers(db):
+    writer = TokenRevocationStore(db=db)
+    reader = TokenRevocationStore(db=db)
+
+    writer.revoke(SESSION, "s1")
+    assert await reader.refresh() == 1
+    assert reader.is_revoked("s1", None, None)
+
+    assert await reader.refresh() == 0
+    writer.revoke(USER, "u1")
+    assert await reader.refresh() == 1
+    assert reader.stats()["users"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_revocations_are_pruned(db):
+    store = TokenRevocationStore(token_ttl_seconds=-1, db=db)
+    store.revoke(SESSION, "s1")
+
+    await store.refresh()
+    assert not store.is_revoked("s1", None, None)
+    assert store.stats()["sessions"] == 0
+    assert store.purge_expired() == 1
+
+
+@pytest.mark.asyncio
+async def test_stateless_tokens_skip_user_lookup(stateless_auth, user):
+    service, _, user_service = stateless_auth
+    token = service.create_access_token(user, "session-1")
+
+    resolved = await service.get_current_user_from_token(token)
+
+    assert resolved.id == "user-1"
+    assert resolved.full_name == "Ana Perez"
+    assert resolved.email_verified is True
+    assert service.session_id_from_token(token) == "session-1"
+    user_service.get_user_by_id.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_deleted_session_revokes_stateless_token(stateless_auth, user):
+    service, _, _ = stateless_auth
+    token = service.create_access_token(user, "session-1")
+
+    await service.session_service.delete_session("session-1")
+
+    with pytest.raises(HTTPException) as exc:
+        await service.get_current_user_from_token(token)
+    assert exc.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_tokens_without_claims_fall_back_to_user_lookup(stateless_auth, user):
+    service, _, user_service = stateless_auth
+    user_service.get_user_by_id.return_value = user
+    legacy = jwt.encode(
+        {
+            "user_id": "user-1",
+            "email": "ana@example.com",
+            "type": "access",
+            "iat": time.time(),
+            "exp": time.time() + 60,
+        },
+        service.secret_key,
+        algorithm=service.algorithm,
+    )
+
+    resolved = await service.get_current_user_from_token(legacy)
+
+    assert resolved.id == "user-1"
+    user_service.get_user_by_id.assert_awaited_once_with("user-1")
@@ -0,0 +1,44 @@
+import asyncio
+import gc
+
+import pytest
+
+from app.services.translation_batcher import TranslationBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_batch():
+    batches = []
+
+    async def resolve(keys):
+        batches.append(list(keys))
+        return {key: f"{key}-es" for key in keys}
+
+    batcher = TranslationBatcher(resolve, window=0.001)
+    results = await asyncio.gather(*(batcher.translate(key) for key in ["salt", "rice", "salt"]))
+
+    assert results == ["salt-es", "rice-es", "salt-es"]
+    assert batches == [["salt", "rice"]]
+    assert batcher.stats()["coalesced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_resolver_task_survives_garbage_collection():
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def resolve(keys):
+        started.set()
+        await release.wait()
+        return {key: key.upper() for key in keys}
+
+    batcher = TranslationBatcher(resolve, window=0.001)
+    pending = asyncio.ensure_future(batcher.translate("salt"))
+    await started.wait()
+
+    assert len(batcher._tasks) == 1
+    gc.collect()
+    release.set()
+
+    assert await asyncio.wait_for(pending, 1) == "SALT"
+    assert not batcher._tasks
@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.database import DatabaseService
+from app.services.translation_memory import TranslationMemory
+from app.services.translation_service import TranslationService
+
+
+class DummyCache:
+    def __init__(self):
+        self.store = {}
+        self.gets = 0
+
+    async def get(self, key):
+        self.gets += 1
+        return self.store.get(key)
+
+    async def set(self, key, value, ttl=None, **kwargs):
+        self.store[key] = value
+        return True
+
+
+class CountingTranslator:
+    instances = 0
+    threads = set()
+
+    def __init__(self, source, target):
+        CountingTranslator.instances += 1
+        CountingTranslator.threads.add(threading.get_ident())
+
+    def translate(self, text):
+        return f"{text}-es"
+
+
+class StatefulTranslator:
+    """Like deep_translator: the text is stored on the instance before the request."""
+
+    def __init__(self, source, target):
+        self._text = None
+
+    def translate(self, text):
+        self._text = text
+        time.sleep(0.005)
+        return f"{self._text}-es"
+
+
+@pytest.fixture
+def db(tmp_path):
+    return DatabaseService(str(tmp_path / "translation-memory.db"), max_connections=2)
+
+
+@pytest.mark.asyncio
+async def test_memory_serves_glossary_and_persists_provider_translations(db):
+    memory = TranslationMemory(db=db)
+    memory.seed({"Olive Oil": "aceite de oliva"}, "en", "es")
+    assert memory.get("olive oil", "en", "es") is None  # inactive until loaded
+
+    memory.load()
+    assert memory.get("  OLIVE   oil ", "en", "es") == "Aceite de oliva"
+
+    await memory.remember({"olive oil": "aceite", "Sea Salt": "sal marina"}, "en", "es")
+    reloaded = TranslationMemory(db=db)
+    reloaded.load()
+    assert reloaded.get("olive oil", "en", "es") == "aceite de oliva"  # glossary wins
+    assert reloaded.get("sea salt", "en", "es") == "sal marina"
+    assert reloaded.get("sea salt", "en", "fr") is None
+
+
+@pytest.mark.asyncio
+async def test_hits_follow_the_casing_of_the_requested_text(db):
+    memory = TranslationMemory(db=db)
+    memory.load()
+    await memory.remember({"Salt": "Sal", "black pepper": "pimienta negra"}, "en", "es")
+
+    assert memory.get("Salt", "en", "es") == "Sal"
+    assert memory.get("salt", "en", "es") == "sal"
+    assert memory.get("Black pepper", "en", "es") == "Pimienta negra"
+    assert memory.get("black pepper", "en", "es") == "pimienta negra"
+
+
+def test_libretranslate_client_is_pooled_per_event_loop():
+    service = TranslationService(cache_service=DummyCache())
+
+    async def client():
+        return service._libretranslate_client()
+
+    first, second = asyncio.new_event_loop(), asyncio.new_event_loop()
+    try:
+        a = first.run_until_complete(client())
+        assert first.run_until_complete(client()) is a
+        assert second.run_until_complete(client()) is not a
+
+        first.run_until_complete(service.close())
+        assert a.is_closed
+    finally:
+        first.close()
+        second.close()
+
+
+@pytest.mark.asyncio
+async def test_translation_service_checks_memory_first_and_reuses_providers(db, monkeypatch):
+    memory = TranslationMemory(db=db)
+    memory.seed({"salt": "sal"}, "en", "es")
+    memory.load()
+    cache = DummyCache()
+    service = TranslationService(cache, memory=memory)
+    service.libretranslate_url = None
+    service.TRANSLATION_PROVIDERS = [CountingTranslator]
+    CountingTranslator.instances = 0
+    CountingTranslator.threads = set()
+
+    assert await service.translate_text("Salt", "en", "es") == "Sal"
+    assert cache.gets == 0
+
+    provider_calls = []
+    original = service._translate_with_providers
+
+    async def counting_providers(text, source_lang, target_lang):
+        provider_calls.append(text)
+        await asyncio.sleep(0)
+        return await original(text, source_lang, target_lang)
+
+    monkeypatch.setattr(service, "_translate_with_providers", counting_providers)
+    first, second = await asyncio.gather(
+        service.translate_text("lentils", "en", "es"),
+        service.translate_text("lentils", "en", "es"),
+    )
+    await service.translate_text("chickpeas", "en", "es")
+
+    assert first == second == "lentils-es"
+    assert provider_calls == ["lentils", "chickpeas"]  # concurrent duplicates share one call
+    assert CountingTranslator.instances == len(CountingTranslator.threads)  # one per executor thread
+    assert memory.get("lentils", "en", "es") == "lentils-es"
+
+
+def test_concurrent_provider_calls_never_share_a_translator():
+    service = TranslationService(DummyCache())
+    texts = [f"ingredient {i}" for i in range(32)]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda text: service._translate_sync(StatefulTranslator, text, "en", "es"), texts))
+
+    assert results == [f"{text}-es" for text in texts]
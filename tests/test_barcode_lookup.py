@@ -235,7 +235,7 @@ class TestBarcodeRedisCache:
         barcode = "1234567890123"
         cached_data = {"name": "Test Product", "brand": "Test Brand"}
         
-        with patch.object(cache, '_get_redis_client') as mock_redis:
+        with patch.object(cache.namespace.cache, 'client') as mock_redis:
             mock_client = AsyncMock()
             mock_client.get.return_value = json.dumps(cached_data)
             mock_redis.return_value = mock_client
@@ -250,7 +250,7 @@ class TestBarcodeRedisCache:
         """Test cache miss scenario"""
         barcode = "1234567890123"
         
-        with patch.object(cache, '_get_redis_client') as mock_redis:
+        with patch.object(cache.namespace.cache, 'client') as mock_redis:
             mock_client = AsyncMock()
             mock_client.get.return_value = None
             mock_redis.return_value = mock_client
@@ -264,7 +264,7 @@ class TestBarcodeRedisCache:
         """Test cache get with Redis error"""
         barcode = "1234567890123"
         
-        with patch.object(cache, '_get_redis_client') as mock_redis:
+        with patch.object(cache.namespace.cache, 'client') as mock_redis:
             mock_client = AsyncMock()
             mock_client.get.side_effect = redis.RedisError("Connection failed")
             mock_redis.return_value = mock_client
@@ -279,7 +279,7 @@ class TestBarcodeRedisCache:
         barcode = "1234567890123"
         product_data = {"name": "Test Product"}
         
-        with patch.object(cache, '_get_redis_client') as mock_redis, \
+        with patch.object(cache.namespace.cache, 'client') as mock_redis, \
              patch('app.config.config.redis_cache_ttl_hours', 24):
             
             mock_client = AsyncMock()
@@ -299,7 +299,7 @@ class TestBarcodeRedisCache:
         barcode = "1234567890123"
         product_data = {"name": "Test Product"}
         
-        with patch.object(cache, '_get_redis_client') as mock_redis:
+        with patch.object(cache.namespace.cache, 'client') as mock_redis:
             mock_client = AsyncMock()
             mock_client.setex.side_effect = redis.RedisError("Write failed")
             mock_redis.return_value = mock_client
@@ -692,11 +692,10 @@ async def test_full_integration_mock_dependencies():
     mock_http_client.get.return_value = mock_http_response
     
     # Patch all external dependencies
-    with patch('redis.asyncio.Redis') as mock_redis, \
+    with patch('app.services.barcode_lookup.cache_layer.client', AsyncMock(return_value=mock_redis_client)), \
          patch('httpx.AsyncClient') as mock_http, \
          patch('app.config.config.off_rate_limit_delay', 0):  # No rate limiting in tests
         
-        mock_redis.return_value = mock_redis_client
         mock_http.return_value = mock_http_client
         
         # Test the full flow
@@ -287,27 +287,28 @@ class TestBarcodeRedisCache:
     def setup_method(self):
         self.cache = BarcodeRedisCache()
     
-    @patch('redis.asyncio.ConnectionPool.from_url')
-    @patch('redis.asyncio.Redis')
-    async def test_get_redis_client_initialization(self, mock_redis, mock_pool):
-        """Test Redis client initialization"""
+    @patch('app.services.cache.redis.from_url')
+    async def test_redis_client_is_pooled_and_reused(self, mock_from_url):
+        """Test the shared pooled client is created once and reused"""
+        from app.services.cache import AsyncCache
         mock_client = AsyncMock()
-        mock_redis.return_value = mock_client
-        mock_pool_instance = Mock()
-        mock_pool.return_value = mock_pool_instance
+        mock_from_url.return_value = mock_client
+        cache = BarcodeRedisCache(AsyncCache("redis://localhost:6379", max_connections=10))
         
-        client = await self.cache._get_redis_client()
+        mock_client.get.return_value = None
+        await cache.get("1234567890123")
+        await cache.get("1234567890124")
         
-        assert client == mock_client
-        mock_pool.assert_called_once()
-        mock_redis.assert_called_once_with(connection_pool=mock_pool_instance)
+        mock_from_url.assert_called_once()
+        assert mock_from_url.call_args.kwargs['max_connections'] == 10
+        mock_client.ping.assert_not_called()
     
     def test_get_cache_key(self):
         """Test cache key generation"""
         key = self.cache._get_cache_key("1234567890123")
         assert key == "barcode:product:1234567890123"
     
-    @patch('app.services.barcode_lookup.BarcodeRedisCache._get_redis_client')
+    @patch('app.services.barcode_lookup.cache_layer.client')
     async def test_cache_get_hit(self, mock_get_client):
         """Test successful cache retrieval"""
         mock_client = AsyncMock()
@@ -321,7 +322,7 @@ class TestBarcodeRedisCache:
         assert result == cached_data
         mock_client.get.assert_called_once_with("barcode:product:1234567890123")
     
-    @patch('app.services.barcode_lookup.BarcodeRedisCache._get_redis_client')
+    @patch('app.services.barcode_lookup.cache_layer.client')
     async def test_cache_get_miss(self, mock_get_client):
         """Test cache miss"""
         mock_client = AsyncMock()
@@ -332,7 +333,7 @@ class TestBarcodeRedisCache:
         
         assert result is None
     
-    @patch('app.services.barcode_lookup.BarcodeRedisCache._get_redis_client')
+    @patch('app.services.barcode_lookup.cache_layer.client')
     async def test_cache_get_redis_error(self, mock_get_client):
         """Test cache get with Redis error"""
         mock_client = AsyncMock()
@@ -343,7 +344,7 @@ class TestBarcodeRedisCache:
         
         assert result is None  # Should handle error gracefully
     
-    @patch('app.services.barcode_lookup.BarcodeRedisCache._get_redis_client')
+    @patch('app.services.barcode_lookup.cache_layer.client')
     async def test_cache_get_json_decode_error(self, mock_get_client):
         """Test cache get with JSON decode error"""
         mock_client = AsyncMock()
@@ -354,7 +355,7 @@ class TestBarcodeRedisCache:
         
         assert result is None  # Should handle error gracefully
     
-    @patch('app.services.barcode_lookup.BarcodeRedisCache._get_redis_client')
+    @patch('app.services.barcode_lookup.cache_layer.client')
     async def test_cache_set_success(self, mock_get_client):
         """Test successful cache storage"""
         mock_client = AsyncMock()
@@ -378,7 +379,7 @@ class TestBarcodeRedisCache:
         assert stored_data['barcode'] == "1234567890123"
         assert '_cache_metadata' in stored_data
     
-    @patch('app.services.barcode_lookup.BarcodeRedisCache._get_redis_client')
+    @patch('app.services.barcode_lookup.cache_layer.client')
     async def test_cache_set_redis_error(self, mock_get_client):
         """Test cache set with Redis error"""
         mock_client = AsyncMock()
@@ -389,7 +390,7 @@ class TestBarcodeRedisCache:
         
         assert result is False
     
-    @patch('app.services.barcode_lookup.BarcodeRedisCache._get_redis_client')
+    @patch('app.services.barcode_lookup.cache_layer.client')
     async def test_cache_delete_success(self, mock_get_client):
         """Test successful cache deletion"""
         mock_client = AsyncMock()
@@ -401,7 +402,7 @@ class TestBarcodeRedisCache:
         assert result is True
         mock_client.delete.assert_called_once_with("barcode:product:1234567890123")
     
-    @patch('app.services.barcode_lookup.BarcodeRedisCache._get_redis_client')
+    @patch('app.services.barcode_lookup.cache_layer.client')
     async def test_cache_delete_not_found(self, mock_get_client):
         """Test cache deletion when key doesn't exist"""
         mock_client = AsyncMock()
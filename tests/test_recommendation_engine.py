@@ -52,7 +52,7 @@ class TestSmartRecommendationEngine:
     
     def test_engine_initialization(self, engine):
         """Test that the engine initializes with correct default values."""
-        assert engine.user_profiles == {}
+        assert len(engine.user_profiles) == 0
         assert engine.feedback_history == []
         assert engine.recommendation_cache_ttl == 300
         assert "nutritional_quality" in engine.scoring_weights
@@ -134,7 +134,7 @@ class TestSmartRecommendationEngine:
             last_updated=datetime.now()
         )
         
-        engine.user_profiles["test_user"] = test_profile
+        engine.user_profiles.set("test_user", test_profile)
         
         profile = await engine._load_user_profile("test_user")
         assert profile == test_profile
@@ -384,13 +384,16 @@ class TestShoppingOptimizationService:
         user_id = 'test_user'
 
         # Mock database responses
-        self.mock_db_service.get_recipe_by_id.side_effect = lambda recipe_id: {
-            'id': recipe_id,
-            'name': f'Recipe {recipe_id}',
-            'ingredients': [
-                {'ingredient': 'olive oil', 'quantity': 2, 'unit': 'tablespoon'},
-                {'ingredient': 'salt', 'quantity': 1, 'unit': 'teaspoon'}
-            ]
+        self.mock_db_service.get_recipes_by_ids.side_effect = lambda ids: {
+            recipe_id: {
+                'id': recipe_id,
+                'name': f'Recipe {recipe_id}',
+                'ingredients': [
+                    {'ingredient': 'olive oil', 'quantity': 2, 'unit': 'tablespoon'},
+                    {'ingredient': 'salt', 'quantity': 1, 'unit': 'teaspoon'}
+                ]
+            }
+            for recipe_id in ids
         }
 
         self.mock_db_service.create_shopping_optimization.return_value = 'opt_123'
@@ -426,12 +429,14 @@ class TestShoppingOptimizationIntegration:
 
         # Mock database service
         db_service = AsyncMock(spec=RecipeDatabaseService)
-        db_service.get_recipe_by_id.return_value = {
-            'id': 'test_recipe',
-            'name': 'Test Recipe',
-            'ingredients': [
-                {'ingredient': 'test ingredient', 'quantity': 1, 'unit': 'cup'}
-            ]
+        db_service.get_recipes_by_ids.return_value = {
+            'test_recipe': {
+                'id': 'test_recipe',
+                'name': 'Test Recipe',
+                'ingredients': [
+                    {'ingredient': 'test ingredient', 'quantity': 1, 'unit': 'cup'}
+                ]
+            }
         }
         db_service.create_shopping_optimization.return_value = 'test_opt_id'
         db_service.create_ingredient_consolidation.return_value = 'test_cons_id'
@@ -410,7 +410,7 @@ class TestSmartDietAPI:
     
     def test_get_smart_diet_metrics_success(self, client):
         """Test successful Smart Diet metrics retrieval."""
-        with patch.object(app.smart_diet_engine, 'suggestion_history', []):
+        with patch.object(app.smart_diet_engine.learning_signals, 'stats', return_value={'users': 0, 'suggestions': 0, 'feedback': 0, 'pending': 0}):
             response = client.get("/smart-diet/metrics?days=30")
             
             assert response.status_code == 200
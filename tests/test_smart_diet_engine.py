@@ -1,3 +1,5 @@
+import asyncio
+import time
 from datetime import datetime
 from types import SimpleNamespace
 
@@ -194,12 +196,12 @@ async def test_generate_optimizations_with_plan(smart_diet_engine):
 async def test_process_feedback_updates_history(smart_diet_engine):
     engine, _, _ = smart_diet_engine
     feedback = _make_feedback()
-    engine.suggestion_history = [_make_suggestion()]
+    engine.learning_signals.record_suggestions("user1", [_make_suggestion()])
     engine._update_learning_from_feedback = AsyncMock()
     success = await engine.process_suggestion_feedback(feedback)
     assert success
     engine._update_learning_from_feedback.assert_awaited_once_with(feedback)
-    assert feedback in engine.feedback_history
+    assert feedback in engine.learning_signals.user_feedback("user1")
 
 
 @pytest.mark.asyncio
@@ -207,10 +209,8 @@ async def test_get_diet_insights_filters_history(smart_diet_engine):
     engine, _, _ = smart_diet_engine
     accepted = _make_suggestion("sug-1")
     ignored = _make_suggestion("sug-2")
-    engine.suggestion_history = [accepted, ignored]
-    engine.feedback_history = [
-        _make_feedback(suggestion_id="sug-1", action="accepted")
-    ]
+    engine.learning_signals.record_suggestions("user1", [accepted, ignored])
+    engine.learning_signals.record_feedback(_make_feedback(suggestion_id="sug-1", action="accepted"))
 
     insights = await engine.get_diet_insights("user1", period="week")
     assert isinstance(insights, SmartDietInsights)
@@ -390,7 +390,7 @@ async def test_update_learning_from_feedback_with_recommendation(smart_diet_engi
         legacy_recommendation_data={"id": "rec-1"}
     )
 
-    engine.suggestion_history = [suggestion]
+    engine.learning_signals.record_suggestions("user1", [suggestion])
     engine.recommendation_engine = _DummyRecommendationEngine()
 
     feedback = SuggestionFeedback(
@@ -411,8 +411,6 @@ async def test_update_learning_from_feedback_missing_suggestion(smart_diet_engin
     """Test _update_learning_from_feedback() with missing suggestion"""
     engine, _, _ = smart_diet_engine
 
-    engine.suggestion_history = []
-
     feedback = SuggestionFeedback(
         suggestion_id="nonexistent",
         user_id="user1",
@@ -443,11 +441,10 @@ async def test_get_diet_insights_error_handling(smart_diet_engine, monkeypatch):
     engine, _, _ = smart_diet_engine
 
     # Mock to raise error
-    monkeypatch.setattr(
-        engine,
-        "suggestion_history",
-        property(lambda self: None)  # Force error during filter
-    )
+    def _raise(*args, **kwargs):
+        raise RuntimeError("history unavailable")
+
+    monkeypatch.setattr(engine.learning_signals, "user_feedback", _raise)
 
     insights = await engine.get_diet_insights("user1")
 
@@ -569,12 +566,31 @@ async def test_boost_and_reduce_similar_suggestions(smart_diet_engine):
 
     suggestion = _make_suggestion("sug-1")
 
-    # Should not raise exceptions
+    engine._boost_similar_suggestions(suggestion)
     engine._boost_similar_suggestions(suggestion)
     engine._reduce_similar_suggestions(suggestion, "not_what_i_expected")
 
-    # These are simplified implementations
-    assert True
+    category = suggestion.category.value
+    assert engine.learning_signals.outcome_counts("user1", category) == (2, 1)
+    assert engine.learning_signals.affinity("user1", category) > 1.0
+
+
+@pytest.mark.asyncio
+async def test_rejections_lower_future_confidence(smart_diet_engine):
+    engine, _, _ = smart_diet_engine
+    suggestion = _make_suggestion("sug-1")
+    engine.learning_signals.record_suggestions("user1", [suggestion])
+
+    for _ in range(3):
+        await engine._update_learning_from_feedback(_make_feedback(action="rejected"))
+
+    fresh = [_make_suggestion("sug-2")]
+    engine._apply_learned_affinity("user1", fresh)
+    assert fresh[0].confidence_score < 0.8
+
+    other_user = [_make_suggestion("sug-3", user_id="user2")]
+    engine._apply_learned_affinity("user2", other_user)
+    assert other_user[0].confidence_score == 0.8
 
 
 @pytest.mark.asyncio
@@ -583,7 +599,7 @@ async def test_process_feedback_with_rejected_action(smart_diet_engine):
     engine, _, _ = smart_diet_engine
 
     suggestion = _make_suggestion("sug-reject")
-    engine.suggestion_history = [suggestion]
+    engine.learning_signals.record_suggestions("user1", [suggestion])
     engine._update_learning_from_feedback = AsyncMock()
 
     feedback = SuggestionFeedback(
@@ -605,9 +621,6 @@ async def test_get_diet_insights_with_no_history(smart_diet_engine):
     """Test get_diet_insights() with empty history"""
     engine, _, _ = smart_diet_engine
 
-    engine.suggestion_history = []
-    engine.feedback_history = []
-
     insights = await engine.get_diet_insights("user-no-history", period="week")
 
     assert isinstance(insights, SmartDietInsights)
@@ -715,3 +728,53 @@ async def test_optimization_engine_error_in_meal_analysis(smart_diet_engine, mon
     assert isinstance(optimizations, list)
     # Should return empty or partial results, not crash
 
+
+
+@pytest.mark.asyncio
+async def test_generation_stages_run_concurrently_with_breakdown(smart_diet_engine):
+    engine, cache, _ = smart_diet_engine
+    running = []
+
+    async def slow_stage(name, value):
+        running.append(name)
+        await asyncio.sleep(0.05)
+        return value
+
+    engine._generate_recommendations = lambda user_id, request: slow_stage(
+        "recommendations", [_make_suggestion("rec-1")]
+    )
+    engine._generate_optimizations = lambda user_id, request: slow_stage(
+        "optimizations", [_make_suggestion("opt-1")]
+    )
+    engine._generate_insights = lambda user_id, request: slow_stage("insights", [])
+    request = SmartDietRequest(context_type=SmartDietContext.TODAY, current_meal_plan_id="plan-1")
+
+    started = time.perf_counter()
+    response = await engine.get_smart_suggestions("user1", request)
+
+    assert time.perf_counter() - started < 0.14
+    assert sorted(running) == ["insights", "optimizations", "recommendations"]
+    assert {"recommendations", "optimizations", "insights", "highlights", "summary"} <= set(
+        response.generation_breakdown_ms
+    )
+    assert response.degraded_stages == []
+    assert cache.data
+
+
+@pytest.mark.asyncio
+async def test_timed_out_stage_degrades_and_skips_cache(smart_diet_engine):
+    engine, cache, _ = smart_diet_engine
+
+    async def hang(user_id, request):
+        await asyncio.sleep(1)
+        return [_make_suggestion("late")]
+
+    engine._generate_insights = hang
+    engine.stage_timeouts["insights"] = 0.01
+    request = SmartDietRequest(context_type=SmartDietContext.INSIGHTS, include_recommendations=False)
+
+    response = await engine.get_smart_suggestions("user1", request)
+
+    assert response.degraded_stages == ["insights"]
+    assert response.insights == []
+    assert cache.data == {}
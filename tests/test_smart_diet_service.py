@@ -152,6 +152,31 @@ async def test_generate_swap_suggestions_uses_alternatives(monkeypatch, optimiza
     mock_suggestion.assert_awaited_with(meal_item, mock_alternatives.return_value[0], "protein_sources")
 
 
+@pytest.mark.asyncio
+async def test_find_healthier_alternatives_uses_nutrient_index(monkeypatch, optimization_engine):
+    from app.services.nutrient_index import NutrientIndex
+    import app.services.smart_diet as smart_diet_module
+
+    index = NutrientIndex()
+    index.register_partitions(optimization_engine.food_swap_database)
+    index.load_rows([
+        {"barcode": "1", "name": "Brown rice", "access_count": 3,
+         "nutriments": {"energy_kcal_per_100g": 110, "protein_g_per_100g": 9,
+                        "fat_g_per_100g": 0.9, "carbs_g_per_100g": 23}},
+        {"barcode": "2", "name": "Fried rice", "access_count": 9,
+         "nutriments": {"energy_kcal_per_100g": 400, "protein_g_per_100g": 5,
+                        "fat_g_per_100g": 12, "carbs_g_per_100g": 50}},
+    ])
+    monkeypatch.setattr(smart_diet_module, "nutrient_index", index)
+
+    item = _SimpleMealItem("White rice", _SimpleMacros(360, 7, 1, 79))
+    alternatives = await optimization_engine._find_healthier_alternatives(item, "grain_products", {})
+
+    assert [alt["barcode"] for alt in alternatives] == ["1"]
+    assert set(alternatives[0]["benefits"]) == {"calories", "protein_g"}
+    assert alternatives[0]["nutrition"]["protein"] == 9
+
+
 # PHASE 3: Extended tests for analyze_meal_plan coverage (2025-12-13)
 @pytest.mark.asyncio
 async def test_analyze_meal_plan_success(monkeypatch, optimization_engine):
@@ -255,3 +280,76 @@ def test_should_apply_rule_checks_conditions(optimization_engine):
     adequate_nutrition = {"protein_g": 40, "calories": 500}
     should_apply = optimization_engine._should_apply_rule(rule, adequate_nutrition, {})
     assert should_apply is False
+
+
+@pytest.fixture
+def product_db(tmp_path, monkeypatch):
+    import json
+    import app.services.smart_diet as smart_diet_module
+    from app.services.database import DatabaseService
+
+    db = DatabaseService(str(tmp_path / "products.db"), max_connections=2)
+    with db.get_connection() as conn:
+        for barcode, name in (("111", "Quinoa"), ("222", "Greek Yogurt Natural"), ("333", "Chia Seeds")):
+            conn.execute(
+                "INSERT INTO products (barcode, name, nutriments, source) VALUES (?, ?, ?, 'Database')",
+                (barcode, name, json.dumps({
+                    "energy_kcal_per_100g": 100, "protein_g_per_100g": 10,
+                    "fat_g_per_100g": 2, "carbs_g_per_100g": 12,
+                })),
+            )
+        conn.commit()
+    monkeypatch.setattr(smart_diet_module, "db_service", db)
+
+    searches = []
+    real_search = smart_diet_module.product_search_service.search
+
+    def counting_search(conn, terms, *args, **kwargs):
+        searches.append(list(terms))
+        return real_search(conn, terms, *args, **kwargs)
+
+    monkeypatch.setattr(smart_diet_module.product_search_service, "search", counting_search)
+    return searches
+
+
+@pytest.mark.asyncio
+async def test_resolve_products_batches_lookup_and_caches(monkeypatch, optimization_engine, product_db):
+    import app.services.smart_diet as smart_diet_module
+
+    remote = AsyncMock(return_value=None)
+    monkeypatch.setattr(smart_diet_module.openfoodfacts_service, "search_product_by_name", remote)
+
+    resolved = await optimization_engine.resolve_products(
+        ["Quinoa", " greek  yogurt", "Chia Seeds", "Dragon Fruit", "quinoa"]
+    )
+
+    assert resolved["quinoa"].barcode == "111"
+    assert resolved["greek yogurt"].barcode == "222"
+    assert resolved["chia seeds"].barcode == "333"
+    assert resolved["dragon fruit"] is None
+    assert len(product_db) == 1
+    remote.assert_awaited_once_with("dragon fruit")
+
+    product = await optimization_engine._resolve_product_for_name("QUINOA")
+    assert product.barcode == "111"
+    assert (await optimization_engine.resolve_products(["dragon fruit"]))["dragon fruit"] is None
+    assert len(product_db) == 1
+    assert remote.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_warm_product_cache_stays_local(monkeypatch, optimization_engine, product_db):
+    import app.services.smart_diet as smart_diet_module
+
+    remote = AsyncMock(return_value=None)
+    monkeypatch.setattr(smart_diet_module.openfoodfacts_service, "search_product_by_name", remote)
+
+    cached = await optimization_engine.warm_product_cache()
+
+    remote.assert_not_awaited()
+    # Rule products found locally plus one candidate list per swap category
+    assert cached == 3 + len(optimization_engine.food_swap_database)
+    assert "almond milk" not in optimization_engine.product_cache
+    searches = len(product_db)
+    await optimization_engine._resolve_product_for_name("Chia Seeds")
+    assert len(product_db) == searches
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import sqlite3
+
+import httpx
+import pytest
+
+from scripts import sync_products_openfoodfacts as sync
+
+
+def _product(barcode: str, name: str = "Oat Milk") -> dict:
+    return {
+        "code": barcode,
+        "product_name_en": name,
+        "brands": "Brand",
+        "categories": "Beverages",
+        "nutriments": {
+            "energy-kcal_100g": 45,
+            "proteins_100g": 1.0,
+            "fat_100g": 1.5,
+            "carbohydrates_100g": 6.7,
+        },
+    }
+
+
+@pytest.fixture
+def conn(tmp_path):
+    connection = sqlite3.connect(tmp_path / "products.db")
+    connection.execute(
+        """
+        CREATE TABLE products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            barcode TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            brand TEXT,
+            categories TEXT,
+            nutriments TEXT NOT NULL,
+            serving_size TEXT,
+            image_url TEXT,
+            source TEXT DEFAULT 'OpenFoodFacts',
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            access_count INTEGER DEFAULT 0
+        )
+        """
+    )
+    connection.execute("CREATE INDEX idx_products_name ON products(name)")
+    yield connection
+    connection.close()
+
+
+def _write_jsonl(path, products):
+    with open(path, "w", encoding="utf-8") as handle:
+        for product in products:
+            handle.write(json.dumps(product) + "\n")
+        handle.write("{not json}\n")
+
+
+def test_ingest_dump_batches_upserts_and_rebuilds_indexes(conn, tmp_path):
+    dump = tmp_path / "off.jsonl"
+    _write_jsonl(dump, [_product(str(1000 + i)) for i in range(7)] + [_product("abc")])
+
+    stats = sync.ingest_dump(conn, str(dump), batch_size=3, progress=sync.ProgressReporter(every=10**9))
+
+    assert stats == {"seen": 9, "upserted": 7, "skipped": 2}
+    assert conn.execute("SELECT COUNT(*) FROM products").fetchone()[0] == 7
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert set(sync.PRODUCT_INDEXES) <= indexes
+
+
+def test_ingest_dump_resumes_from_checkpoint(conn, tmp_path):
+    dump = tmp_path / "off.jsonl"
+    checkpoint = tmp_path / "off.checkpoint"
+    _write_jsonl(dump, [_product(str(2000 + i)) for i in range(5)])
+    sync.save_checkpoint(str(checkpoint), {"source": str(dump), "line": 3, "upserted": 3, "skipped": 0})
+
+    stats = sync.ingest_dump(conn, str(dump), checkpoint_path=str(checkpoint), progress=sync.ProgressReporter(every=10**9))
+
+    barcodes = {row[0] for row in conn.execute("SELECT barcode FROM products")}
+    assert barcodes == {"2003", "2004"}
+    assert stats["upserted"] == 5
+    assert sync.load_checkpoint(str(checkpoint))["completed"] is True
+
+
+def test_ingest_dump_reads_tab_separated_export(conn, tmp_path):
+    dump = tmp_path / "off.csv"
+    dump.write_text(
+        "code\tproduct_name\tbrands\tenergy-kcal_100g\tproteins_100g\tfat_100g\tcarbohydrates_100g\n"
+        "3000\tGreek Yogurt\tAcme\t97\t9\t5\t3.6\n"
+        "3001\tIncomplete\tAcme\t\t9\t5\t3.6\n",
+        encoding="utf-8",
+    )
+
+    stats = sync.ingest_dump(conn, str(dump), progress=sync.ProgressReporter(every=10**9))
+
+    assert stats["upserted"] == 1
+    name, nutriments = conn.execute("SELECT name, nutriments FROM products").fetchone()
+    assert name == "Greek Yogurt"
+    assert json.loads(nutriments)["protein_g_per_100g"] == 9.0
+
+
+def test_upsert_updates_existing_rows(conn):
+    assert sync.upsert_product(conn, _product("4000", "Old Name"))
+    assert sync.upsert_product(conn, _product("4000", "New Name"))
+
+    rows = conn.execute("SELECT name FROM products WHERE barcode = '4000'").fetchall()
+    assert rows == [("New Name",)]
+
+
+def test_fetch_search_pages_async_retries_transient_errors():
+    calls = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        calls[page] = calls.get(page, 0) + 1
+        if page == 1 and calls[page] == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"products": [_product(str(5000 + page))]})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await sync.fetch_search_pages_async([1, 2], page_size=1, client=client, backoff=0)
+
+    results = asyncio.run(run())
+
+    assert calls == {1: 2, 2: 1}
+    assert results[1][0]["code"] == "5001"
+    assert results[2][0]["code"] == "5002"
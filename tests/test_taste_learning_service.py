@@ -561,6 +561,23 @@ async def test_update_cuisine_preferences_success(taste_service, mock_db_service
     assert mock_db_service.update_cuisine_preference.called
 
 
+@pytest.mark.asyncio
+async def test_update_preferences_publish_once_per_batch(taste_service, mock_db_service):
+    """A batch of preference writes sends a single taste-profile invalidation"""
+    from app.services import taste_learning as taste_learning_module
+
+    mock_db_service.update_cuisine_preference = AsyncMock(return_value=True)
+    data = {'raw_score': 0.8, 'total_ratings': 5, 'would_make_again_ratio': 0.8,
+            'average_rating': 4.5, 'modification_ratio': 0.0}
+    analysis = {'cuisine_preferences': {'italian': data, 'thai': data, 'mexican': data}}
+
+    with patch.object(taste_learning_module.invalidation_bus, "publish", AsyncMock()) as publish:
+        assert await taste_service.update_cuisine_preferences_in_db("user-123", analysis) is True
+
+    publish.assert_awaited_once_with(taste_learning_module.TASTE_PROFILE, "user-123")
+    assert all(call.kwargs == {'publish': False} for call in mock_db_service.update_cuisine_preference.await_args_list)
+
+
 @pytest.mark.asyncio
 async def test_update_cuisine_preferences_no_data(taste_service, mock_db_service):
     """Test updating cuisine preferences with no data"""